@@ -4,4 +4,10 @@
 FastAPIアプリケーションのメインパッケージです。
 """
 
+import time
+
 __version__ = "0.1.0"
+
+# アプリケーションのインポートにかかった時間を起動時間の内訳に含めるため、
+# パッケージの読み込み時（app.mainの依存より前）に計測を開始する
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,18 @@
+"""
+アプリケーション起動モジュール。
+
+`python -m app`で設定に従ったアプリケーションサーバーを起動します。
+"""
+
+from __future__ import annotations
+
+import logging
+
+from app.core.server import run
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    run()
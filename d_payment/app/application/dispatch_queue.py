@@ -0,0 +1,277 @@
+"""
+非同期転送キューモジュール。
+
+受け付けた決済リクエストをプロセス内のキューに積み、
+固定数のワーカーが外部APIへ転送するユースケースを実装します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.lifecycle import lifecycle
+from app.domain.entities.merchant import Merchant
+from app.domain.interfaces.payment_service import PaymentServiceInterface
+
+logger = logging.getLogger(__name__)
+
+# ジョブの状態
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """キューが満杯で受け付けられない場合の例外。"""
+
+
+class QueueClosedError(Exception):
+    """ドレイン開始後で受け付けられない場合の例外。"""
+
+
+def generate_transaction_id() -> str:
+    """
+    外部APIに送信するトランザクションIDを生成します。
+
+    Returns:
+        str: 20桁の英数字からなるトランザクションID
+    """
+    return uuid.uuid4().hex[:20]
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="milliseconds") + "+09:00"
+
+
+@dataclass
+class DispatchJob:
+    """
+    非同期転送ジョブ。
+
+    受付時点の状態から外部APIの処理結果までを保持します。
+    """
+
+    transaction_id: str
+    request_data: Dict[str, Any]
+    status: str = JOB_QUEUED
+    accepted_at: str = field(default_factory=_now)
+    completed_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    merchant: Optional[Merchant] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        ステータス照会用の辞書に変換します。
+
+        Returns:
+            Dict[str, Any]: ジョブの状態（リクエスト本文は含みません）
+        """
+        return {
+            "transactionId": self.transaction_id,
+            "status": self.status,
+            "acceptedAt": self.accepted_at,
+            "completedAt": self.completed_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class DispatchQueue:
+    """
+    決済リクエストの非同期転送キュー。
+
+    キューの長さに上限を設け、満杯の場合は呼び出し元に背圧を返します。
+    完了したジョブの結果はmax_results件まで保持し、古いものから破棄します。
+    """
+
+    def __init__(
+        self,
+        payment_service: PaymentServiceInterface,
+        maxsize: int = 1000,
+        workers: int = 8,
+        enqueue_timeout: float = 0.0,
+        max_results: int = 10000,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            payment_service: 転送に使用する決済サービス
+            maxsize: キューに積めるジョブの上限
+            workers: 転送ワーカーの数
+            enqueue_timeout: キューが満杯の場合に空きを待つ最大秒数
+            max_results: 保持するジョブの上限
+        """
+        self._payment_service = payment_service
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self.enqueue_timeout = enqueue_timeout
+        self.max_results = max_results
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, DispatchJob]" = OrderedDict()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def depth(self) -> int:
+        """キューに積まれているジョブの数。"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """
+        転送ワーカーを起動します。
+
+        イベントループ上で呼び出す必要があります。
+        """
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._closed = False
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"dispatch-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"非同期転送ワーカーを起動しました workers={self.worker_count} maxsize={self.maxsize}")
+
+    async def submit(
+        self, request_data: Dict[str, Any], merchant: Optional[Merchant] = None
+    ) -> DispatchJob:
+        """
+        決済リクエストをキューに積みます。
+
+        Args:
+            request_data: 受信した決済リクエストデータ
+            merchant: 送信元の加盟店（省略時は設定ファイルの加盟店）
+
+        Returns:
+            DispatchJob: 受け付けたジョブ
+
+        Raises:
+            QueueClosedError: ドレイン開始後の場合
+            QueueFullError: enqueue_timeout秒以内にキューの空きができなかった場合
+        """
+        if self._closed or self._queue is None or lifecycle.is_draining:
+            raise QueueClosedError()
+        job = DispatchJob(
+            transaction_id=generate_transaction_id(),
+            request_data=request_data,
+            merchant=merchant,
+        )
+        try:
+            if self.enqueue_timeout > 0:
+                await asyncio.wait_for(self._queue.put(job), timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(job)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            raise QueueFullError()
+        self._remember(job)
+        return job
+
+    def get(self, transaction_id: str) -> Optional[DispatchJob]:
+        """
+        ジョブを取得します。
+
+        Args:
+            transaction_id: 受付時に払い出したトランザクションID
+
+        Returns:
+            Optional[DispatchJob]: ジョブ（保持していない場合はNone）
+        """
+        return self._jobs.get(transaction_id)
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        受付を停止し、キューに積まれたジョブの転送完了を待ってワーカーを停止します。
+
+        Args:
+            timeout: 最大待機秒数
+
+        Returns:
+            bool: 期限内にすべてのジョブが完了した場合はTrue
+        """
+        self._closed = True
+        if self._queue is None:
+            return True
+        completed = True
+        if self._queue.qsize():
+            logger.info(f"未転送のジョブ {self._queue.qsize()} 件の完了を待機します")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"非同期転送のドレイン期限を超過しました（未転送 {self._queue.qsize()} 件）")
+            completed = False
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        return completed
+
+    async def _worker(self) -> None:
+        """キューからジョブを取り出して外部APIへ転送するワーカー。"""
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._dispatch(job)
+            finally:
+                self._queue.task_done()
+
+    async def _dispatch(self, job: DispatchJob) -> None:
+        """
+        ジョブを外部APIへ転送し、結果を記録します。
+
+        Args:
+            job: 転送するジョブ
+        """
+        job.status = JOB_PROCESSING
+        started = time.perf_counter()
+        try:
+            async with lifecycle.track():
+                response = await self._payment_service.process_payment(
+                    job.request_data,
+                    transaction_id=job.transaction_id,
+                    merchant=job.merchant,
+                )
+        except Exception as e:
+            logger.exception(f"非同期転送中にエラーが発生しました [{job.transaction_id}]")
+            job.status = JOB_FAILED
+            job.error = str(e)
+        else:
+            job.status = JOB_SUCCEEDED if response.success else JOB_FAILED
+            job.result = response.data
+            job.error = response.error
+        job.completed_at = _now()
+        # 転送が済んだリクエスト本文は保持しない
+        job.request_data = {}
+        logger.info(
+            f"非同期転送が完了しました [{job.transaction_id}] status={job.status} "
+            f"elapsed={time.perf_counter() - started:.3f}s"
+        )
+
+    def _remember(self, job: DispatchJob) -> None:
+        """
+        ジョブを保持し、上限を超えた場合は完了済みのものから古い順に破棄します。
+
+        Args:
+            job: 保持するジョブ
+        """
+        self._jobs[job.transaction_id] = job
+        while len(self._jobs) > self.max_results:
+            for transaction_id, old in self._jobs.items():
+                if old.status in (JOB_SUCCEEDED, JOB_FAILED):
+                    del self._jobs[transaction_id]
+                    break
+            else:
+                break
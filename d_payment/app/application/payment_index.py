@@ -0,0 +1,199 @@
+"""
+決済状況インデックスモジュール。
+
+直近の決済結果を注文番号で引けるよう、プロセス内に保持するユースケースを実装します。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 決済の状態
+PAYMENT_PENDING = "pending"
+PAYMENT_SUCCEEDED = "succeeded"
+PAYMENT_FAILED = "failed"
+
+
+@dataclass
+class PaymentStatus:
+    """
+    注文番号ごとの決済状況。
+
+    同じ注文番号で複数回送信された場合は、最後の送信の状況を保持します。
+    送信はトランザクションIDと送信ごとに採番した送信IDの組で識別します
+    （トランザクションIDは省略時に既定値となり、送信間で重複するため）。
+    """
+
+    order_number: str
+    transaction_id: Optional[str]
+    status: str
+    requested_at: float
+    updated_at: float
+    response_code: Optional[str] = None
+    elapsed_ms: Optional[float] = None
+    attempts: int = 1
+    attempt_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        照会用の辞書に変換します。
+
+        Returns:
+            Dict[str, Any]: 決済状況
+        """
+        return {
+            "orderNumber": self.order_number,
+            "transactionId": self.transaction_id,
+            "status": self.status,
+            "responseCode": self.response_code,
+            "requestedAt": self.requested_at,
+            "completedAt": self.updated_at if self.status != PAYMENT_PENDING else None,
+            "elapsedMs": self.elapsed_ms,
+            "attempts": self.attempts,
+        }
+
+
+class PaymentIndex:
+    """
+    注文番号をキーとする決済状況のインデックス。
+
+    更新順に並べたOrderedDictで保持するため、照会と更新はO(1)、
+    期限切れと上限超過の破棄は古いものから順に行えます。
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl: float = 86400.0):
+        """
+        初期化メソッド。
+
+        Args:
+            max_entries: 保持する注文番号の上限
+            ttl: 最終更新から破棄するまでの秒数
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, PaymentStatus]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, order_number: str, now: Optional[float] = None) -> Optional[PaymentStatus]:
+        """
+        注文番号の決済状況を取得します。
+
+        Args:
+            order_number: 注文番号
+            now: 現在時刻（UNIX秒、省略時は現在時刻）
+
+        Returns:
+            Optional[PaymentStatus]: 決済状況（保持していない場合はNone）
+        """
+        entry = self._entries.get(order_number)
+        if entry is None:
+            return None
+        if entry.updated_at < (now if now is not None else time.time()) - self.ttl:
+            del self._entries[order_number]
+            return None
+        return entry
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        """
+        ジャーナル形式のレコードをインデックスに反映します。
+
+        Args:
+            record: 種別（request/response）、注文番号、トランザクションID、送信IDを含むレコード
+        """
+        order_number = record.get("orderNumber")
+        if not order_number:
+            return
+        ts = record.get("ts") or time.time()
+        attempt_id = record.get("attemptId")
+        entry = self._entries.get(order_number)
+
+        if record.get("type") == "request":
+            if entry is None:
+                entry = PaymentStatus(
+                    order_number=order_number,
+                    transaction_id=record.get("transactionId"),
+                    status=PAYMENT_PENDING,
+                    requested_at=ts,
+                    updated_at=ts,
+                    attempt_id=attempt_id,
+                )
+                self._entries[order_number] = entry
+            else:
+                entry.transaction_id = record.get("transactionId")
+                entry.attempt_id = attempt_id
+                entry.status = PAYMENT_PENDING
+                entry.requested_at = entry.updated_at = ts
+                entry.response_code = entry.elapsed_ms = None
+                entry.attempts += 1
+        elif record.get("type") == "response":
+            if entry is None:
+                # リクエストの記録が期限切れで破棄された場合
+                entry = PaymentStatus(
+                    order_number=order_number,
+                    transaction_id=record.get("transactionId"),
+                    status=PAYMENT_PENDING,
+                    requested_at=ts,
+                    updated_at=ts,
+                    attempt_id=attempt_id,
+                )
+                self._entries[order_number] = entry
+            elif (entry.transaction_id, entry.attempt_id) != (
+                record.get("transactionId"),
+                attempt_id,
+            ):
+                # 後続の送信が始まっている場合は古い送信の結果で上書きしない
+                return
+            entry.status = PAYMENT_SUCCEEDED if record.get("success") else PAYMENT_FAILED
+            entry.response_code = record.get("responseCode")
+            entry.elapsed_ms = record.get("elapsedMs")
+            entry.updated_at = ts
+        else:
+            return
+
+        self._entries.move_to_end(order_number)
+        self._evict(time.time())
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        永続化済みのレコードからインデックスを再構築します。
+
+        保持している内容は破棄してから反映します。
+
+        Args:
+            records: 記録順に並んだレコード
+
+        Returns:
+            int: 反映したレコード数
+        """
+        self._entries.clear()
+        cutoff = time.time() - self.ttl
+        applied = 0
+        for record in records:
+            if (record.get("ts") or 0) < cutoff:
+                continue
+            self.apply(record)
+            applied += 1
+        logger.info(f"決済状況インデックスを再構築しました records={applied} entries={len(self)}")
+        return applied
+
+    def _evict(self, now: float) -> None:
+        """
+        上限を超えたもの、期限切れのものを古い順に破棄します。
+
+        Args:
+            now: 現在時刻（UNIX秒）
+        """
+        cutoff = now - self.ttl
+        while self._entries:
+            order_number, oldest = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and oldest.updated_at >= cutoff:
+                break
+            del self._entries[order_number]
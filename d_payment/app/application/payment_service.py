@@ -6,23 +6,63 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Union
 
+from app.application.payment_index import PaymentIndex
+from app.application.rejected_tokens import RejectedTokenCache
 from app.core.config import settings
+from app.core.tracing import tracer
+from app.domain.entities.merchant import Merchant
 from app.domain.entities.payment import (
     PaymentRequest,
     PaymentResponse,
+    RawUpstreamResponse,
     RegiChargeRequestItem,
 )
 from app.domain.interfaces.payment_service import (
     PaymentServiceInterface,
     HttpClientInterface,
+    JournalInterface,
 )
 
 logger = logging.getLogger(__name__)
 
+# トランザクションIDが指定されない場合に使用する既定値
+DEFAULT_TRANSACTION_ID = "transid0000000000001"
+
+_default_merchant: Optional[Merchant] = None
+
+
+def default_merchant() -> Merchant:
+    """
+    設定ファイルの会社コード・店舗コード・認証パスから加盟店を返します。
+
+    設定値が変わった場合（テストでの差し替えなど）は作り直します。
+
+    Returns:
+        Merchant: 既定の加盟店
+    """
+    global _default_merchant
+    merchant = _default_merchant
+    if (
+        merchant is None
+        or merchant.company_code != settings.PAYMENT_COMPANY_CODE
+        or merchant.store_code != settings.PAYMENT_STORE_CODE
+        or merchant.authentication_pass != settings.PAYMENT_AUTHENTICATION_PASS
+    ):
+        merchant = _default_merchant = Merchant(
+            merchant_id="default",
+            company_code=settings.PAYMENT_COMPANY_CODE,
+            store_code=settings.PAYMENT_STORE_CODE,
+            authentication_pass=settings.PAYMENT_AUTHENTICATION_PASS,
+        )
+    return merchant
+
 
 class PaymentService(PaymentServiceInterface):
     """
@@ -31,16 +71,38 @@ class PaymentService(PaymentServiceInterface):
     決済処理のユースケースを実装します。
     """
 
-    def __init__(self, http_client: HttpClientInterface):
+    def __init__(
+        self,
+        http_client: HttpClientInterface,
+        journal: Optional[JournalInterface] = None,
+        index: Optional[PaymentIndex] = None,
+        client_for: Optional[Callable[[Merchant], Optional[HttpClientInterface]]] = None,
+        rejected_tokens: Optional[RejectedTokenCache] = None,
+    ):
         """
         初期化メソッド。
 
         Args:
             http_client: HTTPクライアントインターフェース
+            journal: 送受信を記録するジャーナル（省略時は記録しない）
+            index: 決済状況を反映するインデックス（省略時は反映しない）
+            client_for: 加盟店専用のHTTPクライアントを返す関数
+                （専用クライアントがない場合はNoneを返す。省略時は常にhttp_clientを使用）
+            rejected_tokens: 拒否済み請求トークンのキャッシュ（省略時は毎回外部APIに送信）
         """
         self._http_client = http_client
+        self._journal = journal
+        self._index = index
+        self._client_for = client_for
+        self._rejected_tokens = rejected_tokens
 
-    async def process_payment(self, request_data: Dict[str, Any]) -> PaymentResponse:
+    async def process_payment(
+        self,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str] = None,
+        merchant: Optional[Merchant] = None,
+        passthrough: bool = False,
+    ) -> PaymentResponse:
         """
         決済リクエストを処理します。
 
@@ -49,18 +111,73 @@ class PaymentService(PaymentServiceInterface):
         2. 外部APIにデータを送信
         3. 外部APIからのレスポンスをそのまま返す
 
+        ジャーナルが設定されている場合は、送信前にリクエストを永続化し、
+        受信後にレスポンスを記録します。インデックスにも同じ内容を反映します。
+        拒否済み請求トークンのキャッシュが設定されている場合、保持している請求トークンの
+        リクエストは外部APIに送信せず（ジャーナルにも記録せず）、拒否したときのレスポンスを返します。
+
+        Args:
+            request_data: 受信した決済リクエストデータ
+            transaction_id: 外部APIに送信するトランザクションID（省略時は既定値）
+            merchant: 送信元の加盟店（省略時は設定ファイルの加盟店）
+            passthrough: 外部APIの正常レスポンスを解析せずにrawとして返すかどうか
+                （エラー時は通常どおりdataにエラー情報を返す）
+
+        Returns:
+            PaymentResponse: 処理結果
+        """
+        with tracer.start_span("process_payment") as span:
+            result = await self._process_payment(
+                span, request_data, transaction_id, merchant, passthrough
+            )
+            span.set_attribute("payment.success", result.success)
+            return result
+
+    async def _process_payment(
+        self,
+        span: Any,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str],
+        merchant: Optional[Merchant],
+        passthrough: bool,
+    ) -> PaymentResponse:
+        """
+        決済リクエストを処理します（process_paymentの本体）。
+
         Args:
+            span: 決済処理のスパン
             request_data: 受信した決済リクエストデータ
+            transaction_id: 外部APIに送信するトランザクションID
+            merchant: 送信元の加盟店
+            passthrough: 外部APIの正常レスポンスを解析せずにrawとして返すかどうか
 
         Returns:
             PaymentResponse: 処理結果
         """
+        recorded = False
+        started = time.perf_counter()
+        # 拒否済み請求トークンのキャッシュは文字列のトークンのみを対象とする
+        billing_token = request_data.get("billingToken")
+        if not isinstance(billing_token, str) or not billing_token:
+            billing_token = None
+
         try:
+            if self._rejected_tokens is not None and billing_token is not None:
+                rejected = self._rejected_tokens.get(billing_token)
+                if rejected is not None:
+                    logger.info("拒否済みの請求トークンのため、外部APIに送信せずに拒否します")
+                    span.set_attribute("payment.rejected_token", True)
+                    return self._rejected_response(rejected, transaction_id, passthrough)
+
             logger.info("決済リクエストの処理を開始します")
 
             # ステップ1: 受信データを外部API用の形式に変換
-            payment_request = self._transform_request(request_data)
-            request_dict = self._payment_request_to_dict(payment_request)
+            merchant = merchant or default_merchant()
+            span.set_attribute("payment.merchant_id", merchant.merchant_id)
+            with tracer.start_span("transform_request"):
+                payment_request = self._transform_request(request_data, transaction_id, merchant)
+                request_dict = self._payment_request_to_dict(payment_request, merchant)
+            span.set_attribute("payment.transaction_id", payment_request.transaction_id)
 
             # 送信データをロギング（機密情報は除く）
             safe_log_data = request_dict.copy()
@@ -68,12 +185,49 @@ class PaymentService(PaymentServiceInterface):
                 safe_log_data["authenticationPass"] = "****"
             logger.info(f"変換されたリクエスト: {safe_log_data}")
 
+            # 送信前にリクエストを記録する（ジャーナルへは先行書き込み）
+            # 送信ごとに送信IDを採番し、リクエストとレスポンスの記録を対応付ける
+            if self._journal is not None or self._index is not None:
+                attempt_id = uuid.uuid4().hex
+                with tracer.start_span("journal_append"):
+                    await self._record(
+                        {
+                            "type": "request",
+                            **self._record_keys(payment_request, attempt_id),
+                            "request": request_dict,
+                        },
+                        wait=True,
+                    )
+                recorded = True
+
             # ステップ2: 外部APIにデータを送信
             logger.info(f"外部API {settings.PAYMENT_API_URL} にリクエストを送信します")
-            response = await self._http_client.post(
-                url=settings.PAYMENT_API_URL, data=request_dict
-            )
+            started = time.perf_counter()
+            http_client = self._http_client
+            if self._client_for is not None:
+                http_client = self._client_for(merchant) or http_client
+            if passthrough:
+                response = await http_client.post_raw(
+                    url=settings.PAYMENT_API_URL, data=request_dict
+                )
+            else:
+                response = await http_client.post(
+                    url=settings.PAYMENT_API_URL, data=request_dict
+                )
             logger.info("外部APIからレスポンスを受信しました")
+            if recorded:
+                await self._record_response(
+                    payment_request, attempt_id, started, response=response
+                )
+            if self._rejected_tokens is not None and billing_token is not None:
+                self._rejected_tokens.record(billing_token, response)
+
+            if isinstance(response, RawUpstreamResponse):
+                return PaymentResponse(
+                    success=True,
+                    message="決済リクエストが正常に処理されました",
+                    raw=response,
+                )
 
             # ステップ3: 外部APIからのレスポンスをそのまま返す
             return PaymentResponse(
@@ -84,16 +238,141 @@ class PaymentService(PaymentServiceInterface):
 
         except Exception as e:
             logger.exception(f"決済リクエスト処理中にエラーが発生しました: {str(e)}")
+            span.record_error(e)
+            if recorded:
+                await self._record_response(payment_request, attempt_id, started, error=str(e))
             return PaymentResponse(
                 success=False, message="決済処理エラー", error=str(e)
             )
 
-    def _transform_request(self, request_data: Dict[str, Any]) -> PaymentRequest:
+    @staticmethod
+    def _rejected_response(
+        response: Union[Dict[str, Any], RawUpstreamResponse],
+        transaction_id: Optional[str],
+        passthrough: bool,
+    ) -> PaymentResponse:
+        """
+        拒否済みの請求トークンに対して、拒否したときと同じ形式の処理結果を返します。
+
+        解析済みのレスポンスは複製し、トランザクションIDを今回のものに置き換えます。
+        未解析のレスポンスは、パススルーの場合はそのまま、それ以外の場合は解析して返します。
+
+        Args:
+            response: 拒否したときの外部APIのレスポンス
+            transaction_id: 今回のトランザクションID
+            passthrough: 未解析のレスポンスをrawとして返すかどうか
+
+        Returns:
+            PaymentResponse: 処理結果
+        """
+        if isinstance(response, RawUpstreamResponse):
+            if passthrough:
+                return PaymentResponse(
+                    success=True, message="決済リクエストが正常に処理されました", raw=response
+                )
+            response = json.loads(response.content)
+        data = dict(response)
+        if "transactionId" in data:
+            data["transactionId"] = transaction_id or DEFAULT_TRANSACTION_ID
+        return PaymentResponse(
+            success=True, message="決済リクエストが正常に処理されました", data=data
+        )
+
+    @staticmethod
+    def _record_keys(payment_request: PaymentRequest, attempt_id: str) -> Dict[str, Any]:
+        """
+        記録するレコードに共通して含める識別情報を返します。
+
+        Args:
+            payment_request: 送信用リクエストオブジェクト
+            attempt_id: 送信ごとに採番した送信ID
+
+        Returns:
+            Dict[str, Any]: トランザクションID、送信ID、会社・店舗コード、注文番号、決済金額
+        """
+        items = payment_request.regi_charge_req_list
+        return {
+            "transactionId": payment_request.transaction_id,
+            "attemptId": attempt_id,
+            "companyCode": payment_request.company_code,
+            "storeCode": payment_request.store_code,
+            "orderNumber": items[0].store_order_number if items else None,
+            "amount": items[0].settlement_amount if items else None,
+        }
+
+    async def _record(self, record: Dict[str, Any], wait: bool) -> None:
+        """
+        レコードをジャーナルに追記し、インデックスに反映します。
+
+        インデックスへの反映はジャーナルへの追記を受け付けた後に行います。
+
+        Args:
+            record: 記録するレコード
+            wait: ジャーナルの永続化の完了まで待機するかどうか
+        """
+        if self._journal is not None:
+            await self._journal.append(record, wait=wait)
+        if self._index is not None:
+            self._index.apply({"ts": time.time(), **record})
+
+    async def _record_response(
+        self,
+        payment_request: PaymentRequest,
+        attempt_id: str,
+        started: float,
+        response: Optional[Union[Dict[str, Any], RawUpstreamResponse]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        外部APIの処理結果を記録します。
+
+        レスポンスの記録は永続化を待たず、記録に失敗しても決済結果には影響させません。
+        未解析のレスポンスは解析せず、ボディを文字列のまま記録します。
+
+        Args:
+            payment_request: 送信用リクエストオブジェクト
+            attempt_id: リクエストの記録時に採番した送信ID
+            started: 送信開始時刻（time.perf_counter）
+            response: 外部APIからのレスポンス
+            error: 送信中に発生したエラー
+        """
+        response_code = None
+        if isinstance(response, RawUpstreamResponse):
+            response_code = response.response_code
+            response = {"raw": response.content.decode("utf-8", "replace")}
+        elif response is not None:
+            response_code = response.get("responseCode")
+            if response_code is None and "status_code" in response:
+                response_code = str(response["status_code"])
+            if response.get("success") is False and error is None:
+                error = str(response.get("error"))
+        record = {
+            "type": "response",
+            **self._record_keys(payment_request, attempt_id),
+            "success": response_code == "0000",
+            "responseCode": response_code,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 3),
+            "response": response,
+            "error": error,
+        }
+        try:
+            await self._record(record, wait=False)
+        except Exception:
+            logger.exception("レスポンスの記録に失敗しました")
+
+    def _transform_request(
+        self,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str] = None,
+        merchant: Optional[Merchant] = None,
+    ) -> PaymentRequest:
         """
         受信リクエストを外部API用のリクエストに変換します。
 
         Args:
             request_data: 受信したリクエストデータ
+            transaction_id: トランザクションID（省略時は既定値）
+            merchant: 送信元の加盟店（省略時は設定ファイルの加盟店）
 
         Returns:
             PaymentRequest: 変換された外部API用リクエスト
@@ -128,25 +407,30 @@ class PaymentService(PaymentServiceInterface):
         ]
 
         # 外部API用リクエストの作成
+        merchant = merchant or default_merchant()
         return PaymentRequest(
-            company_code=settings.PAYMENT_COMPANY_CODE,
-            store_code=settings.PAYMENT_STORE_CODE,
-            authentication_pass=settings.PAYMENT_AUTHENTICATION_PASS,
-            transaction_id="transid0000000000001",
+            company_code=merchant.company_code,
+            store_code=merchant.store_code,
+            authentication_pass=merchant.authentication_pass,
+            transaction_id=transaction_id or DEFAULT_TRANSACTION_ID,
             req_timestamp=current_timestamp,  # 現在時刻を自動設定
-            exec_mode="000",
+            exec_mode=merchant.exec_mode,
             billing_token=billing_token,
             regi_charge_req_list=regi_charge_req_items,
         )
 
     def _payment_request_to_dict(
-        self, payment_request: PaymentRequest
+        self, payment_request: PaymentRequest, merchant: Optional[Merchant] = None
     ) -> Dict[str, Any]:
         """
         PaymentRequestオブジェクトを外部API用の辞書形式に変換します。
 
+        加盟店が指定された場合、加盟店ごとに固定の項目は組み立て済みの
+        テンプレートから複製します。
+
         Args:
             payment_request: 送信用リクエストオブジェクト
+            merchant: 送信元の加盟店
 
         Returns:
             Dict[str, Any]: 外部API用の辞書形式データ
@@ -163,6 +447,14 @@ class PaymentService(PaymentServiceInterface):
                 }
             )
 
+        if merchant is not None:
+            request_dict = merchant.request_template.copy()
+            request_dict["transactionId"] = payment_request.transaction_id
+            request_dict["reqTimestamp"] = payment_request.req_timestamp
+            request_dict["billingToken"] = payment_request.billing_token
+            request_dict["regiChargeReqList"] = regi_charge_req_list
+            return request_dict
+
         # PaymentRequestの変換
         return {
             "companyCode": payment_request.company_code,
@@ -0,0 +1,248 @@
+"""
+拒否済み請求トークンのキャッシュモジュール。
+
+外部APIが再試行しても結果の変わらない応答コードで拒否した請求トークン（期限切れや失効など）を
+応答コードごとの期間だけ保持し、同じトークンでの再送を外部APIに送らずに拒否するユースケースを実装します。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+
+from app.domain.entities.payment import RawUpstreamResponse
+
+logger = logging.getLogger(__name__)
+
+# 外部APIのレスポンス（解析済みの辞書または未解析のレスポンス）
+UpstreamResponse = Union[Dict[str, Any], RawUpstreamResponse]
+
+
+def rejection_code(response: UpstreamResponse) -> Optional[str]:
+    """
+    外部APIのレスポンスから応答コードを取り出します。
+
+    HTTPエラーの場合は、エラーボディのresponseCode、なければHTTPステータスコードを返します。
+
+    Args:
+        response: 外部APIのレスポンス
+
+    Returns:
+        Optional[str]: 応答コード（取り出せない場合はNone）
+    """
+    if isinstance(response, RawUpstreamResponse):
+        return response.response_code
+    code = response.get("responseCode")
+    if code is None and response.get("success") is False:
+        error = response.get("error")
+        if isinstance(error, dict):
+            code = error.get("responseCode")
+        if code is None and "status_code" in response:
+            code = str(response["status_code"])
+    return code if isinstance(code, str) else None
+
+
+class BloomFilter:
+    """
+    ブルームフィルター。
+
+    キャッシュにないトークンの検索を、辞書を引かずに打ち切るために使用します。
+    キーは呼び出し元で計算したダイジェストを2つの64ビット整数に分けて使うため（ダブルハッシング）、
+    追加のハッシュ計算は行いません。要素の削除はできないため、呼び出し元が定期的に作り直します。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        初期化メソッド。
+
+        Args:
+            capacity: 想定する要素数
+            error_rate: 想定する要素数での偽陽性率
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, digest: bytes) -> None:
+        """
+        要素を追加します。
+
+        Args:
+            digest: 16バイト以上のダイジェスト
+        """
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+
+@dataclass
+class _RejectedToken:
+    """拒否された請求トークンの応答と有効期限。"""
+
+    code: str
+    response: UpstreamResponse
+    expires_at: float
+
+
+class RejectedTokenCache:
+    """
+    拒否済み請求トークンのキャッシュ。
+
+    トークンはダイジェストに置き換えて保持し、平文は保持しません。
+    上限を超えた場合は古いものから破棄し、期限切れのものは検索時に破棄します。
+    use_bloomが有効な場合は、ブルームフィルターでキャッシュにないトークンの検索を打ち切ります。
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        max_entries: int = 100000,
+        use_bloom: bool = False,
+        bloom_error_rate: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            ttls: 応答コードごとの保持秒数（含まれない応答コードは保持しない）
+            max_entries: 保持するトークンの上限
+            use_bloom: ブルームフィルターを使用するかどうか
+            bloom_error_rate: ブルームフィルターの偽陽性率
+            clock: 現在時刻を返す関数（単調増加）
+        """
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.bloom_error_rate = bloom_error_rate
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, _RejectedToken]" = OrderedDict()
+        self._bloom: Optional[BloomFilter] = self._new_bloom() if use_bloom else None
+        self._bloom_added = 0
+        self.lookups = 0
+        self.hits = 0
+        self.bloom_skips = 0
+        self.evictions = 0
+        self.hits_by_code: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[UpstreamResponse]:
+        """
+        拒否済みのトークンであれば、拒否したときの外部APIのレスポンスを返します。
+
+        Args:
+            token: 請求トークン
+
+        Returns:
+            Optional[UpstreamResponse]: 外部APIのレスポンス（保持していない場合はNone）
+        """
+        self.lookups += 1
+        digest = self._digest(token)
+        if self._bloom is not None and digest not in self._bloom:
+            self.bloom_skips += 1
+            return None
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[digest]
+            return None
+        self.hits += 1
+        self.hits_by_code[entry.code] = self.hits_by_code.get(entry.code, 0) + 1
+        return entry.response
+
+    def record(self, token: str, response: UpstreamResponse) -> bool:
+        """
+        外部APIのレスポンスが保持対象の応答コードであれば、トークンを保持します。
+
+        Args:
+            token: 請求トークン
+            response: 外部APIのレスポンス
+
+        Returns:
+            bool: 保持した場合はTrue
+        """
+        code = rejection_code(response)
+        ttl = self.ttls.get(code) if code is not None else None
+        if not ttl or ttl <= 0:
+            return False
+        digest = self._digest(token)
+        self._entries[digest] = _RejectedToken(code, response, self._clock() + ttl)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if self._bloom is not None:
+            self._bloom.add(digest)
+            self._bloom_added += 1
+            if self._bloom_added > 2 * self.max_entries:
+                self._rebuild_bloom()
+        logger.info(f"拒否された請求トークンを保持します code={code} ttl={ttl}s")
+        return True
+
+    def _new_bloom(self) -> BloomFilter:
+        """
+        空のブルームフィルターを生成します。
+
+        作り直すまでに上限の2倍まで追加するため、上限の2倍の要素数で偽陽性率を満たす大きさにします。
+
+        Returns:
+            BloomFilter: ブルームフィルター
+        """
+        return BloomFilter(2 * self.max_entries, self.bloom_error_rate)
+
+    def _rebuild_bloom(self) -> None:
+        """
+        保持しているトークンのみでブルームフィルターを作り直します。
+
+        破棄したトークンのビットが残り続けて偽陽性率が上がるのを防ぐため、
+        追加した数が上限の2倍を超えるたびに行います。
+        """
+        now = self._clock()
+        bloom = self._new_bloom()
+        for digest, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[digest]
+                continue
+            bloom.add(digest)
+        self._bloom = bloom
+        self._bloom_added = len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: 保持件数、検索数、ヒット数とヒット率、応答コードごとのヒット数など
+        """
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hitRate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "hitsByCode": dict(self.hits_by_code),
+            "evictions": self.evictions,
+            "bloom": self._bloom is not None,
+            "bloomSkips": self.bloom_skips,
+        }
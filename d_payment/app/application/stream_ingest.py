@@ -0,0 +1,185 @@
+"""
+ストリーミング取り込みモジュール。
+
+改行区切り（NDJSON）の決済リクエストを受信しながら1行ずつ取り出し、
+同時実行数を制限して処理し、完了した順に結果を返すユースケースを実装します。
+入力の大きさによらず、保持するのは処理中の行と未送信の結果（それぞれ同時実行数まで）と
+読み込み途中の1行のみです。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 1行の処理（行番号と行の内容を受け取り、結果を返す）
+LineHandler = Callable[[int, bytes], Awaitable[Dict[str, Any]]]
+
+# 入力の終わり
+_DONE = object()
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    受信したチャンクから1行ずつ取り出します。
+
+    空行は行番号のみ進めて読み飛ばします。上限を超える行は、改行まで読み捨てて内容をNoneとして返します。
+
+    Args:
+        chunks: 受信したボディのチャンク
+        max_line_bytes: 1行の大きさの上限（バイト）
+
+    Yields:
+        Tuple[int, Optional[bytes]]: 行番号（1から）と行の内容（上限を超えた場合はNone）
+    """
+    buffer = bytearray()
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        oversized = True
+                        buffer.clear()
+                break
+            line_no += 1
+            if not oversized:
+                buffer += chunk[start:end]
+            if oversized or len(buffer) > max_line_bytes:
+                yield line_no, None
+            elif buffer.strip():
+                yield line_no, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, bytes(buffer)
+
+
+class StreamIngest:
+    """
+    行の同時実行数を制限した処理。
+
+    空きがない間は次の行を読み込まないため、受信側にも背圧がかかります。
+    結果の読み出しが止まった場合も、未送信の結果が同時実行数に達した時点で処理が止まります。
+    結果の読み出しを途中でやめた場合、処理中の行は中断せずに完了させ、結果のみ破棄します
+    （外部APIへの送信を途中で打ち切らないため）。
+    """
+
+    def __init__(
+        self,
+        handler: LineHandler,
+        concurrency: int = 8,
+        should_stop: Callable[[], bool] = lambda: False,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            handler: 1行の処理
+            concurrency: 同時に処理する行の上限
+            should_stop: 次の行を読み込む前に確認する、読み込みを打ち切るかどうかの判定
+        """
+        self.handler = handler
+        self.concurrency = concurrency
+        self.should_stop = should_stop
+        self.lines = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.stopped = False
+
+    async def run(
+        self, lines: AsyncIterator[Tuple[int, Optional[bytes]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        行を処理し、完了した順に結果を返します。
+
+        Args:
+            lines: 行番号と行の内容（read_linesの戻り値）
+
+        Yields:
+            Dict[str, Any]: 行ごとの結果
+        """
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+        abandoned = False
+
+        async def process(line_no: int, line: Optional[bytes]) -> None:
+            try:
+                if line is None:
+                    result = {"line": line_no, "success": False, "error": "行が大きすぎます"}
+                else:
+                    result = await self.handler(line_no, line)
+            except Exception as e:
+                logger.exception(f"行の処理中にエラーが発生しました line={line_no}")
+                result = {"line": line_no, "success": False, "error": str(e)}
+            try:
+                if not abandoned:
+                    await results.put(result)
+            finally:
+                slots.release()
+
+        async def produce() -> None:
+            try:
+                async for line_no, line in lines:
+                    await slots.acquire()
+                    if self.should_stop():
+                        slots.release()
+                        self.stopped = True
+                        break
+                    self.lines += 1
+                    task = asyncio.create_task(process(line_no, line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            finally:
+                if tasks:
+                    await asyncio.wait(set(tasks))
+                await results.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                if result.get("success"):
+                    self.succeeded += 1
+                else:
+                    self.failed += 1
+                yield result
+            await producer
+        finally:
+            abandoned = True
+            if not producer.done():
+                # 読み込みのみ打ち切り、処理中の行はそのまま完了させる
+                producer.cancel()
+            # 結果の空きを待っている行を先に進める
+            while not results.empty():
+                results.get_nowait()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        処理の集計を返します。
+
+        Returns:
+            Dict[str, Any]: 処理した行数、成功数、失敗数、読み込みを打ち切ったかどうか
+        """
+        return {
+            "done": True,
+            "lines": self.lines,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "stopped": self.stopped,
+        }
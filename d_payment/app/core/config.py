@@ -6,7 +6,7 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import AnyHttpUrl, validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -31,15 +31,136 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
 
+    # サーバー設定
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_RUNTIME_PROFILE: str = "production"
+    SERVER_WORKERS: int = 1
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_REUSE_PORT: bool = False
+    SERVER_DRAIN_TIMEOUT: float = 30.0
+    SERVER_READINESS_GRACE: float = 0.0
+    SERVER_WORKER_START_TIMEOUT: float = 30.0
+
     # 外部APIの設定
     PAYMENT_API_URL: str = ""
     PAYMENT_API_TIMEOUT: int = 30
+    PAYMENT_API_MAX_CONNECTIONS: int = 100
+    PAYMENT_API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PAYMENT_API_KEEPALIVE_EXPIRY: float = 30.0
+    PAYMENT_API_MAX_RESPONSE_BYTES: int = 1024 * 1024
+    PAYMENT_PASSTHROUGH: bool = False
+
+    # HTTP/2の設定（h2がインストールされている場合のみ有効）
+    PAYMENT_API_HTTP2: bool = False
+    PAYMENT_API_HTTP2_CONNECTIONS: int = 2
+    PAYMENT_API_HTTP2_MAX_STREAMS: int = 100
+
+    # 上流接続の事前確立の設定
+    PAYMENT_API_DNS_TTL: float = 60.0
+    PAYMENT_API_TLS_SESSION_REUSE: bool = True
+    # 事前確立は送信先へGETを送るため既定は無効（有効にする場合はPAYMENT_API_PROBE_PATHも指定する）
+    PAYMENT_API_WARMUP_CONNECTIONS: int = 0
+    PAYMENT_API_WARMUP_TIMEOUT: float = 5.0
+
+    # 複数の上流エンドポイントの設定（指定した場合はPAYMENT_API_URLの代わりに使用）
+    PAYMENT_API_URLS: List[str] = []
+    PAYMENT_API_BALANCER: str = "peak_ewma"
+    PAYMENT_API_EJECT_FAILURES: int = 5
+    PAYMENT_API_EJECT_SECONDS: float = 30.0
+    # ヘルスチェックはPAYMENT_API_PROBE_PATHを指定した場合のみ行う（決済のURLにはGETを送らない）
+    PAYMENT_API_PROBE_INTERVAL: float = 10.0
+    PAYMENT_API_PROBE_PATH: str = ""
+    PAYMENT_API_PROBE_SUCCESSES: int = 3
     
     # 認証情報
     PAYMENT_COMPANY_CODE: str = "DCM12345678"
     PAYMENT_STORE_CODE: str = "TNP00000001"
     PAYMENT_AUTHENTICATION_PASS: str = "XXXXXXXXXXXXXXXXXXXX"
 
+    # 呼び出し元のJWT認証の設定（有効な場合はAPIルーターのすべてのエンドポイントで検証）
+    AUTH_JWT_ENABLED: bool = False
+    AUTH_JWT_ALGORITHMS: List[str] = ["RS256"]
+    AUTH_JWT_SECRET: str = ""
+    AUTH_JWT_JWKS_URL: str = ""
+    AUTH_JWT_JWKS_TTL: float = 300.0
+    AUTH_JWT_JWKS_REFRESH_INTERVAL: float = 30.0
+    AUTH_JWT_ISSUER: str = ""
+    AUTH_JWT_AUDIENCE: str = ""
+    AUTH_JWT_LEEWAY: int = 0
+    AUTH_JWT_CACHE_SIZE: int = 10000
+
+    # 拒否済み請求トークンのキャッシュの設定（応答コードごとの保持秒数、空の場合は無効）
+    REJECTED_TOKEN_TTLS: Dict[str, float] = {}
+    REJECTED_TOKEN_CACHE_SIZE: int = 100000
+    REJECTED_TOKEN_BLOOM: bool = False
+    REJECTED_TOKEN_BLOOM_ERROR_RATE: float = 0.01
+
+    # 加盟店レジストリの設定
+    MERCHANT_REGISTRY_PATH: str = ""
+    MERCHANT_REGISTRY_RELOAD_INTERVAL: float = 5.0
+    MERCHANT_HEADER: str = "X-Merchant-Id"
+
+    # 非同期転送キューの設定
+    ASYNC_QUEUE_MAXSIZE: int = 1000
+    ASYNC_QUEUE_WORKERS: int = 8
+    ASYNC_ENQUEUE_TIMEOUT: float = 0.0
+    ASYNC_RETRY_AFTER: int = 1
+    ASYNC_MAX_RESULTS: int = 10000
+
+    # トランザクションジャーナルの設定
+    # 有効にすると送信前のfsyncの分だけ応答が遅くなり、ディスクの障害ですべての決済が失敗するため既定は無効
+    # 有効にする場合はJOURNAL_DIRに永続化される絶対パスを指定する
+    JOURNAL_ENABLED: bool = False
+    JOURNAL_DIR: str = ""
+    JOURNAL_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024
+    JOURNAL_MAX_BATCH: int = 256
+    JOURNAL_FSYNC: bool = True
+
+    # 決済状況インデックスの設定
+    PAYMENT_INDEX_MAX_ENTRIES: int = 100000
+    PAYMENT_INDEX_TTL: float = 86400.0
+
+    # リクエストボディの制限（JSONの解析前に検査する、0の場合は検査しない）
+    REQUEST_MAX_BODY_BYTES: int = 65536
+    REQUEST_MAX_JSON_DEPTH: int = 32
+    REQUEST_MAX_JSON_KEYS: int = 1000
+
+    # ストリーミング取り込みの設定（同時に処理する行の上限、1行の大きさの上限）
+    # 行ごとのJSONの構造はREQUEST_MAX_JSON_DEPTHとREQUEST_MAX_JSON_KEYSで制限する
+    STREAM_INGEST_CONCURRENCY: int = 8
+    STREAM_INGEST_MAX_LINE_BYTES: int = 65536
+
+    # トラフィックキャプチャの設定
+    CAPTURE_ENABLED: bool = False
+    CAPTURE_PATH: str = "capture/receive.cap"
+    CAPTURE_MAX_BODY_BYTES: int = 65536
+    # billingTokenの置き換えに使う鍵（空の場合は起動ごとに無作為に生成する）
+    CAPTURE_TOKEN_KEY: str = ""
+
+    # トレーシングの設定（サンプリングしたスパンはJSON Lines形式でファイルへ書き出す）
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_EXPORT_PATH: str = "traces/spans.jsonl"
+    TRACING_EXPORT_BATCH_SIZE: int = 512
+    TRACING_EXPORT_INTERVAL: float = 1.0
+    TRACING_EXPORT_QUEUE_SIZE: int = 10000
+
+    # イベントループの監視の設定（ラグの計測間隔、ブロックとして記録するラグの下限など、秒）
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL: float = 0.05
+    LOOP_MONITOR_SLOW_THRESHOLD: float = 0.1
+    LOOP_MONITOR_MAX_EVENTS: int = 100
+    LOOP_MONITOR_LOG_INTERVAL: float = 60.0
+
+    # 診断用エンドポイントの設定（/debug以下、既定は無効）
+    # DEBUG_TOKENが空の場合はループバックからのリクエストのみ受け付ける
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+    DEBUG_TOKEN: str = ""
+    DEBUG_PROFILE_MAX_SECONDS: float = 60.0
+    DEBUG_PROFILE_INTERVAL: float = 0.01
+
     # CORSの設定
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
@@ -67,6 +67,45 @@ class ValidationException(BaseAppException):
         )
 
 
+class UnauthorizedException(BaseAppException):
+    """
+    呼び出し元の認証に失敗した場合の例外クラス。
+    """
+
+    def __init__(
+        self,
+        detail: str = "認証に失敗しました",
+        error: Optional[str] = "invalid_token",
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            detail: エラーの詳細メッセージ
+            error: WWW-Authenticateヘッダーに含めるエラーコード（RFC 6750、トークンがない場合はNone）
+        """
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail,
+            headers={"WWW-Authenticate": f'Bearer error="{error}"' if error else "Bearer"},
+        )
+
+
+class ForbiddenException(BaseAppException):
+    """
+    アクセスが許可されていない場合の例外クラス。
+    """
+
+    def __init__(self, detail: str = "アクセスが許可されていません"):
+        """
+        初期化メソッド。
+
+        Args:
+            detail: エラーの詳細メッセージ
+        """
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
 class PaymentApiException(BaseAppException):
     """
     決済API通信エラーの例外クラス。
@@ -91,6 +130,56 @@ class PaymentApiException(BaseAppException):
         )
 
 
+class ServiceUnavailableException(BaseAppException):
+    """
+    一時的に受付できない場合の例外クラス。
+
+    キューの満杯やドレイン中など、時間をおいて再送すれば受け付けられる場合に使用します。
+    """
+
+    def __init__(
+        self,
+        detail: str = "現在リクエストを受け付けられません",
+        retry_after: int = 1,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            detail: エラーの詳細メッセージ
+            retry_after: 再送までの推奨待機秒数（Retry-Afterヘッダー）
+        """
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TooManyRequestsException(BaseAppException):
+    """
+    流量制限を超えた場合の例外クラス。
+    """
+
+    def __init__(
+        self,
+        detail: str = "リクエストが多すぎます",
+        retry_after: int = 1,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            detail: エラーの詳細メッセージ
+            retry_after: 再送までの推奨待機秒数（Retry-Afterヘッダー）
+        """
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 async def base_exception_handler(
     request: Request,
     exc: BaseAppException,
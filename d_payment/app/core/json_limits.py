@@ -0,0 +1,102 @@
+"""
+JSONの構造の制限モジュール。
+
+JSONを解析する前に、入れ子の深さとオブジェクトのキーの数を数えて上限と比較します。
+括弧とコロンの数が上限以内のボディ（通常の決済リクエスト）は数を数えるだけで通過させ、
+超える場合のみ文字列を除いて正確に数えます。
+文字列の除去はエスケープの除去と文字列の置換の2回の走査で行い、
+ボディの長さに対して線形の時間で終わるようにします。
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import accumulate
+from typing import Optional
+
+# エスケープシーケンス（バックスラッシュと続く1バイト）
+_ESCAPE = re.compile(rb"\\.", re.DOTALL)
+
+# エスケープを除いた後のJSONの文字列
+_STRING = re.compile(rb'"[^"]*"')
+
+# 括弧以外のすべてのバイト（bytes.translateで削除する）
+_NON_BRACKETS = bytes(b for b in range(256) if b not in b"[]{}")
+
+# 括弧ごとの深さの増減
+_DEPTH_STEP = {ord("["): 1, ord("{"): 1, ord("]"): -1, ord("}"): -1}
+
+
+def json_depth(body: bytes) -> int:
+    """
+    JSONの入れ子の最大の深さを返します。
+
+    Args:
+        body: JSON（UTF-8）
+
+    Returns:
+        int: 入れ子の最大の深さ（スカラーのみの場合は0）
+    """
+    return _max_depth(_strip_strings(body))
+
+
+def _strip_strings(body: bytes) -> bytes:
+    """
+    JSONの文字列の中身を除きます。
+
+    先にエスケープシーケンスを除くことで、文字列の正規表現がバックトラックせず、
+    エスケープした引用符が大量に続くボディでも線形の時間で終わります。
+
+    Args:
+        body: JSON（UTF-8）
+
+    Returns:
+        bytes: 文字列を空文字列に置き換えたJSON
+    """
+    return _STRING.sub(b'""', _ESCAPE.sub(b"", body))
+
+
+def _max_depth(structure: bytes) -> int:
+    """
+    文字列を除いたJSONの入れ子の最大の深さを返します。
+
+    Args:
+        structure: 文字列を除いたJSON
+
+    Returns:
+        int: 入れ子の最大の深さ
+    """
+    brackets = structure.translate(None, _NON_BRACKETS)
+    return max(accumulate(_DEPTH_STEP[b] for b in brackets), default=0)
+
+
+def check_json_limits(body: bytes, max_depth: int, max_keys: int) -> Optional[str]:
+    """
+    JSONの入れ子の深さとキーの数が上限以内かを検査します。
+
+    JSONとして正しいかどうかは検査しません（解析時に通常どおり検出されます）。
+
+    Args:
+        body: JSON（UTF-8）
+        max_depth: 入れ子の深さの上限（0以下の場合は検査しない）
+        max_keys: オブジェクトのキーの総数の上限（0以下の場合は検査しない）
+
+    Returns:
+        Optional[str]: 上限を超えた場合はその内容、上限以内の場合はNone
+    """
+    if max_depth <= 0 and max_keys <= 0:
+        return None
+    # 文字列の中の括弧とコロンも数えた上限値で収まる場合は、文字列を除かずに通過させる
+    keys_bound = body.count(b":")
+    depth_bound = body.count(b"[") + body.count(b"{")
+    if (max_keys <= 0 or keys_bound <= max_keys) and (max_depth <= 0 or depth_bound <= max_depth):
+        return None
+    structure = _strip_strings(body)
+    if max_keys > 0:
+        # 文字列の外のコロンはオブジェクトのキーと値の区切りのみ
+        keys = structure.count(b":")
+        if keys > max_keys:
+            return f"キーの数が上限（{max_keys}）を超えています"
+    if max_depth > 0 and _max_depth(structure) > max_depth:
+        return f"入れ子の深さが上限（{max_depth}）を超えています"
+    return None
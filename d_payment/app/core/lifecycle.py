@@ -0,0 +1,121 @@
+"""
+ライフサイクル管理モジュール。
+
+ワーカープロセスの状態（起動中・ウォームアップ中・受付中・ドレイン中）と処理中の決済数を管理し、
+レディネス判定とグレースフルシャットダウンに使用します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# ライフサイクルの状態
+STATE_STARTING = "starting"
+STATE_WARMING = "warming"
+STATE_READY = "ready"
+STATE_DRAINING = "draining"
+STATE_STOPPED = "stopped"
+
+
+class Lifecycle:
+    """
+    ワーカーのライフサイクル。
+
+    処理中の決済数を数え、ドレイン時にすべての処理が終わるまで待機できます。
+    """
+
+    def __init__(self) -> None:
+        """
+        初期化メソッド。
+        """
+        self.state = STATE_STARTING
+        self.inflight = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """リクエストを受け付けられる状態かどうか。"""
+        return self.state == STATE_READY
+
+    @property
+    def is_draining(self) -> bool:
+        """ドレイン中かどうか。"""
+        return self.state == STATE_DRAINING
+
+    def mark_warming(self) -> None:
+        """上流へのコネクションを事前に確立している状態にします。"""
+        if self.state == STATE_STARTING:
+            self.state = STATE_WARMING
+
+    def mark_ready(self) -> None:
+        """受付中の状態にします。"""
+        if self.state in (STATE_STARTING, STATE_WARMING):
+            self.state = STATE_READY
+            logger.info("リクエストの受付を開始しました")
+
+    def begin_drain(self) -> None:
+        """
+        ドレインを開始します。
+
+        レディネスは即座に未準備となり、以降は処理中の決済の完了を待ちます。
+        シグナルハンドラから呼び出せるよう、状態の変更のみを行います。
+        """
+        if self.state in (STATE_STARTING, STATE_WARMING, STATE_READY):
+            self.state = STATE_DRAINING
+
+    def mark_stopped(self) -> None:
+        """停止済みの状態にします。"""
+        self.state = STATE_STOPPED
+
+    def reset(self) -> None:
+        """起動前の状態に戻します。"""
+        self.state = STATE_STARTING
+        self.inflight = 0
+        self._idle = None
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """
+        処理中の決済として数えるコンテキストマネージャーです。
+        """
+        self.inflight += 1
+        if self._idle is not None:
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            if self.inflight == 0 and self._idle is not None:
+                self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """
+        処理中の決済がなくなるまで待機します。
+
+        Args:
+            timeout: 最大待機秒数
+
+        Returns:
+            bool: 期限内にすべての処理が完了した場合はTrue
+        """
+        if self.inflight == 0:
+            return True
+        self._idle = asyncio.Event()
+        logger.info(f"処理中の決済 {self.inflight} 件の完了を待機します")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"ドレインの期限を超過しました（未完了 {self.inflight} 件）")
+            return False
+        finally:
+            self._idle = None
+
+
+# ライフサイクルインスタンスの作成
+lifecycle = Lifecycle()
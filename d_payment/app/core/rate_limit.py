@@ -0,0 +1,57 @@
+"""
+流量制限モジュール。
+
+トークンバケットによる単位時間あたりのリクエスト数の制限を提供します。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    トークンバケット。
+
+    1秒あたりrateの速度でトークンを補充し、最大burst個まで蓄えます。
+    補充は取得時にまとめて計算するため、タイマーは使用しません。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            rate: 1秒あたりに補充するトークン数
+            burst: 蓄えられるトークンの上限
+            clock: 現在時刻を返す関数（単調増加）
+        """
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        トークンの取得を試みます。
+
+        Args:
+            tokens: 取得するトークン数
+
+        Returns:
+            float: 取得できた場合は0、できなかった場合は取得できるまでの秒数
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
@@ -0,0 +1,179 @@
+"""
+サーバー起動モジュール。
+
+uvicornの起動設定を組み立て、アプリケーションサーバーを起動します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import socket
+import time
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+import uvicorn
+
+from app.core.config import Settings, settings
+from app.core.lifecycle import STATE_WARMING, lifecycle
+
+logger = logging.getLogger(__name__)
+
+# ランタイムプロファイル
+PROFILE_PRODUCTION = "production"
+PROFILE_DEFAULT = "default"
+
+
+def _is_available(module: str) -> bool:
+    """
+    モジュールがインストールされているかを確認します。
+
+    Args:
+        module: モジュール名
+
+    Returns:
+        bool: インポート可能な場合はTrue
+    """
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_runtime(profile: str) -> Dict[str, str]:
+    """
+    ランタイムプロファイルからイベントループとHTTPパーサーを決定します。
+
+    productionプロファイルではuvloopとhttptoolsを優先し、
+    インストールされていない場合は標準のasyncioとh11にフォールバックします。
+
+    Args:
+        profile: ランタイムプロファイル（"production"または"default"）
+
+    Returns:
+        Dict[str, str]: uvicornのloopとhttpの設定値
+    """
+    if profile == PROFILE_DEFAULT:
+        return {"loop": "asyncio", "http": "h11"}
+    if profile != PROFILE_PRODUCTION:
+        raise ValueError(f"不明なランタイムプロファイルです: {profile}")
+    return {
+        "loop": "uvloop" if _is_available("uvloop") else "asyncio",
+        "http": "httptools" if _is_available("httptools") else "h11",
+    }
+
+
+def build_server_config(config: Settings = settings) -> Dict[str, Any]:
+    """
+    設定からuvicornの起動パラメータを組み立てます。
+
+    Args:
+        config: アプリケーション設定
+
+    Returns:
+        Dict[str, Any]: uvicorn.runに渡すキーワード引数
+    """
+    return {
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": config.SERVER_WORKERS,
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEPALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": int(config.SERVER_DRAIN_TIMEOUT),
+        "log_level": "debug" if config.DEBUG else "info",
+        **resolve_runtime(config.SERVER_RUNTIME_PROFILE),
+    }
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    グレースフルドレインに対応したuvicornサーバー。
+
+    終了シグナルを受けるとまずレディネスを未準備に切り替え、
+    readiness_grace秒の猶予の後に新規接続の受付を停止します。
+    その後はuvicornの通常のシャットダウン処理で処理中のリクエストを待ちます。
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        readiness_grace: float = 0.0,
+        on_started: Optional[Callable[[], None]] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            config: uvicornの設定
+            readiness_grace: レディネスを切り替えてから受付を停止するまでの秒数
+            on_started: 待ち受け開始後（上流へのコネクションの事前確立を待って）呼び出すコールバック
+        """
+        super().__init__(config)
+        self.readiness_grace = readiness_grace
+        self.on_started = on_started
+        self._drain_started: Optional[float] = None
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started and self.on_started is not None:
+            # ローリング再起動で旧ワーカーのドレインを始めるのは、事前確立の完了（または打ち切り）後にする
+            while lifecycle.state == STATE_WARMING:
+                await asyncio.sleep(0.05)
+            self.on_started()
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        # 2回目以降のシグナルはuvicornの通常の処理（強制終了を含む）に任せる
+        if self._drain_started is not None or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        lifecycle.begin_drain()
+        self._drain_started = time.monotonic()
+
+    async def on_tick(self, counter: int) -> bool:
+        if (
+            self._drain_started is not None
+            and time.monotonic() - self._drain_started >= self.readiness_grace
+        ):
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def create_server(
+    server_config: Dict[str, Any],
+    on_started: Optional[Callable[[], None]] = None,
+) -> DrainingServer:
+    """
+    ドレイン対応のサーバーを生成します。
+
+    Args:
+        server_config: build_server_configで組み立てた起動パラメータ
+        on_started: 待ち受け開始後に呼び出すコールバック
+
+    Returns:
+        DrainingServer: サーバー
+    """
+    options = {k: v for k, v in server_config.items() if k != "workers"}
+    return DrainingServer(
+        uvicorn.Config("app.main:app", **options),
+        readiness_grace=settings.SERVER_READINESS_GRACE,
+        on_started=on_started,
+    )
+
+
+def run() -> None:
+    """
+    設定に従ってアプリケーションサーバーを起動します。
+
+    ワーカー数が2以上の場合はプリフォーク型のスーパーバイザーで起動します。
+    """
+    server_config = build_server_config()
+    logger.info(
+        f"ランタイムプロファイル {settings.SERVER_RUNTIME_PROFILE}: "
+        f"loop={server_config['loop']} http={server_config['http']} "
+        f"workers={server_config['workers']}"
+    )
+    if server_config["workers"] > 1:
+        from app.core.supervisor import Supervisor
+
+        Supervisor(server_config).run()
+        return
+    create_server(server_config).run()
@@ -0,0 +1,81 @@
+"""
+起動時間計測モジュール。
+
+ワーカープロセスの起動にかかった時間を、アプリケーションのインポートと
+起動処理の各段階に分けて記録し、起動完了時にログへ出力します。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+# 起動時間の内訳を出力するログのメッセージ（benchmarks.startupがこの後ろのJSONを読み取る）
+REPORT_MESSAGE = "起動時間の内訳(ms): "
+
+
+class StartupProfile:
+    """
+    起動時間の内訳。
+
+    段階ごとの所要時間を記録順に保持します。
+    """
+
+    def __init__(self) -> None:
+        """
+        初期化メソッド。
+        """
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        段階の所要時間を記録します。
+
+        同じ名前の段階を再度記録した場合は上書きします（テストなどで同じプロセス内で
+        再度起動した場合に、直近の起動の内訳を残すため）。
+
+        Args:
+            name: 段階の名前
+            seconds: 所要時間（秒）
+        """
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        ブロックの所要時間を段階として記録します。
+
+        Args:
+            name: 段階の名前
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict[str, float]:
+        """
+        記録した内訳を返します。
+
+        Returns:
+            Dict[str, float]: 段階ごとの所要時間（ミリ秒）と合計（total）
+        """
+        report = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        report["total"] = round(sum(self.phases.values()) * 1000, 1)
+        return report
+
+    def log(self) -> None:
+        """
+        記録した内訳をログに出力します。
+        """
+        logger.info(REPORT_MESSAGE + json.dumps(self.report()))
+
+
+# プロセス内で共有する起動時間の内訳
+startup_profile = StartupProfile()
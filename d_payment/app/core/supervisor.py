@@ -0,0 +1,241 @@
+"""
+プリフォーク型スーパーバイザーモジュール。
+
+複数のワーカープロセスを起動・監視し、ローリング再起動と
+グレースフルシャットダウンを行います。
+
+シグナル:
+    SIGTERM / SIGINT: 全ワーカーをドレインして終了します。
+    SIGHUP: ワーカーを1つずつ入れ替えます（新ワーカーの起動完了後に旧ワーカーをドレイン）。
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from multiprocessing.synchronize import Event
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 監視ループの間隔（秒）
+_POLL_INTERVAL = 0.2
+
+
+def bind_socket(host: str, port: int, backlog: int, reuse_port: bool = False) -> socket.socket:
+    """
+    待ち受けソケットを生成します。
+
+    Args:
+        host: 待ち受けホスト
+        port: 待ち受けポート
+        backlog: 接続待ちキューの長さ
+        reuse_port: SO_REUSEPORTを有効にするかどうか
+
+    Returns:
+        socket.socket: 待ち受け中のソケット
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker_main(
+    server_config: Dict[str, Any],
+    sock: Optional[socket.socket],
+    ready: Event,
+    reuse_port: bool,
+) -> None:
+    """
+    ワーカープロセスの本体。
+
+    Args:
+        server_config: uvicornの起動パラメータ
+        sock: 親プロセスと共有する待ち受けソケット（SO_REUSEPORT使用時はNone）
+        ready: 待ち受け開始を親プロセスに通知するイベント
+        reuse_port: SO_REUSEPORTで個別にソケットを生成するかどうか
+    """
+    from app.core.server import create_server
+
+    # 親プロセスのシグナルハンドラを引き継がないようにする
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+
+    if reuse_port:
+        sock = bind_socket(
+            server_config["host"], server_config["port"], server_config["backlog"], True
+        )
+    assert sock is not None
+    create_server(server_config, on_started=ready.set).run(sockets=[sock])
+
+
+class _Worker:
+    """
+    スーパーバイザーが管理するワーカー。
+    """
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, ready: Event):
+        self.process = process
+        self.ready = ready
+        self.stopping = False
+
+
+class Supervisor:
+    """
+    プリフォーク型スーパーバイザー。
+
+    待ち受けソケットを親プロセスで生成してワーカーに引き継ぎます。
+    SO_REUSEPORTを有効にした場合は各ワーカーが個別にソケットを生成し、
+    カーネルが接続を振り分けます。
+    """
+
+    def __init__(self, server_config: Dict[str, Any]):
+        """
+        初期化メソッド。
+
+        Args:
+            server_config: build_server_configで組み立てた起動パラメータ
+        """
+        self.server_config = server_config
+        self.worker_count = server_config["workers"]
+        self.reuse_port = settings.SERVER_REUSE_PORT
+        self.start_timeout = settings.SERVER_WORKER_START_TIMEOUT
+        # ドレインの期限に猶予と後処理の時間を加えたものを停止待ちの上限とする
+        self.stop_timeout = settings.SERVER_DRAIN_TIMEOUT + settings.SERVER_READINESS_GRACE + 5
+        self.workers: List[_Worker] = []
+        self._context = multiprocessing.get_context("fork")
+        self._socket: Optional[socket.socket] = None
+        self._should_exit = False
+        self._reload_requested = False
+
+    def run(self) -> None:
+        """
+        ワーカーを起動し、終了シグナルを受けるまで監視します。
+        """
+        if not self.reuse_port:
+            self._socket = bind_socket(
+                self.server_config["host"],
+                self.server_config["port"],
+                self.server_config["backlog"],
+            )
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(f"スーパーバイザーを起動しました [{os.getpid()}] workers={self.worker_count}")
+        for _ in range(self.worker_count):
+            self.workers.append(self._spawn())
+
+        try:
+            while not self._should_exit:
+                time.sleep(_POLL_INTERVAL)
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self.rolling_reload()
+                self._replace_dead_workers()
+        finally:
+            self._stop_all()
+            if self._socket is not None:
+                self._socket.close()
+        logger.info("スーパーバイザーを終了しました")
+
+    def rolling_reload(self) -> None:
+        """
+        ワーカーを1つずつ入れ替えます。
+
+        新しいワーカーが待ち受けを開始してから古いワーカーをドレインするため、
+        入れ替え中も受付可能なワーカー数は減りません。
+        """
+        logger.info("ワーカーのローリング再起動を開始します")
+        for old in list(self.workers):
+            if self._should_exit:
+                return
+            new = self._spawn()
+            if not new.ready.wait(self.start_timeout):
+                logger.error("新しいワーカーが起動しなかったため再起動を中止します")
+                self._stop(new)
+                return
+            self.workers.append(new)
+            self._stop(old)
+            self.workers.remove(old)
+        logger.info("ワーカーのローリング再起動が完了しました")
+
+    def _spawn(self) -> _Worker:
+        """
+        ワーカーを1つ起動します。
+
+        Returns:
+            _Worker: 起動したワーカー
+        """
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.server_config, self._socket, ready, self.reuse_port),
+            name="payment-worker",
+        )
+        process.start()
+        logger.info(f"ワーカーを起動しました [{process.pid}]")
+        return _Worker(process, ready)
+
+    def _stop(self, worker: _Worker) -> None:
+        """
+        ワーカーをドレインして停止します。
+
+        Args:
+            worker: 停止するワーカー
+        """
+        worker.stopping = True
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(self.stop_timeout)
+        if worker.process.is_alive():
+            logger.warning(f"ワーカーが期限内に終了しないため強制終了します [{worker.process.pid}]")
+            worker.process.kill()
+            worker.process.join()
+
+    def _stop_all(self) -> None:
+        """すべてのワーカーを並行してドレインし、停止します。"""
+        for worker in self.workers:
+            worker.stopping = True
+            if worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for worker in self.workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                logger.warning(f"ワーカーが期限内に終了しないため強制終了します [{worker.process.pid}]")
+                worker.process.kill()
+                worker.process.join()
+        self.workers.clear()
+
+    def _replace_dead_workers(self) -> None:
+        """予期せず終了したワーカーを置き換えます。"""
+        for worker in list(self.workers):
+            if worker.process.is_alive() or worker.stopping:
+                continue
+            logger.warning(
+                f"ワーカーが終了しました [{worker.process.pid}] "
+                f"exitcode={worker.process.exitcode}"
+            )
+            self.workers.remove(worker)
+            if not self._should_exit:
+                self.workers.append(self._spawn())
+
+    def _handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        self._should_exit = True
+
+    def _handle_reload(self, sig: int, frame: Optional[FrameType]) -> None:
+        self._reload_requested = True
@@ -0,0 +1,286 @@
+"""
+トレーシングモジュール。
+
+W3C Trace Context（traceparentヘッダー）の受け渡しと、処理区間（スパン）の記録を提供します。
+現在のスパンはcontextvarsで引き継ぐため、ルート・決済サービス・HTTPクライアントの間で
+引数を追加せずに親子関係を構成できます。
+
+サンプリングされなかったリクエストではスパンの属性や時刻を記録せず、トレースIDとスパンIDの
+受け渡しのみを行います。トレーシングが無効な場合は、共有の何もしないスパンを返すだけです。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import random
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# traceparentヘッダーの形式（version-traceid-parentid-flags）
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+# 無効なトレースIDとスパンID（すべて0）
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# スパンの状態
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+# 現在のスパン
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    traceparentヘッダーを解析します。
+
+    Args:
+        header: traceparentヘッダーの値
+
+    Returns:
+        Optional[Tuple[str, str, bool]]: トレースID、親スパンID、サンプリングフラグ
+            （ヘッダーがない場合や形式が不正な場合はNone）
+    """
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+class Span:
+    """
+    スパン。
+
+    サンプリングされたスパン（recording=True）のみ、時刻と属性を記録して終了時にエクスポートします。
+    """
+
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "recording",
+        "start_ns", "end_ns", "attributes", "status", "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: Optional["Tracer"],
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str],
+        recording: bool,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.recording = recording
+        self.start_ns = time.time_ns() if recording else 0
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_OK
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def traceparent(self) -> str:
+        """下流へ送るtraceparentヘッダーの値。"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.recording else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        属性を設定します（サンプリングされていない場合は何もしません）。
+
+        Args:
+            key: 属性名
+            value: 属性値
+        """
+        if self.recording:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        """
+        スパンを失敗として記録します。
+
+        Args:
+            error: 発生した例外
+        """
+        if self.recording:
+            self.status = STATUS_ERROR
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        """スパンを終了し、サンプリングされている場合はエクスポートします。"""
+        if self.recording and not self.end_ns:
+            self.end_ns = time.time_ns()
+            if self.tracer is not None:
+                self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        エクスポート用の辞書に変換します。
+
+        Returns:
+            Dict[str, Any]: スパンの内容
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_error(exc)
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end()
+
+
+class _NoopSpan:
+    """トレーシングが無効な場合に返す、何もしないスパン。"""
+
+    __slots__ = ()
+
+    recording = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    トレーサー。
+
+    親のないスパン（受信したリクエストの最初のスパン）でサンプリングを決め、
+    子のスパンは親の決定に従います。traceparentヘッダーを受信した場合は、
+    送信元のサンプリングフラグに従います。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 1.0,
+        exporter: Optional[Any] = None,
+        random_value: Callable[[], float] = random.random,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            enabled: トレーシングを有効にするかどうか
+            sample_rate: 親のないスパンをサンプリングする割合（0〜1）
+            exporter: サンプリングしたスパンを受け取るエクスポーター（export(span)を持つもの）
+            random_value: サンプリングに使用する0以上1未満の乱数を返す関数
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._random = random_value
+
+    def configure(
+        self, enabled: bool, sample_rate: float = 1.0, exporter: Optional[Any] = None
+    ) -> None:
+        """
+        設定を変更します（起動処理とテストで使用します）。
+
+        Args:
+            enabled: トレーシングを有効にするかどうか
+            sample_rate: 親のないスパンをサンプリングする割合（0〜1）
+            exporter: サンプリングしたスパンを受け取るエクスポーター
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def start_span(self, name: str, traceparent: Optional[str] = None) -> Any:
+        """
+        現在のスパンの子としてスパンを開始します。
+
+        withで使用すると、ブロックの間は現在のスパンになり、終了時に自動で終了します。
+
+        Args:
+            name: スパンの名前
+            traceparent: 受信したtraceparentヘッダー（現在のスパンがない場合のみ使用）
+
+        Returns:
+            Span: スパン（トレーシングが無効な場合は何もしないスパン）
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, _new_span_id(), parent.span_id, parent.recording)
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+            return Span(self, name, trace_id, _new_span_id(), parent_id, sampled)
+        sampled = self.sample_rate >= 1.0 or self._random() < self.sample_rate
+        return Span(self, name, _new_trace_id(), _new_span_id(), None, sampled)
+
+    def export(self, span: Span) -> None:
+        """
+        終了したスパンをエクスポーターに渡します。
+
+        Args:
+            span: 終了したスパン
+        """
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    """
+    現在のスパンを返します。
+
+    Returns:
+        Optional[Span]: 現在のスパン（ない場合はNone）
+    """
+    return _current_span.get()
+
+
+def _new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+# プロセス内で共有するトレーサー
+tracer = Tracer()
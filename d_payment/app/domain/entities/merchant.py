@@ -0,0 +1,51 @@
+"""
+加盟店エンティティモジュール。
+
+決済リクエストの送信元となる加盟店（会社コード・店舗コード・認証情報）を定義します。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# 外部APIに送信する実行モード
+DEFAULT_EXEC_MODE = "000"
+
+
+@dataclass(frozen=True)
+class Merchant:
+    """
+    加盟店のエンティティ。
+
+    外部APIに送信するリクエストのうち、加盟店ごとに固定の項目は
+    request_templateとして生成時に組み立てておきます。
+    """
+
+    merchant_id: str
+    company_code: str
+    store_code: str
+    authentication_pass: str = field(repr=False)
+    exec_mode: str = DEFAULT_EXEC_MODE
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    rate_limit_rps: Optional[float] = None
+    rate_limit_burst: Optional[int] = None
+    request_template: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "request_template",
+            {
+                "companyCode": self.company_code,
+                "storeCode": self.store_code,
+                "authenticationPass": self.authentication_pass,
+                "execMode": self.exec_mode,
+            },
+        )
+
+    @property
+    def has_dedicated_pool(self) -> bool:
+        """専用のコネクションプールを使用するかどうか。"""
+        return self.max_connections is not None
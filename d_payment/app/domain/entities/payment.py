@@ -41,6 +41,21 @@ class PaymentRequest:
     regi_charge_req_list: List[RegiChargeRequestItem]
 
 
+@dataclass
+class RawUpstreamResponse:
+    """
+    外部APIからの未解析のレスポンスのエンティティ。
+
+    レスポンスボディはクライアントへそのまま返すため解析せず、
+    成否の判定に必要な応答コードのみを抜き出して保持します。
+    """
+
+    status_code: int
+    content: bytes
+    content_type: str
+    response_code: Optional[str] = None
+
+
 @dataclass
 class PaymentResponse:
     """
@@ -53,3 +68,4 @@ class PaymentResponse:
     message: str
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    raw: Optional[RawUpstreamResponse] = None
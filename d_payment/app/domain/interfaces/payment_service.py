@@ -7,9 +7,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 
-from app.domain.entities.payment import PaymentRequest, PaymentResponse
+from app.domain.entities.merchant import Merchant
+from app.domain.entities.payment import PaymentRequest, PaymentResponse, RawUpstreamResponse
 
 
 class PaymentServiceInterface(ABC):
@@ -20,12 +21,21 @@ class PaymentServiceInterface(ABC):
     """
 
     @abstractmethod
-    async def process_payment(self, request_data: Dict[str, Any]) -> PaymentResponse:
+    async def process_payment(
+        self,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str] = None,
+        merchant: Optional[Merchant] = None,
+        passthrough: bool = False,
+    ) -> PaymentResponse:
         """
         決済リクエストを処理します。
 
         Args:
             request_data: 受信した決済リクエストデータ
+            transaction_id: 外部APIに送信するトランザクションID（省略時は既定値）
+            merchant: 送信元の加盟店（省略時は設定ファイルの加盟店）
+            passthrough: 外部APIの正常レスポンスを解析せずにrawとして返すかどうか
 
         Returns:
             PaymentResponse: 処理結果
@@ -56,3 +66,52 @@ class HttpClientInterface(ABC):
             Dict[str, Any]: レスポンスデータ
         """
         pass
+
+    @abstractmethod
+    async def post_raw(
+        self, url: str, data: Dict[str, Any], timeout: int = 30
+    ) -> Union[RawUpstreamResponse, Dict[str, Any]]:
+        """
+        POSTリクエストを送信し、正常レスポンスを解析せずに返します。
+
+        Args:
+            url: 送信先URL
+            data: 送信データ
+            timeout: タイムアウト秒数
+
+        Returns:
+            Union[RawUpstreamResponse, Dict[str, Any]]: 正常時は未解析のレスポンス、
+                エラー時はpost()と同じ形式のエラー情報
+        """
+        pass
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        上流エンドポイントごとのメトリクスを返します。
+
+        Returns:
+            List[Dict[str, Any]]: エンドポイントの状態と累計値（複数のエンドポイントを持たない場合は空）
+        """
+        return []
+
+
+class JournalInterface(ABC):
+    """
+    トランザクションジャーナルインターフェース。
+
+    外部APIとの送受信を記録するためのインターフェースを定義します。
+    """
+
+    @abstractmethod
+    async def append(self, record: Dict[str, Any], wait: bool = True) -> int:
+        """
+        レコードを追記します。
+
+        Args:
+            record: 記録するレコード
+            wait: 永続化の完了まで待機するかどうか
+
+        Returns:
+            int: 付与したシーケンス番号
+        """
+        pass
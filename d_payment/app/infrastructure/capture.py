@@ -0,0 +1,191 @@
+"""
+トラフィックキャプチャモジュール。
+
+受信した決済リクエストを到着時刻とともに追記専用ファイルへ記録し、
+記録済みのファイルを読み出す機能を提供します。
+
+ファイル形式:
+    レコードを連結したバイナリ形式です。各レコードは
+    「到着時刻（UNIX秒、float64）」「ボディ長（uint32）」のヘッダーと、
+    機密情報をマスクしたコンパクトなJSONボディで構成されます。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import secrets
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# レコードヘッダー（到着時刻、ボディ長）
+_HEADER = struct.Struct("<dI")
+
+# 書き込みスレッドの停止指示
+_STOP = object()
+
+
+def redact_body(body: Dict[str, Any], key: bytes) -> Dict[str, Any]:
+    """
+    リクエストボディの機密情報をマスクします。
+
+    billingTokenは同一トークンの再送を再現できるよう、鍵付きハッシュ（HMAC-SHA256）に置き換えます。
+    請求トークンは桁数が少なく総当たりで元に戻せるため、鍵なしのハッシュは使いません。
+
+    Args:
+        body: 受信したリクエストボディ
+        key: 鍵付きハッシュの鍵
+
+    Returns:
+        Dict[str, Any]: マスク済みのリクエストボディ
+    """
+    data = body.get("data")
+    if not isinstance(data, dict) or "billingToken" not in data:
+        return body
+    token = str(data["billingToken"]).encode()
+    masked = dict(data)
+    masked["billingToken"] = "tok-" + hmac.new(key, token, hashlib.sha256).hexdigest()[:16]
+    return {**body, "data": masked}
+
+
+class CaptureWriter:
+    """
+    キャプチャファイルの書き込み。
+
+    JSONの解析とマスク、ファイル書き込みは専用スレッドで行い、
+    イベントループ上ではキューへの追加のみを行います。
+    書き込み待ちがmax_queue件に達している場合は待たずに破棄します。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_body_bytes: int = 65536,
+        max_queue: int = 10000,
+        token_key: Optional[bytes] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            path: キャプチャファイルのパス
+            max_body_bytes: 記録するボディの最大バイト数（超えたものは記録しない）
+            max_queue: 書き込み待ちのリクエストの上限
+            token_key: billingTokenの置き換えに使う鍵（省略時はキャプチャごとに無作為に生成し、
+                同じキャプチャの中でのみ同一トークンを対応付けられる）
+        """
+        self.path = Path(path)
+        self.max_body_bytes = max_body_bytes
+        self._token_key = token_key or secrets.token_bytes(32)
+        self.recorded = 0
+        self.skipped = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def record(self, arrived_at: float, body: bytes) -> None:
+        """
+        リクエストを記録します。
+
+        Args:
+            arrived_at: 到着時刻（UNIX秒）
+            body: 受信したリクエストボディ
+        """
+        if len(body) > self.max_body_bytes:
+            self.skipped += 1
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((arrived_at, body))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """書き込みスレッドを停止し、未書き込みのレコードを書き出します。"""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=1)
+            except queue.Full:
+                logger.warning("キャプチャの書き込みが滞っているため停止します")
+            self._thread.join(timeout=10)
+        self._thread = None
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="traffic-capture", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """書き込みスレッドの本体。"""
+        with open(self.path, "ab") as file:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                arrived_at, body = item
+                try:
+                    parsed = json.loads(body)
+                    if not isinstance(parsed, dict):
+                        # JSONオブジェクトでないリクエストは記録しない
+                        self.skipped += 1
+                        continue
+                    payload = json.dumps(
+                        redact_body(parsed, self._token_key),
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    ).encode()
+                    file.write(_HEADER.pack(arrived_at, len(payload)) + payload)
+                except ValueError:
+                    # JSONとして解釈できないリクエストは記録しない
+                    self.skipped += 1
+                    continue
+                except Exception:
+                    # 書き込みスレッドを止めず、このリクエストのみ記録しない
+                    logger.exception("キャプチャの書き込みに失敗しました")
+                    self.skipped += 1
+                    continue
+                self.recorded += 1
+                # 後続のリクエストがなければバッファをフラッシュする
+                if self._queue.empty():
+                    file.flush()
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    キャプチャファイルを読み出します。
+
+    書き込み途中で途切れた末尾のレコードは無視します。
+
+    Args:
+        path: キャプチャファイルのパス
+
+    Yields:
+        Tuple[float, Dict[str, Any]]: 到着時刻とリクエストボディ
+    """
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            arrived_at, length = _HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                logger.warning(f"キャプチャファイルの末尾が途切れています: {path}")
+                return
+            yield arrived_at, json.loads(payload)
@@ -6,30 +6,379 @@ HTTPクライアントモジュール。
 
 from __future__ import annotations
 
+import asyncio
 import httpx
+import importlib.util
+import json
 import logging
-from typing import Dict, Any
+import re
+import ssl
+import time
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
 
+from app.core.tracing import Span, current_span, tracer
+from app.domain.entities.payment import RawUpstreamResponse
 from app.domain.interfaces.payment_service import HttpClientInterface
+from app.infrastructure.transport import DnsCache, create_client
+
+if TYPE_CHECKING:
+    from app.infrastructure.load_balancer import LoadBalancer
 
 logger = logging.getLogger(__name__)
 
+# 送信先側の失敗の種類
+FAULT_CONNECT = "connect"
+FAULT_STATUS = "status"
+FAULT_REQUEST = "request"
+
+# HTTP/2に必要なh2パッケージがインストールされているかどうか
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# レスポンスサイズの上限の既定値
+DEFAULT_MAX_RESPONSE_BYTES = 1024 * 1024
+
+# 未解析のレスポンスから応答コードを抜き出すパターン
+_RESPONSE_CODE_PATTERN = re.compile(rb'"responseCode"\s*:\s*"([^"\\]*)"')
+
+
+class ResponseTooLargeError(Exception):
+    """レスポンスボディが上限を超えた場合の例外。"""
+
+
+class UpstreamTimings:
+    """
+    httpcoreのトレースイベントから、1回の送信の時間の内訳を記録します。
+
+    コネクションプールからの取得はイベントを発生させないため、送信の開始から最初のイベント
+    （新しい接続の確立またはリクエストヘッダーの送信）までをプールの待ち時間とみなします。
+    """
+
+    __slots__ = ("started", "marks")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        # イベント名は「http11.send_request_headers.started」のようにプロトコル名が前に付く
+        self.marks.setdefault(event_name.split(".", 1)[1], time.perf_counter())
+
+    def _elapsed_ms(self, start: str, end: str) -> Optional[float]:
+        if start not in self.marks or end not in self.marks:
+            return None
+        return round((self.marks[end] - self.marks[start]) * 1000, 3)
+
+    def apply(self, span: Span) -> None:
+        """
+        記録した内訳をスパンの属性に設定します。
+
+        Args:
+            span: 送信のスパン
+        """
+        if not self.marks:
+            return
+        span.set_attribute(
+            "upstream.pool_wait_ms", round((min(self.marks.values()) - self.started) * 1000, 3)
+        )
+        span.set_attribute("upstream.new_connection", "connect_tcp.started" in self.marks)
+        for name, start, end in (
+            ("upstream.connect_ms", "connect_tcp.started", "connect_tcp.complete"),
+            ("upstream.tls_ms", "start_tls.started", "start_tls.complete"),
+            ("upstream.ttfb_ms", "send_request_headers.started", "receive_response_headers.complete"),
+        ):
+            elapsed = self._elapsed_ms(start, end)
+            if elapsed is not None:
+                span.set_attribute(name, elapsed)
+
+
+def sniff_response_code(content: bytes) -> Optional[str]:
+    """
+    レスポンスボディを解析せずに、トップレベルのresponseCodeを抜き出します。
+
+    最初に現れるresponseCodeより前にトップレベルの開き括弧しかない場合のみ採用し、
+    それ以外（明細側のresponseCodeが先に現れる場合など）はボディ全体を解析します。
+
+    Args:
+        content: レスポンスボディ
+
+    Returns:
+        Optional[str]: 応答コード（含まれない場合や解析できない場合はNone）
+    """
+    match = _RESPONSE_CODE_PATTERN.search(content)
+    if match is not None:
+        prefix = content[: match.start()]
+        if prefix.count(b"{") == 1 and b"}" not in prefix and b"[" not in prefix:
+            return match.group(1).decode("utf-8", "replace")
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        return None
+    if isinstance(parsed, dict) and isinstance(parsed.get("responseCode"), str):
+        return parsed["responseCode"]
+    return None
+
 
 class HttpClient(HttpClientInterface):
     """
     HTTPクライアントの実装。
 
     外部APIとの通信を担当します。
+    コネクションプールはインスタンスごとに保持し、リクエスト間で再利用します。
+    ロードバランサーを指定した場合は、送信先URLの代わりにロードバランサーが選択した
+    エンドポイントへ、エンドポイントごとのコネクションプールで送信します。
+
+    HTTP/2を有効にした場合は、http2_connections本のコネクションを保持し、
+    処理中のストリーム数が最も少ないコネクションで多重化して送信します。
+    外部APIがHTTP/2に対応していない場合は、HTTP/1.1のコネクションプールに切り替えます。
     """
 
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        balancer: Optional[LoadBalancer] = None,
+        max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+        http2: bool = False,
+        http2_connections: int = 2,
+        http2_max_streams: int = 100,
+        http2_prior_knowledge: bool = False,
+        dns_cache: Optional[DnsCache] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            max_connections: 最大同時コネクション数
+            max_keepalive_connections: 維持するキープアライブコネクション数
+            keepalive_expiry: アイドル状態のコネクションを維持する秒数
+            balancer: 複数の上流エンドポイントに振り分けるロードバランサー
+            max_response_bytes: 受信するレスポンスボディの上限バイト数
+            http2: HTTP/2で送信するかどうか（h2がインストールされていない場合はHTTP/1.1）
+            http2_connections: HTTP/2で保持するコネクション数
+            http2_max_streams: HTTP/2の1コネクションあたりの最大同時ストリーム数
+            http2_prior_knowledge: ALPNによるネゴシエーションを行わずにHTTP/2で接続するかどうか
+                （TLSを使用しないhttp://の送信先でHTTP/2を使う場合に指定）
+            dns_cache: 接続時の名前解決に使用するDNSキャッシュ
+            ssl_context: TLSの接続に使用するSSLコンテキスト（TLSセッションの再利用など）
+        """
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._balancer = balancer
+        self.max_response_bytes = max_response_bytes
+        self._dns_cache = dns_cache
+        self._ssl_context = ssl_context
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2がインストールされていないため、HTTP/1.1で送信します")
+            http2 = False
+        self.http2 = http2
+        self.http2_connections = http2_connections
+        self.http2_max_streams = http2_max_streams
+        self.http2_prior_knowledge = http2_prior_knowledge
+        self._http2_limits = httpx.Limits(
+            max_connections=1,
+            max_keepalive_connections=1,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2_clients: List[Optional[httpx.AsyncClient]] = [None] * http2_connections
+        self._http2_inflight = [0] * http2_connections
+        self._http2_streams = asyncio.Semaphore(http2_connections * http2_max_streams)
+        self._http2_lock = asyncio.Lock()
+        # HTTP/2で応答を受信するまではネゴシエーション中とみなす
+        # ロードバランサーを使用する場合は、エンドポイントごとにALPNでネゴシエーションする
+        self._http2_negotiating = http2 and balancer is None
+        self._retired: List[httpx.AsyncClient] = []
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        プール付きのHTTPクライアントを取得します。
+
+        初回呼び出し時に、呼び出し元のイベントループ上で生成します。
+
+        Returns:
+            httpx.AsyncClient: HTTPクライアント
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = create_client(
+                self._limits, dns_cache=self._dns_cache, ssl_context=self._ssl_context
+            )
+        return self._client
+
+    def _get_http2_client(self, index: int) -> httpx.AsyncClient:
+        """
+        HTTP/2のコネクションを1本だけ保持するHTTPクライアントを取得します。
+
+        Args:
+            index: コネクションの番号
+
+        Returns:
+            httpx.AsyncClient: HTTPクライアント
+        """
+        client = self._http2_clients[index]
+        if client is None or client.is_closed:
+            client = self._http2_clients[index] = create_client(
+                self._http2_limits,
+                http1=not self.http2_prior_knowledge,
+                http2=True,
+                dns_cache=self._dns_cache,
+                ssl_context=self._ssl_context,
+            )
+        return client
+
+    def _fall_back_to_http1(self, reason: str) -> None:
+        """
+        HTTP/2をやめてHTTP/1.1のコネクションプールに切り替えます。
+
+        処理中のリクエストがあるため、HTTP/2のクライアントはaclose()まで閉じずに保持します。
+
+        Args:
+            reason: 切り替える理由
+        """
+        if not self.http2:
+            return
+        logger.warning(f"HTTP/2で通信できないため、HTTP/1.1に切り替えます: {reason}")
+        self.http2 = False
+        self._http2_negotiating = False
+        self._retired.extend(c for c in self._http2_clients if c is not None)
+        self._http2_clients = [None] * self.http2_connections
+
+    async def _negotiate_http2(self, url: str, timeout: float) -> None:
+        """
+        送信先がHTTP/2で応答するかをGETリクエストで確認します。
+
+        決済リクエストを再送せずに済むよう、最初の決済リクエストの前に1回だけ確認します。
+        HTTP/2以外で応答した場合や、接続後に通信が切断された場合（HTTP/1.1のみのサーバーが
+        接続プリフェースを拒否した場合など）はHTTP/1.1に切り替えます。
+        接続自体に失敗した場合は判断せず、次のリクエストで再度確認します。
+
+        Args:
+            url: 送信先URL
+            timeout: タイムアウト秒数
+        """
+        async with self._http2_lock:
+            if not self._http2_negotiating:
+                return
+            try:
+                response = await self._get_http2_client(0).get(url, timeout=timeout)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                logger.warning(f"HTTP/2の確認のための接続に失敗しました: {str(e)}")
+                return
+            except httpx.TransportError as e:
+                self._fall_back_to_http1(f"{type(e).__name__}: {str(e)}")
+                return
+            if response.http_version != "HTTP/2":
+                self._fall_back_to_http1(f"negotiated {response.http_version}")
+                return
+            self._http2_negotiating = False
+            logger.info(f"HTTP/2で送信します: {url}")
+
+    @property
+    def protocol(self) -> str:
+        """
+        送信に使用しているプロトコル。
+
+        Returns:
+            str: HTTP/2で送信している場合は"HTTP/2"、それ以外は"HTTP/1.1"
+        """
+        return "HTTP/2" if self.http2 else "HTTP/1.1"
+
+    async def warm_up(
+        self, url: str, connections: int, timeout: float, path: str = ""
+    ) -> Dict[str, Any]:
+        """
+        送信先へのコネクションを事前に確立し、コネクションプールに保持します。
+
+        同時にGETリクエストを送ることで、名前解決・TCP接続・TLSハンドシェイクを済ませた
+        コネクションを必要な数だけ開きます。HTTP/2の場合はネゴシエーションを行い、
+        保持するすべてのコネクションを開きます。ロードバランサーを使用する場合は
+        エンドポイントごとにconnections本ずつ開きます。
+        コネクションは送信先ごとに共有されるため、決済のURLではなく
+        ヘルスチェックのパス（path）にGETを送っても同じコネクションが使われます。
+
+        Args:
+            url: 送信先URL（ロードバランサーを使用する場合は参照しない）
+            connections: 開くコネクション数（維持するキープアライブコネクション数が上限）
+            timeout: 1リクエストあたりのタイムアウト秒数
+            path: GETを送るパス（送信先URLからの相対パス、空の場合は送信先URLそのもの）
+
+        Returns:
+            Dict[str, Any]: 開いたコネクション数、失敗数、所要時間、プロトコル
+        """
+        started = time.perf_counter()
+        count = min(connections, self._limits.max_keepalive_connections or connections)
+        if path:
+            url = str(httpx.URL(url).join(path))
+        if self._balancer is not None:
+            targets = [
+                (endpoint.client, str(httpx.URL(endpoint.url).join(path)) if path else endpoint.url)
+                for endpoint in self._balancer.endpoints
+                for _ in range(count)
+            ]
+        elif self.http2:
+            await self._negotiate_http2(url, timeout)
+            targets = [(self._get_client(), url)] * count
+            if self.http2:
+                targets = [(self._get_http2_client(i), url) for i in range(self.http2_connections)]
+        else:
+            targets = [(self._get_client(), url)] * count
+
+        async def open_connection(client: httpx.AsyncClient, target: str) -> bool:
+            try:
+                await client.get(target, timeout=timeout)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"コネクションの事前確立に失敗しました: {target}: {e!r}")
+                return False
+
+        results = await asyncio.gather(*(open_connection(c, u) for c, u in targets))
+        return {
+            "connections": sum(results),
+            "failed": len(results) - sum(results),
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 3),
+            "protocol": self.protocol,
+        }
+
+    async def aclose(self) -> None:
+        """コネクションプールを閉じます。"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for client in self._http2_clients + self._retired:
+            if client is not None:
+                await client.aclose()
+        self._http2_clients = [None] * self.http2_connections
+        self._retired.clear()
+        if self._balancer is not None:
+            await self._balancer.aclose()
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        上流エンドポイントごとのメトリクスを返します。
+
+        Returns:
+            List[Dict[str, Any]]: エンドポイントの状態と累計値（ロードバランサーがない場合は空）
+        """
+        if self._balancer is None:
+            return []
+        return self._balancer.stats()
+
     async def post(
         self, url: str, data: Dict[str, Any], timeout: int = 30
     ) -> Dict[str, Any]:
         """
         POSTリクエストを送信します。
 
+        ロードバランサーを使用する場合、接続の確立に失敗したときに限り
+        （リクエストが外部APIに届いていないため）別のエンドポイントへ1回だけ再送します。
+
         Args:
-            url: 送信先URL
+            url: 送信先URL（ロードバランサーを使用する場合は参照しない）
             data: 送信データ
             timeout: タイムアウト秒数
 
@@ -39,53 +388,288 @@ class HttpClient(HttpClientInterface):
         Raises:
             Exception: リクエスト送信中にエラーが発生した場合
         """
-        try:
-            logger.info(f"Sending POST request to {url}")
-            logger.debug(f"Request data: {data}")
+        return await self._send(url, data, timeout, raw=False)
+
+    async def post_raw(
+        self, url: str, data: Dict[str, Any], timeout: int = 30
+    ) -> Union[RawUpstreamResponse, Dict[str, Any]]:
+        """
+        POSTリクエストを送信し、正常レスポンスを解析せずに返します。
+
+        ボディは上限まで読み込み、応答コードのみを抜き出します。
+        エラー時はpost()と同じ形式のエラー情報を返します。
+
+        Args:
+            url: 送信先URL（ロードバランサーを使用する場合は参照しない）
+            data: 送信データ
+            timeout: タイムアウト秒数
+
+        Returns:
+            Union[RawUpstreamResponse, Dict[str, Any]]: 正常時は未解析のレスポンス、
+                エラー時はエラー情報
+        """
+        return await self._send(url, data, timeout, raw=True)
+
+    async def _send(
+        self, url: str, data: Dict[str, Any], timeout: int, raw: bool
+    ) -> Union[RawUpstreamResponse, Dict[str, Any]]:
+        """
+        送信先を選択してPOSTリクエストを送信します。
+
+        Args:
+            url: 送信先URL（ロードバランサーを使用する場合は参照しない）
+            data: 送信データ
+            timeout: タイムアウト秒数
+            raw: 正常レスポンスを解析せずに返すかどうか
+
+        Returns:
+            Union[RawUpstreamResponse, Dict[str, Any]]: レスポンス
+        """
+        with tracer.start_span("upstream_call"):
+            return await self._dispatch(url, data, timeout, raw)
+
+    async def _dispatch(
+        self, url: str, data: Dict[str, Any], timeout: int, raw: bool
+    ) -> Union[RawUpstreamResponse, Dict[str, Any]]:
+        """
+        送信先を選択してPOSTリクエストを送信します（_sendの本体）。
+
+        接続に失敗した場合は、別のエンドポイントへ1回だけ再送します。
+
+        Args:
+            url: 送信先URL（ロードバランサーを使用する場合は参照しない）
+            data: 送信データ
+            timeout: タイムアウト秒数
+            raw: 正常レスポンスを解析せずに返すかどうか
+
+        Returns:
+            Union[RawUpstreamResponse, Dict[str, Any]]: レスポンス
+        """
+        if self._balancer is None:
+            if self.http2:
+                return await self._send_http2(url, data, timeout, raw)
+            response_data, _ = await self._post(self._get_client(), url, data, timeout, raw)
+            return response_data
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
+        tried = []
+        while True:
+            endpoint = self._balancer.select(exclude=tried)
+            started = self._balancer.begin(endpoint)
+            try:
+                response_data, fault = await self._post(
+                    endpoint.client, endpoint.url, data, timeout, raw
                 )
+            except BaseException:
+                # キャンセルされた場合は結果を評価せず、処理中の数だけ戻す
+                self._balancer.release(endpoint)
+                raise
+            self._balancer.complete(endpoint, started, failed=fault is not None)
+            tried.append(endpoint)
+            if fault != FAULT_CONNECT or len(tried) >= min(2, len(self._balancer.endpoints)):
+                return response_data
+            logger.warning(f"接続に失敗したため別のエンドポイントへ再送します: {endpoint.url}")
 
-                # レスポンスのステータスコードをチェック
-                response.raise_for_status()
+    async def _send_http2(
+        self, url: str, data: Dict[str, Any], timeout: int, raw: bool
+    ) -> Union[RawUpstreamResponse, Dict[str, Any]]:
+        """
+        HTTP/2のコネクションで多重化してPOSTリクエストを送信します。
 
-                # JSONレスポンスを解析
-                response_data = response.json()
-                logger.debug(f"Response data: {response_data}")
+        同時ストリーム数がhttp2_connections×http2_max_streamsを超える場合は空きを待ちます。
+        HTTP/2で応答するかを確認できていない場合は、先に確認し、必要に応じてHTTP/1.1で送信します。
 
+        Args:
+            url: 送信先URL
+            data: 送信データ
+            timeout: タイムアウト秒数
+            raw: 正常レスポンスを解析せずに返すかどうか
+
+        Returns:
+            Union[RawUpstreamResponse, Dict[str, Any]]: レスポンス
+        """
+        if self._http2_negotiating:
+            await self._negotiate_http2(url, timeout)
+            if not self.http2:
+                response_data, _ = await self._post(self._get_client(), url, data, timeout, raw)
                 return response_data
+        waited = time.perf_counter()
+        async with self._http2_streams:
+            span = current_span()
+            if span is not None:
+                span.set_attribute(
+                    "upstream.stream_wait_ms", round((time.perf_counter() - waited) * 1000, 3)
+                )
+            index = min(range(self.http2_connections), key=self._http2_inflight.__getitem__)
+            client = self._get_http2_client(index)
+            self._http2_inflight[index] += 1
+            try:
+                response_data, _ = await self._post(client, url, data, timeout, raw)
+            finally:
+                self._http2_inflight[index] -= 1
+        return response_data
+
+    async def _read_body(self, response: httpx.Response) -> bytes:
+        """
+        レスポンスボディを上限まで読み込みます。
+
+        Content-Lengthが上限を超える場合は読み込まずに打ち切ります。
+
+        Args:
+            response: ストリーミング中のレスポンス
+
+        Returns:
+            bytes: レスポンスボディ
+
+        Raises:
+            ResponseTooLargeError: ボディが上限を超えた場合
+        """
+        declared = response.headers.get("content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_response_bytes:
+            raise ResponseTooLargeError(f"Content-Length {declared} bytes")
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_response_bytes:
+                raise ResponseTooLargeError(f"more than {self.max_response_bytes} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        data: Dict[str, Any],
+        timeout: int,
+        raw: bool = False,
+    ) -> Tuple[Union[RawUpstreamResponse, Dict[str, Any]], Optional[str]]:
+        """
+        1つの送信先にPOSTリクエストを送信します。
+
+        トレーシングが有効な場合はtraceparentヘッダーを付けて送信し、サンプリングされている場合は
+        プールの待ち時間や接続時間などの内訳をスパンに記録します。
+
+        Args:
+            client: 送信に使用するHTTPクライアント
+            url: 送信先URL
+            data: 送信データ
+            timeout: タイムアウト秒数
+            raw: 正常レスポンスを解析せずに返すかどうか
+
+        Returns:
+            Tuple[Union[RawUpstreamResponse, Dict[str, Any]], Optional[str]]: レスポンスと、送信先側の失敗の種類
+                （接続失敗はconnect、5xx応答はstatus、その他の通信エラーはrequest、失敗でない場合はNone）
+        """
+        with tracer.start_span("http_post") as span:
+            headers = {
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            }
+            if span.traceparent is not None:
+                headers["traceparent"] = span.traceparent
+            if not span.recording:
+                return await self._post_once(client, url, data, timeout, raw, headers)
 
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
+            timings = UpstreamTimings()
+            response_data, fault = await self._post_once(
+                client, url, data, timeout, raw, headers, {"trace": timings}
             )
-            # エラーレスポンスがJSONの場合は解析を試みる
-            try:
-                error_data = e.response.json()
-                logger.error(f"Error details: {error_data}")
-                return {
-                    "success": False,
-                    "status_code": e.response.status_code,
-                    "error": error_data,
-                }
-            except Exception:
-                return {
-                    "success": False,
-                    "status_code": e.response.status_code,
-                    "error": e.response.text,
-                }
+            timings.apply(span)
+            span.set_attribute("http.url", url)
+            if isinstance(response_data, RawUpstreamResponse):
+                span.set_attribute("http.status_code", response_data.status_code)
+            elif "status_code" in response_data:
+                span.set_attribute("http.status_code", response_data["status_code"])
+            if fault is not None:
+                span.set_attribute("upstream.fault", fault)
+            return response_data, fault
+
+    async def _post_once(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        data: Dict[str, Any],
+        timeout: int,
+        raw: bool,
+        headers: Dict[str, str],
+        extensions: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Union[RawUpstreamResponse, Dict[str, Any]], Optional[str]]:
+        """
+        1つの送信先にPOSTリクエストを送信します（_postの本体）。
+
+        Args:
+            client: 送信に使用するHTTPクライアント
+            url: 送信先URL
+            data: 送信データ
+            timeout: タイムアウト秒数
+            raw: 正常レスポンスを解析せずに返すかどうか
+            headers: リクエストヘッダー
+            extensions: httpcoreに渡す拡張（トレースイベントの受け取りなど）
+
+        Returns:
+            Tuple[Union[RawUpstreamResponse, Dict[str, Any]], Optional[str]]: レスポンスと、送信先側の失敗の種類
+        """
+        try:
+            logger.info(f"Sending POST request to {url}")
+            logger.debug(f"Request data: {data}")
+
+            async with client.stream(
+                "POST",
+                url,
+                json=data,
+                headers=headers,
+                timeout=timeout,
+                extensions=extensions,
+            ) as response:
+                content = await self._read_body(response)
+
+            if response.is_error:
+                status_code = response.status_code
+                text = content.decode(response.encoding or "utf-8", "replace")
+                logger.error(f"HTTP error occurred: {status_code} - {text}")
+                fault = FAULT_STATUS if status_code >= 500 else None
+                # エラーレスポンスがJSONの場合は解析を試みる
+                try:
+                    error_data = json.loads(content)
+                    logger.error(f"Error details: {error_data}")
+                    return {
+                        "success": False,
+                        "status_code": status_code,
+                        "error": error_data,
+                    }, fault
+                except Exception:
+                    return {
+                        "success": False,
+                        "status_code": status_code,
+                        "error": text,
+                    }, fault
+
+            if raw:
+                return RawUpstreamResponse(
+                    status_code=response.status_code,
+                    content=content,
+                    content_type=response.headers.get("content-type", "application/json"),
+                    response_code=sniff_response_code(content),
+                ), None
+
+            # JSONレスポンスを解析
+            response_data = json.loads(content)
+            logger.debug(f"Response data: {response_data}")
+
+            return response_data, None
+
+        except ResponseTooLargeError as e:
+            logger.error(f"Response too large: {str(e)}")
+            return {"success": False, "error": f"Response too large: {str(e)}"}, FAULT_REQUEST
+
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            logger.error(f"Connection error occurred: {str(e)}")
+            return {"success": False, "error": f"Request error: {str(e)}"}, FAULT_CONNECT
 
         except httpx.RequestError as e:
             logger.error(f"Request error occurred: {str(e)}")
-            return {"success": False, "error": f"Request error: {str(e)}"}
+            return {"success": False, "error": f"Request error: {str(e)}"}, FAULT_REQUEST
 
         except Exception as e:
             logger.exception(f"Unexpected error during API request: {str(e)}")
-            return {"success": False, "error": f"Unexpected error: {str(e)}"}
+            return {"success": False, "error": f"Unexpected error: {str(e)}"}, None
@@ -0,0 +1,442 @@
+"""
+トランザクションジャーナルモジュール。
+
+外部APIに送信したリクエストと受信したレスポンスを追記専用のファイルへ記録し、
+障害後にどの決済が外部APIへ到達したかを確認できるようにします。
+
+ファイル形式:
+    ジャーナルは複数のセグメントファイルで構成されます。各レコードは
+    「ボディ長（uint32）」「CRC32（uint32）」のヘッダーと、
+    コンパクトなJSONボディで構成されます。
+
+書き込み方式:
+    イベントループ上ではキューへの追加のみを行い、専用の書き込みタスクが
+    溜まったレコードをまとめて書き込んで1回のfsyncで永続化します（グループコミット）。
+    ファイルへの書き込みとfsyncはスレッドプールで実行するため、
+    イベントループがディスクI/Oで停止することはありません。
+
+    各プロセスは起動ごとに新しいセグメントを作成し、書き込み中のセグメントを
+    排他ロックで保持します。プリフォーク型の複数ワーカーが同じディレクトリを
+    使用しても、互いのセグメントに書き込むことはありません。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.domain.interfaces.payment_service import JournalInterface
+
+logger = logging.getLogger(__name__)
+
+# レコードヘッダー（ボディ長、CRC32）
+_HEADER = struct.Struct("<II")
+
+# セグメントファイルの拡張子
+SEGMENT_SUFFIX = ".jnl"
+
+# マスク対象のキー
+_REDACTED_KEYS = ("authenticationPass",)
+
+# 書き込みタスクの停止指示
+_STOP = object()
+
+
+def redact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    レコード内の機密情報をマスクします。
+
+    Args:
+        record: ジャーナルに記録するレコード
+
+    Returns:
+        Dict[str, Any]: マスク済みのレコード
+    """
+    redacted = {}
+    for key, value in record.items():
+        if key in _REDACTED_KEYS:
+            redacted[key] = "****"
+        elif isinstance(value, dict):
+            redacted[key] = redact_record(value)
+        else:
+            redacted[key] = value
+    return redacted
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """
+    レコードをヘッダー付きのバイト列に変換します。
+
+    Args:
+        record: レコード
+
+    Returns:
+        bytes: ヘッダーとJSONボディを連結したバイト列
+    """
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _scan_segment(file: BinaryIO, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    セグメントを指定したオフセットから読み出します。
+
+    ボディ長の不足、CRCの不一致、JSONの解析エラーのいずれかを検出した時点で終了します。
+
+    Args:
+        file: セグメントファイル
+        offset: 読み出しを開始するオフセット（レコードの境界）
+
+    Yields:
+        Tuple[int, Dict[str, Any]]: レコード末尾のオフセットとレコード
+    """
+    file.seek(offset)
+    while True:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        length, checksum = _HEADER.unpack(header)
+        payload = file.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        try:
+            record = json.loads(payload)
+        except ValueError:
+            return
+        offset += _HEADER.size + length
+        yield offset, record
+
+
+def list_segments(directory: str) -> List[Path]:
+    """
+    ジャーナルのセグメントを作成順に列挙します。
+
+    Args:
+        directory: ジャーナルのディレクトリ
+
+    Returns:
+        List[Path]: セグメントファイルのパス
+    """
+    path = Path(directory)
+    if not path.is_dir():
+        return []
+    return sorted(path.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    セグメントのレコードを読み出します。
+
+    書き込み途中で途切れた末尾のレコードは無視します。
+
+    Args:
+        path: セグメントファイルのパス
+
+    Yields:
+        Dict[str, Any]: レコード
+    """
+    with open(path, "rb") as file:
+        for _, record in _scan_segment(file):
+            yield record
+
+
+def iter_segment(path: Path, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    セグメントのレコードを末尾のオフセットとともに読み出します。
+
+    前回読み出した位置から再開する、増分処理に使用します。
+
+    Args:
+        path: セグメントファイルのパス
+        offset: 読み出しを開始するオフセット（前回のレコード末尾）
+
+    Yields:
+        Tuple[int, Dict[str, Any]]: レコード末尾のオフセットとレコード
+    """
+    with open(path, "rb") as file:
+        yield from _scan_segment(file, offset)
+
+
+def read_journal(directory: str, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    ジャーナルのレコードをセグメントの作成順に読み出します。
+
+    Args:
+        directory: ジャーナルのディレクトリ
+        since: 指定した場合、最終更新がこの時刻（UNIX秒）より前のセグメントを読み飛ばします
+
+    Yields:
+        Dict[str, Any]: レコード
+    """
+    for path in list_segments(directory):
+        if since is not None and path.stat().st_mtime < since:
+            continue
+        yield from read_segment(path)
+
+
+@dataclass
+class RecoveryReport:
+    """
+    起動時のリカバリ結果。
+    """
+
+    segments: int = 0
+    records: int = 0
+    truncated_segments: int = 0
+    truncated_bytes: int = 0
+    skipped_segments: int = 0
+
+
+def recover(directory: str) -> RecoveryReport:
+    """
+    ジャーナルを検査し、途切れた末尾のレコードを切り詰めます。
+
+    他のプロセスが書き込み中のセグメント（排他ロックを保持しているもの）は対象外です。
+
+    Args:
+        directory: ジャーナルのディレクトリ
+
+    Returns:
+        RecoveryReport: リカバリ結果
+    """
+    report = RecoveryReport()
+    for path in list_segments(directory):
+        with open(path, "r+b") as file:
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                report.skipped_segments += 1
+                continue
+            try:
+                valid_end = 0
+                for valid_end, _ in _scan_segment(file):
+                    report.records += 1
+                size = os.fstat(file.fileno()).st_size
+                if size > valid_end:
+                    logger.warning(
+                        f"ジャーナルの末尾を切り詰めます: {path.name} "
+                        f"({size - valid_end} バイト)"
+                    )
+                    file.truncate(valid_end)
+                    os.fsync(file.fileno())
+                    report.truncated_segments += 1
+                    report.truncated_bytes += size - valid_end
+                report.segments += 1
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+    return report
+
+
+class Journal(JournalInterface):
+    """
+    追記専用のトランザクションジャーナル。
+
+    appendで受け取ったレコードを書き込みタスクがまとめて書き込み、
+    バッチごとに1回fsyncします。レコードにはプロセス内で単調増加する
+    シーケンス番号（seq）を付与します。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        max_batch: int = 256,
+        fsync: bool = True,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            directory: ジャーナルのディレクトリ
+            segment_max_bytes: セグメントを切り替えるサイズ
+            max_batch: 1回のコミットでまとめるレコードの上限
+            fsync: コミットごとにfsyncするかどうか
+        """
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.records = 0
+        self.commits = 0
+        self.recovery: Optional[RecoveryReport] = None
+        self._seq = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._file: Optional[BinaryIO] = None
+        self._segment_size = 0
+
+    @property
+    def depth(self) -> int:
+        """書き込み待ちのレコードの数。"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def segment_path(self) -> Optional[Path]:
+        """書き込み中のセグメントのパス。"""
+        return Path(self._file.name) if self._file is not None else None
+
+    async def start(self) -> RecoveryReport:
+        """
+        リカバリを行い、書き込みタスクを起動します。
+
+        Returns:
+            RecoveryReport: リカバリ結果
+        """
+        loop = asyncio.get_running_loop()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.recovery = await loop.run_in_executor(None, recover, str(self.directory))
+        logger.info(
+            f"ジャーナルのリカバリが完了しました segments={self.recovery.segments} "
+            f"records={self.recovery.records} truncated={self.recovery.truncated_bytes}B"
+        )
+        await loop.run_in_executor(None, self._open_segment)
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run(), name="journal-writer")
+        return self.recovery
+
+    async def append(self, record: Dict[str, Any], wait: bool = True) -> int:
+        """
+        レコードを追記します。
+
+        Args:
+            record: 記録するレコード（機密情報はマスクされます）
+            wait: fsyncの完了まで待機するかどうか
+
+        Returns:
+            int: 付与したシーケンス番号
+
+        Raises:
+            RuntimeError: 書き込みタスクが起動していない場合
+            Exception: 待機したコミットが失敗した場合（ディスクの空き不足によるOSErrorなど）
+        """
+        if self._queue is None:
+            raise RuntimeError("ジャーナルが起動していません")
+        self._seq += 1
+        seq = self._seq
+        entry = {"seq": seq, "ts": time.time(), **redact_record(record)}
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._queue.put_nowait((encode_record(entry), future))
+        if future is not None:
+            await future
+        return seq
+
+    async def close(self) -> None:
+        """未書き込みのレコードを書き出して書き込みタスクを停止します。"""
+        if self._writer is None or self._queue is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._writer
+        self._writer = None
+        self._queue = None
+        await asyncio.get_running_loop().run_in_executor(None, self._close_segment)
+
+    async def _run(self) -> None:
+        """書き込みタスクの本体。"""
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            # fsync中に溜まったレコードを次のコミットにまとめる
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if any(item is _STOP for item in batch):
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+            if not batch:
+                continue
+
+            try:
+                await loop.run_in_executor(
+                    None, self._commit, b"".join(data for data, _ in batch)
+                )
+            except Exception as e:
+                # 失敗したバッチのみを失敗させ、書き込みタスクは継続する
+                logger.exception("ジャーナルへの書き込みに失敗しました")
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                try:
+                    await loop.run_in_executor(None, self._rollback)
+                except Exception:
+                    logger.exception("ジャーナルのセグメントを復旧できませんでした")
+                continue
+            self.records += len(batch)
+            self.commits += 1
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+    def _commit(self, data: bytes) -> None:
+        """
+        バッチを書き込んで永続化します（スレッドプールで実行）。
+
+        Args:
+            data: 連結済みのレコード
+        """
+        if self._file is None:
+            # 前回の復旧でセグメントを開けなかった
+            self._open_segment()
+        if self._segment_size and self._segment_size + len(data) > self.segment_max_bytes:
+            self._close_segment()
+            self._open_segment()
+        # バッファを介さずに書き込み、失敗したバッチが後から書き出されないようにする
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+        if self.fsync:
+            os.fdatasync(self._file.fileno())
+        self._segment_size += len(data)
+
+    def _rollback(self) -> None:
+        """
+        失敗したコミットの書き込みを取り消します（スレッドプールで実行）。
+
+        途中まで書き込まれたレコードの後ろに次のレコードを追記すると、リカバリで
+        それ以降のレコードがすべて切り詰められるため、最後にコミットした位置まで切り詰めます。
+        切り詰められない場合は新しいセグメントに切り替えます（途切れた末尾は次回のリカバリで切り詰めます）。
+        """
+        if self._file is None:
+            return
+        try:
+            os.ftruncate(self._file.fileno(), self._segment_size)
+            return
+        except OSError:
+            logger.exception("ジャーナルの切り詰めに失敗したため、セグメントを切り替えます")
+        try:
+            self._file.close()
+        finally:
+            self._file = None
+        self._open_segment()
+
+    def _open_segment(self) -> None:
+        """新しいセグメントを作成して排他ロックを取得します。"""
+        name = f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._file = open(self.directory / name, "ab", buffering=0)
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        self._segment_size = 0
+        if self.fsync:
+            # 新しいファイルのディレクトリエントリを永続化する
+            fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _close_segment(self) -> None:
+        """書き込み中のセグメントを閉じます。レコードのないセグメントは削除します。"""
+        if self._file is None:
+            return
+        self._file.close()
+        if self._segment_size == 0:
+            Path(self._file.name).unlink(missing_ok=True)
+        self._file = None
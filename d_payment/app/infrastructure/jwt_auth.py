@@ -0,0 +1,344 @@
+"""
+JWT認証モジュール。
+
+呼び出し元が提示したBearerトークン（JWT）の署名とクレームを検証します。
+検証済みのトークンは有効期限までLRUキャッシュに保持し、JWKSから取得した鍵は
+鍵ID（kid）ごとに解析済みの状態で保持するため、同じトークンでの繰り返しの呼び出しでは
+署名の検証を1回しか行いません。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from jose import jwk, jwt
+from jose.exceptions import JOSEError
+
+logger = logging.getLogger(__name__)
+
+# JWKにalgがない場合に鍵の種類から決めるアルゴリズム
+_DEFAULT_ALGORITHMS = {
+    ("RSA", None): "RS256",
+    ("EC", "P-256"): "ES256",
+    ("EC", "P-384"): "ES384",
+    ("EC", "P-521"): "ES512",
+    ("oct", None): "HS256",
+}
+
+# JWKSを取得する関数の型（URLまたはファイルのパスからJWKSを返す）
+JwksFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class TokenVerificationError(Exception):
+    """トークンの検証に失敗した場合の例外。"""
+
+
+class JwksKeyStore:
+    """
+    JWKSの鍵の保持。
+
+    JWKSを取得して鍵IDごとに保持し、アルゴリズムごとに解析した鍵を再利用します。
+    保持期間（ttl秒）を過ぎた場合、または未知の鍵IDのトークンを受け取った場合に
+    再取得します。未知の鍵IDによる再取得は、refresh_interval秒に1回までに制限します。
+    """
+
+    def __init__(
+        self,
+        source: str,
+        ttl: float = 300.0,
+        refresh_interval: float = 30.0,
+        fetch: Optional[JwksFetcher] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            source: JWKSのURL（http://またはhttps://）またはファイルのパス
+            ttl: 取得したJWKSを保持する秒数
+            refresh_interval: 未知の鍵IDによる再取得の最短間隔（秒）
+            fetch: JWKSを取得するコルーチン関数（省略時はsourceから取得）
+            clock: 現在時刻を返す関数（単調増加）
+        """
+        self.source = source
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._fetch = fetch or _load_jwks
+        self._clock = clock
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._parsed: Dict[Tuple[str, str], Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.fetches = 0
+
+    async def get(self, kid: Optional[str], algorithm: str) -> Any:
+        """
+        鍵IDとアルゴリズムに対応する解析済みの鍵を返します。
+
+        Args:
+            kid: トークンのヘッダーの鍵ID（ない場合はJWKSの鍵が1つのときのみ使用）
+            algorithm: トークンのヘッダーのアルゴリズム
+
+        Returns:
+            Any: 解析済みの鍵（jose.jwk.Key）
+
+        Raises:
+            TokenVerificationError: 鍵が見つからない場合、またはアルゴリズムが鍵と一致しない場合
+        """
+        if self._fetched_at is None or self._clock() - self._fetched_at >= self.ttl:
+            await self._refresh(force=True)
+        key = self._lookup(kid)
+        if key is None:
+            await self._refresh(force=False)
+            key = self._lookup(kid)
+        if key is None:
+            raise TokenVerificationError(f"unknown key id: {kid}")
+
+        key_id = key.get("kid", "")
+        parsed = self._parsed.get((key_id, algorithm))
+        if parsed is None:
+            declared = key.get("alg") or _DEFAULT_ALGORITHMS.get(
+                (key.get("kty"), key.get("crv"))
+            )
+            if declared != algorithm:
+                raise TokenVerificationError(f"algorithm {algorithm} does not match key {key_id}")
+            try:
+                parsed = jwk.construct(key, algorithm)
+            except JOSEError as e:
+                raise TokenVerificationError(f"invalid key {key_id}: {e}") from e
+            self._parsed[(key_id, algorithm)] = parsed
+        return parsed
+
+    def _lookup(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        保持しているJWKSから鍵を探します。
+
+        Args:
+            kid: 鍵ID
+
+        Returns:
+            Optional[Dict[str, Any]]: JWK（見つからない場合はNone）
+        """
+        if kid is None:
+            return next(iter(self._jwks.values())) if len(self._jwks) == 1 else None
+        return self._jwks.get(kid)
+
+    async def _refresh(self, force: bool) -> None:
+        """
+        JWKSを再取得します。
+
+        同時の再取得は1回にまとめます。取得に失敗した場合は保持している鍵を使い続けます。
+
+        Args:
+            force: 保持期間を過ぎた場合の再取得かどうか（Falseの場合は最短間隔を守る）
+        """
+        started = self._clock()
+        async with self._lock:
+            fetched_at = self._fetched_at
+            if fetched_at is not None and fetched_at >= started:
+                return  # 待っている間に他のリクエストが再取得した
+            if not force and fetched_at is not None and started - fetched_at < self.refresh_interval:
+                return
+            try:
+                document = await self._fetch(self.source)
+                keys = {key.get("kid", ""): key for key in document.get("keys", [])}
+            except Exception as e:
+                if not self._jwks:
+                    raise TokenVerificationError(f"JWKSを取得できません: {e}") from e
+                logger.warning(f"JWKSの再取得に失敗したため、保持している鍵を使用します: {e}")
+                self._fetched_at = self._clock()
+                return
+            self.fetches += 1
+            self._jwks = keys
+            self._parsed = {k: v for k, v in self._parsed.items() if k[0] in keys}
+            self._fetched_at = self._clock()
+            logger.info(f"JWKSを取得しました keys={len(keys)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: 保持している鍵の数と取得回数
+        """
+        return {"keys": len(self._jwks), "parsed": len(self._parsed), "fetches": self.fetches}
+
+
+async def _load_jwks(source: str) -> Dict[str, Any]:
+    """
+    URLまたはファイルからJWKSを読み込みます。
+
+    Args:
+        source: JWKSのURLまたはファイルのパス
+
+    Returns:
+        Dict[str, Any]: JWKS
+    """
+    if source.startswith(("http://", "https://")):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(source)
+            response.raise_for_status()
+            return response.json()
+    with open(source, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass
+class _VerifiedToken:
+    """検証済みのトークンのクレームと有効期限。"""
+
+    claims: Dict[str, Any]
+    expires_at: float
+
+
+class JwtVerifier:
+    """
+    JWTの検証。
+
+    検証済みのトークンはSHA-256のハッシュをキーとして、expクレームの時刻まで
+    最大max_entries件のLRUキャッシュに保持します。JWKSから鍵を削除しても、
+    検証済みのトークンは有効期限まで受け付けます。
+    """
+
+    def __init__(
+        self,
+        algorithms: List[str],
+        secret: str = "",
+        keys: Optional[JwksKeyStore] = None,
+        issuer: str = "",
+        audience: str = "",
+        leeway: int = 0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            algorithms: 受け付ける署名アルゴリズム
+            secret: HS256などの共通鍵（JWKSを使用する場合は不要）
+            keys: JWKSの鍵の保持（RS256などの公開鍵で検証する場合に指定）
+            issuer: 期待する発行者（issクレーム、空の場合は検証しない）
+            audience: 期待する受信者（audクレーム、空の場合は検証しない）
+            leeway: 有効期限などの検証で許容する時刻のずれ（秒）
+            max_entries: キャッシュする検証済みのトークンの上限
+            clock: 現在時刻を返す関数（UNIX時刻）
+        """
+        self.algorithms = algorithms
+        self._secret = secret
+        self._keys = keys
+        self.issuer = issuer or None
+        self.audience = audience or None
+        self.leeway = leeway
+        self.max_entries = max_entries
+        self._clock = clock
+        self._cache: "OrderedDict[bytes, _VerifiedToken]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        トークンを検証し、クレームを返します。
+
+        Args:
+            token: JWT
+
+        Returns:
+            Dict[str, Any]: クレーム
+
+        Raises:
+            TokenVerificationError: 署名やクレームが不正な場合、有効期限が切れている場合
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            if cached.expires_at + self.leeway > self._clock():
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                return cached.claims
+            del self._cache[digest]
+
+        self.misses += 1
+        try:
+            claims = await self._decode(token)
+        except TokenVerificationError:
+            self.failures += 1
+            raise
+
+        self._cache[digest] = _VerifiedToken(claims, float(claims["exp"]))
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return claims
+
+    async def _decode(self, token: str) -> Dict[str, Any]:
+        """
+        トークンの署名とクレームを検証します。
+
+        Args:
+            token: JWT
+
+        Returns:
+            Dict[str, Any]: クレーム
+
+        Raises:
+            TokenVerificationError: 検証に失敗した場合
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JOSEError as e:
+            raise TokenVerificationError(f"malformed token: {e}") from e
+        algorithm = header.get("alg")
+        if algorithm not in self.algorithms:
+            raise TokenVerificationError(f"algorithm not allowed: {algorithm}")
+
+        if algorithm.startswith("HS"):
+            if not self._secret:
+                raise TokenVerificationError("no secret configured")
+            key: Any = self._secret
+        elif self._keys is not None:
+            key = await self._keys.get(header.get("kid"), algorithm)
+        else:
+            raise TokenVerificationError("no JWKS configured")
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                options={
+                    "verify_aud": self.audience is not None,
+                    "require_exp": True,
+                    "leeway": self.leeway,
+                },
+            )
+        except JOSEError as e:
+            raise TokenVerificationError(str(e)) from e
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: キャッシュの件数、ヒット数、検証の回数と失敗数、JWKSの状態
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "jwks": self._keys.stats() if self._keys is not None else None,
+        }
@@ -0,0 +1,443 @@
+"""
+上流エンドポイントの負荷分散モジュール。
+
+複数の外部APIエンドポイントへの送信先の選択、失敗したエンドポイントの一時的な除外、
+バックグラウンドでのヘルスチェックを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import ssl
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from app.infrastructure.transport import DnsCache, create_client
+
+logger = logging.getLogger(__name__)
+
+# 送信先の選択方式
+STRATEGY_PEAK_EWMA = "peak_ewma"
+STRATEGY_LEAST_OUTSTANDING = "least_outstanding"
+STRATEGIES = (STRATEGY_PEAK_EWMA, STRATEGY_LEAST_OUTSTANDING)
+
+
+class UpstreamEndpoint:
+    """
+    上流エンドポイント。
+
+    エンドポイントごとにコネクションプールを持ち、処理中のリクエスト数、
+    レイテンシの指数移動平均（peak EWMA）、連続失敗数を保持します。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        limits: httpx.Limits,
+        initial_rtt: float,
+        decay: float,
+        clock: Callable[[], float],
+        http2: bool = False,
+        dns_cache: Optional[DnsCache] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            url: 送信先URL
+            limits: コネクションプールの上限
+            initial_rtt: 計測前に仮定するレイテンシ（秒）
+            decay: 指数移動平均の時定数（秒）
+            clock: 現在時刻を返す関数（単調増加）
+            http2: ALPNでHTTP/2をネゴシエーションするかどうか
+            dns_cache: 接続時の名前解決に使用するDNSキャッシュ
+            ssl_context: TLSの接続に使用するSSLコンテキスト
+        """
+        self.url = url
+        self._limits = limits
+        self._http2 = http2
+        self._dns_cache = dns_cache
+        self._ssl_context = ssl_context
+        self._decay = decay
+        self._clock = clock
+        self._client: Optional[httpx.AsyncClient] = None
+        self.outstanding = 0
+        self.ewma = initial_rtt
+        self._ewma_at = clock()
+        self._measured = False
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = 0
+        self.failures = 0
+        self.probes = 0
+        self.probe_failures = 0
+        self.consecutive_probe_successes = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        エンドポイント専用のHTTPクライアント。
+
+        初回参照時に、呼び出し元のイベントループ上で生成します。
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = create_client(
+                self._limits,
+                http2=self._http2,
+                dns_cache=self._dns_cache,
+                ssl_context=self._ssl_context,
+            )
+        return self._client
+
+    def is_ejected(self, now: float) -> bool:
+        """
+        除外中かどうかを返します。
+
+        Args:
+            now: 現在時刻（clock）
+
+        Returns:
+            bool: 除外中の場合はTrue
+        """
+        return now < self.ejected_until
+
+    def observe(self, rtt: float) -> None:
+        """
+        レイテンシの計測値を反映します。
+
+        計測値が現在の平均より大きい場合は即座に引き上げ、小さい場合は
+        経過時間に応じた重みで平均に近づけます（peak EWMA）。
+        初回の計測値は、計測前に仮定した値をそのまま置き換えます。
+
+        Args:
+            rtt: 計測したレイテンシ（秒）
+        """
+        now = self._clock()
+        if rtt > self.ewma or not self._measured:
+            self.ewma = rtt
+            self._measured = True
+        else:
+            weight = math.exp(-max(0.0, now - self._ewma_at) / self._decay)
+            self.ewma = self.ewma * weight + rtt * (1.0 - weight)
+        self._ewma_at = now
+
+    def cost(self, strategy: str) -> float:
+        """
+        送信先を選択する際のコストを返します。
+
+        Args:
+            strategy: 選択方式
+
+        Returns:
+            float: コスト（小さいほど優先）
+        """
+        if strategy == STRATEGY_LEAST_OUTSTANDING:
+            return float(self.outstanding)
+        return self.ewma * (self.outstanding + 1)
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        """
+        メトリクス用の辞書に変換します。
+
+        Args:
+            now: 現在時刻（clock）
+
+        Returns:
+            Dict[str, Any]: エンドポイントの状態と累計値
+        """
+        return {
+            "url": self.url,
+            "healthy": not self.is_ejected(now),
+            "outstanding": self.outstanding,
+            "ewmaMs": round(self.ewma * 1000, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutiveFailures": self.consecutive_failures,
+            "ejections": self.ejections,
+            "probes": self.probes,
+            "probeFailures": self.probe_failures,
+        }
+
+    async def aclose(self) -> None:
+        """コネクションプールを閉じます。"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LoadBalancer:
+    """
+    上流エンドポイントのロードバランサー。
+
+    無作為に選んだ2つのエンドポイントのうちコストの小さい方を選択します
+    （power of two choices）。連続してeject_failures回失敗したエンドポイントは
+    一定時間除外し、除外が続くたびに除外時間を倍にします（送信が成功するまで除外時間は戻しません）。
+    除外中のエンドポイントは、ヘルスチェックがprobe_successes回続けて正常の場合に除外を解除します。
+    ヘルスチェックはprobe_pathを指定した場合のみ行います（決済のURLそのものには送信しません）。
+    すべてのエンドポイントが除外中の場合は、除外を無視して選択します。
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        limits: Optional[httpx.Limits] = None,
+        strategy: str = STRATEGY_PEAK_EWMA,
+        initial_rtt: float = 0.05,
+        decay: float = 10.0,
+        eject_failures: int = 5,
+        eject_seconds: float = 30.0,
+        max_eject_seconds: float = 300.0,
+        probe_interval: float = 10.0,
+        probe_path: str = "",
+        probe_timeout: float = 2.0,
+        probe_successes: int = 3,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+        http2: bool = False,
+        dns_cache: Optional[DnsCache] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            urls: 送信先URLのリスト
+            limits: エンドポイントごとのコネクションプールの上限
+            strategy: 選択方式（peak_ewma、least_outstanding）
+            initial_rtt: 計測前に仮定するレイテンシ（秒）
+            decay: レイテンシの指数移動平均の時定数（秒）
+            eject_failures: 除外するまでの連続失敗数
+            eject_seconds: 初回の除外時間（秒）
+            max_eject_seconds: 除外時間の上限（秒）
+            probe_interval: ヘルスチェックの間隔（秒、0以下で行わない）
+            probe_path: ヘルスチェックのパス（空の場合は行わない）
+            probe_timeout: ヘルスチェックのタイムアウト秒数
+            probe_successes: 除外を解除するまでに続けて正常と判定されるヘルスチェックの回数
+            rng: エンドポイントの抽出に使う乱数生成器
+            clock: 現在時刻を返す関数（単調増加）
+            http2: ALPNでHTTP/2をネゴシエーションするかどうか
+                （https://のエンドポイントのみ。http://のエンドポイントはHTTP/1.1で送信）
+            dns_cache: 接続時の名前解決に使用するDNSキャッシュ
+            ssl_context: TLSの接続に使用するSSLコンテキスト
+
+        Raises:
+            ValueError: URLが空の場合、選択方式が不正な場合
+        """
+        if not urls:
+            raise ValueError("送信先URLが指定されていません")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"選択方式が不正です: {strategy}")
+        limits = limits or httpx.Limits()
+        self.strategy = strategy
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.probe_interval = probe_interval
+        self.probe_path = probe_path
+        self.probe_timeout = probe_timeout
+        self.probe_successes = max(1, probe_successes)
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self.endpoints = [
+            UpstreamEndpoint(
+                url,
+                limits,
+                initial_rtt,
+                decay,
+                clock,
+                http2=http2,
+                dns_cache=dns_cache,
+                ssl_context=ssl_context,
+            )
+            for url in urls
+        ]
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def select(self, exclude: Sequence[UpstreamEndpoint] = ()) -> UpstreamEndpoint:
+        """
+        送信先のエンドポイントを選択します。
+
+        Args:
+            exclude: 選択から外すエンドポイント（再送時に送信済みのものなど）
+
+        Returns:
+            UpstreamEndpoint: 選択したエンドポイント
+        """
+        self._ensure_probes()
+        now = self._clock()
+        candidates = [
+            e for e in self.endpoints if e not in exclude and not e.is_ejected(now)
+        ]
+        if not candidates:
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+        if len(candidates) <= 2:
+            pair = candidates
+        else:
+            pair = self._rng.sample(candidates, 2)
+        return min(pair, key=lambda e: e.cost(self.strategy))
+
+    def begin(self, endpoint: UpstreamEndpoint) -> float:
+        """
+        エンドポイントへの送信の開始を記録します。
+
+        Args:
+            endpoint: 送信先のエンドポイント
+
+        Returns:
+            float: 送信開始時刻（time.perf_counter）
+        """
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        return time.perf_counter()
+
+    def complete(self, endpoint: UpstreamEndpoint, started: float, failed: bool) -> None:
+        """
+        エンドポイントへの送信の完了を記録します。
+
+        Args:
+            endpoint: 送信先のエンドポイント
+            started: 送信開始時刻（begin()の戻り値）
+            failed: 接続エラーや5xx応答などエンドポイント側の失敗かどうか
+        """
+        self.release(endpoint)
+        if failed:
+            endpoint.failures += 1
+            self._record_failure(endpoint)
+        else:
+            endpoint.observe(time.perf_counter() - started)
+            endpoint.consecutive_failures = 0
+            endpoint.ejections = 0
+
+    def release(self, endpoint: UpstreamEndpoint) -> None:
+        """
+        結果を評価せずに、エンドポイントの処理中のリクエスト数を戻します。
+
+        Args:
+            endpoint: 送信先のエンドポイント
+        """
+        endpoint.outstanding -= 1
+
+    def _record_failure(self, endpoint: UpstreamEndpoint) -> None:
+        """
+        エンドポイントの失敗を数え、連続失敗数が閾値に達した場合は除外します。
+
+        Args:
+            endpoint: 失敗したエンドポイント
+        """
+        endpoint.consecutive_failures += 1
+        endpoint.consecutive_probe_successes = 0
+        now = self._clock()
+        if endpoint.consecutive_failures < self.eject_failures or endpoint.is_ejected(now):
+            return
+        duration = min(self.max_eject_seconds, self.eject_seconds * (2 ** endpoint.ejections))
+        endpoint.ejected_until = now + duration
+        endpoint.ejections += 1
+        logger.warning(
+            f"上流エンドポイントを除外しました url={endpoint.url} "
+            f"failures={endpoint.consecutive_failures} seconds={duration:.0f}"
+        )
+
+    def _reinstate(self, endpoint: UpstreamEndpoint) -> None:
+        """
+        除外中のエンドポイントを復帰させます。
+
+        除外回数は戻さないため、復帰後に再び除外された場合の除外時間は倍になります。
+
+        Args:
+            endpoint: 復帰させるエンドポイント
+        """
+        logger.info(f"上流エンドポイントを復帰させました url={endpoint.url}")
+        endpoint.ejected_until = 0.0
+        endpoint.consecutive_failures = 0
+        endpoint.consecutive_probe_successes = 0
+
+    async def probe(self, endpoint: UpstreamEndpoint) -> bool:
+        """
+        エンドポイントにヘルスチェックを送信します。
+
+        5xx以外の応答が返れば正常とみなします。除外中のエンドポイントは
+        probe_successes回続けて正常な場合に除外を解除し、異常な場合は失敗として数えます。
+        除外されていないエンドポイントの連続失敗数は、送信の結果のみで数えます
+        （GETへの応答が正常でも、決済の送信が失敗している場合があるため）。
+
+        Args:
+            endpoint: 確認するエンドポイント
+
+        Returns:
+            bool: 正常な場合はTrue
+
+        Raises:
+            ValueError: ヘルスチェックのパスが指定されていない場合
+        """
+        if not self.probe_path:
+            raise ValueError("ヘルスチェックのパスが指定されていません")
+        url = httpx.URL(endpoint.url).join(self.probe_path)
+        endpoint.probes += 1
+        try:
+            response = await endpoint.client.get(url, timeout=self.probe_timeout)
+            healthy = response.status_code < 500
+        except httpx.HTTPError:
+            healthy = False
+        if healthy:
+            if endpoint.is_ejected(self._clock()):
+                endpoint.consecutive_probe_successes += 1
+                if endpoint.consecutive_probe_successes >= self.probe_successes:
+                    self._reinstate(endpoint)
+        else:
+            endpoint.probe_failures += 1
+            self._record_failure(endpoint)
+        return healthy
+
+    def _ensure_probes(self) -> None:
+        """実行中のイベントループ上でヘルスチェックのタスクを開始します。"""
+        if self.probe_interval <= 0 or not self.probe_path or self._probe_task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._probe_task = loop.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        """一定間隔ですべてのエンドポイントのヘルスチェックを行います。"""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            results = await asyncio.gather(
+                *(self.probe(e) for e in self.endpoints), return_exceptions=True
+            )
+            # 想定外の例外でもヘルスチェックを止めない
+            for endpoint, result in zip(self.endpoints, results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"ヘルスチェックに失敗しました url={endpoint.url}",
+                        exc_info=result,
+                    )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        エンドポイントごとのメトリクスを返します。
+
+        Returns:
+            List[Dict[str, Any]]: エンドポイントの状態と累計値のリスト
+        """
+        now = self._clock()
+        return [e.to_dict(now) for e in self.endpoints]
+
+    async def aclose(self) -> None:
+        """ヘルスチェックを停止し、すべてのコネクションプールを閉じます。"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        for endpoint in self.endpoints:
+            await endpoint.aclose()
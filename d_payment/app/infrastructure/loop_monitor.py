@@ -0,0 +1,272 @@
+"""
+イベントループの監視モジュール。
+
+イベントループのスケジューリングの遅れ（ラグ）をヒストグラムに集計し、
+しきい値を超えてループをブロックした処理のスタックと処理中のルートを記録します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from types import FrameType
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from app.infrastructure.profiler import collapse
+
+logger = logging.getLogger(__name__)
+
+# ブロックを検知したときのログメッセージ（続けてJSONを出力する）
+SLOW_CALLBACK_MESSAGE = "イベントループが長時間ブロックされました: "
+
+# 定期的に出力するラグの集計のログメッセージ（続けてJSONを出力する）
+SUMMARY_MESSAGE = "イベントループのラグ: "
+
+# ヒストグラムの区間の上限（ミリ秒）
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LagHistogram:
+    """
+    ラグのヒストグラム。
+
+    区間ごとの件数（Prometheusのhistogramと同じ累積形式で出力）、合計、最大を保持します。
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """
+        初期化メソッド。
+
+        Args:
+            buckets_ms: 区間の上限（ミリ秒、昇順）
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, lag_ms: float) -> None:
+        """
+        ラグを記録します。
+
+        Args:
+            lag_ms: ラグ（ミリ秒）
+        """
+        self._counts[bisect.bisect_left(self.buckets_ms, lag_ms)] += 1
+        self.count += 1
+        self.sum_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def quantile(self, q: float) -> float:
+        """
+        分位点を区間の上限で近似して返します。
+
+        Args:
+            q: 分位（0〜1）
+
+        Returns:
+            float: 分位点（ミリ秒、最後の区間を超える場合は最大値）
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: 累積の区間ごとの件数、件数、合計、最大、p50とp99
+        """
+        buckets: Dict[str, int] = {}
+        seen = 0
+        for bound, count in zip((*self.buckets_ms, "+Inf"), self._counts):
+            seen += count
+            buckets[str(bound)] = seen
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sumMs": round(self.sum_ms, 3),
+            "maxMs": round(self.max_ms, 3),
+            "p50Ms": self.quantile(0.5),
+            "p99Ms": self.quantile(0.99),
+        }
+
+
+def route_of(frame: Optional[FrameType]) -> Optional[str]:
+    """
+    スタックをたどり、処理中のリクエストのメソッドとパスを返します。
+
+    ASGIアプリケーションのフレームのローカル変数scopeを参照します。
+
+    Args:
+        frame: 葉のフレーム
+
+    Returns:
+        Optional[str]: 「メソッド パス」（リクエストの処理中でない場合はNone）
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return f"{scope.get('method', '')} {scope.get('path', '')}"
+        frame = frame.f_back
+    return None
+
+
+class EventLoopMonitor:
+    """
+    イベントループの監視。
+
+    ループ上のタスクがinterval秒ごとに起床して予定からの遅れをヒストグラムに記録します。
+    別スレッドのウォッチドッグは、起床がslow_threshold秒以上途絶えた時点でループのスレッドの
+    スタックを採取するため、ブロックしている最中の処理とルートを特定できます。
+    ループの再開後に、遅れの長さとともに構造化ログへ出力し、直近max_events件を保持します。
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        slow_threshold: float = 0.1,
+        max_events: int = 100,
+        log_interval: float = 60.0,
+        max_depth: int = 64,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            interval: ラグを計測する間隔（秒）
+            slow_threshold: ブロックとして記録するラグの下限（秒）
+            max_events: 保持するブロックの記録の上限
+            log_interval: ラグの集計をログに出力する間隔（秒、0以下の場合は出力しない）
+            max_depth: 採取するスタックのフレームの上限
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.log_interval = log_interval
+        self.max_depth = max_depth
+        self.histogram = LagHistogram()
+        self.slow_events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.slow_count = 0
+        self._beat = 0.0
+        self._captured_beat = -1.0
+        self._pending: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """実行中のイベントループで監視を開始します。"""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._beat = time.monotonic()
+        self._task = loop.create_task(self._measure(loop))
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            args=(loop, threading.get_ident()),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """監視を停止します。"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._watchdog.join)
+            self._watchdog = None
+
+    async def _measure(self, loop: asyncio.AbstractEventLoop) -> None:
+        """ループ上でラグを計測するタスクの本体。"""
+        next_log = loop.time() + self.log_interval
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = max(0.0, now - expected)
+            self.histogram.record(lag * 1000)
+            self._beat = time.monotonic()
+            pending, self._pending = self._pending, None
+            if lag >= self.slow_threshold:
+                self._record_slow(lag, pending)
+            if self.log_interval > 0 and now >= next_log:
+                next_log = now + self.log_interval
+                logger.info(SUMMARY_MESSAGE + json.dumps(self.histogram.stats()))
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> None:
+        """ウォッチドッグのスレッドの本体。"""
+        period = max(0.005, self.slow_threshold / 4)
+        while not self._stop.wait(period):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.slow_threshold or beat == self._captured_beat:
+                continue
+            self._captured_beat = beat
+            frame = sys._current_frames().get(loop_thread)
+            task = asyncio.current_task(loop)
+            coro = task.get_coro() if task is not None else None
+            self._pending = {
+                "task": getattr(coro, "__qualname__", None),
+                "route": route_of(frame),
+                "stack": collapse(frame, self.max_depth),
+            }
+            del frame
+
+    def _record_slow(self, lag: float, pending: Optional[Dict[str, Any]]) -> None:
+        """
+        ブロックを記録し、構造化ログに出力します。
+
+        Args:
+            lag: ラグ（秒）
+            pending: ウォッチドッグがブロック中に採取した内容（採取できなかった場合はNone）
+        """
+        self.slow_count += 1
+        event: Dict[str, Any] = {
+            "at": time.time(),
+            "durationMs": round(lag * 1000, 3),
+            "task": None,
+            "route": None,
+            "stack": [],
+        }
+        if pending is not None:
+            event.update(pending)
+        self.slow_events.append(event)
+        logger.warning(SLOW_CALLBACK_MESSAGE + json.dumps(event, ensure_ascii=False))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: ラグのヒストグラム、ブロックの件数と直近の記録
+        """
+        recent: List[Dict[str, Any]] = list(self.slow_events)
+        return {
+            "intervalMs": self.interval * 1000,
+            "slowThresholdMs": self.slow_threshold * 1000,
+            "lag": self.histogram.stats(),
+            "slowCallbacks": self.slow_count,
+            "recentSlowCallbacks": recent,
+        }
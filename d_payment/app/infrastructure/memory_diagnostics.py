@@ -0,0 +1,225 @@
+"""
+メモリ診断モジュール。
+
+tracemallocのスナップショットを採取して2つのスナップショットの間で増えた確保箇所を集計し、
+アプリケーションの型ごとのオブジェクト数を数えます。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import linecache
+import os
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+try:
+    import resource
+except ImportError:  # Windowsにはない
+    resource = None
+
+# スナップショットから除外する確保箇所（診断自体と標準ライブラリの読み込み）
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SnapshotNotFoundError(Exception):
+    """指定したスナップショットがない場合の例外。"""
+
+
+class MemoryDiagnostics:
+    """
+    tracemallocによるメモリの診断。
+
+    スナップショットは採取順の番号で識別し、直近max_snapshots件のみ保持します。
+    tracemallocは確保のたびに呼び出し元を記録するため、診断の間だけ開始します。
+    """
+
+    def __init__(self, max_snapshots: int = 5):
+        """
+        初期化メソッド。
+
+        Args:
+            max_snapshots: 保持するスナップショットの上限
+        """
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._taken_at: Dict[int, float] = {}
+        self._seq = 0
+
+    def start(self, frames: int = 1) -> None:
+        """
+        tracemallocを開始します（開始済みの場合は何もしません）。
+
+        Args:
+            frames: 確保箇所ごとに記録する呼び出し元のフレーム数
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """tracemallocを停止し、保持しているスナップショットを破棄します。"""
+        tracemalloc.stop()
+        self._snapshots.clear()
+        self._taken_at.clear()
+
+    async def take_snapshot(self) -> Dict[str, Any]:
+        """
+        スナップショットを採取します。
+
+        採取と除外の処理はスレッドで行い、その間も他のリクエストを処理できるようにします。
+
+        Returns:
+            Dict[str, Any]: スナップショットの番号と、採取時点の確保量
+
+        Raises:
+            RuntimeError: tracemallocを開始していない場合
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemallocが開始されていません")
+        snapshot = await asyncio.to_thread(
+            lambda: tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        )
+        self._seq += 1
+        self._snapshots[self._seq] = snapshot
+        self._taken_at[self._seq] = time.time()
+        while len(self._snapshots) > self.max_snapshots:
+            old, _ = self._snapshots.popitem(last=False)
+            self._taken_at.pop(old, None)
+        current, peak = tracemalloc.get_traced_memory()
+        return {"id": self._seq, "tracedBytes": current, "peakBytes": peak}
+
+    async def diff(
+        self,
+        base: Optional[int] = None,
+        target: Optional[int] = None,
+        limit: int = 20,
+        group_by: str = "lineno",
+    ) -> Dict[str, Any]:
+        """
+        2つのスナップショットの間で増えた確保箇所を、増加量の大きい順に返します。
+
+        Args:
+            base: 比較元のスナップショットの番号（省略時は最新の1つ前）
+            target: 比較先のスナップショットの番号（省略時は最新）
+            limit: 返す確保箇所の数
+            group_by: 集計の単位（lineno、filename、traceback）
+
+        Returns:
+            Dict[str, Any]: 比較したスナップショットの番号と、確保箇所ごとの増加量
+
+        Raises:
+            SnapshotNotFoundError: 指定したスナップショットがない場合、または2つ未満の場合
+        """
+        ids = list(self._snapshots)
+        if target is None:
+            target = ids[-1] if ids else None
+        if base is None:
+            earlier = [i for i in ids if target is not None and i < target]
+            base = earlier[-1] if earlier else None
+        if base not in self._snapshots or target not in self._snapshots:
+            raise SnapshotNotFoundError(f"スナップショットがありません base={base} target={target}")
+        stats = await asyncio.to_thread(
+            self._snapshots[target].compare_to, self._snapshots[base], group_by
+        )
+        return {
+            "base": base,
+            "target": target,
+            "elapsedSeconds": round(self._taken_at[target] - self._taken_at[base], 3),
+            "groupBy": group_by,
+            "totalSizeDiff": sum(stat.size_diff for stat in stats),
+            "top": [_stat_to_dict(stat) for stat in stats[:limit]],
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """
+        tracemallocの状態を返します。
+
+        Returns:
+            Dict[str, Any]: 開始しているかどうか、確保量、保持しているスナップショットの番号
+        """
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "tracedBytes": current,
+            "peakBytes": peak,
+            "snapshots": list(self._snapshots),
+        }
+
+
+def _stat_to_dict(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    """
+    確保箇所ごとの差分を辞書に変換します。
+
+    Args:
+        stat: 確保箇所ごとの差分
+
+    Returns:
+        Dict[str, Any]: 確保箇所（呼び出し元から順）、増加量、確保量と件数
+    """
+    return {
+        "site": [f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback)],
+        "sizeDiff": stat.size_diff,
+        "countDiff": stat.count_diff,
+        "size": stat.size,
+        "count": stat.count,
+    }
+
+
+def count_objects(types: Mapping[str, type]) -> Dict[str, int]:
+    """
+    ガベージコレクターが追跡しているオブジェクトを型ごとに数えます。
+
+    指定した型（サブクラスを含まない）の数に加えて、完了していないタスクと
+    フューチャー（タスクを除く）の数を返します。すべてのオブジェクトをたどるため、
+    呼び出し元でスレッドに逃がして使用します。
+
+    Args:
+        types: 表示名と型の対応
+
+    Returns:
+        Dict[str, int]: 表示名ごとの数と、pendingTasks、pendingFutures
+    """
+    names = {cls: name for name, cls in types.items()}
+    counts: Dict[str, int] = {name: 0 for name in types}
+    counts["pendingTasks"] = 0
+    counts["pendingFutures"] = 0
+    for obj in gc.get_objects():
+        cls = type(obj)
+        name = names.get(cls)
+        if name is not None:
+            counts[name] += 1
+        elif isinstance(obj, asyncio.Future) and not obj.done():
+            counts["pendingTasks" if isinstance(obj, asyncio.Task) else "pendingFutures"] += 1
+    return counts
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """
+    プロセスのメモリ使用量を返します。
+
+    Returns:
+        Dict[str, Optional[int]]: 現在の常駐メモリ量（Linux以外ではNone）と最大の常駐メモリ量（バイト）
+    """
+    rss: Optional[int] = None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    max_rss: Optional[int] = None
+    if resource is not None:
+        # Linuxではキロバイト単位
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"rssBytes": rss, "maxRssBytes": max_rss}
+
@@ -0,0 +1,419 @@
+"""
+加盟店レジストリモジュール。
+
+加盟店ごとの認証情報・コネクションプール・流量制限をファイルから読み込み、
+リクエストごとに加盟店を選択できるようにします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.rate_limit import TokenBucket
+from app.domain.entities.merchant import DEFAULT_EXEC_MODE, Merchant
+
+if TYPE_CHECKING:
+    from app.infrastructure.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+
+def _default_client_factory(max_connections: int, max_keepalive_connections: int) -> HttpClient:
+    """
+    専用プールのHTTPクライアントを生成します。
+
+    専用プールを持つ加盟店がない場合にhttpxをインポートしないよう、生成時にインポートします。
+
+    Args:
+        max_connections: 最大同時コネクション数
+        max_keepalive_connections: 維持するキープアライブコネクション数
+
+    Returns:
+        HttpClient: HTTPクライアント
+    """
+    from app.infrastructure.http_client import HttpClient
+
+    return HttpClient(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+    )
+
+
+class UnknownMerchantError(KeyError):
+    """レジストリに登録されていない加盟店IDが指定された場合の例外。"""
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    ある時点で読み込んだレジストリの内容。
+
+    再読み込み時は新しいスナップショットを組み立ててから参照を差し替えるため、
+    処理中のリクエストが読み込み途中の状態を参照することはありません。
+    """
+
+    merchants: Dict[str, Merchant]
+    default_id: Optional[str]
+    stamp: Optional[Tuple[int, int]]
+
+
+def _optional_number(entry: Dict[str, Any], key: str, cast: Callable[[Any], Any]) -> Any:
+    """
+    省略可能な数値項目を取り出します。
+
+    Args:
+        entry: 加盟店の定義
+        key: 項目名
+        cast: 変換関数（int、floatなど）
+
+    Returns:
+        Any: 変換した値（省略時はNone）
+
+    Raises:
+        ValueError: 正の数値でない場合
+    """
+    value = entry.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key} は正の数値で指定してください: {value!r}")
+    value = cast(value)
+    if value <= 0:
+        raise ValueError(f"{key} は正の数値で指定してください: {value}")
+    return value
+
+
+def _optional_string(entry: Dict[str, Any], key: str) -> Optional[str]:
+    """
+    省略可能な文字列項目を取り出します。
+
+    Args:
+        entry: 加盟店の定義
+        key: 項目名
+
+    Returns:
+        Optional[str]: 値（省略時はNone）
+
+    Raises:
+        ValueError: 文字列でない場合
+    """
+    value = entry.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{key} は文字列で指定してください: {value!r}")
+    return value
+
+
+def parse_registry(data: Dict[str, Any]) -> Tuple[Dict[str, Merchant], Optional[str]]:
+    """
+    レジストリファイルの内容から加盟店を組み立てます。
+
+    認証パスはauthenticationPassで直接指定するほか、authenticationPassEnvで
+    環境変数名を指定して読み込むこともできます。
+
+    Args:
+        data: レジストリファイルのJSON
+
+    Returns:
+        Tuple[Dict[str, Merchant], Optional[str]]: 加盟店IDごとの加盟店と、既定の加盟店ID
+
+    Raises:
+        ValueError: 必須項目の欠落、加盟店IDの重複、型の誤りなど内容が不正な場合
+    """
+    if not isinstance(data, dict):
+        raise ValueError("レジストリファイルはオブジェクトで指定してください")
+    entries: List[Dict[str, Any]] = data.get("merchants") or []
+    if not isinstance(entries, list):
+        raise ValueError("merchants は配列で指定してください")
+    merchants: Dict[str, Merchant] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"加盟店の定義はオブジェクトで指定してください: {entry!r}")
+        merchant_id = _optional_string(entry, "merchantId")
+        if not merchant_id:
+            raise ValueError("merchantId が指定されていない加盟店があります")
+        if merchant_id in merchants:
+            raise ValueError(f"加盟店IDが重複しています: {merchant_id}")
+        company_code = _optional_string(entry, "companyCode")
+        store_code = _optional_string(entry, "storeCode")
+        authentication_pass = _optional_string(entry, "authenticationPass")
+        pass_env = _optional_string(entry, "authenticationPassEnv")
+        if authentication_pass is None and pass_env:
+            authentication_pass = os.environ.get(pass_env)
+        missing = [
+            key
+            for key, value in (
+                ("companyCode", company_code),
+                ("storeCode", store_code),
+                ("authenticationPass", authentication_pass),
+            )
+            if not value
+        ]
+        if missing:
+            raise ValueError(f"加盟店 {merchant_id} に {', '.join(missing)} が指定されていません")
+        rate_limit_rps = _optional_number(entry, "rateLimitRps", float)
+        rate_limit_burst = _optional_number(entry, "rateLimitBurst", int)
+        if rate_limit_rps is not None and rate_limit_burst is None:
+            rate_limit_burst = max(1, int(rate_limit_rps))
+        merchants[merchant_id] = Merchant(
+            merchant_id=merchant_id,
+            company_code=company_code,
+            store_code=store_code,
+            authentication_pass=authentication_pass,
+            exec_mode=_optional_string(entry, "execMode") or DEFAULT_EXEC_MODE,
+            max_connections=_optional_number(entry, "maxConnections", int),
+            max_keepalive_connections=_optional_number(entry, "maxKeepaliveConnections", int),
+            rate_limit_rps=rate_limit_rps,
+            rate_limit_burst=rate_limit_burst,
+        )
+
+    default_id = _optional_string(data, "default")
+    if default_id is not None and default_id not in merchants:
+        raise ValueError(f"既定の加盟店 {default_id} が登録されていません")
+    return merchants, default_id
+
+
+def _pool_key(merchant: Merchant) -> Tuple[Optional[int], Optional[int]]:
+    """専用プールの設定を比較用のタプルにします。"""
+    return merchant.max_connections, merchant.max_keepalive_connections
+
+
+def _rate_key(merchant: Merchant) -> Tuple[Optional[float], Optional[int]]:
+    """流量制限の設定を比較用のタプルにします。"""
+    return merchant.rate_limit_rps, merchant.rate_limit_burst
+
+
+class MerchantRegistry:
+    """
+    加盟店レジストリ。
+
+    加盟店IDをキーとする辞書で保持するため、リクエストごとの選択はO(1)です。
+    ファイルの更新は一定間隔で更新日時とサイズを確認して検出し、
+    内容が不正な場合は読み込み済みの内容を使い続けます。
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        reload_interval: float = 5.0,
+        retire_delay: float = 30.0,
+        client_factory: Optional[Callable[[int, int], HttpClient]] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            path: レジストリファイルのパス（省略時は加盟店を登録しない）
+            reload_interval: ファイルの更新を確認する間隔（秒、0以下で確認しない）
+            retire_delay: 不要になった専用プールを閉じるまでの猶予秒数
+            client_factory: 最大同時コネクション数と維持するキープアライブコネクション数から
+                専用プールのHTTPクライアントを生成する関数（省略時はHttpClient）
+        """
+        self.path = path or None
+        self.reload_interval = reload_interval
+        self.retire_delay = retire_delay
+        self._client_factory = client_factory or _default_client_factory
+        self._snapshot = _Snapshot(merchants={}, default_id=None, stamp=None)
+        self._clients: Dict[str, HttpClient] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._retiring: Set[Tuple[asyncio.Task, HttpClient]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.merchants)
+
+    def get(self, merchant_id: str) -> Optional[Merchant]:
+        """
+        加盟店IDで加盟店を取得します。
+
+        Args:
+            merchant_id: 加盟店ID
+
+        Returns:
+            Optional[Merchant]: 加盟店（登録されていない場合はNone）
+        """
+        return self._snapshot.merchants.get(merchant_id)
+
+    def resolve(self, merchant_id: Any) -> Optional[Merchant]:
+        """
+        リクエストで指定された加盟店IDから送信元の加盟店を選択します。
+
+        Args:
+            merchant_id: リクエストで指定された加盟店ID（指定がない場合はNone）
+
+        Returns:
+            Optional[Merchant]: 加盟店（指定がなく既定の加盟店もない場合はNone）
+
+        Raises:
+            UnknownMerchantError: 登録されていない加盟店ID、または文字列でない加盟店IDが指定された場合
+        """
+        snapshot = self._snapshot
+        if merchant_id is None:
+            merchant_id = snapshot.default_id
+            if merchant_id is None:
+                return None
+        elif not isinstance(merchant_id, str):
+            raise UnknownMerchantError(merchant_id)
+        merchant = snapshot.merchants.get(merchant_id)
+        if merchant is None:
+            raise UnknownMerchantError(merchant_id)
+        return merchant
+
+    def try_acquire(self, merchant: Merchant) -> float:
+        """
+        加盟店の流量制限のトークンの取得を試みます。
+
+        Args:
+            merchant: 加盟店
+
+        Returns:
+            float: 送信できる場合は0、制限を超えた場合は次に送信できるまでの秒数
+        """
+        bucket = self._buckets.get(merchant.merchant_id)
+        if bucket is None:
+            return 0.0
+        return bucket.try_acquire()
+
+    def client_for(self, merchant: Merchant) -> Optional[HttpClient]:
+        """
+        加盟店専用のHTTPクライアントを取得します。
+
+        Args:
+            merchant: 加盟店
+
+        Returns:
+            Optional[HttpClient]: 専用のHTTPクライアント（共有プールを使う加盟店はNone）
+        """
+        if not merchant.has_dedicated_pool:
+            return None
+        client = self._clients.get(merchant.merchant_id)
+        if client is None:
+            client = self._client_factory(
+                merchant.max_connections,
+                merchant.max_keepalive_connections or merchant.max_connections,
+            )
+            self._clients[merchant.merchant_id] = client
+        return client
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        レジストリファイルを読み込み直します。
+
+        更新日時とサイズが前回と同じ場合は読み込みません。
+
+        Args:
+            force: 更新の有無にかかわらず読み込むかどうか
+
+        Returns:
+            bool: 新しい内容に切り替えた場合はTrue
+
+        Raises:
+            OSError: ファイルを読み込めない場合
+            ValueError: ファイルの内容が不正な場合
+        """
+        if self.path is None:
+            return False
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if not force and stamp == self._snapshot.stamp:
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            merchants, default_id = parse_registry(json.load(f))
+        self._swap(_Snapshot(merchants=merchants, default_id=default_id, stamp=stamp))
+        logger.info(
+            f"加盟店レジストリを読み込みました merchants={len(merchants)} default={default_id}"
+        )
+        return True
+
+    def _swap(self, snapshot: _Snapshot) -> None:
+        """
+        スナップショットを差し替え、専用プールと流量制限を新しい設定に合わせます。
+
+        Args:
+            snapshot: 新しいスナップショット
+        """
+        previous = self._snapshot.merchants
+        self._snapshot = snapshot
+
+        for merchant_id in list(self._clients):
+            old = previous.get(merchant_id)
+            new = snapshot.merchants.get(merchant_id)
+            if new is None or old is None or _pool_key(old) != _pool_key(new):
+                self._retire(self._clients.pop(merchant_id))
+
+        buckets: Dict[str, TokenBucket] = {}
+        for merchant_id, merchant in snapshot.merchants.items():
+            if merchant.rate_limit_rps is None:
+                continue
+            bucket = self._buckets.get(merchant_id)
+            old = previous.get(merchant_id)
+            if bucket is None or old is None or _rate_key(old) != _rate_key(merchant):
+                bucket = TokenBucket(merchant.rate_limit_rps, merchant.rate_limit_burst)
+            buckets[merchant_id] = bucket
+        self._buckets = buckets
+
+    def _retire(self, client: HttpClient) -> None:
+        """
+        不要になった専用プールを、送信中のリクエストの完了を待ってから閉じます。
+
+        Args:
+            client: 閉じるHTTPクライアント
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        async def close_later() -> None:
+            await asyncio.sleep(self.retire_delay)
+            await client.aclose()
+
+        task = loop.create_task(close_later())
+        self._retiring.add((task, client))
+        task.add_done_callback(lambda _: self._retiring.discard((task, client)))
+
+    async def start(self) -> None:
+        """
+        レジストリファイルを読み込み、更新を確認するタスクを開始します。
+
+        Raises:
+            OSError: ファイルを読み込めない場合
+            ValueError: ファイルの内容が不正な場合
+        """
+        if self.path is None:
+            return
+        self.reload(force=True)
+        if self.reload_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        """一定間隔でレジストリファイルの更新を確認します。"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except (OSError, ValueError) as e:
+                logger.error(f"加盟店レジストリの再読み込みに失敗しました。現在の内容を使い続けます: {e}")
+            except Exception:
+                logger.exception("加盟店レジストリの再読み込みに失敗しました。現在の内容を使い続けます")
+
+    async def close(self) -> None:
+        """更新の確認を停止し、専用プールをすべて閉じます。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task, client in list(self._retiring):
+            task.cancel()
+            await client.aclose()
+        self._retiring.clear()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
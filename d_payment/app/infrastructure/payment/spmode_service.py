@@ -7,13 +7,17 @@ d決済サービスとの連携を実装します。
 from __future__ import annotations
 
 import logging
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 
 from app.domain.interfaces.payment_service import (
     PaymentServiceInterface,
     HttpClientInterface,
+    JournalInterface,
 )
+from app.application.payment_index import PaymentIndex
 from app.application.payment_service import PaymentService
+from app.application.rejected_tokens import RejectedTokenCache
+from app.domain.entities.merchant import Merchant
 from app.infrastructure.http_client import HttpClient
 
 logger = logging.getLogger(__name__)
@@ -27,12 +31,30 @@ class DPaymentService:
     """
 
     @staticmethod
-    def create() -> PaymentServiceInterface:
+    def create(
+        http_client: Optional[HttpClientInterface] = None,
+        journal: Optional[JournalInterface] = None,
+        index: Optional[PaymentIndex] = None,
+        client_for: Optional[Callable[[Merchant], Optional[HttpClientInterface]]] = None,
+        rejected_tokens: Optional[RejectedTokenCache] = None,
+    ) -> PaymentServiceInterface:
         """
         d決済サービスのインスタンスを生成します。
 
+        Args:
+            http_client: 共有するHTTPクライアント（省略時は新規に生成）
+            journal: 送受信を記録するジャーナル（省略時は記録しない）
+            index: 決済状況を反映するインデックス（省略時は反映しない）
+            client_for: 加盟店専用のHTTPクライアントを返す関数（省略時は共有クライアントのみ）
+            rejected_tokens: 拒否済み請求トークンのキャッシュ（省略時は使用しない）
+
         Returns:
             PaymentServiceInterface: d決済サービスのインスタンス
         """
-        http_client = HttpClient()
-        return PaymentService(http_client)
+        return PaymentService(
+            http_client or HttpClient(),
+            journal=journal,
+            index=index,
+            client_for=client_for,
+            rejected_tokens=rejected_tokens,
+        )
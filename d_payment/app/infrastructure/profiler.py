@@ -0,0 +1,184 @@
+"""
+サンプリングプロファイラーモジュール。
+
+稼働中のワーカーのスタックを一定間隔で採取し、フレームグラフ用の折り畳み形式
+（collapsed stacks）で集計します。計装は不要で、採取は専用スレッドから行います。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+from typing import Dict, List, Optional
+
+
+class ProfilerBusyError(Exception):
+    """別のプロファイルを採取中の場合の例外。"""
+
+
+@dataclass
+class Profile:
+    """
+    採取したプロファイル。
+    """
+
+    stacks: Counter
+    samples: int
+    seconds: float
+
+    def collapsed(self) -> str:
+        """
+        折り畳み形式（1行に「根;...;葉 回数」）の文字列に変換します。
+
+        Returns:
+            str: flamegraph.plやspeedscopeなどにそのまま渡せる文字列
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def frame_label(frame: FrameType) -> str:
+    """
+    フレームの表示名を返します。
+
+    Args:
+        frame: フレーム
+
+    Returns:
+        str: 「モジュール名:修飾名」の形式の表示名
+    """
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def collapse(frame: Optional[FrameType], max_depth: int = 128) -> List[str]:
+    """
+    フレームから根までをたどり、根から順の表示名のリストにします。
+
+    Args:
+        frame: 葉のフレーム
+        max_depth: たどるフレームの上限（超えた分は根の側を省略します）
+
+    Returns:
+        List[str]: 根から葉までの表示名
+    """
+    labels: List[str] = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """
+    サンプリングプロファイラー。
+
+    イベントループのスレッドのスタックを採取し、実行中のタスクのコルーチン名を根に付けて集計します。
+    待機中のコルーチンはスタックに現れないため、CPUを使っている処理のみが集計されます。
+    同時に採取できるプロファイルは1つだけです。
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 128):
+        """
+        初期化メソッド。
+
+        Args:
+            interval: 採取の間隔（秒）
+            max_depth: 1つのスタックでたどるフレームの上限
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """プロファイルを採取中かどうか。"""
+        return self._running
+
+    async def profile(self, seconds: float, all_threads: bool = False) -> Profile:
+        """
+        指定した秒数の間スタックを採取します。
+
+        Args:
+            seconds: 採取する秒数
+            all_threads: イベントループ以外のスレッド（スレッドプールなど）も採取するかどうか
+
+        Returns:
+            Profile: 採取したプロファイル
+
+        Raises:
+            ProfilerBusyError: 別のプロファイルを採取中の場合
+        """
+        if self._running:
+            raise ProfilerBusyError("別のプロファイルを採取中です")
+        self._running = True
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        stacks: Counter = Counter()
+        counts = [0]
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(loop, threading.get_ident(), all_threads, stop, stacks, counts),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        started = time.monotonic()
+        try:
+            sampler.start()
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await loop.run_in_executor(None, sampler.join)
+            self._running = False
+        return Profile(stacks, counts[0], round(time.monotonic() - started, 3))
+
+    def _sample(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread: int,
+        all_threads: bool,
+        stop: threading.Event,
+        stacks: Counter,
+        counts: List[int],
+    ) -> None:
+        """採取スレッドの本体。"""
+        own = threading.get_ident()
+        while not stop.wait(self.interval):
+            frames = sys._current_frames()
+            counts[0] += 1
+            if not all_threads:
+                stacks[self._loop_stack(loop, frames.get(loop_thread))] += 1
+                continue
+            names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                if ident == loop_thread:
+                    stack = self._loop_stack(loop, frame)
+                else:
+                    labels = collapse(frame, self.max_depth)
+                    stack = ";".join([f"thread:{names.get(ident, ident)}", *labels])
+                stacks[stack] += 1
+
+    def _loop_stack(self, loop: asyncio.AbstractEventLoop, frame: Optional[FrameType]) -> str:
+        """
+        イベントループのスレッドのスタックを、実行中のタスクのコルーチン名を根にして折り畳みます。
+
+        Args:
+            loop: イベントループ
+            frame: イベントループのスレッドの葉のフレーム
+
+        Returns:
+            str: 折り畳んだスタック
+        """
+        labels = collapse(frame, self.max_depth)
+        task = asyncio.current_task(loop)
+        if task is None:
+            return ";".join(["loop", *labels])
+        coro = task.get_coro()
+        return ";".join([f"task:{getattr(coro, '__qualname__', type(coro).__name__)}", *labels])
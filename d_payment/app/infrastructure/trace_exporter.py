@@ -0,0 +1,153 @@
+"""
+スパンのエクスポートモジュール。
+
+サンプリングしたスパンをまとめてローカルのファイルへJSON Lines形式で書き出します。
+コレクターは不要で、書き出したファイルはjqなどでそのまま集計できます。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 書き込みスレッドの停止指示
+_STOP = object()
+
+
+class FileSpanExporter:
+    """
+    スパンのファイルへのエクスポーター。
+
+    イベントループ上ではキューへの追加のみを行い、シリアライズと書き込みは専用スレッドで
+    最大batch_size件（またはinterval秒の間に届いた分）ずつまとめて行います。
+    キューが満杯の場合は待たずにスパンを破棄します。
+    書き出し先のファイルは生成時に開くため、使用できないパスは起動時にエラーになります。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 10000,
+        batch_size: int = 512,
+        interval: float = 1.0,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            path: 書き出すファイルのパス
+            max_queue: 書き出し待ちのスパンの上限
+            batch_size: 1回の書き込みでまとめるスパンの数
+            interval: 最初のスパンを受け取ってからbatch_size件に満たないまま書き出すまでの最長の秒数
+
+        Raises:
+            OSError: 書き出し先のディレクトリを作成できない、またはファイルを開けない場合
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.batch_size = batch_size
+        self.interval = interval
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """書き出し待ちのスパンの数。"""
+        return self._queue.qsize()
+
+    def export(self, span: Any) -> None:
+        """
+        終了したスパンを書き出し待ちにします。
+
+        Args:
+            span: 終了したスパン（to_dict()を持つもの）
+        """
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """
+        書き込みスレッドを停止し、書き出し待ちのスパンを書き出してファイルを閉じます。
+
+        停止処理がイベントループを止めないよう、キューに空きがない場合や
+        書き込みスレッドが終了している場合は停止指示を送らずに閉じます。
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=1)
+            except queue.Full:
+                logger.warning(f"スパンの書き出しが滞っているため停止します depth={self.depth}")
+            thread.join(timeout=10)
+            if thread.is_alive():
+                # 書き込み中のファイルは閉じない
+                return
+        self._thread = None
+        self._file.close()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """書き込みスレッドの本体。"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[Any] = []
+            deadline = time.monotonic() + self.interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(self._file, batch)
+
+    def _write(self, file: Any, batch: List[Any]) -> None:
+        """
+        スパンをまとめて書き出します。
+
+        Args:
+            file: 書き出し先のファイル
+            batch: 書き出すスパン
+        """
+        try:
+            file.write(
+                "".join(
+                    json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+                    for span in batch
+                )
+            )
+            file.flush()
+        except Exception:
+            # 書き込みスレッドを止めず、このバッチのみ破棄する
+            logger.exception("スパンの書き出しに失敗しました")
+            self.dropped += len(batch)
+            return
+        self.exported += len(batch)
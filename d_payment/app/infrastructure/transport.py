@@ -0,0 +1,381 @@
+"""
+上流接続のトランスポートモジュール。
+
+外部APIへの接続に使用するDNSキャッシュとTLSセッションの再利用を提供し、
+これらを組み込んだHTTPクライアントを生成します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import ssl
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 名前解決を行う関数の型（ホスト名とポートからIPアドレスのリストを返す）
+Lookup = Callable[[str, int], Awaitable[List[str]]]
+
+
+async def _getaddrinfo(host: str, port: int) -> List[str]:
+    """
+    OSのリゾルバーで名前解決を行います。
+
+    Args:
+        host: ホスト名
+        port: ポート番号
+
+    Returns:
+        List[str]: IPアドレスのリスト（重複を除き、OSが返した順）
+    """
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+@dataclass
+class _DnsEntry:
+    """名前解決の結果と有効期限。"""
+
+    addresses: List[str]
+    expires_at: float
+
+
+class DnsCache:
+    """
+    DNSキャッシュ。
+
+    名前解決の結果をttl秒間保持します。OSのリゾルバーはレコードのTTLを返さないため、
+    保持期間は設定値で指定します。期限切れ後の再解決に失敗した場合は、
+    期限切れの結果を使い続けます。同じホストの同時の名前解決は1回にまとめます。
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        lookup: Optional[Lookup] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            ttl: 名前解決の結果を保持する秒数
+            lookup: 名前解決を行う関数（省略時はOSのリゾルバー）
+            clock: 現在時刻を返す関数（単調増加）
+        """
+        self.ttl = ttl
+        self._lookup = lookup or _getaddrinfo
+        self._clock = clock
+        self._entries: Dict[Tuple[str, int], _DnsEntry] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        """
+        ホスト名をIPアドレスに解決します。
+
+        Args:
+            host: ホスト名
+            port: ポート番号
+
+        Returns:
+            List[str]: IPアドレスのリスト
+
+        Raises:
+            OSError: 名前解決に失敗し、保持している結果もない場合
+        """
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > self._clock():
+            self.hits += 1
+            return entry.addresses
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            addresses = await self._refresh(key, entry)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # 待機している呼び出し元がいない場合の警告を抑止する
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(addresses)
+            return addresses
+        finally:
+            del self._pending[key]
+
+    async def _refresh(self, key: Tuple[str, int], entry: Optional[_DnsEntry]) -> List[str]:
+        """
+        名前解決を行い、結果を保持します。
+
+        Args:
+            key: ホスト名とポート番号
+            entry: 保持している期限切れの結果
+
+        Returns:
+            List[str]: IPアドレスのリスト
+
+        Raises:
+            OSError: 名前解決に失敗し、保持している結果もない場合
+        """
+        host, port = key
+        try:
+            addresses = await self._lookup(host, port)
+            if not addresses:
+                raise OSError(f"no address for {host}")
+        except OSError as e:
+            if entry is None:
+                raise
+            self.stale += 1
+            logger.warning(f"名前解決に失敗したため、前回の結果を使用します host={host}: {e}")
+            return entry.addresses
+        self._entries[key] = _DnsEntry(addresses, self._clock() + self.ttl)
+        return addresses
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: 保持している件数とヒット数など
+        """
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+        }
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    DNSキャッシュを使用して接続するネットワークバックエンド。
+
+    解決したIPアドレスに順に接続を試み、接続できたものを使用します。
+    TLSのSNIと証明書の検証には、httpcoreが元のホスト名を使用します。
+    """
+
+    def __init__(self, cache: DnsCache, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        """
+        初期化メソッド。
+
+        Args:
+            cache: DNSキャッシュ
+            backend: 実際に接続するネットワークバックエンド
+        """
+        self._cache = cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            ipaddress.ip_address(host)
+            addresses = [host]
+        except ValueError:
+            try:
+                addresses = await self._cache.resolve(host, port)
+            except OSError as e:
+                raise httpcore.ConnectError(str(e)) from e
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        assert error is not None
+        raise error
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    TLSセッションを再利用するクライアント用のSSLコンテキスト。
+
+    ホスト名ごとに直近のコネクションのセッションを保持し、同じホストへの新しい
+    コネクションで再開（フルハンドシェイクの省略）を試みます。TLS 1.3のセッション
+    チケットはハンドシェイク後に届くため、セッションは次のコネクションの生成時に取り出します。
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._latest: Dict[str, ssl.SSLObject] = {}
+        self._sessions: Dict[str, ssl.SSLSession] = {}
+        self.connections = 0
+        self.offered = 0
+
+    def _session_for(self, hostname: str) -> Optional[ssl.SSLSession]:
+        """
+        ホストに対して再利用できるセッションを返します。
+
+        Args:
+            hostname: 接続先のホスト名
+
+        Returns:
+            Optional[ssl.SSLSession]: セッション（ない場合や期限切れの場合はNone）
+        """
+        latest = self._latest.get(hostname)
+        if latest is not None:
+            try:
+                session = latest.session
+            except (ssl.SSLError, ValueError):
+                session = None
+            if session is not None:
+                self._sessions[hostname] = session
+        session = self._sessions.get(hostname)
+        if session is not None and time.time() > session.time + session.timeout:
+            del self._sessions[hostname]
+            return None
+        return session
+
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: Optional[Any] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLObject:
+        if server_side or server_hostname is None:
+            return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+        hostname = (
+            server_hostname.decode("ascii")
+            if isinstance(server_hostname, bytes)
+            else server_hostname
+        )
+        with self._lock:
+            if session is None:
+                session = self._session_for(hostname)
+            try:
+                ssl_object = super().wrap_bio(
+                    incoming, outgoing, server_side, server_hostname, session
+                )
+            except (ssl.SSLError, ValueError):
+                # セッションが使用できない場合はフルハンドシェイクで接続する
+                self._sessions.pop(hostname, None)
+                session = None
+                ssl_object = super().wrap_bio(incoming, outgoing, server_side, server_hostname)
+            self._latest[hostname] = ssl_object
+            self.connections += 1
+            self.offered += int(session is not None)
+        return ssl_object
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        メトリクスを返します。
+
+        Returns:
+            Dict[str, Any]: 保持しているセッション数、TLSのコネクション数、
+                セッションの再開を要求したコネクション数
+        """
+        return {
+            "sessions": len(self._sessions),
+            "connections": self.connections,
+            "offered": self.offered,
+        }
+
+
+def create_ssl_context(cafile: Optional[str] = None) -> ResumingSSLContext:
+    """
+    TLSセッションを再利用するSSLコンテキストを生成します。
+
+    証明書の検証はhttpxの既定と同じく、certifiの証明書を使用します。
+
+    Args:
+        cafile: CA証明書のファイル（省略時はcertifi）
+
+    Returns:
+        ResumingSSLContext: SSLコンテキスト
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    if cafile is None:
+        import certifi
+
+        cafile = certifi.where()
+    context.load_verify_locations(cafile=cafile)
+    return context
+
+
+def create_client(
+    limits: httpx.Limits,
+    http1: bool = True,
+    http2: bool = False,
+    dns_cache: Optional[DnsCache] = None,
+    ssl_context: Optional[ssl.SSLContext] = None,
+) -> httpx.AsyncClient:
+    """
+    外部APIへの送信に使用するHTTPクライアントを生成します。
+
+    Args:
+        limits: コネクションプールの上限
+        http1: HTTP/1.1を使用するかどうか
+        http2: HTTP/2を使用するかどうか
+        dns_cache: DNSキャッシュ（省略時はコネクションごとに名前解決）
+        ssl_context: SSLコンテキスト（省略時はhttpxの既定）
+
+    Returns:
+        httpx.AsyncClient: HTTPクライアント
+    """
+    if dns_cache is None and ssl_context is None:
+        return httpx.AsyncClient(limits=limits, http1=http1, http2=http2)
+    transport = httpx.AsyncHTTPTransport(
+        verify=ssl_context if ssl_context is not None else True,
+        http1=http1,
+        http2=http2,
+        limits=limits,
+    )
+    if dns_cache is not None:
+        # httpxにはネットワークバックエンドを指定する公開APIがないため、プールに直接設定する
+        # （requirements.txtで動作を確認したhttpx・httpcoreのバージョンに固定している）
+        pool = getattr(transport, "_pool", None)
+        backend = getattr(pool, "_network_backend", None)
+        if backend is None:
+            logger.warning("このバージョンのhttpxではDNSキャッシュを使用できないため、無効にします")
+        else:
+            pool._network_backend = CachingNetworkBackend(dns_cache, backend)
+    return httpx.AsyncClient(transport=transport)
@@ -0,0 +1,235 @@
+"""
+診断用APIルートモジュール。
+
+稼働中のワーカーの状態を調べるためのエンドポイントを定義します。
+DEBUG_ENDPOINTS_ENABLEDが有効な場合のみ、/debug以下に登録します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.application.dispatch_queue import DispatchJob
+from app.application.payment_index import PaymentStatus
+from app.core.config import settings
+from app.core.errors import TooManyRequestsException, ValidationException
+from app.domain.entities.payment import (
+    PaymentRequest,
+    PaymentResponse,
+    RawUpstreamResponse,
+    RegiChargeRequestItem,
+)
+from app.interfaces.api.dependencies import (
+    cache_sizes,
+    current_http_client,
+    get_loop_monitor,
+    get_memory_diagnostics,
+    get_profiler,
+    get_rejected_tokens,
+    require_debug_access,
+)
+
+logger = logging.getLogger(__name__)
+
+# オブジェクト数を数えるアプリケーションの型
+COUNTED_TYPES = {
+    "PaymentRequest": PaymentRequest,
+    "RegiChargeRequestItem": RegiChargeRequestItem,
+    "PaymentResponse": PaymentResponse,
+    "RawUpstreamResponse": RawUpstreamResponse,
+    "PaymentStatus": PaymentStatus,
+    "DispatchJob": DispatchJob,
+}
+
+# 診断用のAPIルーターを作成（すべてのエンドポイントでアクセスを検査する）
+router = APIRouter(tags=["debug"], dependencies=[Depends(require_debug_access)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    all_threads: bool = Query(False),
+):
+    """
+    稼働中のワーカーのCPUプロファイルを採取するエンドポイント。
+
+    指定した秒数の間、イベントループのスタックをDEBUG_PROFILE_INTERVAL秒ごとに採取し、
+    フレームグラフ用の折り畳み形式で返します。各スタックの根は実行中のタスクのコルーチン名
+    （タスク外の処理はloop）です。
+
+    Args:
+        seconds: 採取する秒数（DEBUG_PROFILE_MAX_SECONDS以下）
+        all_threads: スレッドプールなどイベントループ以外のスレッドも採取するかどうか
+
+    Returns:
+        折り畳み形式のスタック（1行に「根;...;葉 回数」）
+
+    Raises:
+        ValidationException: 秒数が上限を超える場合
+        TooManyRequestsException: 別のプロファイルを採取中の場合
+    """
+    from app.infrastructure.profiler import ProfilerBusyError
+
+    if seconds > settings.DEBUG_PROFILE_MAX_SECONDS:
+        raise ValidationException(
+            detail=f"secondsは{settings.DEBUG_PROFILE_MAX_SECONDS}以下で指定してください"
+        )
+    logger.info(f"CPUプロファイルの採取を開始します seconds={seconds}")
+    try:
+        result = await get_profiler().profile(seconds, all_threads=all_threads)
+    except ProfilerBusyError as e:
+        raise TooManyRequestsException(detail=str(e), retry_after=max(1, math.ceil(seconds)))
+    logger.info(f"CPUプロファイルの採取を終了しました samples={result.samples}")
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={"X-Profile-Samples": str(result.samples), "X-Profile-Seconds": str(result.seconds)},
+    )
+
+
+@router.get("/event-loop", response_model=None)
+async def event_loop():
+    """
+    イベントループの監視のメトリクスを返すエンドポイント。
+
+    Returns:
+        ラグのヒストグラム、ブロックの件数と直近の記録（スタックと処理中のルート）
+        （監視が無効な場合はenabled=False）
+    """
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, **monitor.stats()}
+
+
+@router.get("/upstreams", response_model=None)
+async def upstreams():
+    """
+    上流エンドポイントごとのメトリクスを返すエンドポイント。
+
+    共有HTTPクライアントがまだ生成されていない場合は、生成せずに空の一覧を返します。
+
+    Returns:
+        エンドポイントごとの状態（除外中かどうか、処理中の数、レイテンシの移動平均）と累計値
+    """
+    http_client = current_http_client()
+    endpoints = http_client.endpoint_stats() if http_client is not None else []
+    return {"strategy": settings.PAYMENT_API_BALANCER, "endpoints": endpoints}
+
+
+@router.get("/rejected-tokens", response_model=None)
+async def rejected_tokens():
+    """
+    拒否済み請求トークンのキャッシュのメトリクスを返すエンドポイント。
+
+    Returns:
+        保持件数、ヒット数とヒット率、応答コードごとのヒット数（キャッシュが無効な場合はenabled=False）
+    """
+    cache = get_rejected_tokens()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/memory", response_model=None)
+async def memory():
+    """
+    プロセスのメモリの状態を返すエンドポイント。
+
+    Returns:
+        常駐メモリ量、tracemallocの状態、アプリケーションの型ごとのオブジェクト数
+        （完了していないタスクとフューチャーを含む）、キャッシュとキューごとの件数
+    """
+    from app.infrastructure.memory_diagnostics import count_objects, process_memory
+
+    return {
+        "process": process_memory(),
+        "tracemalloc": get_memory_diagnostics().status(),
+        "objects": await asyncio.to_thread(count_objects, COUNTED_TYPES),
+        "caches": cache_sizes(),
+    }
+
+
+@router.post("/memory/tracemalloc", response_model=None)
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=64)):
+    """
+    tracemallocを開始するエンドポイント。
+
+    開始している間はメモリの確保ごとに呼び出し元を記録するため、処理が遅くなります。
+
+    Args:
+        frames: 確保箇所ごとに記録する呼び出し元のフレーム数
+
+    Returns:
+        tracemallocの状態
+    """
+    diagnostics = get_memory_diagnostics()
+    diagnostics.start(frames)
+    logger.info(f"tracemallocを開始しました frames={frames}")
+    return diagnostics.status()
+
+
+@router.delete("/memory/tracemalloc", response_model=None)
+async def stop_tracemalloc():
+    """
+    tracemallocを停止し、保持しているスナップショットを破棄するエンドポイント。
+
+    Returns:
+        tracemallocの状態
+    """
+    diagnostics = get_memory_diagnostics()
+    diagnostics.stop()
+    logger.info("tracemallocを停止しました")
+    return diagnostics.status()
+
+
+@router.post("/memory/snapshots", response_model=None)
+async def take_snapshot():
+    """
+    tracemallocのスナップショットを採取するエンドポイント。
+
+    Returns:
+        スナップショットの番号と採取時点の確保量
+
+    Raises:
+        ValidationException: tracemallocを開始していない場合
+    """
+    try:
+        return await get_memory_diagnostics().take_snapshot()
+    except RuntimeError as e:
+        raise ValidationException(detail=str(e))
+
+
+@router.get("/memory/diff", response_model=None)
+async def snapshot_diff(
+    base: Optional[int] = None,
+    target: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """
+    2つのスナップショットの間で増えた確保箇所を返すエンドポイント。
+
+    Args:
+        base: 比較元のスナップショットの番号（省略時は最新の1つ前）
+        target: 比較先のスナップショットの番号（省略時は最新）
+        limit: 返す確保箇所の数
+        group_by: 集計の単位（lineno、filename、traceback）
+
+    Returns:
+        確保箇所ごとの増加量（増加量の大きい順）
+
+    Raises:
+        HTTPException: スナップショットが見つからない場合
+    """
+    from app.infrastructure.memory_diagnostics import SnapshotNotFoundError
+
+    try:
+        return await get_memory_diagnostics().diff(base, target, limit, group_by)
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -2,14 +2,429 @@
 API依存性モジュール。
 
 FastAPIの依存性注入で使用する依存関係を定義します。
+HTTPクライアント（httpx）やジャーナルなどのインポートに時間のかかるモジュールは、
+起動を速くするため、最初に使用する時点でインポートします。
 """
 
 from __future__ import annotations
 
-from fastapi import Depends
+import asyncio
+import hmac
+import logging
+import ssl
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
+from fastapi import Request
+
+from app.application.dispatch_queue import DispatchQueue
+from app.application.payment_index import PaymentIndex
+from app.application.rejected_tokens import RejectedTokenCache
+from app.core.config import settings
+from app.core.errors import ForbiddenException, UnauthorizedException
+from app.domain.entities.merchant import Merchant
+from app.domain.entities.payment import PaymentResponse
 from app.domain.interfaces.payment_service import PaymentServiceInterface
-from app.infrastructure.payment.spmode_service import DPaymentService
+from app.infrastructure.merchant_registry import MerchantRegistry
+
+if TYPE_CHECKING:
+    from app.infrastructure.http_client import HttpClient
+    from app.infrastructure.journal import Journal
+    from app.infrastructure.jwt_auth import JwtVerifier
+    from app.infrastructure.loop_monitor import EventLoopMonitor
+    from app.infrastructure.memory_diagnostics import MemoryDiagnostics
+    from app.infrastructure.profiler import SamplingProfiler
+    from app.infrastructure.transport import DnsCache
+
+logger = logging.getLogger(__name__)
+
+# プロセス内で共有するHTTPクライアント
+_http_client: Optional[HttpClient] = None
+
+# プロセス内のすべてのコネクションプールで共有するDNSキャッシュとSSLコンテキスト
+_dns_cache: Optional[DnsCache] = None
+_ssl_context: Optional[ssl.SSLContext] = None
+
+# プロセス内で共有するトランザクションジャーナル（起動処理で開く）
+_journal: Optional[Journal] = None
+
+# プロセス内で共有する決済状況インデックス
+_payment_index: Optional[PaymentIndex] = None
+
+# プロセス内で共有する拒否済み請求トークンのキャッシュ
+_rejected_tokens: Optional[RejectedTokenCache] = None
+
+# プロセス内で共有する非同期転送キュー
+_dispatch_queue: Optional[DispatchQueue] = None
+
+# プロセス内で共有する加盟店レジストリ
+_merchant_registry: Optional[MerchantRegistry] = None
+
+# プロセス内で共有するJWTの検証（AUTH_JWT_ENABLEDが有効な場合のみ生成）
+_jwt_verifier: Optional[JwtVerifier] = None
+
+# プロセス内で共有するイベントループの監視（LOOP_MONITOR_ENABLEDが有効な場合のみ生成）
+_loop_monitor: Optional[EventLoopMonitor] = None
+
+# プロセス内で共有するサンプリングプロファイラー（診断用エンドポイントで使用）
+_profiler: Optional[SamplingProfiler] = None
+
+# プロセス内で共有するメモリ診断（診断用エンドポイントで使用）
+_memory_diagnostics: Optional[MemoryDiagnostics] = None
+
+# DEBUG_TOKENが空の場合に診断用エンドポイントを許可する送信元
+_LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def get_dns_cache() -> Optional[DnsCache]:
+    """
+    プロセス内で共有するDNSキャッシュを取得します。
+
+    Returns:
+        Optional[DnsCache]: DNSキャッシュ（PAYMENT_API_DNS_TTLが0以下の場合はNone）
+    """
+    global _dns_cache
+    if _dns_cache is None and settings.PAYMENT_API_DNS_TTL > 0:
+        from app.infrastructure.transport import DnsCache
+
+        _dns_cache = DnsCache(ttl=settings.PAYMENT_API_DNS_TTL)
+    return _dns_cache
+
+
+def get_ssl_context() -> Optional[ssl.SSLContext]:
+    """
+    プロセス内で共有する、TLSセッションを再利用するSSLコンテキストを取得します。
+
+    Returns:
+        Optional[ssl.SSLContext]: SSLコンテキスト（PAYMENT_API_TLS_SESSION_REUSEが無効な場合はNone）
+    """
+    global _ssl_context
+    if _ssl_context is None and settings.PAYMENT_API_TLS_SESSION_REUSE:
+        from app.infrastructure.transport import create_ssl_context
+
+        _ssl_context = create_ssl_context()
+    return _ssl_context
+
+
+def build_http_client(max_connections: int, max_keepalive_connections: int) -> HttpClient:
+    """
+    設定に従ってHTTPクライアントを生成します。
+
+    PAYMENT_API_URLSが指定されている場合は、エンドポイントごとに指定の上限の
+    コネクションプールを持つロードバランサー付きで生成します。
+    PAYMENT_API_HTTP2が有効な場合、http://の送信先には事前知識でHTTP/2（h2c）接続し、
+    https://の送信先にはALPNでネゴシエーションします。
+    DNSキャッシュとSSLコンテキストはプロセス内のすべてのクライアントで共有します。
+
+    Args:
+        max_connections: 最大同時コネクション数
+        max_keepalive_connections: 維持するキープアライブコネクション数
+
+    Returns:
+        HttpClient: HTTPクライアント
+    """
+    import httpx
+
+    from app.infrastructure.http_client import HttpClient
+
+    balancer = None
+    if settings.PAYMENT_API_URLS:
+        from app.infrastructure.load_balancer import LoadBalancer
+
+        balancer = LoadBalancer(
+            settings.PAYMENT_API_URLS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=settings.PAYMENT_API_KEEPALIVE_EXPIRY,
+            ),
+            strategy=settings.PAYMENT_API_BALANCER,
+            eject_failures=settings.PAYMENT_API_EJECT_FAILURES,
+            eject_seconds=settings.PAYMENT_API_EJECT_SECONDS,
+            probe_interval=settings.PAYMENT_API_PROBE_INTERVAL,
+            probe_path=settings.PAYMENT_API_PROBE_PATH,
+            probe_successes=settings.PAYMENT_API_PROBE_SUCCESSES,
+            http2=settings.PAYMENT_API_HTTP2,
+            dns_cache=get_dns_cache(),
+            ssl_context=get_ssl_context(),
+        )
+    return HttpClient(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=settings.PAYMENT_API_KEEPALIVE_EXPIRY,
+        balancer=balancer,
+        max_response_bytes=settings.PAYMENT_API_MAX_RESPONSE_BYTES,
+        http2=settings.PAYMENT_API_HTTP2,
+        http2_connections=settings.PAYMENT_API_HTTP2_CONNECTIONS,
+        http2_max_streams=settings.PAYMENT_API_HTTP2_MAX_STREAMS,
+        http2_prior_knowledge=settings.PAYMENT_API_URL.startswith("http://"),
+        dns_cache=get_dns_cache(),
+        ssl_context=get_ssl_context(),
+    )
+
+
+def get_http_client() -> HttpClient:
+    """
+    プロセス内で共有するHTTPクライアントを取得します。
+
+    Returns:
+        HttpClient: コネクションプールを保持するHTTPクライアント
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = build_http_client(
+            settings.PAYMENT_API_MAX_CONNECTIONS,
+            settings.PAYMENT_API_MAX_KEEPALIVE_CONNECTIONS,
+        )
+    return _http_client
+
+
+def current_http_client() -> Optional[HttpClient]:
+    """
+    生成済みの共有HTTPクライアントを取得します（生成はしません）。
+
+    Returns:
+        Optional[HttpClient]: 共有HTTPクライアント（まだ生成されていない場合はNone）
+    """
+    return _http_client
+
+
+def warm_up_enabled() -> bool:
+    """
+    起動時に上流へのコネクションを事前に確立するかどうかを返します。
+
+    Returns:
+        bool: 事前確立の数が1以上で、送信先が設定されている場合はTrue
+    """
+    return settings.PAYMENT_API_WARMUP_CONNECTIONS > 0 and bool(
+        settings.PAYMENT_API_URL or settings.PAYMENT_API_URLS
+    )
+
+
+async def warm_up_http_client() -> Optional[Dict[str, Any]]:
+    """
+    共有しているHTTPクライアントの上流へのコネクションを事前に確立します。
+
+    PAYMENT_API_WARMUP_TIMEOUT秒を超えた場合は打ち切ります。
+
+    Returns:
+        Optional[Dict[str, Any]]: 事前確立の結果（無効な場合や打ち切った場合はNone）
+    """
+    if not warm_up_enabled():
+        return None
+    timeout = settings.PAYMENT_API_WARMUP_TIMEOUT
+    try:
+        result = await asyncio.wait_for(
+            get_http_client().warm_up(
+                settings.PAYMENT_API_URL,
+                settings.PAYMENT_API_WARMUP_CONNECTIONS,
+                timeout,
+                path=settings.PAYMENT_API_PROBE_PATH,
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"上流へのコネクションの事前確立が{timeout}秒以内に終わりませんでした")
+        return None
+    logger.info(f"上流へのコネクションを事前に確立しました: {result}")
+    return result
+
+
+async def close_http_client() -> None:
+    """
+    共有しているHTTPクライアントのコネクションプールを閉じます。
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_journal() -> Optional[Journal]:
+    """
+    プロセス内で共有するトランザクションジャーナルを取得します。
+
+    Returns:
+        Optional[Journal]: ジャーナル（無効な場合や起動前はNone）
+    """
+    return _journal
+
+
+async def open_journal() -> Optional[Journal]:
+    """
+    設定に従ってトランザクションジャーナルを開きます。
+
+    起動時のリカバリもここで行います。
+
+    Returns:
+        Optional[Journal]: ジャーナル（無効な場合はNone）
+
+    Raises:
+        ValueError: ジャーナルが有効でJOURNAL_DIRが指定されていない場合
+    """
+    global _journal
+    if settings.JOURNAL_ENABLED and _journal is None:
+        from app.infrastructure.journal import Journal
+
+        if not settings.JOURNAL_DIR:
+            raise ValueError("JOURNAL_ENABLEDの場合はJOURNAL_DIRを指定してください")
+
+        journal = Journal(
+            settings.JOURNAL_DIR,
+            segment_max_bytes=settings.JOURNAL_SEGMENT_MAX_BYTES,
+            max_batch=settings.JOURNAL_MAX_BATCH,
+            fsync=settings.JOURNAL_FSYNC,
+        )
+        await journal.start()
+        _journal = journal
+    return _journal
+
+
+async def close_journal() -> None:
+    """
+    トランザクションジャーナルの未書き込みのレコードを書き出して閉じます。
+    """
+    global _journal
+    if _journal is not None:
+        await _journal.close()
+        _journal = None
+
+
+def get_payment_index() -> PaymentIndex:
+    """
+    プロセス内で共有する決済状況インデックスを取得します。
+
+    依存性注入で使用します。
+
+    Returns:
+        PaymentIndex: 決済状況インデックス
+    """
+    global _payment_index
+    if _payment_index is None:
+        _payment_index = PaymentIndex(
+            max_entries=settings.PAYMENT_INDEX_MAX_ENTRIES,
+            ttl=settings.PAYMENT_INDEX_TTL,
+        )
+    return _payment_index
+
+
+def get_rejected_tokens() -> Optional[RejectedTokenCache]:
+    """
+    プロセス内で共有する拒否済み請求トークンのキャッシュを取得します。
+
+    Returns:
+        Optional[RejectedTokenCache]: キャッシュ（REJECTED_TOKEN_TTLSが空の場合はNone）
+    """
+    global _rejected_tokens
+    if _rejected_tokens is None and settings.REJECTED_TOKEN_TTLS:
+        _rejected_tokens = RejectedTokenCache(
+            settings.REJECTED_TOKEN_TTLS,
+            max_entries=settings.REJECTED_TOKEN_CACHE_SIZE,
+            use_bloom=settings.REJECTED_TOKEN_BLOOM,
+            bloom_error_rate=settings.REJECTED_TOKEN_BLOOM_ERROR_RATE,
+        )
+    return _rejected_tokens
+
+
+async def rebuild_payment_index() -> int:
+    """
+    ジャーナルから決済状況インデックスを再構築します。
+
+    保持期間より前に更新が止まったセグメントは読み飛ばします。
+
+    Returns:
+        int: 反映したレコード数
+    """
+    if not settings.JOURNAL_ENABLED:
+        return 0
+    from app.infrastructure.journal import read_journal
+
+    index = get_payment_index()
+    since = time.time() - index.ttl
+    return await asyncio.get_running_loop().run_in_executor(
+        None, lambda: index.rebuild(read_journal(settings.JOURNAL_DIR, since=since))
+    )
+
+
+def get_merchant_registry() -> MerchantRegistry:
+    """
+    プロセス内で共有する加盟店レジストリを取得します。
+
+    依存性注入で使用します。
+
+    Returns:
+        MerchantRegistry: 加盟店レジストリ（ファイル未設定の場合は加盟店なし）
+    """
+    global _merchant_registry
+    if _merchant_registry is None:
+        _merchant_registry = MerchantRegistry(
+            settings.MERCHANT_REGISTRY_PATH,
+            reload_interval=settings.MERCHANT_REGISTRY_RELOAD_INTERVAL,
+            retire_delay=settings.PAYMENT_API_TIMEOUT,
+            client_factory=build_http_client,
+        )
+    return _merchant_registry
+
+
+async def open_merchant_registry() -> MerchantRegistry:
+    """
+    加盟店レジストリを読み込み、ファイルの更新の確認を開始します。
+
+    Returns:
+        MerchantRegistry: 加盟店レジストリ
+    """
+    registry = get_merchant_registry()
+    await registry.start()
+    return registry
+
+
+async def close_merchant_registry() -> None:
+    """
+    加盟店レジストリの更新の確認を停止し、加盟店専用のコネクションプールを閉じます。
+    """
+    global _merchant_registry
+    if _merchant_registry is not None:
+        await _merchant_registry.close()
+        _merchant_registry = None
+
+
+def get_loop_monitor() -> Optional[EventLoopMonitor]:
+    """
+    プロセス内で共有するイベントループの監視を取得します。
+
+    Returns:
+        Optional[EventLoopMonitor]: イベントループの監視（LOOP_MONITOR_ENABLEDが無効な場合はNone）
+    """
+    global _loop_monitor
+    if _loop_monitor is None and settings.LOOP_MONITOR_ENABLED:
+        from app.infrastructure.loop_monitor import EventLoopMonitor
+
+        _loop_monitor = EventLoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL,
+            slow_threshold=settings.LOOP_MONITOR_SLOW_THRESHOLD,
+            max_events=settings.LOOP_MONITOR_MAX_EVENTS,
+            log_interval=settings.LOOP_MONITOR_LOG_INTERVAL,
+        )
+    return _loop_monitor
+
+
+def start_loop_monitor() -> None:
+    """
+    イベントループの監視を開始します（LOOP_MONITOR_ENABLEDが無効な場合は何もしません）。
+    """
+    monitor = get_loop_monitor()
+    if monitor is not None:
+        monitor.start()
+
+
+async def close_loop_monitor() -> None:
+    """
+    イベントループの監視を停止します。
+    """
+    global _loop_monitor
+    if _loop_monitor is not None:
+        await _loop_monitor.stop()
+        _loop_monitor = None
 
 
 def get_payment_service() -> PaymentServiceInterface:
@@ -21,4 +436,231 @@ def get_payment_service() -> PaymentServiceInterface:
     Returns:
         PaymentServiceInterface: 決済サービスのインスタンス
     """
-    return DPaymentService.create()
+    from app.infrastructure.payment.spmode_service import DPaymentService
+
+    return DPaymentService.create(
+        get_http_client(),
+        journal=_journal,
+        index=get_payment_index(),
+        client_for=get_merchant_registry().client_for,
+        rejected_tokens=get_rejected_tokens(),
+    )
+
+
+class _DeferredPaymentService(PaymentServiceInterface):
+    """
+    処理時に決済サービスを取得する決済サービス。
+
+    起動時に非同期転送キューを生成する際にHTTPクライアントのインポートと生成を行わず、
+    最初の転送まで遅らせるために使用します。
+    """
+
+    async def process_payment(
+        self,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str] = None,
+        merchant: Optional[Merchant] = None,
+        passthrough: bool = False,
+    ) -> PaymentResponse:
+        return await get_payment_service().process_payment(
+            request_data, transaction_id=transaction_id, merchant=merchant, passthrough=passthrough
+        )
+
+
+def get_dispatch_queue() -> DispatchQueue:
+    """
+    プロセス内で共有する非同期転送キューを取得します。
+
+    依存性注入で使用します。
+
+    Returns:
+        DispatchQueue: 非同期転送キュー
+    """
+    global _dispatch_queue
+    if _dispatch_queue is None:
+        _dispatch_queue = DispatchQueue(
+            _DeferredPaymentService(),
+            maxsize=settings.ASYNC_QUEUE_MAXSIZE,
+            workers=settings.ASYNC_QUEUE_WORKERS,
+            enqueue_timeout=settings.ASYNC_ENQUEUE_TIMEOUT,
+            max_results=settings.ASYNC_MAX_RESULTS,
+        )
+    return _dispatch_queue
+
+
+async def close_dispatch_queue(timeout: float) -> None:
+    """
+    非同期転送キューをドレインして停止します。
+
+    Args:
+        timeout: 未転送のジョブの完了を待つ最大秒数
+    """
+    global _dispatch_queue
+    if _dispatch_queue is not None:
+        await _dispatch_queue.drain(timeout)
+        _dispatch_queue = None
+
+
+def get_jwt_verifier() -> JwtVerifier:
+    """
+    プロセス内で共有するJWTの検証を取得します。
+
+    python-joseは認証を有効にした場合のみ必要なため、最初の呼び出し時にインポートします。
+
+    Returns:
+        JwtVerifier: JWTの検証
+    """
+    global _jwt_verifier
+    if _jwt_verifier is None:
+        from app.infrastructure.jwt_auth import JwksKeyStore, JwtVerifier
+
+        keys = None
+        if settings.AUTH_JWT_JWKS_URL:
+            keys = JwksKeyStore(
+                settings.AUTH_JWT_JWKS_URL,
+                ttl=settings.AUTH_JWT_JWKS_TTL,
+                refresh_interval=settings.AUTH_JWT_JWKS_REFRESH_INTERVAL,
+            )
+        _jwt_verifier = JwtVerifier(
+            settings.AUTH_JWT_ALGORITHMS,
+            secret=settings.AUTH_JWT_SECRET,
+            keys=keys,
+            issuer=settings.AUTH_JWT_ISSUER,
+            audience=settings.AUTH_JWT_AUDIENCE,
+            leeway=settings.AUTH_JWT_LEEWAY,
+            max_entries=settings.AUTH_JWT_CACHE_SIZE,
+        )
+    return _jwt_verifier
+
+
+async def authenticate_client(request: Request) -> Dict[str, Any]:
+    """
+    AuthorizationヘッダーのBearerトークンを検証します。
+
+    AUTH_JWT_ENABLEDが有効な場合に、APIルーターの依存関係として使用します。
+    検証したクレームはrequest.state.auth_claimsに保持します。
+
+    Args:
+        request: リクエストオブジェクト
+
+    Returns:
+        Dict[str, Any]: トークンのクレーム
+
+    Raises:
+        UnauthorizedException: トークンがない場合、または検証に失敗した場合
+    """
+    from app.infrastructure.jwt_auth import TokenVerificationError
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise UnauthorizedException(detail="認証トークンがありません", error=None)
+    try:
+        claims = await get_jwt_verifier().verify(token.strip())
+    except TokenVerificationError as e:
+        logger.warning(f"認証トークンの検証に失敗しました: {e}")
+        raise UnauthorizedException()
+    request.state.auth_claims = claims
+    return claims
+
+
+def get_profiler() -> SamplingProfiler:
+    """
+    プロセス内で共有するサンプリングプロファイラーを取得します。
+
+    Returns:
+        SamplingProfiler: サンプリングプロファイラー
+    """
+    global _profiler
+    if _profiler is None:
+        from app.infrastructure.profiler import SamplingProfiler
+
+        _profiler = SamplingProfiler(interval=settings.DEBUG_PROFILE_INTERVAL)
+    return _profiler
+
+
+def get_memory_diagnostics() -> MemoryDiagnostics:
+    """
+    プロセス内で共有するメモリ診断を取得します。
+
+    Returns:
+        MemoryDiagnostics: メモリ診断
+    """
+    global _memory_diagnostics
+    if _memory_diagnostics is None:
+        from app.infrastructure.memory_diagnostics import MemoryDiagnostics
+
+        _memory_diagnostics = MemoryDiagnostics()
+    return _memory_diagnostics
+
+
+def cache_sizes() -> Dict[str, Any]:
+    """
+    プロセス内のキャッシュとキューの大きさを返します。
+
+    生成されていないもの（無効なものや未使用のもの）は含めません。
+
+    Returns:
+        Dict[str, Any]: キャッシュとキューごとの件数と上限
+    """
+    from app.core.tracing import tracer
+
+    sizes: Dict[str, Any] = {}
+    if _payment_index is not None:
+        sizes["paymentIndex"] = {"entries": len(_payment_index), "max": _payment_index.max_entries}
+    if _rejected_tokens is not None:
+        sizes["rejectedTokens"] = {
+            "entries": len(_rejected_tokens),
+            "max": _rejected_tokens.max_entries,
+        }
+    if _jwt_verifier is not None:
+        sizes["jwtVerifier"] = {
+            "entries": _jwt_verifier.stats()["entries"],
+            "max": _jwt_verifier.max_entries,
+        }
+    if _dns_cache is not None:
+        sizes["dnsCache"] = {"entries": _dns_cache.stats()["entries"]}
+    if _ssl_context is not None and hasattr(_ssl_context, "stats"):
+        sizes["tlsSessions"] = {"entries": _ssl_context.stats()["sessions"]}
+    if _merchant_registry is not None:
+        sizes["merchantRegistry"] = {"entries": len(_merchant_registry)}
+    if _dispatch_queue is not None:
+        sizes["dispatchQueue"] = {
+            "depth": _dispatch_queue.depth,
+            "maxDepth": _dispatch_queue.maxsize,
+            "jobs": len(_dispatch_queue),
+            "maxJobs": _dispatch_queue.max_results,
+        }
+    if _journal is not None:
+        sizes["journal"] = {"depth": _journal.depth}
+    if _loop_monitor is not None:
+        sizes["loopMonitor"] = {
+            "events": len(_loop_monitor.slow_events),
+            "max": _loop_monitor.slow_events.maxlen,
+        }
+    exporter = tracer.exporter
+    if exporter is not None and hasattr(exporter, "depth"):
+        sizes["spanExporter"] = {"depth": exporter.depth, "dropped": exporter.dropped}
+    return sizes
+
+
+async def require_debug_access(request: Request) -> None:
+    """
+    診断用エンドポイントへのアクセスを検査します。
+
+    DEBUG_TOKENが設定されている場合はX-Debug-Tokenヘッダーの一致を、
+    設定されていない場合はループバックアドレスからのリクエストであることを要求します。
+
+    Args:
+        request: リクエストオブジェクト
+
+    Raises:
+        ForbiddenException: アクセスが許可されていない場合
+    """
+    if settings.DEBUG_TOKEN:
+        token = request.headers.get("x-debug-token", "")
+        if hmac.compare_digest(token.encode(), settings.DEBUG_TOKEN.encode()):
+            return
+    elif request.client is not None and request.client.host in _LOOPBACK_HOSTS:
+        return
+    logger.warning(f"診断用エンドポイントへのアクセスを拒否しました: {request.url.path}")
+    raise ForbiddenException()
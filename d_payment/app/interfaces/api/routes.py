@@ -6,14 +6,41 @@ FastAPIのルートとハンドラを定義します。
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+import math
+from typing import Any, AsyncIterator, Dict, Optional
 
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+from app.application.dispatch_queue import DispatchQueue, QueueClosedError, QueueFullError
+from app.application.payment_index import PaymentIndex
+from app.application.stream_ingest import StreamIngest, read_lines
+from app.core.config import settings
+from app.core.json_limits import check_json_limits
+from app.core.lifecycle import lifecycle
+from app.core.tracing import tracer
+from app.domain.entities.merchant import Merchant
 from app.domain.interfaces.payment_service import PaymentServiceInterface
+from app.infrastructure.merchant_registry import MerchantRegistry, UnknownMerchantError
 from app.interfaces.schemas.payment import PaymentRequestSchema, PaymentResponseSchema
-from app.interfaces.api.dependencies import get_payment_service
-from app.core.errors import ValidationException, PaymentApiException
+from app.interfaces.api.dependencies import (
+    get_dispatch_queue,
+    get_merchant_registry,
+    get_payment_index,
+    get_payment_service,
+)
+from app.core.errors import (
+    ValidationException,
+    PaymentApiException,
+    ServiceUnavailableException,
+    TooManyRequestsException,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +48,51 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["payment"])
 
 
+def _select_merchant(
+    request: Request,
+    payment_request: PaymentRequestSchema,
+    registry: MerchantRegistry,
+) -> Optional[Merchant]:
+    """
+    リクエストの送信元の加盟店を選択し、加盟店の流量制限を適用します。
+
+    加盟店IDはヘッダー、リクエストデータのmerchantIdの順に参照し、
+    どちらもない場合はレジストリの既定の加盟店を使用します。
+
+    Args:
+        request: リクエストオブジェクト
+        payment_request: クライアントからの決済リクエスト
+        registry: 加盟店レジストリ
+
+    Returns:
+        Optional[Merchant]: 加盟店（Noneの場合は設定ファイルの加盟店）
+
+    Raises:
+        ValidationException: 登録されていない加盟店IDが指定された場合
+        TooManyRequestsException: 加盟店の流量制限を超えた場合
+    """
+    merchant_id = request.headers.get(settings.MERCHANT_HEADER) or payment_request.data.get(
+        "merchantId"
+    )
+    try:
+        merchant = registry.resolve(merchant_id)
+    except UnknownMerchantError:
+        logger.warning(f"登録されていない加盟店IDが指定されました: {merchant_id}")
+        raise ValidationException(detail="加盟店が見つかりません")
+    if merchant is not None:
+        wait = registry.try_acquire(merchant)
+        if wait > 0:
+            logger.warning(f"加盟店の流量制限を超えました: {merchant.merchant_id}")
+            raise TooManyRequestsException(retry_after=max(1, math.ceil(wait)))
+    return merchant
+
+
 @router.post("/receive", response_model=None)
 async def receive_payment(
     payment_request: PaymentRequestSchema,
+    request: Request,
     payment_service: PaymentServiceInterface = Depends(get_payment_service),
+    merchant_registry: MerchantRegistry = Depends(get_merchant_registry),
 ):
     """
     決済リクエストを受信するエンドポイント。
@@ -36,23 +104,33 @@ async def receive_payment(
 
     Args:
         payment_request: クライアントからの決済リクエスト
+        request: リクエストオブジェクト
         payment_service: 依存性注入された決済サービス
+        merchant_registry: 依存性注入された加盟店レジストリ
 
     Returns:
         外部APIからのレスポンスをそのまま返します
 
     Raises:
-        ValidationException: 入力データが無効な場合
+        ValidationException: 入力データが無効な場合、加盟店が見つからない場合
+        TooManyRequestsException: 加盟店の流量制限を超えた場合
         PaymentApiException: 外部APIとの通信中にエラーが発生した場合
         HTTPException: その他のエラーが発生した場合
     """
+    merchant = _select_merchant(request, payment_request, merchant_registry)
     try:
         # ステップ1: リクエストの受信をログに記録
         logger.info("決済リクエストを受信しました")
         
         # ステップ2: 決済サービスを使用してリクエストを処理
         logger.info("決済サービスにリクエストを転送します")
-        result = await payment_service.process_payment(payment_request.data)
+        async with lifecycle.track():
+            with tracer.start_span("receive_payment"):
+                result = await payment_service.process_payment(
+                    payment_request.data,
+                    merchant=merchant,
+                    passthrough=settings.PAYMENT_PASSTHROUGH,
+                )
 
         # 処理結果の確認
         if not result.success:
@@ -64,6 +142,9 @@ async def receive_payment(
 
         # ステップ3: 外部APIからのレスポンスをそのまま返却
         logger.info("決済処理が成功しました。レスポンスを返却します")
+        if result.raw is not None:
+            # パススルー時は再エンコードせず、受信したボディとContent-Typeのまま返す
+            return Response(content=result.raw.content, media_type=result.raw.content_type)
         return result.data
 
     except ValidationException as e:
@@ -85,3 +166,251 @@ async def receive_payment(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"内部サーバーエラー: {str(e)}",
         )
+
+
+class NdjsonStreamingResponse(StreamingResponse):
+    """
+    リクエストボディを読み込みながら返すNDJSONのレスポンス。
+
+    StreamingResponseは送信中に切断を検知するため受信関数を読み続けますが、
+    それではボディの残りを横取りしてしまうため、送信のみを行います。
+    切断はボディの受信（ClientDisconnect）と送信の失敗で検知します。
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+async def _ingest_line(
+    line_no: int,
+    line: bytes,
+    request: Request,
+    payment_service: PaymentServiceInterface,
+    registry: MerchantRegistry,
+) -> Dict[str, Any]:
+    """
+    ストリーミング取り込みの1行（PaymentRequestSchema.dataと同じ形式）を処理します。
+
+    加盟店の流量制限を超えた場合は拒否せず、送信できるまで待ちます。
+
+    Args:
+        line_no: 行番号
+        line: 行の内容（JSON）
+        request: リクエストオブジェクト
+        payment_service: 決済サービス
+        registry: 加盟店レジストリ
+
+    Returns:
+        Dict[str, Any]: 行番号と処理結果（失敗した場合はエラーの内容）
+    """
+    problem = check_json_limits(line, settings.REQUEST_MAX_JSON_DEPTH, settings.REQUEST_MAX_JSON_KEYS)
+    if problem is not None:
+        return {"line": line_no, "success": False, "error": problem}
+    try:
+        payment_request = PaymentRequestSchema(data=json.loads(line))
+    except (ValueError, ValidationError):
+        return {"line": line_no, "success": False, "error": "JSONオブジェクトではありません"}
+
+    merchant_id = request.headers.get(settings.MERCHANT_HEADER) or payment_request.data.get(
+        "merchantId"
+    )
+    try:
+        merchant = registry.resolve(merchant_id)
+    except UnknownMerchantError:
+        return {"line": line_no, "success": False, "error": "加盟店が見つかりません"}
+    if merchant is not None:
+        while (wait := registry.try_acquire(merchant)) > 0:
+            await asyncio.sleep(wait)
+
+    async with lifecycle.track():
+        result = await payment_service.process_payment(payment_request.data, merchant=merchant)
+    if not result.success:
+        return {
+            "line": line_no,
+            "success": False,
+            "error": result.error or "決済処理に失敗しました",
+        }
+    return {"line": line_no, "success": True, "data": result.data}
+
+
+@router.post("/receive/stream", response_class=NdjsonStreamingResponse)
+async def receive_payment_stream(
+    request: Request,
+    payment_service: PaymentServiceInterface = Depends(get_payment_service),
+    merchant_registry: MerchantRegistry = Depends(get_merchant_registry),
+):
+    """
+    改行区切り（NDJSON）の決済リクエストを取り込むエンドポイント。
+
+    このエンドポイントは以下の処理を行います：
+    1. リクエストボディを受信しながら1行ずつ取り出す（各行はPaymentRequestSchema.dataと同じ形式）
+    2. STREAM_INGEST_CONCURRENCY行まで同時に決済サービスで処理
+    3. 行ごとの結果を完了した順にNDJSONで返却し、最後に集計の行を返却
+
+    処理中の行が上限に達している間は次の行を読み込まないため、
+    入力の大きさによらず使用するメモリは一定です。
+    ドレイン中は次の行を読み込まずに終了し、集計のstoppedをtrueにします。
+
+    Args:
+        request: リクエストオブジェクト
+        payment_service: 依存性注入された決済サービス
+        merchant_registry: 依存性注入された加盟店レジストリ
+
+    Returns:
+        1行に1件の結果（{"line", "success", "data"または"error"}）と、
+        最後に集計（{"done", "lines", "succeeded", "failed", "stopped"}）
+    """
+
+    async def handle(line_no: int, line: bytes) -> Dict[str, Any]:
+        return await _ingest_line(line_no, line, request, payment_service, merchant_registry)
+
+    ingest = StreamIngest(
+        handle,
+        concurrency=settings.STREAM_INGEST_CONCURRENCY,
+        should_stop=lambda: lifecycle.is_draining,
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        logger.info("ストリーミング取り込みを開始しました")
+        lines = read_lines(request.stream(), settings.STREAM_INGEST_MAX_LINE_BYTES)
+        try:
+            async for result in ingest.run(lines):
+                yield _ndjson(result)
+        except ClientDisconnect:
+            logger.warning(f"ストリーミング取り込みの受信中に切断されました lines={ingest.lines}")
+            return
+        summary = ingest.summary()
+        logger.info(f"ストリーミング取り込みを終了しました {summary}")
+        yield _ndjson(summary)
+
+    return NdjsonStreamingResponse(body())
+
+
+def _ndjson(obj: Dict[str, Any]) -> bytes:
+    """
+    オブジェクトをNDJSONの1行に変換します。
+
+    Args:
+        obj: 変換するオブジェクト
+
+    Returns:
+        bytes: 改行で終わるJSON（UTF-8）
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+@router.post("/receive/async", status_code=status.HTTP_202_ACCEPTED, response_model=None)
+async def receive_payment_async(
+    payment_request: PaymentRequestSchema,
+    request: Request,
+    dispatch_queue: DispatchQueue = Depends(get_dispatch_queue),
+    merchant_registry: MerchantRegistry = Depends(get_merchant_registry),
+):
+    """
+    決済リクエストを非同期で受け付けるエンドポイント。
+
+    このエンドポイントは以下の処理を行います：
+    1. クライアントからの決済リクエストを受信
+    2. トランザクションIDを払い出して転送キューに積む
+    3. 外部APIの応答を待たずに202を返却
+
+    転送結果はステータス照会エンドポイントで取得します。
+
+    Args:
+        payment_request: クライアントからの決済リクエスト
+        request: リクエストオブジェクト
+        dispatch_queue: 依存性注入された非同期転送キュー
+        merchant_registry: 依存性注入された加盟店レジストリ
+
+    Returns:
+        払い出したトランザクションIDとステータス照会先
+
+    Raises:
+        ValidationException: 加盟店が見つからない場合
+        TooManyRequestsException: 加盟店の流量制限を超えた場合
+        ServiceUnavailableException: キューが満杯、またはドレイン中の場合
+    """
+    merchant = _select_merchant(request, payment_request, merchant_registry)
+    try:
+        job = await dispatch_queue.submit(payment_request.data, merchant=merchant)
+    except QueueFullError:
+        logger.warning(f"転送キューが満杯のため受付を拒否しました depth={dispatch_queue.depth}")
+        raise ServiceUnavailableException(
+            detail="転送キューが満杯です", retry_after=settings.ASYNC_RETRY_AFTER
+        )
+    except QueueClosedError:
+        raise ServiceUnavailableException(
+            detail="サーバーが停止処理中です", retry_after=settings.ASYNC_RETRY_AFTER
+        )
+
+    logger.info(f"決済リクエストを非同期で受け付けました [{job.transaction_id}]")
+    status_url = str(request.url_for("get_async_payment_status", transaction_id=job.transaction_id))
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"transactionId": job.transaction_id, "status": job.status, "statusUrl": status_url},
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/receive/async/{transaction_id}", response_model=None)
+async def get_async_payment_status(
+    transaction_id: str,
+    dispatch_queue: DispatchQueue = Depends(get_dispatch_queue),
+):
+    """
+    非同期で受け付けた決済リクエストの状態を返すエンドポイント。
+
+    Args:
+        transaction_id: 受付時に払い出したトランザクションID
+        dispatch_queue: 依存性注入された非同期転送キュー
+
+    Returns:
+        ジョブの状態（完了済みの場合は外部APIからのレスポンスを含む）
+
+    Raises:
+        HTTPException: トランザクションIDが見つからない場合
+    """
+    job = dispatch_queue.get(transaction_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="トランザクションが見つかりません",
+        )
+    return job.to_dict()
+
+
+@router.get("/payments/{order_number}", response_model=None)
+async def get_payment_status(
+    order_number: str,
+    payment_index: PaymentIndex = Depends(get_payment_index),
+):
+    """
+    注文番号の決済状況を返すエンドポイント。
+
+    プロセス内のインデックスのみを参照し、外部APIへの問い合わせは行いません。
+
+    Args:
+        order_number: 店舗注文番号
+        payment_index: 依存性注入された決済状況インデックス
+
+    Returns:
+        直近の送信のトランザクションID、状態、外部APIの応答コード、所要時間
+
+    Raises:
+        HTTPException: 注文番号が見つからない場合
+    """
+    entry = payment_index.get(order_number)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="注文番号が見つかりません",
+        )
+    return entry.to_dict()
+
@@ -0,0 +1,9 @@
+"""
+ミドルウェアパッケージ。
+
+ASGIレベルで動作するミドルウェアを定義します。
+"""
+
+from __future__ import annotations
+
+from typing import Annotated
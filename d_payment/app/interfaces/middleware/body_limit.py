@@ -0,0 +1,150 @@
+"""
+リクエストボディの制限ミドルウェアモジュール。
+
+アプリケーションがボディを読み込んでJSONを解析する前に、ボディの大きさと
+JSONの入れ子の深さ・キーの数を上限と比較し、超えたリクエストを拒否します。
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, List, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.json_limits import check_json_limits
+
+logger = logging.getLogger(__name__)
+
+# ボディを検査するメソッド
+_BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+class BodyLimitMiddleware:
+    """
+    リクエストボディの制限ミドルウェア。
+
+    Content-Lengthが上限を超える場合はボディを読まずに413を返します。
+    Content-Lengthがない場合（チャンク転送）も受信したバイト数を数え、上限を超えた時点で413を返します。
+    上限以内のボディはJSONの場合のみ入れ子の深さとキーの数を検査し（超えた場合は422）、
+    受信済みのボディをそのままアプリケーションに渡します。
+    ボディを読み込みながら処理するパス（exempt_paths）は検査せずにそのまま渡します。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_bytes: int,
+        max_depth: int = 0,
+        max_keys: int = 0,
+        exempt_paths: Iterable[str] = (),
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            app: 後続のASGIアプリケーション
+            max_body_bytes: ボディの大きさの上限（バイト）
+            max_depth: JSONの入れ子の深さの上限（0の場合は検査しない）
+            max_keys: JSONのオブジェクトのキーの総数の上限（0の場合は検査しない）
+            exempt_paths: 検査しないパス（ルート側で行ごとなどに制限するもの）
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.max_depth = max_depth
+        self.max_keys = max_keys
+        self.exempt_paths = frozenset(exempt_paths)
+        self.rejected = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in _BODY_METHODS
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length: Optional[bytes] = None
+        content_type = b""
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                content_length = value
+            elif name == b"content-type":
+                content_type = value
+
+        if content_length is not None:
+            if not content_length.isdigit():
+                await self._reject(scope, receive, send, 400, "Content-Lengthが不正です")
+                return
+            if int(content_length) > self.max_body_bytes:
+                await self._reject(scope, receive, send, 413, "リクエストボディが大きすぎます")
+                return
+
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # ボディの受信中に切断された
+                return
+            body = message.get("body", b"")
+            size += len(body)
+            if size > self.max_body_bytes:
+                await self._reject(scope, receive, send, 413, "リクエストボディが大きすぎます")
+                return
+            chunks.append(body)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        if _is_json(content_type):
+            problem = check_json_limits(body, self.max_depth, self.max_keys)
+            if problem is not None:
+                await self._reject(scope, receive, send, 422, problem)
+                return
+
+        replayed = False
+
+        async def replay_receive() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, status_code: int, detail: str
+    ) -> None:
+        """
+        リクエストを拒否するレスポンスを送信します。
+
+        Args:
+            scope: ASGIのスコープ
+            receive: 受信関数
+            send: 送信関数
+            status_code: HTTPステータスコード
+            detail: エラーの詳細メッセージ
+        """
+        self.rejected += 1
+        logger.warning(f"リクエストボディを拒否しました: {detail} path={scope['path']}")
+        headers = {"Connection": "close"} if status_code == 413 else None
+        response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+        await response(scope, receive, send)
+
+
+def _is_json(content_type: bytes) -> bool:
+    """
+    Content-TypeがJSON（未指定を含む）かどうかを判定します。
+
+    Args:
+        content_type: Content-Typeヘッダーの値
+
+    Returns:
+        bool: JSONとして解析される場合はTrue
+    """
+    media_type = content_type.split(b";", 1)[0].strip().lower()
+    return not media_type or media_type.endswith(b"/json") or media_type.endswith(b"+json")
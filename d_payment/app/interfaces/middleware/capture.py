@@ -0,0 +1,67 @@
+"""
+トラフィックキャプチャミドルウェアモジュール。
+
+指定したパスへのリクエストボディを、アプリケーションへの受け渡しと並行して記録します。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import List
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.capture import CaptureWriter
+
+
+class TrafficCaptureMiddleware:
+    """
+    トラフィックキャプチャミドルウェア。
+
+    リクエストボディはアプリケーションに渡しながら蓄積し、
+    受信完了時にCaptureWriterへ引き渡します。
+    """
+
+    def __init__(self, app: ASGIApp, writer: CaptureWriter, path: str):
+        """
+        初期化メソッド。
+
+        Args:
+            app: 後続のASGIアプリケーション
+            writer: キャプチャファイルの書き込み
+            path: 記録対象のパス
+        """
+        self.app = app
+        self.writer = writer
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] != self.path
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        arrived_at = time.time()
+        chunks: List[bytes] = []
+        size = 0
+        limit = self.writer.max_body_bytes
+
+        async def capture_receive() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= limit:
+                    chunks.append(body)
+                if not message.get("more_body", False):
+                    if size <= limit:
+                        self.writer.record(arrived_at, b"".join(chunks))
+                    else:
+                        self.writer.skipped += 1
+            return message
+
+        await self.app(scope, capture_receive, send)
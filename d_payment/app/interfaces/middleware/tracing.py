@@ -0,0 +1,58 @@
+"""
+トレーシングミドルウェアモジュール。
+
+受信したリクエストごとに受信側のスパンを開始し、traceparentヘッダーで受け取った
+トレースに接続します。後続の処理で開始したスパンは、このスパンの子になります。
+"""
+
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import Tracer
+
+
+class TracingMiddleware:
+    """
+    トレーシングミドルウェア。
+
+    レスポンスの送信を終えた時点でスパンを終了し、メソッド、パス、ステータスコードを属性に記録します。
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        """
+        初期化メソッド。
+
+        Args:
+            app: 後続のASGIアプリケーション
+            tracer: スパンを開始するトレーサー
+        """
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        path = scope["path"]
+        with self.tracer.start_span(f"{method} {path}", traceparent=traceparent) as span:
+            if span.recording:
+                span.set_attribute("http.method", method)
+                span.set_attribute("http.target", path)
+
+                async def traced_send(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        span.set_attribute("http.status_code", message["status"])
+                    await send(message)
+
+                await self.app(scope, receive, traced_send)
+            else:
+                await self.app(scope, receive, send)
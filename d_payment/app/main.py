@@ -7,16 +7,40 @@ FastAPIアプリケーションのエントリーポイントとなるモジュ
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import time
+from typing import Optional
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app import IMPORT_STARTED
 from app.core.config import settings
 from app.core.errors import setup_exception_handlers
+from app.core.lifecycle import lifecycle
+from app.core.startup import startup_profile
+from app.interfaces.api.dependencies import (
+    close_dispatch_queue,
+    close_http_client,
+    close_journal,
+    close_loop_monitor,
+    close_merchant_registry,
+    get_dispatch_queue,
+    open_journal,
+    open_merchant_registry,
+    rebuild_payment_index,
+    start_loop_monitor,
+    warm_up_enabled,
+    warm_up_http_client,
+)
 from app.interfaces.api.routes import router as api_router
 
+startup_profile.record("import", time.perf_counter() - IMPORT_STARTED)
+_app_started = time.perf_counter()
+
 # ロギングの設定
 logging.basicConfig(
     level=logging.INFO if not settings.DEBUG else logging.DEBUG,
@@ -45,6 +69,55 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 
+# リクエストボディの制限（JSONの解析前に大きさと構造を検査する）
+if settings.REQUEST_MAX_BODY_BYTES > 0:
+    from app.interfaces.middleware.body_limit import BodyLimitMiddleware
+
+    app.add_middleware(
+        BodyLimitMiddleware,
+        max_body_bytes=settings.REQUEST_MAX_BODY_BYTES,
+        max_depth=settings.REQUEST_MAX_JSON_DEPTH,
+        max_keys=settings.REQUEST_MAX_JSON_KEYS,
+        # ストリーミング取り込みは行ごとに制限するため、ボディ全体は検査しない
+        exempt_paths={f"{settings.API_PREFIX}/receive/stream"},
+    )
+
+
+# トラフィックキャプチャの設定（オプトイン）
+capture_writer = None
+if settings.CAPTURE_ENABLED:
+    from app.infrastructure.capture import CaptureWriter
+    from app.interfaces.middleware.capture import TrafficCaptureMiddleware
+
+    capture_writer = CaptureWriter(
+        settings.CAPTURE_PATH,
+        settings.CAPTURE_MAX_BODY_BYTES,
+        token_key=settings.CAPTURE_TOKEN_KEY.encode() or None,
+    )
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        writer=capture_writer,
+        path=f"{settings.API_PREFIX}/receive",
+    )
+
+
+# トレーシングの設定（オプトイン）
+span_exporter = None
+if settings.TRACING_ENABLED:
+    from app.core.tracing import tracer
+    from app.infrastructure.trace_exporter import FileSpanExporter
+    from app.interfaces.middleware.tracing import TracingMiddleware
+
+    span_exporter = FileSpanExporter(
+        settings.TRACING_EXPORT_PATH,
+        max_queue=settings.TRACING_EXPORT_QUEUE_SIZE,
+        batch_size=settings.TRACING_EXPORT_BATCH_SIZE,
+        interval=settings.TRACING_EXPORT_INTERVAL,
+    )
+    tracer.configure(True, settings.TRACING_SAMPLE_RATE, span_exporter)
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+
 # リクエスト処理時間を計測するミドルウェア
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -55,12 +128,27 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 
-# ルーターの設定
-app.include_router(api_router, prefix=settings.API_PREFIX)
+# ルーターの設定（呼び出し元のJWT認証はオプトイン）
+api_dependencies = []
+if settings.AUTH_JWT_ENABLED:
+    from fastapi import Depends
+
+    from app.interfaces.api.dependencies import authenticate_client
+
+    api_dependencies.append(Depends(authenticate_client))
+app.include_router(api_router, prefix=settings.API_PREFIX, dependencies=api_dependencies)
+
+# 診断用エンドポイントの設定（オプトイン）
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    from app.interfaces.api.debug import router as debug_router
+
+    app.include_router(debug_router, prefix="/debug")
 
 # 例外ハンドラの設定
 setup_exception_handlers(app)
 
+startup_profile.record("app", time.perf_counter() - _app_started)
+
 
 @app.get("/")
 async def root():
@@ -77,16 +165,69 @@ async def root():
     }
 
 
+@app.get("/ready")
+async def ready():
+    """
+    レディネスエンドポイント。
+
+    起動処理の完了後からドレイン開始までの間のみ200を返します。
+
+    Returns:
+        dict: ワーカーの状態を含む辞書
+    """
+    content = {"status": lifecycle.state, "inflight": lifecycle.inflight, "pid": os.getpid()}
+    if not lifecycle.is_ready:
+        return JSONResponse(status_code=503, content=content)
+    return content
+
+
+# 起動時に上流へのコネクションを事前に確立するタスク
+_warmup_task: Optional[asyncio.Task] = None
+
+
+async def _warm_up_and_mark_ready() -> None:
+    """
+    上流へのコネクションを事前に確立し、完了または打ち切り後に受付を開始します。
+    """
+    try:
+        with startup_profile.phase("warm_up"):
+            await warm_up_http_client()
+    except Exception:
+        logger.exception("上流へのコネクションの事前確立に失敗しました")
+    lifecycle.mark_ready()
+    startup_profile.log()
+
+
 @app.on_event("startup")
 async def startup_event():
     """
     アプリケーション起動時のイベントハンドラ。
 
     リソースの初期化などを行います。
+    上流へのコネクションの事前確立はバックグラウンドで行い、完了するか
+    PAYMENT_API_WARMUP_TIMEOUT秒を超えるまではレディネスを未準備のままにします。
+    各段階の所要時間は、受付の開始時に起動時間の内訳としてログに出力します。
     """
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    lifecycle.reset()
+    start_loop_monitor()
+    with startup_profile.phase("merchant_registry"):
+        await open_merchant_registry()
+    with startup_profile.phase("journal"):
+        await open_journal()
+    with startup_profile.phase("payment_index"):
+        await rebuild_payment_index()
+    with startup_profile.phase("dispatch_queue"):
+        get_dispatch_queue().start()
+    if warm_up_enabled():
+        global _warmup_task
+        lifecycle.mark_warming()
+        _warmup_task = asyncio.create_task(_warm_up_and_mark_ready())
+    else:
+        lifecycle.mark_ready()
+        startup_profile.log()
 
 
 @app.on_event("shutdown")
@@ -95,5 +236,21 @@ async def shutdown_event():
     アプリケーション終了時のイベントハンドラ。
 
     リソースのクリーンアップなどを行います。
+    未転送のジョブと処理中の決済の完了を期限まで待ってから、コネクションプールを閉じます。
     """
     logger.info(f"Shutting down {settings.APP_NAME}")
+    lifecycle.begin_drain()
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    deadline = time.monotonic() + settings.SERVER_DRAIN_TIMEOUT
+    await close_dispatch_queue(settings.SERVER_DRAIN_TIMEOUT)
+    await lifecycle.wait_idle(max(0.0, deadline - time.monotonic()))
+    await close_http_client()
+    await close_merchant_registry()
+    await close_journal()
+    await close_loop_monitor()
+    if capture_writer is not None:
+        capture_writer.close()
+    if span_exporter is not None:
+        span_exporter.close()
+    lifecycle.mark_stopped()
@@ -0,0 +1,9 @@
+"""
+運用ツールパッケージ。
+
+照合やエクスポートなど、サーバーとは別に実行するコマンドを提供します。
+"""
+
+from __future__ import annotations
+
+from typing import Annotated
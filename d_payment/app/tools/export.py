@@ -0,0 +1,379 @@
+"""
+決済記録の列指向エクスポートモジュール。
+
+トランザクションジャーナルから完了した決済（レスポンスの記録）を読み出し、
+分析用の列指向ファイルとして時間単位のパーティションに書き出します。
+
+出力形式:
+    pyarrowがインストールされている場合はParquet形式で書き出します。
+    インストールされていない場合は、型付き配列をそのまま連結した独自の
+    バイナリ形式（.colbin）で書き出し、read_columnsで読み込めます。
+    いずれの形式でも会社コード・店舗コード・応答コードは辞書エンコードします。
+
+増分処理:
+    セグメントごとに前回読み出した位置を状態ファイルに記録し、
+    次回はその位置から読み出します。書き出し済みのデータを読み直すことはありません。
+    パーティションは「date=YYYY-MM-DD/hour=HH」（日本時間）で、実行ごとに
+    新しいパートファイルを追加します。
+
+使い方:
+    python -m app.tools.export --journal journal --output analytics
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.infrastructure.journal import iter_segment, list_segments
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrowがない環境では独自のバイナリ形式で書き出す
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# パーティションの時刻は日本時間で区切る
+JST = timezone(timedelta(hours=9))
+
+# 出力形式
+FORMAT_PARQUET = "parquet"
+FORMAT_COLUMNAR = "columnar"
+
+# 独自バイナリ形式のマジックナンバーとヘッダー長
+_MAGIC = b"DPC1"
+_HEADER_LENGTH = struct.Struct("<I")
+
+# 状態ファイル名
+STATE_FILE = "_export_state.json"
+
+# 列の定義（列名、型）
+# dictionaryは辞書エンコードする文字列、stringはそのままの文字列
+COLUMNS: List[Tuple[str, str]] = [
+    ("ts", "float64"),
+    ("transactionId", "string"),
+    ("orderNumber", "string"),
+    ("companyCode", "dictionary"),
+    ("storeCode", "dictionary"),
+    ("amount", "int64"),
+    ("responseCode", "dictionary"),
+    ("success", "bool"),
+    ("elapsedMs", "float64"),
+]
+
+# 独自バイナリ形式での配列の型コード
+_TYPECODES = {"float64": "d", "int64": "q", "bool": "B"}
+
+
+def _to_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ジャーナルのレコードを出力用の行に変換します。
+
+    Args:
+        record: レスポンスのレコード
+
+    Returns:
+        Dict[str, Any]: 列名をキーとする行
+    """
+    try:
+        amount = int(record.get("amount") or 0)
+    except (TypeError, ValueError):
+        amount = -1
+    return {
+        "ts": float(record.get("ts") or 0.0),
+        "transactionId": record.get("transactionId") or "",
+        "orderNumber": record.get("orderNumber") or "",
+        "companyCode": record.get("companyCode") or "",
+        "storeCode": record.get("storeCode") or "",
+        "amount": amount,
+        "responseCode": record.get("responseCode") or "",
+        "success": bool(record.get("success")),
+        "elapsedMs": float(record.get("elapsedMs") or 0.0),
+    }
+
+
+def partition_of(ts: float) -> str:
+    """
+    時刻が属するパーティションのパスを返します。
+
+    Args:
+        ts: 時刻（UNIX秒）
+
+    Returns:
+        str: 「date=YYYY-MM-DD/hour=HH」形式のパス
+    """
+    moment = datetime.fromtimestamp(ts, tz=JST)
+    return f"date={moment:%Y-%m-%d}/hour={moment:%H}"
+
+
+def write_columnar(path: Path, rows: List[Dict[str, Any]]) -> None:
+    """
+    行を独自の列指向バイナリ形式で書き出します。
+
+    ファイルは「マジックナンバー」「ヘッダー長（uint32）」「JSONヘッダー」と、
+    ヘッダーに記載した順の列データで構成されます。
+    文字列の列はオフセット配列（uint32）とUTF-8のバイト列、
+    辞書エンコードの列はコード配列（uint32）で保持し、辞書はヘッダーに含めます。
+
+    Args:
+        path: 出力先
+        rows: 行
+    """
+    buffers: List[bytes] = []
+    columns = []
+    for name, kind in COLUMNS:
+        values = [row[name] for row in rows]
+        column: Dict[str, Any] = {"name": name, "type": kind}
+        if kind == "dictionary":
+            dictionary: Dict[str, int] = {}
+            codes = array("I", (dictionary.setdefault(v, len(dictionary)) for v in values))
+            column["dictionary"] = list(dictionary)
+            data = [codes.tobytes()]
+        elif kind == "string":
+            encoded = [v.encode() for v in values]
+            offsets = array("I", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            data = [offsets.tobytes(), b"".join(encoded)]
+        else:
+            data = [array(_TYPECODES[kind], values).tobytes()]
+        column["lengths"] = [len(d) for d in data]
+        columns.append(column)
+        buffers.extend(data)
+
+    header = json.dumps(
+        {"rows": len(rows), "byteorder": sys.byteorder, "columns": columns},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as file:
+        file.write(_MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        for data in buffers:
+            file.write(data)
+    os.replace(temporary, path)
+
+
+def read_columns(path: str) -> Dict[str, List[Any]]:
+    """
+    独自の列指向バイナリ形式のファイルを読み込みます。
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        Dict[str, List[Any]]: 列名をキーとする値のリスト
+
+    Raises:
+        ValueError: 形式が正しくない場合
+    """
+    with open(path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"列指向ファイルではありません: {path}")
+        (length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+        header = json.loads(file.read(length))
+        swap = header.get("byteorder", sys.byteorder) != sys.byteorder
+        result: Dict[str, List[Any]] = {}
+        for column in header["columns"]:
+            chunks = [file.read(n) for n in column["lengths"]]
+            kind = column["type"]
+            if kind == "dictionary":
+                codes = array("I")
+                codes.frombytes(chunks[0])
+                if swap:
+                    codes.byteswap()
+                result[column["name"]] = [column["dictionary"][c] for c in codes]
+            elif kind == "string":
+                offsets = array("I")
+                offsets.frombytes(chunks[0])
+                if swap:
+                    offsets.byteswap()
+                data = chunks[1]
+                result[column["name"]] = [
+                    data[offsets[i]:offsets[i + 1]].decode() for i in range(len(offsets) - 1)
+                ]
+            else:
+                values = array(_TYPECODES[kind])
+                values.frombytes(chunks[0])
+                if swap:
+                    values.byteswap()
+                result[column["name"]] = [bool(v) for v in values] if kind == "bool" else values.tolist()
+        return result
+
+
+def write_parquet(path: Path, rows: List[Dict[str, Any]]) -> None:
+    """
+    行をParquet形式で書き出します。
+
+    Args:
+        path: 出力先
+        rows: 行
+    """
+    arrays = {}
+    for name, kind in COLUMNS:
+        values = [row[name] for row in rows]
+        if kind == "dictionary":
+            arrays[name] = pa.array(values, type=pa.string()).dictionary_encode()
+        elif kind == "string":
+            arrays[name] = pa.array(values, type=pa.string())
+        else:
+            arrow_type = {"float64": pa.float64, "int64": pa.int64, "bool": pa.bool_}[kind]()
+            arrays[name] = pa.array(values, type=arrow_type)
+    temporary = path.with_suffix(".tmp")
+    pq.write_table(pa.table(arrays), temporary, compression="zstd")
+    os.replace(temporary, path)
+
+
+class Exporter:
+    """
+    ジャーナルの増分エクスポート。
+
+    セグメントごとの読み出し位置を出力先の状態ファイルに保持します。
+    """
+
+    def __init__(self, journal_dir: str, output_dir: str, output_format: Optional[str] = None):
+        """
+        初期化メソッド。
+
+        Args:
+            journal_dir: ジャーナルのディレクトリ
+            output_dir: 出力先のディレクトリ
+            output_format: 出力形式（省略時はpyarrowの有無で決定）
+
+        Raises:
+            ValueError: Parquet形式を指定したがpyarrowがない場合
+        """
+        if output_format is None:
+            output_format = FORMAT_PARQUET if pa is not None else FORMAT_COLUMNAR
+        if output_format == FORMAT_PARQUET and pa is None:
+            raise ValueError("Parquet形式での出力にはpyarrowが必要です")
+        self.journal_dir = journal_dir
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format
+        self.state_path = self.output_dir / STATE_FILE
+
+    def load_state(self) -> Dict[str, int]:
+        """
+        セグメントごとの読み出し位置を読み込みます。
+
+        Returns:
+            Dict[str, int]: セグメント名をキーとする読み出し位置
+        """
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, encoding="utf-8") as file:
+            return json.load(file).get("segments", {})
+
+    def save_state(self, segments: Dict[str, int]) -> None:
+        """
+        セグメントごとの読み出し位置を保存します。
+
+        Args:
+            segments: セグメント名をキーとする読み出し位置
+        """
+        temporary = self.state_path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"segments": segments, "updated_at": time.time()}, file)
+        os.replace(temporary, self.state_path)
+
+    def _new_records(self, state: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """
+        前回の読み出し位置以降のレスポンスのレコードを読み出し、位置を更新します。
+
+        Args:
+            state: セグメントごとの読み出し位置（読み出しに合わせて更新されます）
+
+        Yields:
+            Dict[str, Any]: レスポンスのレコード
+        """
+        segments = list_segments(self.journal_dir)
+        # 削除されたセグメントの読み出し位置は破棄する
+        for name in set(state) - {path.name for path in segments}:
+            del state[name]
+        for path in segments:
+            offset = state.get(path.name, 0)
+            if offset >= path.stat().st_size:
+                continue
+            for offset, record in iter_segment(path, offset):
+                if record.get("type") == "response":
+                    yield record
+            state[path.name] = offset
+
+    def run(self) -> Dict[str, int]:
+        """
+        前回以降に完了した決済をエクスポートします。
+
+        Returns:
+            Dict[str, int]: パーティションごとの書き出し行数
+        """
+        state = self.load_state()
+        partitions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in self._new_records(state):
+            row = _to_row(record)
+            partitions[partition_of(row["ts"])].append(row)
+
+        suffix = ".parquet" if self.output_format == FORMAT_PARQUET else ".colbin"
+        part = f"part-{time.time_ns():020d}-{os.getpid()}{suffix}"
+        written = {}
+        for partition, rows in sorted(partitions.items()):
+            directory = self.output_dir / partition
+            directory.mkdir(parents=True, exist_ok=True)
+            if self.output_format == FORMAT_PARQUET:
+                write_parquet(directory / part, rows)
+            else:
+                write_columnar(directory / part, rows)
+            written[partition] = len(rows)
+
+        # パートファイルを書き終えてから読み出し位置を進める
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.save_state(state)
+        return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    エクスポートコマンドのエントリーポイント。
+
+    Args:
+        argv: コマンドライン引数
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="決済記録の列指向エクスポート")
+    parser.add_argument("--journal", default="journal", help="ジャーナルのディレクトリ")
+    parser.add_argument("--output", default="analytics", help="出力先のディレクトリ")
+    parser.add_argument(
+        "--format",
+        choices=[FORMAT_PARQUET, FORMAT_COLUMNAR],
+        help="出力形式（省略時はpyarrowがあればparquet）",
+    )
+    args = parser.parse_args(argv)
+
+    exporter = Exporter(args.journal, args.output, args.format)
+    written = exporter.run()
+    print(
+        json.dumps(
+            {"format": exporter.output_format, "rows": sum(written.values()), "partitions": written},
+            ensure_ascii=False,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    sys.exit(main())
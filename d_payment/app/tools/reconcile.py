@@ -0,0 +1,502 @@
+"""
+決済照合コマンドモジュール。
+
+ゲートウェイが送信した決済（storeOrderNumber, settlementAmount）と
+決済事業者の精算CSVを照合し、欠落・重複・金額不一致を報告します。
+
+方式:
+    両側の行を一定件数ごとに整列して一時ファイル（ラン）に書き出し、
+    ランをマージしながら注文番号で突き合わせます（外部ソートマージ）。
+    メモリ上に保持するのは1つのランと各ランの読み取りバッファのみのため、
+    数GBのファイルでも使用メモリは--memory-mbの範囲に収まります。
+    numpyがインストールされている場合は、金額の比較をバッチ単位で一括して行います。
+
+使い方:
+    python -m app.tools.reconcile --gateway journal --provider settlement.csv \\
+        --output discrepancies.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import logging
+import os
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.infrastructure.journal import read_journal
+
+try:
+    import numpy as np
+except ImportError:  # numpyがない環境では1件ずつ比較する
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 1行あたりのメモリ使用量の見積もり（タプルと文字列2つ分、バイト）
+_ROW_BYTES = 256
+
+# 金額を一括比較する件数
+_COMPARE_BATCH = 65536
+
+# 差異の種別
+MISSING_IN_PROVIDER = "missing_in_provider"
+MISSING_IN_GATEWAY = "missing_in_gateway"
+DUPLICATE = "duplicate"
+AMOUNT_MISMATCH = "amount_mismatch"
+INVALID_AMOUNT = "invalid_amount"
+
+Row = Tuple[str, str]
+
+
+@dataclass
+class Discrepancy:
+    """
+    照合で見つかった差異。
+    """
+
+    kind: str
+    order_number: str
+    gateway_amount: Optional[str] = None
+    provider_amount: Optional[str] = None
+    gateway_count: int = 0
+    provider_count: int = 0
+
+
+@dataclass
+class ReconcileReport:
+    """
+    照合結果の集計。
+    """
+
+    gateway_rows: int = 0
+    provider_rows: int = 0
+    matched: int = 0
+    missing_in_provider: int = 0
+    missing_in_gateway: int = 0
+    duplicate: int = 0
+    amount_mismatch: int = 0
+    invalid_amount: int = 0
+
+    @property
+    def discrepancies(self) -> int:
+        """差異の件数。"""
+        return (
+            self.missing_in_provider
+            + self.missing_in_gateway
+            + self.duplicate
+            + self.amount_mismatch
+            + self.invalid_amount
+        )
+
+
+def iter_journal_orders(directory: str) -> Iterator[Row]:
+    """
+    ジャーナルから外部APIが正常応答した決済を読み出します。
+
+    Args:
+        directory: ジャーナルのディレクトリ
+
+    Yields:
+        Row: 注文番号と決済金額
+    """
+    for record in read_journal(directory):
+        if record.get("type") == "response" and record.get("success") and record.get("orderNumber"):
+            yield record["orderNumber"], str(record.get("amount") or "")
+
+
+def iter_csv_orders(
+    path: str,
+    order_column: str = "storeOrderNumber",
+    amount_column: str = "settlementAmount",
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+) -> Iterator[Row]:
+    """
+    CSVファイルから注文番号と金額を読み出します。
+
+    Args:
+        path: CSVファイルのパス
+        order_column: 注文番号の列名
+        amount_column: 金額の列名
+        delimiter: 区切り文字
+        encoding: 文字コード
+
+    Yields:
+        Row: 注文番号と決済金額
+
+    Raises:
+        ValueError: 指定した列が存在しない場合
+    """
+    with open(path, newline="", encoding=encoding) as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        try:
+            order_index = header.index(order_column)
+            amount_index = header.index(amount_column)
+        except ValueError:
+            raise ValueError(f"{path} に列 {order_column} / {amount_column} がありません")
+        for row in reader:
+            if len(row) <= max(order_index, amount_index):
+                continue
+            yield row[order_index].strip(), row[amount_index].strip()
+
+
+def _write_run(rows: List[Row], directory: str) -> str:
+    """
+    整列済みの行をランファイルに書き出します。
+
+    Args:
+        rows: 整列済みの行
+        directory: 一時ディレクトリ
+
+    Returns:
+        str: ランファイルのパス
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows(rows)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Row]:
+    """
+    ランファイルを読み出します。
+
+    Args:
+        path: ランファイルのパス
+
+    Yields:
+        Row: 注文番号と決済金額
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        for order_number, amount in csv.reader(file):
+            yield order_number, amount
+
+
+def _merge_runs(paths: List[str], directory: str) -> str:
+    """
+    複数のランを1つのランにマージします。
+
+    Args:
+        paths: マージするランファイルのパス
+        directory: 一時ディレクトリ
+
+    Returns:
+        str: マージ後のランファイルのパス
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows(
+            heapq.merge(*(_read_run(p) for p in paths), key=itemgetter(0))
+        )
+    for p in paths:
+        os.remove(p)
+    return path
+
+
+def external_sort(
+    rows: Iterable[Row],
+    directory: str,
+    run_rows: int,
+    fan_in: int = 64,
+) -> Tuple[Iterator[Row], int]:
+    """
+    行を注文番号で整列します。
+
+    run_rows件ごとに整列してランを書き出し、同時に開くランがfan_in以下になるまで
+    段階的にマージしてから、最終段のマージ結果を順に返します。
+
+    Args:
+        rows: 整列する行
+        directory: ランを書き出す一時ディレクトリ
+        run_rows: 1つのランに含める行数（メモリ上に保持する行数の上限）
+        fan_in: 一度にマージするランの上限
+
+    Returns:
+        Tuple[Iterator[Row], int]: 整列済みの行のイテレータと入力行数
+    """
+    runs: List[str] = []
+    buffer: List[Row] = []
+    count = 0
+    for row in rows:
+        buffer.append(row)
+        count += 1
+        if len(buffer) >= run_rows:
+            buffer.sort(key=itemgetter(0))
+            runs.append(_write_run(buffer, directory))
+            buffer = []
+    if not runs:
+        buffer.sort(key=itemgetter(0))
+        return iter(buffer), count
+    if buffer:
+        buffer.sort(key=itemgetter(0))
+        runs.append(_write_run(buffer, directory))
+        buffer = []
+
+    while len(runs) > fan_in:
+        runs = [_merge_runs(runs[i:i + fan_in], directory) for i in range(0, len(runs), fan_in)]
+    logger.info(f"{count} 行を {len(runs)} 個のランに整列しました")
+    return heapq.merge(*(_read_run(p) for p in runs), key=itemgetter(0)), count
+
+
+def _merge_join(
+    gateway: Iterator[Row], provider: Iterator[Row]
+) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """
+    整列済みの両側を注文番号で突き合わせます。
+
+    Args:
+        gateway: 整列済みのゲートウェイ側の行
+        provider: 整列済みの決済事業者側の行
+
+    Yields:
+        Tuple[str, List[str], List[str]]: 注文番号と両側の金額のリスト
+    """
+    left = groupby(gateway, key=itemgetter(0))
+    right = groupby(provider, key=itemgetter(0))
+    left_group = next(left, None)
+    right_group = next(right, None)
+    while left_group is not None or right_group is not None:
+        if right_group is None or (left_group is not None and left_group[0] < right_group[0]):
+            yield left_group[0], [a for _, a in left_group[1]], []
+            left_group = next(left, None)
+        elif left_group is None or right_group[0] < left_group[0]:
+            yield right_group[0], [], [a for _, a in right_group[1]]
+            right_group = next(right, None)
+        else:
+            yield left_group[0], [a for _, a in left_group[1]], [a for _, a in right_group[1]]
+            left_group = next(left, None)
+            right_group = next(right, None)
+
+
+def _parse_amount(amount: str) -> Optional[int]:
+    """
+    金額を整数（円）に変換します。
+
+    Args:
+        amount: 金額の文字列
+
+    Returns:
+        Optional[int]: 金額（解釈できない場合はNone）
+    """
+    try:
+        return int(amount.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _compare_batch(
+    batch: List[Tuple[str, str, str]], vectorized: bool
+) -> Iterator[Discrepancy]:
+    """
+    1対1で対応した注文の金額を比較します。
+
+    Args:
+        batch: 注文番号と両側の金額
+        vectorized: numpyで一括比較するかどうか
+
+    Yields:
+        Discrepancy: 金額不一致または金額を解釈できない注文
+    """
+    parsed = []
+    for order_number, gateway_amount, provider_amount in batch:
+        g, p = _parse_amount(gateway_amount), _parse_amount(provider_amount)
+        if g is None or p is None:
+            yield Discrepancy(INVALID_AMOUNT, order_number, gateway_amount, provider_amount, 1, 1)
+        else:
+            parsed.append((order_number, gateway_amount, provider_amount, g, p))
+
+    if vectorized and np is not None and parsed:
+        gateway_values = np.fromiter((row[3] for row in parsed), dtype=np.int64, count=len(parsed))
+        provider_values = np.fromiter((row[4] for row in parsed), dtype=np.int64, count=len(parsed))
+        mismatched = np.flatnonzero(gateway_values != provider_values).tolist()
+    else:
+        mismatched = [i for i, row in enumerate(parsed) if row[3] != row[4]]
+    for i in mismatched:
+        order_number, gateway_amount, provider_amount, _, _ = parsed[i]
+        yield Discrepancy(AMOUNT_MISMATCH, order_number, gateway_amount, provider_amount, 1, 1)
+
+
+class ReconcileRun:
+    """
+    1回分の照合処理。
+
+    executeで差異を順に返し、消費し終えた後にreportで集計結果を参照できます。
+    """
+
+    def __init__(
+        self,
+        memory_mb: int = 256,
+        fan_in: int = 64,
+        vectorized: bool = True,
+        workdir: Optional[str] = None,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            memory_mb: 整列に使用するメモリの上限（MB）
+            fan_in: 一度にマージするランの上限
+            vectorized: numpyで金額を一括比較するかどうか
+            workdir: ランを書き出すディレクトリ
+        """
+        self.run_rows = max(1000, memory_mb * 1024 * 1024 // _ROW_BYTES)
+        self.fan_in = max(2, fan_in)
+        self.vectorized = vectorized
+        self.workdir = workdir
+        self.report = ReconcileReport()
+
+    def execute(
+        self, gateway_rows: Iterable[Row], provider_rows: Iterable[Row]
+    ) -> Iterator[Discrepancy]:
+        """
+        両側を照合し、差異を順に返します。
+
+        Args:
+            gateway_rows: ゲートウェイ側の行
+            provider_rows: 決済事業者側の行
+
+        Yields:
+            Discrepancy: 差異
+        """
+        report = self.report
+        with tempfile.TemporaryDirectory(prefix="reconcile-", dir=self.workdir) as directory:
+            gateway_dir = os.path.join(directory, "gateway")
+            provider_dir = os.path.join(directory, "provider")
+            os.mkdir(gateway_dir)
+            os.mkdir(provider_dir)
+            gateway, report.gateway_rows = external_sort(
+                gateway_rows, gateway_dir, self.run_rows, self.fan_in
+            )
+            provider, report.provider_rows = external_sort(
+                provider_rows, provider_dir, self.run_rows, self.fan_in
+            )
+
+            batch: List[Tuple[str, str, str]] = []
+            for order_number, gateway_amounts, provider_amounts in _merge_join(gateway, provider):
+                if not provider_amounts:
+                    report.missing_in_provider += 1
+                    yield Discrepancy(
+                        MISSING_IN_PROVIDER, order_number, gateway_amounts[0], None,
+                        len(gateway_amounts), 0,
+                    )
+                elif not gateway_amounts:
+                    report.missing_in_gateway += 1
+                    yield Discrepancy(
+                        MISSING_IN_GATEWAY, order_number, None, provider_amounts[0],
+                        0, len(provider_amounts),
+                    )
+                elif len(gateway_amounts) > 1 or len(provider_amounts) > 1:
+                    report.duplicate += 1
+                    yield Discrepancy(
+                        DUPLICATE, order_number, gateway_amounts[0], provider_amounts[0],
+                        len(gateway_amounts), len(provider_amounts),
+                    )
+                else:
+                    batch.append((order_number, gateway_amounts[0], provider_amounts[0]))
+                    if len(batch) >= _COMPARE_BATCH:
+                        yield from self._flush(batch)
+                        batch = []
+            yield from self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, str, str]]) -> Iterator[Discrepancy]:
+        """
+        溜まった1対1の注文の金額を比較します。
+
+        Args:
+            batch: 注文番号と両側の金額
+
+        Yields:
+            Discrepancy: 金額の差異
+        """
+        mismatched = 0
+        for discrepancy in _compare_batch(batch, self.vectorized):
+            if discrepancy.kind == INVALID_AMOUNT:
+                self.report.invalid_amount += 1
+            else:
+                self.report.amount_mismatch += 1
+            mismatched += 1
+            yield discrepancy
+        self.report.matched += len(batch) - mismatched
+
+
+def write_discrepancies(discrepancies: Iterable[Discrepancy], output: TextIO) -> None:
+    """
+    差異をCSV形式で書き出します。
+
+    Args:
+        discrepancies: 差異
+        output: 出力先
+    """
+    writer = csv.writer(output)
+    writer.writerow(
+        ["kind", "storeOrderNumber", "gatewayAmount", "providerAmount", "gatewayCount", "providerCount"]
+    )
+    for d in discrepancies:
+        writer.writerow(
+            [d.kind, d.order_number, d.gateway_amount, d.provider_amount, d.gateway_count, d.provider_count]
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    照合コマンドのエントリーポイント。
+
+    Args:
+        argv: コマンドライン引数
+
+    Returns:
+        int: 差異がなければ0、差異があれば1
+    """
+    parser = argparse.ArgumentParser(description="ゲートウェイの送信記録と精算ファイルの照合")
+    parser.add_argument("--gateway", required=True, help="ジャーナルのディレクトリ、またはCSVファイル")
+    parser.add_argument("--provider", required=True, help="決済事業者の精算CSVファイル")
+    parser.add_argument("--order-column", default="storeOrderNumber", help="精算CSVの注文番号の列名")
+    parser.add_argument("--amount-column", default="settlementAmount", help="精算CSVの金額の列名")
+    parser.add_argument("--delimiter", default=",", help="精算CSVの区切り文字")
+    parser.add_argument("--encoding", default="utf-8", help="精算CSVの文字コード（例: cp932）")
+    parser.add_argument("--memory-mb", type=int, default=256, help="整列に使用するメモリの上限（MB）")
+    parser.add_argument("--fan-in", type=int, default=64, help="一度にマージするランの上限")
+    parser.add_argument("--workdir", help="一時ファイルの書き出し先")
+    parser.add_argument("--no-vectorize", action="store_true", help="numpyによる一括比較を無効にする")
+    parser.add_argument("--output", help="差異の出力先CSV（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.gateway):
+        gateway_rows: Iterable[Row] = iter_journal_orders(args.gateway)
+    else:
+        gateway_rows = iter_csv_orders(args.gateway)
+    provider_rows = iter_csv_orders(
+        args.provider, args.order_column, args.amount_column, args.delimiter, args.encoding
+    )
+
+    run = ReconcileRun(
+        memory_mb=args.memory_mb,
+        fan_in=args.fan_in,
+        vectorized=not args.no_vectorize,
+        workdir=args.workdir,
+    )
+    discrepancies = run.execute(gateway_rows, provider_rows)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as output:
+            write_discrepancies(discrepancies, output)
+    else:
+        write_discrepancies(discrepancies, sys.stdout)
+
+    print(json.dumps(asdict(run.report), ensure_ascii=False), file=sys.stderr)
+    return 1 if run.report.discrepancies else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""
+ベンチマークパッケージ。
+
+ゲートウェイの性能計測用ツールを提供します。
+"""
+
+from __future__ import annotations
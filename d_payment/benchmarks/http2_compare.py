@@ -0,0 +1,182 @@
+"""
+HTTP/1.1とHTTP/2の上流接続の比較モジュール。
+
+上流シミュレーターに対して、HttpClientをHTTP/1.1のコネクションプールと
+HTTP/2の多重化コネクションでそれぞれ高い同時実行数で動かし、
+使用したソケット数とレイテンシ（特にテールレイテンシ）を比較します。
+
+使用例:
+    python -m benchmarks.http2_compare --concurrency 200 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.infrastructure.http_client import HTTP2_AVAILABLE, HttpClient
+from benchmarks.loadtest import _git_revision, save_results
+from benchmarks.stats import summarize
+from benchmarks.upstream import Scenario, UpstreamSimulator
+
+# 比較するモード
+MODE_HTTP1 = "http1"
+MODE_HTTP2 = "http2"
+
+
+def build_client(mode: str, args: argparse.Namespace) -> HttpClient:
+    """
+    モードに応じたHTTPクライアントを生成します。
+
+    Args:
+        mode: http1またはhttp2
+        args: コマンドライン引数
+
+    Returns:
+        HttpClient: HTTPクライアント
+    """
+    if mode == MODE_HTTP2:
+        return HttpClient(
+            http2=True,
+            http2_connections=args.http2_connections,
+            http2_max_streams=args.http2_max_streams,
+            http2_prior_knowledge=True,
+        )
+    return HttpClient(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+
+
+async def run_mode(
+    mode: str, simulator: UpstreamSimulator, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """
+    1つのモードで上流シミュレーターに負荷をかけます。
+
+    Args:
+        mode: http1またはhttp2
+        simulator: 別スレッドで起動済みの上流シミュレーター
+        args: コマンドライン引数
+
+    Returns:
+        Dict[str, Any]: 集計結果と使用したソケット数
+    """
+    client = build_client(mode, args)
+    latencies: List[float] = []
+    errors = 0
+    sequence = 0
+    try:
+        # ウォームアップ（HTTP/2のネゴシエーションとコネクションの確立を計測から除く）
+        await asyncio.gather(
+            *(client.post(simulator.url, {"transactionId": "warmup"}) for _ in range(8))
+        )
+        connections_before = simulator.connection_count
+        simulator.peak_connections = simulator.active_connections
+        deadline = time.perf_counter() + args.duration
+
+        async def worker() -> None:
+            nonlocal errors, sequence
+            while time.perf_counter() < deadline:
+                sequence += 1
+                started = time.perf_counter()
+                response = await client.post(
+                    simulator.url, {"transactionId": f"h2bench{sequence:012d}"}
+                )
+                if response.get("responseCode") == "0000":
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        protocol = client.protocol
+    finally:
+        await client.aclose()
+
+    result = summarize(latencies, elapsed, errors)
+    result.update(
+        {
+            "mode": mode,
+            "protocol": protocol,
+            "concurrency": args.concurrency,
+            "sockets_opened": simulator.connection_count - connections_before,
+            "peak_open_sockets": simulator.peak_connections,
+        }
+    )
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    コマンドラインからHTTP/1.1とHTTP/2を比較します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="HTTP/1.1とHTTP/2の上流接続の比較")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-connections", type=int, default=100,
+                        help="HTTP/1.1の最大同時コネクション数")
+    parser.add_argument("--http2-connections", type=int, default=2)
+    parser.add_argument("--http2-max-streams", type=int, default=100)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    modes = [MODE_HTTP1]
+    if HTTP2_AVAILABLE:
+        modes.append(MODE_HTTP2)
+    else:
+        print("h2 is not installed; measuring HTTP/1.1 only")
+
+    simulator = UpstreamSimulator(
+        scenario=Scenario.fixed_latency(args.upstream_latency_ms),
+        max_concurrent_streams=args.http2_max_streams,
+    )
+    results_by_mode = []
+    with simulator.run_in_thread():
+        for mode in modes:
+            results_by_mode.append(asyncio.run(run_mode(mode, simulator, args)))
+
+    print(
+        f"concurrency={args.concurrency} duration={args.duration}s "
+        f"upstream_latency={args.upstream_latency_ms}ms"
+    )
+    for result in results_by_mode:
+        latency = result["latency_ms"]
+        print(
+            f"  {result['mode']:6s} ({result['protocol']}) "
+            f"sockets={result['sockets_opened']:4d} peak_open={result['peak_open_sockets']:4d} "
+            f"throughput={result['throughput_rps']:9.1f} rps "
+            f"p50={latency['p50']:7.2f} ms p99={latency['p99']:7.2f} ms "
+            f"max={latency['max']:7.2f} ms errors={result['errors']}"
+        )
+
+    results = {
+        "name": "http2",
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "max_connections": args.max_connections,
+            "http2_connections": args.http2_connections,
+            "http2_max_streams": args.http2_max_streams,
+        },
+        "modes": results_by_mode,
+    }
+    print(f"results saved to {save_results(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
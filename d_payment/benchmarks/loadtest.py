@@ -0,0 +1,488 @@
+"""
+負荷試験ハーネスモジュール。
+
+ゲートウェイをuvicornで起動し、ローカルの上流シミュレーターに向けた状態で
+/api/receive に負荷をかけ、スループットとレイテンシを計測します。
+
+使用例:
+    python -m benchmarks.loadtest --rate 100 --rate 200 --duration 10
+    python -m benchmarks.loadtest --compare results/a.json results/b.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.stats import find_saturation, summarize
+
+# d_paymentディレクトリ（サブプロセスの作業ディレクトリ）
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 結果ファイルの保存先
+RESULTS_DIR = PROJECT_DIR / "benchmarks" / "results"
+
+# 負荷試験で送信するエンドポイント
+RECEIVE_PATH = "/api/receive"
+
+# 同時実行数スイープのデフォルト値
+DEFAULT_CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def build_payload(sequence: int) -> Dict[str, Any]:
+    """
+    負荷試験用の決済リクエストを生成します。
+
+    Args:
+        sequence: リクエストの通し番号
+
+    Returns:
+        Dict[str, Any]: /api/receive に送信するリクエストデータ
+    """
+    return {
+        "data": {
+            "billingToken": "9000000248250856006510",
+            "paymentInfo": {
+                "amount": 100 + sequence % 9900,
+                "orderNumber": f"BENCH{sequence:010d}",
+                "description": "負荷試験",
+            },
+        }
+    }
+
+
+class ServerProcess:
+    """
+    サブプロセスで起動したサーバー。
+
+    コンテキストマネージャーとして使用し、終了時にプロセスを停止します。
+    """
+
+    def __init__(self, name: str, command: List[str], env: Optional[Dict[str, str]] = None):
+        """
+        初期化メソッド。
+
+        Args:
+            name: ログ表示用の名前
+            command: 実行するコマンド
+            env: 追加の環境変数
+        """
+        self.name = name
+        self.command = command
+        self.env = {**os.environ, **(env or {})}
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "ServerProcess":
+        self._process = subprocess.Popen(
+            self.command,
+            cwd=PROJECT_DIR,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """プロセスID。"""
+        return self._process.pid if self._process else None
+
+
+def upstream_command(
+    port: int, latency_ms: float, scenario: Optional[Path] = None
+) -> List[str]:
+    """
+    上流シミュレーターの起動コマンドを生成します。
+
+    Args:
+        port: 待ち受けポート
+        latency_ms: 上流の固定遅延（ミリ秒）
+        scenario: 障害シナリオファイル（指定時は固定遅延より優先）
+
+    Returns:
+        List[str]: 起動コマンド
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.upstream",
+        "--port", str(port), "--latency-ms", str(latency_ms),
+    ]
+    if scenario is not None:
+        command += ["--scenario", str(scenario)]
+    return command
+
+
+def gateway_command(port: int) -> List[str]:
+    """
+    ゲートウェイの起動コマンドを生成します。
+
+    Args:
+        port: 待ち受けポート
+
+    Returns:
+        List[str]: 起動コマンド
+    """
+    return [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+
+
+def wait_until_ready(url: str, timeout: float = 15.0) -> None:
+    """
+    サーバーが応答するまで待機します。
+
+    Args:
+        url: 確認に使用するURL
+        timeout: 最大待機秒数
+
+    Raises:
+        RuntimeError: タイムアウトまでに応答しなかった場合
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"サーバーが起動しませんでした: {url}")
+
+
+async def run_fixed_rate(
+    url: str,
+    rate: float,
+    duration: float,
+    payload_factory: Callable[[int], Dict[str, Any]] = build_payload,
+    max_outstanding: int = 10000,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    固定到着率（オープンループ）で負荷をかけます。
+
+    レイテンシは予定送信時刻から計測するため、サーバーの遅延で
+    送信が詰まった場合もその待ち時間が結果に反映されます。
+
+    Args:
+        url: 送信先URL
+        rate: 1秒あたりの到着数
+        duration: 計測時間（秒）
+        payload_factory: 通し番号からリクエストを生成する関数
+        max_outstanding: 同時に保持する未完了リクエストの上限
+        timeout: リクエストのタイムアウト秒数
+
+    Returns:
+        Dict[str, Any]: 集計結果
+    """
+    latencies: List[float] = []
+    errors = 0
+    dropped = 0
+    total = int(rate * duration)
+    limits = httpx.Limits(max_connections=max_outstanding, max_keepalive_connections=1000)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+
+        async def send(sequence: int, scheduled: float) -> None:
+            nonlocal errors
+            try:
+                response = await client.post(url, json=payload_factory(sequence))
+                if response.status_code >= 400:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - scheduled)
+            except httpx.HTTPError:
+                errors += 1
+
+        tasks = set()
+        start = time.perf_counter()
+        for sequence in range(total):
+            scheduled = start + sequence / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= max_outstanding:
+                dropped += 1
+                continue
+            task = asyncio.create_task(send(sequence, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    result = summarize(latencies, elapsed, errors)
+    result.update({"target_rate": rate, "dropped": dropped})
+    return result
+
+
+async def run_closed_loop(
+    url: str,
+    concurrency: int,
+    duration: float,
+    payload_factory: Callable[[int], Dict[str, Any]] = build_payload,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    固定同時実行数（クローズドループ）で負荷をかけます。
+
+    Args:
+        url: 送信先URL
+        concurrency: 同時実行数
+        duration: 計測時間（秒）
+        payload_factory: 通し番号からリクエストを生成する関数
+        timeout: リクエストのタイムアウト秒数
+
+    Returns:
+        Dict[str, Any]: 集計結果
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload_factory(next(counter)))
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result = summarize(latencies, elapsed, errors)
+    result["concurrency"] = concurrency
+    return result
+
+
+async def sweep_concurrency(
+    url: str, levels: List[int], duration: float, min_gain: float = 0.05
+) -> Dict[str, Any]:
+    """
+    同時実行数を段階的に増やして飽和点を求めます。
+
+    Args:
+        url: 送信先URL
+        levels: 計測する同時実行数（昇順）
+        duration: 各段階の計測時間（秒）
+        min_gain: 飽和とみなすスループット増加率の閾値
+
+    Returns:
+        Dict[str, Any]: 各段階の結果と飽和点
+    """
+    points = []
+    for concurrency in levels:
+        point = await run_closed_loop(url, concurrency, duration)
+        print(
+            f"  concurrency={concurrency:4d} "
+            f"throughput={point['throughput_rps']:9.1f} rps "
+            f"p99={point['latency_ms']['p99']:8.2f} ms"
+        )
+        points.append(point)
+    return {"points": points, "saturation_concurrency": find_saturation(points, min_gain)}
+
+
+def _git_revision() -> str:
+    """
+    現在のgitリビジョンを取得します。
+
+    Returns:
+        str: 短縮コミットハッシュ（取得できない場合は"unknown"）
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    """
+    計測結果をJSONファイルに保存します。
+
+    Args:
+        results: 計測結果
+        output: 保存先（省略時はresultsディレクトリに自動命名）
+
+    Returns:
+        Path: 保存したファイルのパス
+    """
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{results['name']}-{stamp}-{results['meta']['git_revision']}.json"
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return output
+
+
+def compare_results(baseline_path: Path, candidate_path: Path) -> None:
+    """
+    2つの計測結果を比較して表示します。
+
+    Args:
+        baseline_path: 基準となる結果ファイル
+        candidate_path: 比較対象の結果ファイル
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    candidate = json.loads(candidate_path.read_text(encoding="utf-8"))
+    print(f"baseline:  {baseline['meta']['git_revision']}  candidate: {candidate['meta']['git_revision']}")
+
+    for base, cand in zip(baseline.get("fixed_rate", []), candidate.get("fixed_rate", [])):
+        print(f"rate={base['target_rate']}")
+        for key in ["p50", "p95", "p99", "p999"]:
+            b, c = base["latency_ms"][key], cand["latency_ms"][key]
+            change = (c - b) / b * 100 if b else 0.0
+            print(f"  {key:>5}: {b:9.2f} ms -> {c:9.2f} ms ({change:+.1f}%)")
+
+    base_sweep = baseline.get("concurrency_sweep") or {}
+    cand_sweep = candidate.get("concurrency_sweep") or {}
+    if base_sweep and cand_sweep:
+        print(
+            "saturation: "
+            f"{base_sweep['saturation_concurrency']} -> {cand_sweep['saturation_concurrency']}"
+        )
+        base_peak = max(p["throughput_rps"] for p in base_sweep["points"])
+        cand_peak = max(p["throughput_rps"] for p in cand_sweep["points"])
+        print(f"peak throughput: {base_peak:.1f} rps -> {cand_peak:.1f} rps")
+
+
+async def run_benchmark(args: argparse.Namespace, gateway_url: str) -> Dict[str, Any]:
+    """
+    引数で指定された負荷試験を実行します。
+
+    Args:
+        args: コマンドライン引数
+        gateway_url: ゲートウェイのベースURL
+
+    Returns:
+        Dict[str, Any]: 計測結果
+    """
+    url = gateway_url + RECEIVE_PATH
+
+    # ウォームアップ（コネクション確立や初回インポートの影響を除く）
+    await run_closed_loop(url, concurrency=4, duration=args.warmup)
+
+    fixed_rate = []
+    for rate in args.rate:
+        print(f"fixed rate: {rate} rps x {args.duration}s")
+        result = await run_fixed_rate(url, rate, args.duration)
+        print(
+            f"  throughput={result['throughput_rps']:.1f} rps "
+            f"p50={result['latency_ms']['p50']:.2f} ms "
+            f"p99={result['latency_ms']['p99']:.2f} ms "
+            f"p999={result['latency_ms']['p999']:.2f} ms "
+            f"errors={result['errors']}"
+        )
+        fixed_rate.append(result)
+
+    sweep = None
+    if args.concurrency:
+        print("concurrency sweep:")
+        sweep = await sweep_concurrency(url, args.concurrency, args.sweep_duration)
+        print(f"  saturation at concurrency={sweep['saturation_concurrency']}")
+
+    return {"fixed_rate": fixed_rate, "concurrency_sweep": sweep}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    コマンドラインから負荷試験を実行します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="d払いゲートウェイ負荷試験")
+    parser.add_argument("--name", default="loadtest", help="結果ファイル名の接頭辞")
+    parser.add_argument("--rate", type=float, action="append", default=None,
+                        help="固定到着率（rps）。複数指定可")
+    parser.add_argument("--duration", type=float, default=10.0, help="固定到着率の計測秒数")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=DEFAULT_CONCURRENCY_LEVELS,
+                        help="同時実行数スイープの段階（空指定でスキップ）")
+    parser.add_argument("--sweep-duration", type=float, default=5.0, help="スイープ各段階の計測秒数")
+    parser.add_argument("--warmup", type=float, default=2.0, help="ウォームアップ秒数")
+    parser.add_argument("--upstream-latency-ms", type=float, default=5.0, help="上流の固定遅延")
+    parser.add_argument("--upstream-scenario", type=Path, default=None, help="上流の障害シナリオ")
+    parser.add_argument("--gateway-port", type=int, default=18000)
+    parser.add_argument("--upstream-port", type=int, default=19000)
+    parser.add_argument("--output", type=Path, default=None, help="結果の保存先")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="2つの結果ファイルを比較して終了")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    if args.rate is None:
+        args.rate = [50.0, 100.0, 200.0]
+
+    upstream_url = (
+        f"http://127.0.0.1:{args.upstream_port}/api/fes/rksrv/testsrvresource"
+    )
+    gateway_url = f"http://127.0.0.1:{args.gateway_port}"
+
+    with ServerProcess(
+        "upstream",
+        upstream_command(args.upstream_port, args.upstream_latency_ms, args.upstream_scenario),
+    ):
+        wait_until_ready(f"http://127.0.0.1:{args.upstream_port}/")
+        with ServerProcess(
+            "gateway",
+            gateway_command(args.gateway_port),
+            env={"PAYMENT_API_URL": upstream_url, "DEBUG": "False"},
+        ):
+            wait_until_ready(gateway_url + "/")
+            measurements = asyncio.run(run_benchmark(args, gateway_url))
+
+    results = {
+        "name": args.name,
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "upstream_scenario": str(args.upstream_scenario) if args.upstream_scenario else None,
+            "duration_s": args.duration,
+        },
+        **measurements,
+    }
+    path = save_results(results, args.output)
+    print(f"results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+マイクロベンチマークモジュール。
+
+1リクエストあたりのCPU処理（リクエスト変換、シリアライズ、スキーマ検証など）を
+ステップごとに計測し、保存済みのベースラインと比較して性能劣化を検出します。
+
+実行環境の差を吸収するため、各ケースの計測値は基準処理（キャリブレーション）に
+対する比率で比較します。計測は全ケースと基準処理を交互に複数ラウンド繰り返し、
+ラウンドごとの比率（各ラウンドの最小値どうし）の中央値を採用します。比率のばらつき（noise）も記録し、
+ばらつきの大きいケースは許容する劣化率を広げて誤検出を防ぎます。
+
+ホットパスを意図的に変更するコミットでは、同じコミットでベースラインを更新してください。
+
+使用例:
+    python -m benchmarks.micro                    # ベースラインと比較（劣化時は終了コード1）
+    python -m benchmarks.micro --update-baseline  # ベースラインを更新
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from app.application.payment_service import PaymentService, default_merchant
+from app.domain.entities.payment import RawUpstreamResponse
+from app.domain.interfaces.payment_service import HttpClientInterface
+from app.infrastructure.merchant_registry import MerchantRegistry
+from app.interfaces.api import routes
+from app.interfaces.schemas.payment import PaymentRequestSchema
+
+# ベースラインファイルのパス
+BASELINE_PATH = Path(__file__).resolve().parent / "micro_baseline.json"
+
+# 許容する劣化率のデフォルト値
+DEFAULT_TOLERANCE = 0.30
+
+# 計測のラウンド数（ラウンドごとに全ケースと基準処理を計測する）
+DEFAULT_ROUNDS = 7
+
+# 許容する劣化率の下限とする、ラウンドごとの比率のばらつきの倍数
+NOISE_FACTOR = 1.5
+
+# 計測に使用する受信リクエスト
+REQUEST_BODY: Dict[str, Any] = {
+    "data": {
+        "billingToken": "9000000248250856006510",
+        "paymentInfo": {
+            "amount": 3980,
+            "orderNumber": "ORDER12345",
+            "description": "商品購入",
+            "displayContents1": "商品購入",
+            "displayContents2": "オンラインストア",
+        },
+    }
+}
+
+# 上流の応答を模したデータ
+UPSTREAM_RESPONSE: Dict[str, Any] = {
+    "responseCode": "0000",
+    "responseMessage": "Success",
+    "transactionId": "transid0000000000001",
+    "regiChargeResList": [
+        {"storeOrderNumber": "ORDER12345", "settlementAmount": "3980", "responseCode": "0000"}
+    ],
+}
+UPSTREAM_RESPONSE_BYTES = json.dumps(UPSTREAM_RESPONSE).encode()
+
+
+class _StaticHttpClient(HttpClientInterface):
+    """
+    固定レスポンスを返すHTTPクライアント。
+    """
+
+    async def post(
+        self, url: str, data: Dict[str, Any], timeout: int = 30
+    ) -> Dict[str, Any]:
+        return UPSTREAM_RESPONSE
+
+    async def post_raw(
+        self, url: str, data: Dict[str, Any], timeout: int = 30
+    ) -> RawUpstreamResponse:
+        return RawUpstreamResponse(200, UPSTREAM_RESPONSE_BYTES, "application/json", "0000")
+
+
+@dataclass
+class Case:
+    """
+    マイクロベンチマークのケース。
+
+    is_asyncがTrueの場合、funcはコルーチン関数として扱います。
+    """
+
+    name: str
+    func: Callable[[], Any]
+    is_async: bool = False
+
+
+def _calibration() -> Any:
+    """
+    実行環境の速度を測る基準処理です。
+    """
+    total = 0
+    for i in range(200):
+        total += i * i
+    return json.dumps({"total": total, "items": [str(i) for i in range(10)]})
+
+
+def build_cases() -> List[Case]:
+    """
+    計測ケースを生成します。
+
+    Returns:
+        List[Case]: 計測ケースのリスト
+    """
+    service = PaymentService(_StaticHttpClient())
+    data = REQUEST_BODY["data"]
+    payment_request = service._transform_request(data)
+    request_dict = service._payment_request_to_dict(payment_request)
+    request_json = json.dumps(REQUEST_BODY).encode()
+    schema = PaymentRequestSchema.model_validate(REQUEST_BODY)
+    merchant = default_merchant()
+    request = Request({"type": "http", "method": "POST", "path": "/api/receive", "headers": []})
+    registry = MerchantRegistry()
+
+    return [
+        Case("calibration", _calibration),
+        Case("timestamp_isoformat",
+             lambda: datetime.now().isoformat(timespec="milliseconds") + "+09:00"),
+        Case("transform_request", lambda: service._transform_request(data)),
+        Case("payment_request_to_dict",
+             lambda: service._payment_request_to_dict(payment_request)),
+        Case("payment_request_to_dict_template",
+             lambda: service._payment_request_to_dict(payment_request, merchant)),
+        Case("schema_validate_json",
+             lambda: PaymentRequestSchema.model_validate_json(request_json)),
+        Case("json_encode_upstream_request",
+             lambda: json.dumps(request_dict).encode("utf-8")),
+        Case("json_encode_client_response",
+             lambda: JSONResponse(content=jsonable_encoder(UPSTREAM_RESPONSE)).body),
+        Case("process_payment", lambda: service.process_payment(data), is_async=True),
+        Case("receive_payment_route",
+             lambda: routes.receive_payment(schema, request, service, registry), is_async=True),
+        Case("process_payment_passthrough",
+             lambda: service.process_payment(data, passthrough=True), is_async=True),
+    ]
+
+
+def _timer(case: Case) -> Tuple[Callable[[int], float], Callable[[], None]]:
+    """
+    ケースを指定回数実行して経過秒数を返す関数と、後片付けの関数を返します。
+
+    Args:
+        case: 計測ケース
+
+    Returns:
+        Tuple[Callable[[int], float], Callable[[], None]]: 計測関数と後片付けの関数
+    """
+    if case.is_async:
+        loop = asyncio.new_event_loop()
+
+        async def run_async(number: int) -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                await case.func()
+            return time.perf_counter() - started
+
+        def run(number: int) -> float:
+            return loop.run_until_complete(run_async(number))
+
+        return run, loop.close
+
+    def run_sync(number: int) -> float:
+        func = case.func
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - started
+
+    return run_sync, lambda: None
+
+
+def _iterations(run: Callable[[int], float], min_time: float) -> int:
+    """
+    1回の計測がmin_time秒程度になる実行回数を求めます。
+
+    Args:
+        run: 計測関数
+        min_time: 1回の計測の目標時間（秒）
+
+    Returns:
+        int: 実行回数
+    """
+    number = 1
+    while run(number) < min_time / 10:
+        number *= 10
+    return max(1, int(number * min_time / max(run(number), 1e-9)))
+
+
+def measure(case: Case, min_time: float = 0.2, repeat: int = 7) -> float:
+    """
+    ケースの1回あたりの実行時間を計測します。
+
+    実行回数はmin_time秒を超えるまで自動で増やし、repeat回の最小値を採用します。
+
+    Args:
+        case: 計測ケース
+        min_time: 1ラウンドあたりの最小計測時間（秒）
+        repeat: ラウンド数
+
+    Returns:
+        float: 1回あたりの実行時間（ナノ秒）
+    """
+    run, close = _timer(case)
+    try:
+        number = _iterations(run, min_time)
+        best = min(run(number) for _ in range(repeat))
+    finally:
+        close()
+    return best / number * 1e9
+
+
+def run_suite(
+    name_filter: Optional[str] = None,
+    min_time: float = 0.05,
+    rounds: int = DEFAULT_ROUNDS,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """
+    全ケースを計測します。
+
+    ラウンドごとに基準処理と全ケースを続けて計測し（各ケースはrepeat回の最小値）、
+    ラウンド間の速度変動（CPUの周波数やほかのプロセスの影響）が
+    基準処理と各ケースに同じように現れるようにします。比率はラウンドごとの比率の中央値、
+    ばらつきはラウンドごとの比率の四分位範囲を中央値で割った値です（外れ値のラウンドの影響を受けにくい）。
+
+    Args:
+        name_filter: ケース名に含まれる文字列で絞り込む場合に指定
+        min_time: 1回の計測の最小時間（秒）
+        rounds: ラウンド数
+        repeat: ラウンドごとの計測回数
+
+    Returns:
+        Dict[str, Any]: ケースごとの実行時間（ナノ秒）、基準処理との比率、比率のばらつき
+    """
+    cases = build_cases()
+    calibration = cases[0]
+    selected = [calibration] + [
+        case for case in cases[1:] if not name_filter or name_filter in case.name
+    ]
+    timers = {case.name: _timer(case) for case in selected}
+    samples: Dict[str, List[float]] = {case.name: [] for case in selected}
+    try:
+        numbers = {name: _iterations(run, min_time) for name, (run, _) in timers.items()}
+        for _ in range(rounds):
+            for case in selected:
+                run, _ = timers[case.name]
+                number = numbers[case.name]
+                best = min(run(number) for _ in range(repeat))
+                samples[case.name].append(best / number * 1e9)
+    finally:
+        for _, close in timers.values():
+            close()
+
+    calibration_samples = samples.pop(calibration.name)
+    calibration_ns = min(calibration_samples)
+    results = {}
+    for name, ns_samples in samples.items():
+        ratios = [ns / cal for ns, cal in zip(ns_samples, calibration_samples)]
+        median = statistics.median(ratios)
+        q1, _, q3 = statistics.quantiles(ratios, n=4) if len(ratios) > 1 else (median, median, median)
+        results[name] = {
+            "ns": round(min(ns_samples), 1),
+            "ratio": round(median, 4),
+            "noise": round((q3 - q1) / median, 4),
+        }
+    return {"calibration_ns": round(calibration_ns, 1), "cases": results}
+
+
+def find_regressions(
+    baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    ベースラインと比較して劣化したケースを返します。
+
+    許容する劣化率は、ベースラインと今回の計測のうち大きい方のばらつき（noise）の
+    NOISE_FACTOR倍を下限とします。
+
+    Args:
+        baseline: ベースラインの計測結果
+        current: 今回の計測結果
+        tolerance: 許容する劣化率（ケースごとの値がベースラインにあればそちらを優先）
+
+    Returns:
+        List[str]: 劣化したケースの説明
+    """
+    regressions = []
+    for name, result in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        noise = max(base.get("noise", 0.0), result.get("noise", 0.0))
+        allowed = max(base.get("tolerance", tolerance), NOISE_FACTOR * noise)
+        change = result["ratio"] / base["ratio"] - 1
+        if change > allowed:
+            regressions.append(
+                f"{name}: {base['ratio']:.3f} -> {result['ratio']:.3f} "
+                f"({change:+.0%}, 許容 {allowed:.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    コマンドラインからマイクロベンチマークを実行します。
+
+    Args:
+        argv: コマンドライン引数
+
+    Returns:
+        int: 終了コード（劣化を検出した場合は1）
+    """
+    parser = argparse.ArgumentParser(description="決済処理のマイクロベンチマーク")
+    parser.add_argument("--update-baseline", action="store_true", help="ベースラインを更新")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--filter", default=None, help="ケース名で絞り込み")
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.filter, args.min_time, args.rounds)
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8"))
+        if args.baseline.exists()
+        else None
+    )
+
+    print(f"calibration: {current['calibration_ns']:.0f} ns")
+    for name, result in current["cases"].items():
+        line = (
+            f"{name:32s} {result['ns']:12.0f} ns  ratio={result['ratio']:8.3f}"
+            f"  noise={result['noise']:6.1%}"
+        )
+        if baseline and name in baseline["cases"]:
+            change = result["ratio"] / baseline["cases"][name]["ratio"] - 1
+            line += f"  ({change:+.1%})"
+        elif baseline:
+            line += "  (ベースラインなし)"
+        print(line)
+
+    if args.update_baseline:
+        if baseline:
+            # ケースごとに設定した許容率は引き継ぐ
+            for name, result in current["cases"].items():
+                if "tolerance" in baseline["cases"].get(name, {}):
+                    result["tolerance"] = baseline["cases"][name]["tolerance"]
+        args.baseline.write_text(
+            json.dumps(current, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("ベースラインがありません。--update-baseline で作成してください")
+        return 0
+
+    regressions = find_regressions(baseline, current, args.tolerance)
+    if regressions:
+        print("性能劣化を検出しました:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+トラフィックリプレイモジュール。
+
+キャプチャモードで記録した /api/receive のリクエストを、記録時の到着間隔を
+指定倍速に縮めてゲートウェイへ再送し、レイテンシのパーセンタイルを報告します。
+
+使用例:
+    python -m benchmarks.replay capture/receive.cap --target http://127.0.0.1:8000 --speed 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.infrastructure.capture import read_capture
+from benchmarks.loadtest import RECEIVE_PATH
+from benchmarks.stats import summarize
+
+
+def load_schedule(
+    path: str, speed: float = 1.0, limit: Optional[int] = None
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    キャプチャファイルから送信スケジュールを作成します。
+
+    Args:
+        path: キャプチャファイルのパス
+        speed: 再生速度の倍率（2.0の場合は到着間隔を半分にする）
+        limit: 読み込むリクエスト数の上限
+
+    Returns:
+        List[Tuple[float, Dict[str, Any]]]: 開始からの送信時刻（秒）とリクエストボディ
+    """
+    schedule = []
+    first: Optional[float] = None
+    for arrived_at, body in read_capture(path):
+        if first is None:
+            first = arrived_at
+        schedule.append(((arrived_at - first) / speed, body))
+        if limit is not None and len(schedule) >= limit:
+            break
+    return schedule
+
+
+async def replay(
+    url: str,
+    schedule: List[Tuple[float, Dict[str, Any]]],
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    スケジュールどおりにリクエストを再送します。
+
+    レイテンシは予定送信時刻から計測します。
+
+    Args:
+        url: 送信先URL
+        schedule: 開始からの送信時刻とリクエストボディ
+        timeout: リクエストのタイムアウト秒数
+
+    Returns:
+        Dict[str, Any]: 集計結果
+    """
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    errors = 0
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+
+        async def send(scheduled: float, body: Dict[str, Any]) -> None:
+            nonlocal errors
+            try:
+                response = await client.post(url, json=body)
+            except httpx.HTTPError:
+                errors += 1
+                return
+            key = str(response.status_code)
+            status_counts[key] = status_counts.get(key, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - scheduled)
+
+        tasks = set()
+        start = time.perf_counter()
+        for offset, body in schedule:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(send(scheduled, body))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    result = summarize(latencies, elapsed, errors)
+    result["status_counts"] = status_counts
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    コマンドラインからリプレイを実行します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="キャプチャしたトラフィックのリプレイ")
+    parser.add_argument("capture", help="キャプチャファイル")
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="ゲートウェイのベースURL")
+    parser.add_argument("--speed", type=float, default=1.0, help="再生速度の倍率")
+    parser.add_argument("--limit", type=int, default=None, help="再送するリクエスト数の上限")
+    parser.add_argument("--output", type=Path, default=None, help="結果の保存先（JSON）")
+    args = parser.parse_args(argv)
+
+    schedule = load_schedule(args.capture, args.speed, args.limit)
+    if not schedule:
+        print("キャプチャファイルにリクエストがありません")
+        return
+    print(
+        f"replaying {len(schedule)} requests over {schedule[-1][0]:.1f}s "
+        f"at {args.speed}x to {args.target}"
+    )
+
+    result = asyncio.run(replay(args.target + RECEIVE_PATH, schedule))
+    latency = result["latency_ms"]
+    print(
+        f"throughput={result['throughput_rps']:.1f} rps errors={result['errors']} "
+        f"p50={latency['p50']:.2f} ms p95={latency['p95']:.2f} ms "
+        f"p99={latency['p99']:.2f} ms p999={latency['p999']:.2f} ms"
+    )
+    print(f"status: {result['status_counts']}")
+
+    if args.output:
+        result["meta"] = {
+            "capture": args.capture,
+            "speed": args.speed,
+            "target": args.target,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+ランタイムプロファイル比較モジュール。
+
+`python -m app`でゲートウェイを起動し、defaultプロファイル（asyncio/h11）と
+productionプロファイル（uvloop/httptools）のスループットとレイテンシを比較します。
+
+使用例:
+    python -m benchmarks.runtime_compare --concurrency 16 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.server import PROFILE_DEFAULT, PROFILE_PRODUCTION, resolve_runtime
+from benchmarks.loadtest import (
+    RECEIVE_PATH,
+    ServerProcess,
+    _git_revision,
+    run_closed_loop,
+    save_results,
+    upstream_command,
+    wait_until_ready,
+)
+from benchmarks.stats import summarize
+
+# 比較するエンドポイント（ルートはフレームワーク単体、receiveは上流呼び出しを含む）
+TARGETS = {"root": "/", "receive": RECEIVE_PATH}
+
+
+async def _get_root_loop(url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """
+    GETでルートエンドポイントに負荷をかけます。
+
+    Args:
+        url: 送信先URL
+        concurrency: 同時実行数
+        duration: 計測時間（秒）
+
+    Returns:
+        Dict[str, Any]: 集計結果
+    """
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    result = summarize(latencies, elapsed, errors)
+    result["concurrency"] = concurrency
+    return result
+
+
+async def _measure(base_url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """
+    各エンドポイントを計測します。
+
+    Args:
+        base_url: ゲートウェイのベースURL
+        concurrency: 同時実行数
+        duration: 各エンドポイントの計測時間（秒）
+
+    Returns:
+        Dict[str, Any]: エンドポイントごとの集計結果
+    """
+    # ウォームアップ
+    await _get_root_loop(base_url + "/", concurrency, 1.0)
+    return {
+        "root": await _get_root_loop(base_url + TARGETS["root"], concurrency, duration),
+        "receive": await run_closed_loop(base_url + TARGETS["receive"], concurrency, duration),
+    }
+
+
+def run_profile(
+    profile: str, port: int, upstream_url: str, concurrency: int, duration: float
+) -> Dict[str, Any]:
+    """
+    指定したプロファイルでゲートウェイを起動して計測します。
+
+    Args:
+        profile: ランタイムプロファイル
+        port: ゲートウェイの待ち受けポート
+        upstream_url: 上流シミュレーターのURL
+        concurrency: 同時実行数
+        duration: 計測時間（秒）
+
+    Returns:
+        Dict[str, Any]: 計測結果
+    """
+    env = {
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_RUNTIME_PROFILE": profile,
+        "SERVER_WORKERS": "1",
+        "PAYMENT_API_URL": upstream_url,
+        "DEBUG": "False",
+    }
+    base_url = f"http://127.0.0.1:{port}"
+    with ServerProcess(f"gateway-{profile}", [sys.executable, "-m", "app"], env=env):
+        wait_until_ready(base_url + "/")
+        measurements = asyncio.run(_measure(base_url, concurrency, duration))
+    return {"profile": profile, "runtime": resolve_runtime(profile), **measurements}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    コマンドラインからランタイムプロファイルを比較します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="ランタイムプロファイルの比較")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=5.0)
+    parser.add_argument("--gateway-port", type=int, default=18000)
+    parser.add_argument("--upstream-port", type=int, default=19000)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}/api/fes/rksrv/testsrvresource"
+    profiles = []
+    with ServerProcess("upstream", upstream_command(args.upstream_port, args.upstream_latency_ms)):
+        wait_until_ready(f"http://127.0.0.1:{args.upstream_port}/")
+        for profile in [PROFILE_DEFAULT, PROFILE_PRODUCTION]:
+            result = run_profile(
+                profile, args.gateway_port, upstream_url, args.concurrency, args.duration
+            )
+            profiles.append(result)
+
+    print(f"concurrency={args.concurrency} duration={args.duration}s")
+    for target in TARGETS:
+        base, prod = profiles[0][target], profiles[1][target]
+        gain = (
+            (prod["throughput_rps"] / base["throughput_rps"] - 1) * 100
+            if base["throughput_rps"]
+            else 0.0
+        )
+        print(f"{target}:")
+        for result in profiles:
+            runtime = result["runtime"]
+            point = result[target]
+            print(
+                f"  {result['profile']:10s} ({runtime['loop']}/{runtime['http']}) "
+                f"throughput={point['throughput_rps']:9.1f} rps "
+                f"p50={point['latency_ms']['p50']:7.2f} ms "
+                f"p99={point['latency_ms']['p99']:7.2f} ms"
+            )
+        print(f"  production vs default: {gain:+.1f}% throughput")
+
+    results = {
+        "name": "runtime",
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        },
+        "profiles": profiles,
+    }
+    print(f"results saved to {save_results(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
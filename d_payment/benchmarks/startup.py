@@ -0,0 +1,245 @@
+"""
+起動時間計測モジュール。
+
+`python -m app`でゲートウェイを起動してから最初の`/`に応答するまでの時間（コールドスタート）を
+計測し、`python -X importtime`によるパッケージごとのインポート時間と、
+ゲートウェイが出力する起動処理の段階ごとの所要時間に分けて表示します。
+
+使用例:
+    python -m benchmarks.startup --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.startup import REPORT_MESSAGE
+from benchmarks.loadtest import PROJECT_DIR, _git_revision, save_results
+
+# インポート時間を計測するモジュール
+TARGET_MODULE = "app.main"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _group(module: str) -> str:
+    """
+    モジュール名を集計の単位に変換します。
+
+    アプリケーションのモジュールはレイヤー（app.core、app.infrastructureなど）ごと、
+    それ以外はトップレベルのパッケージごとに集計します。
+
+    Args:
+        module: モジュール名
+
+    Returns:
+        str: 集計の単位
+    """
+    parts = module.split(".")
+    if parts[0] == "app" and len(parts) > 1:
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+def import_breakdown(module: str = TARGET_MODULE) -> Dict[str, Any]:
+    """
+    新しいインタープリターでモジュールをインポートし、パッケージごとのインポート時間を集計します。
+
+    インタープリターの起動時（siteなど）に読み込まれるモジュールは含めません。
+
+    Args:
+        module: インポートするモジュール
+
+    Returns:
+        Dict[str, Any]: 合計（total_ms）、パッケージごとの時間（packages、降順、ミリ秒）、
+            インポートしたモジュールの一覧（modules）
+    """
+    baseline = _imported_modules("pass")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: Dict[str, float] = {}
+    modules: List[str] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if not fields[0].isdigit():
+            continue
+        name = fields[2]
+        if name in baseline:
+            continue
+        modules.append(name)
+        group = _group(name)
+        packages[group] = packages.get(group, 0.0) + int(fields[0]) / 1000
+    ordered = dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+    return {
+        "total_ms": round(sum(ordered.values()), 1),
+        "packages": {name: round(ms, 1) for name, ms in ordered.items()},
+        "modules": modules,
+    }
+
+
+def _imported_modules(code: str) -> set:
+    """
+    新しいインタープリターでコードを実行した後にインポート済みのモジュールを返します。
+
+    Args:
+        code: 実行するコード
+
+    Returns:
+        set: モジュール名の集合
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stdout.split())
+
+
+def _read_phases(log: str) -> Dict[str, float]:
+    """
+    ゲートウェイのログから起動処理の段階ごとの所要時間を読み取ります。
+
+    Args:
+        log: ゲートウェイのログ
+
+    Returns:
+        Dict[str, float]: 段階ごとの所要時間（ミリ秒、見つからない場合は空）
+    """
+    for line in reversed(log.splitlines()):
+        position = line.find(REPORT_MESSAGE)
+        if position >= 0:
+            return json.loads(line[position + len(REPORT_MESSAGE):])
+    return {}
+
+
+def measure_cold_start(
+    env: Optional[Dict[str, str]] = None, timeout: float = 30.0
+) -> Dict[str, Any]:
+    """
+    `python -m app`でゲートウェイを起動し、最初の`/`に応答するまでの時間を計測します。
+
+    Args:
+        env: 追加の環境変数
+        timeout: 応答を待つ最大秒数
+
+    Returns:
+        Dict[str, Any]: 最初の応答までの時間（first_request_ms）と
+            ゲートウェイが出力した起動処理の内訳（phases、ミリ秒）
+
+    Raises:
+        RuntimeError: タイムアウトまでに応答しなかった場合
+    """
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    server_env = {
+        **os.environ,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": "1",
+        **(env or {}),
+    }
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "app"],
+            cwd=PROJECT_DIR,
+            env=server_env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            elapsed = None
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline and process.poll() is None:
+                try:
+                    if httpx.get(url, timeout=1.0).status_code == 200:
+                        elapsed = time.perf_counter() - started
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        log.seek(0)
+        output = log.read()
+    if elapsed is None:
+        raise RuntimeError(f"ゲートウェイが起動しませんでした:\n{output}")
+    return {"first_request_ms": round(elapsed * 1000, 1), "phases": _read_phases(output)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    コマンドラインから起動時間を計測します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="ゲートウェイの起動時間の計測")
+    parser.add_argument("--runs", type=int, default=3, help="コールドスタートの計測回数")
+    parser.add_argument("--top", type=int, default=15, help="表示するパッケージの数")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    imports = import_breakdown()
+    print(f"import {TARGET_MODULE}: {imports['total_ms']:.1f} ms ({len(imports['modules'])} modules)")
+    for name, ms in list(imports["packages"].items())[: args.top]:
+        print(f"  {name:32s} {ms:8.1f} ms")
+
+    runs = [measure_cold_start() for _ in range(args.runs)]
+    first_request = [run["first_request_ms"] for run in runs]
+    print(
+        f"cold start to first '/': median={statistics.median(first_request):.1f} ms "
+        f"min={min(first_request):.1f} ms max={max(first_request):.1f} ms"
+    )
+    print("startup phases (last run):")
+    for name, ms in runs[-1]["phases"].items():
+        print(f"  {name:32s} {ms:8.1f} ms")
+
+    results = {
+        "name": "startup",
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "runs": args.runs,
+        },
+        "imports": {"total_ms": imports["total_ms"], "packages": imports["packages"]},
+        "cold_start": runs,
+    }
+    print(f"results saved to {save_results(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+ベンチマーク統計モジュール。
+
+レイテンシのパーセンタイルやスループットの集計を提供します。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+# レポートに含めるパーセンタイル
+PERCENTILES = {"p50": 50.0, "p95": 95.0, "p99": 99.0, "p999": 99.9}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    ソート済みの値からパーセンタイルを求めます（最近傍順位法）。
+
+    Args:
+        sorted_values: 昇順にソートされた値
+        q: パーセンタイル（0〜100）
+
+    Returns:
+        float: パーセンタイル値（値が空の場合は0.0）
+    """
+    if not sorted_values:
+        return 0.0
+    rank = int(q / 100.0 * len(sorted_values) + 0.999999999)
+    index = min(max(rank, 1), len(sorted_values)) - 1
+    return sorted_values[index]
+
+
+def summarize(
+    latencies: List[float], elapsed: float, errors: int = 0
+) -> Dict[str, Any]:
+    """
+    レイテンシ計測結果を集計します。
+
+    Args:
+        latencies: 成功したリクエストのレイテンシ（秒）
+        elapsed: 計測にかかった時間（秒）
+        errors: 失敗したリクエスト数
+
+    Returns:
+        Dict[str, Any]: スループットとレイテンシ（ミリ秒）の集計結果
+    """
+    values = sorted(latencies)
+    latency_ms = {
+        name: round(percentile(values, q) * 1000, 3) for name, q in PERCENTILES.items()
+    }
+    latency_ms["mean"] = round(sum(values) / len(values) * 1000, 3) if values else 0.0
+    latency_ms["max"] = round(values[-1] * 1000, 3) if values else 0.0
+    return {
+        "count": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": latency_ms,
+    }
+
+
+def find_saturation(
+    points: List[Dict[str, Any]], min_gain: float = 0.05
+) -> Optional[int]:
+    """
+    同時実行数スイープの結果から飽和点を求めます。
+
+    同時実行数を増やしてもスループットの伸びがmin_gain未満になった
+    最初の同時実行数を飽和点とします。
+
+    Args:
+        points: concurrencyとthroughput_rpsを含む計測結果（同時実行数の昇順）
+        min_gain: 飽和とみなすスループット増加率の閾値
+
+    Returns:
+        Optional[int]: 飽和点の同時実行数（飽和が見られない場合はNone）
+    """
+    for previous, current in zip(points, points[1:]):
+        base = previous["throughput_rps"]
+        if base <= 0:
+            continue
+        if (current["throughput_rps"] - base) / base < min_gain:
+            return previous["concurrency"]
+    return None
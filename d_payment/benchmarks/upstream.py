@@ -0,0 +1,895 @@
+"""
+上流シミュレーターモジュール。
+
+d払いAPIのregiChargeReqList形式を受け付けるローカルの上流サーバーを提供します。
+レイテンシ分布、4xx/5xx/429応答、低速送信、コネクションリセットなどの障害を
+シナリオで再現でき、負荷試験やHttpClientのオフラインテストで使用します。
+
+使用例:
+    python -m benchmarks.upstream --port 9000 --latency-ms 5
+    python -m benchmarks.upstream --scenario scenarios/flaky.json --log requests.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.settings
+except ImportError:  # h2がインストールされていない環境ではHTTP/2に応答しない
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2の接続プリフェース（h2c、事前知識による接続）
+_H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+# レスポンスの固定ヘッダー
+_RESPONSE_HEAD = (
+    "HTTP/1.1 {status} {reason}\r\n"
+    "Content-Type: application/json\r\n"
+    "Content-Length: {length}\r\n"
+    "{extra}"
+    "\r\n"
+)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    409: "Conflict",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+# ステータスコード以外の障害種別
+OUTCOME_OK = "ok"
+OUTCOME_SLOW = "slow"
+OUTCOME_RESET = "reset"
+OUTCOME_HANG = "hang"
+
+# 低速送信時の1チャンクあたりのバイト数
+_DRIP_CHUNK_BYTES = 16
+
+
+def build_charge_response(request_body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    regiChargeReqList形式のリクエストに対応する正常レスポンスを生成します。
+
+    Args:
+        request_body: PaymentServiceが送信したリクエストデータ
+
+    Returns:
+        Dict[str, Any]: 外部APIを模したレスポンスデータ
+    """
+    res_list = [
+        {
+            "storeOrderNumber": item.get("storeOrderNumber", ""),
+            "settlementAmount": item.get("settlementAmount", ""),
+            "responseCode": "0000",
+        }
+        for item in request_body.get("regiChargeReqList", [])
+    ]
+    return {
+        "responseCode": "0000",
+        "responseMessage": "Success",
+        "transactionId": request_body.get("transactionId", ""),
+        "regiChargeResList": res_list,
+    }
+
+
+def build_error_response(status: int, request_body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    エラー応答のボディを生成します。
+
+    Args:
+        status: HTTPステータスコード
+        request_body: PaymentServiceが送信したリクエストデータ
+
+    Returns:
+        Dict[str, Any]: 外部APIを模したエラーレスポンスデータ
+    """
+    return {
+        "responseCode": f"E{status}",
+        "responseMessage": _REASONS.get(status, "Error"),
+        "transactionId": request_body.get("transactionId", ""),
+    }
+
+
+@dataclass
+class LatencyProfile:
+    """
+    応答レイテンシの分布。
+
+    distributionには"fixed"、"uniform"、"lognormal"を指定します。
+    """
+
+    distribution: str = "fixed"
+    median_ms: float = 0.0
+    min_ms: float = 0.0
+    max_ms: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        レイテンシを1件サンプリングします。
+
+        Args:
+            rng: 乱数生成器
+
+        Returns:
+            float: レイテンシ（ミリ秒）
+        """
+        if self.distribution == "uniform":
+            return rng.uniform(self.min_ms, self.max_ms)
+        if self.distribution == "lognormal":
+            if self.median_ms <= 0:
+                return 0.0
+            value = rng.lognormvariate(0.0, self.sigma) * self.median_ms
+            return min(value, self.max_ms) if self.max_ms > 0 else value
+        return self.median_ms
+
+
+@dataclass
+class Phase:
+    """
+    シナリオの1段階。
+
+    durationまたはrequestsに達すると次の段階に進みます。
+    どちらも指定しない段階はシナリオの最後まで継続します。
+
+    faultsは障害種別ごとの発生確率です。キーにはステータスコード（"500"、"429"など）
+    または"slow"、"reset"、"hang"を指定します。sequenceを指定した場合は、
+    確率ではなくその順番どおりに応答種別を繰り返します。
+    """
+
+    name: str = "default"
+    duration_s: Optional[float] = None
+    requests: Optional[int] = None
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    faults: Dict[str, float] = field(default_factory=dict)
+    sequence: Optional[List[str]] = None
+    drip_interval_ms: float = 50.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Phase":
+        """
+        辞書から段階を生成します。
+
+        Args:
+            data: 段階の定義
+
+        Returns:
+            Phase: 段階
+        """
+        values = dict(data)
+        values["latency"] = LatencyProfile(**values.get("latency", {}))
+        return cls(**values)
+
+
+@dataclass
+class Scenario:
+    """
+    障害シナリオ。
+
+    段階を順番に適用し、最後の段階は終了条件に関わらず継続します。
+    """
+
+    phases: List[Phase] = field(default_factory=lambda: [Phase()])
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        """
+        辞書からシナリオを生成します。
+
+        Args:
+            data: シナリオの定義
+
+        Returns:
+            Scenario: シナリオ
+        """
+        phases = [Phase.from_dict(p) for p in data.get("phases", [{}])]
+        return cls(phases=phases or [Phase()], seed=data.get("seed"))
+
+    @classmethod
+    def load(cls, path: Path) -> "Scenario":
+        """
+        JSONファイルからシナリオを読み込みます。
+
+        Args:
+            path: シナリオファイルのパス
+
+        Returns:
+            Scenario: シナリオ
+        """
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @classmethod
+    def fixed_latency(cls, latency_ms: float) -> "Scenario":
+        """
+        固定遅延のみの正常シナリオを生成します。
+
+        Args:
+            latency_ms: 固定遅延（ミリ秒）
+
+        Returns:
+            Scenario: シナリオ
+        """
+        return cls(phases=[Phase(latency=LatencyProfile(median_ms=latency_ms))])
+
+
+@dataclass
+class RequestRecord:
+    """
+    シミュレーターが受信したリクエストの記録。
+    """
+
+    sequence: int
+    connection_id: int
+    received_at: float
+    phase: str
+    outcome: str
+    status: Optional[int]
+    injected_latency_ms: float
+    total_ms: float
+    transaction_id: str
+    traceparent: str = ""
+
+
+class _ScenarioState:
+    """
+    シナリオの進行状態。
+    """
+
+    def __init__(self, scenario: Scenario):
+        self.scenario = scenario
+        self.rng = random.Random(scenario.seed)
+        self.index = 0
+        self.phase_started = time.monotonic()
+        self.phase_requests = 0
+
+    def next(self) -> Tuple[Phase, str, float]:
+        """
+        次のリクエストに適用する段階、応答種別、レイテンシを決定します。
+
+        Returns:
+            Tuple[Phase, str, float]: 段階、応答種別、レイテンシ（ミリ秒）
+        """
+        phases = self.scenario.phases
+        while self.index < len(phases) - 1 and self._phase_finished(phases[self.index]):
+            self.index += 1
+            self.phase_started = time.monotonic()
+            self.phase_requests = 0
+
+        phase = phases[self.index]
+        if phase.sequence:
+            outcome = phase.sequence[self.phase_requests % len(phase.sequence)]
+        else:
+            outcome = self._draw_outcome(phase.faults)
+        self.phase_requests += 1
+        return phase, outcome, phase.latency.sample(self.rng)
+
+    def _phase_finished(self, phase: Phase) -> bool:
+        if phase.requests is not None and self.phase_requests >= phase.requests:
+            return True
+        if phase.duration_s is not None:
+            return time.monotonic() - self.phase_started >= phase.duration_s
+        return False
+
+    def _draw_outcome(self, faults: Dict[str, float]) -> str:
+        point = self.rng.random()
+        cumulative = 0.0
+        for outcome, probability in faults.items():
+            cumulative += probability
+            if point < cumulative:
+                return outcome
+        return OUTCOME_OK
+
+
+class UpstreamSimulator:
+    """
+    上流シミュレーター。
+
+    HTTP/1.1のキープアライブに対応した最小限のサーバーで、
+    シナリオに従ってレイテンシや障害を注入します。
+    h2がインストールされている場合は、事前知識によるHTTP/2（h2c）の接続にも応答します。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        scenario: Optional[Scenario] = None,
+        log_path: Optional[Path] = None,
+        max_records: int = 100000,
+        max_concurrent_streams: int = 100,
+    ):
+        """
+        初期化メソッド。
+
+        Args:
+            host: 待ち受けホスト
+            port: 待ち受けポート（0の場合は空きポートを使用）
+            scenario: 障害シナリオ（省略時は遅延なしの正常応答）
+            log_path: リクエスト記録をJSON Linesで書き出すファイル
+            max_records: メモリ上に保持するリクエスト記録の上限
+            max_concurrent_streams: HTTP/2の1コネクションあたりの最大同時ストリーム数
+        """
+        self.host = host
+        self.port = port
+        self.log_path = log_path
+        self.records: Deque[RequestRecord] = deque(maxlen=max_records)
+        self.request_count = 0
+        self.connection_count = 0
+        self.active_connections = 0
+        self.peak_connections = 0
+        self.http2_connections = 0
+        self.max_concurrent_streams = max_concurrent_streams
+        self._scenario_state = _ScenarioState(scenario or Scenario())
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._log_file = None
+
+    @property
+    def url(self) -> str:
+        """決済エンドポイントのURL。"""
+        return f"http://{self.host}:{self.port}/api/fes/rksrv/testsrvresource"
+
+    @property
+    def scenario(self) -> Scenario:
+        """現在の障害シナリオ。"""
+        return self._scenario_state.scenario
+
+    @scenario.setter
+    def scenario(self, scenario: Scenario) -> None:
+        self._scenario_state = _ScenarioState(scenario)
+
+    def outcomes(self) -> List[str]:
+        """
+        記録済みリクエストの応答種別を受信順に返します。
+
+        Returns:
+            List[str]: 応答種別のリスト
+        """
+        return [record.outcome for record in self.records]
+
+    async def start(self) -> None:
+        """サーバーを起動します。"""
+        if self.log_path is not None:
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"上流シミュレーターを起動しました: {self.url}")
+
+    async def stop(self) -> None:
+        """サーバーを停止します。"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.transport.abort()
+            # 切断を検知したコネクションの処理が終わるのを待つ
+            if self._handlers:
+                await asyncio.wait(self._handlers, timeout=1.0)
+            await self._server.wait_closed()
+            self._server = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    async def serve_forever(self) -> None:
+        """サーバーを起動し、停止されるまで待機します。"""
+        await self.start()
+        assert self._server is not None
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    @contextmanager
+    def run_in_thread(self) -> Iterator["UpstreamSimulator"]:
+        """
+        専用スレッドのイベントループでサーバーを起動します。
+
+        pytestのフィクスチャや同期コードから使用します。
+
+        Yields:
+            UpstreamSimulator: 起動済みのシミュレーター
+        """
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        thread = threading.Thread(target=run, name="upstream-simulator", daemon=True)
+        thread.start()
+        started.wait(timeout=10)
+        try:
+            yield self
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=10)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        1つのコネクションを処理します。
+
+        Args:
+            reader: 受信ストリーム
+            writer: 送信ストリーム
+        """
+        self.connection_count += 1
+        self.active_connections += 1
+        self.peak_connections = max(self.peak_connections, self.active_connections)
+        connection_id = self.connection_count
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        try:
+            request_line = await reader.readline()
+            if request_line == _H2_PREFACE[:16]:
+                if h2 is None:
+                    # HTTP/1.1のみのサーバーと同様に、HTTP/2の接続を拒否する
+                    writer.write(_encode_response(505, b"", keep_alive=False))
+                    await writer.drain()
+                    return
+                preface = request_line + await reader.readexactly(len(_H2_PREFACE) - 16)
+                await self._handle_h2(connection_id, preface, reader, writer)
+                return
+            while True:
+                try:
+                    request = await _read_request(reader, request_line)
+                except ValueError:
+                    # 不正なリクエスト行やヘッダーには400を返してコネクションを閉じる
+                    writer.write(_encode_response(400, b"", keep_alive=False))
+                    await writer.drain()
+                    break
+                request_line = None
+                if request is None:
+                    break
+                keep_alive = await self._respond(connection_id, request, reader, writer)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.active_connections -= 1
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            if not writer.transport.is_closing():
+                writer.close()
+
+    async def _respond(
+        self,
+        connection_id: int,
+        request: Tuple[str, str, Dict[str, str], bytes],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        """
+        1件のリクエストに応答します。
+
+        Args:
+            connection_id: コネクションの通し番号
+            request: メソッド、パス、ヘッダー、ボディ
+            reader: 受信ストリーム
+            writer: 送信ストリーム
+
+        Returns:
+            bool: コネクションを維持する場合はTrue
+        """
+        method, path, headers, body = request
+        received_at = time.time()
+        started = time.perf_counter()
+        self.request_count += 1
+        # 遅延の注入中に後続のリクエストが到着しても受信順の番号を記録する
+        sequence = self.request_count
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        # ヘルスチェックなどPOST以外は障害注入の対象外
+        if method != "POST":
+            writer.write(_encode_response(200, b'{"status":"ok"}', keep_alive))
+            await writer.drain()
+            return keep_alive
+
+        phase, outcome, latency_ms = self._scenario_state.next()
+        try:
+            request_body = json.loads(body or b"{}")
+        except ValueError:
+            request_body = {}
+            outcome = "400"
+
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+        def record(status: Optional[int]) -> None:
+            self._record(
+                RequestRecord(
+                    sequence=sequence,
+                    connection_id=connection_id,
+                    received_at=received_at,
+                    phase=phase.name,
+                    outcome=outcome,
+                    status=status,
+                    injected_latency_ms=round(latency_ms, 3),
+                    total_ms=round((time.perf_counter() - started) * 1000, 3),
+                    transaction_id=str(request_body.get("transactionId", "")),
+                    traceparent=headers.get("traceparent", ""),
+                )
+            )
+
+        if outcome == OUTCOME_RESET:
+            _abort_with_reset(writer)
+            record(None)
+            return False
+        if outcome == OUTCOME_HANG:
+            # 応答せずにクライアントのタイムアウトを待つ
+            await _wait_closed(reader, writer)
+            record(None)
+            return False
+
+        status = 200 if outcome in (OUTCOME_OK, OUTCOME_SLOW) else int(outcome)
+        payload = json.dumps(
+            build_charge_response(request_body)
+            if status == 200
+            else build_error_response(status, request_body)
+        ).encode()
+        extra = "Retry-After: 1\r\n" if status == 429 else ""
+        data = _encode_response(status, payload, keep_alive, extra)
+        if outcome == OUTCOME_SLOW:
+            await _drip(writer, data, phase.drip_interval_ms)
+            record(status)
+        else:
+            # クライアントが応答を受け取るより前に記録が参照できるよう、送信前に記録する
+            record(status)
+            writer.write(data)
+            await writer.drain()
+        return keep_alive
+
+    async def _handle_h2(
+        self,
+        connection_id: int,
+        preface: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """
+        HTTP/2のコネクションを処理します。
+
+        ストリームごとに応答タスクを起動し、1つのコネクション上で並行して応答します。
+
+        Args:
+            connection_id: コネクションの通し番号
+            preface: 受信済みの接続プリフェース
+            reader: 受信ストリーム
+            writer: 送信ストリーム
+        """
+        self.http2_connections += 1
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        conn.initiate_connection()
+        conn.update_settings(
+            {h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: self.max_concurrent_streams}
+        )
+        streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        tasks: Set[asyncio.Task] = set()
+        data = preface
+        try:
+            while data:
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, h2.events.DataReceived):
+                        streams[event.stream_id][1].extend(event.data)
+                        conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id
+                        )
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = streams.pop(event.stream_id)
+                        task = asyncio.create_task(
+                            self._respond_h2(
+                                conn, writer, connection_id, event.stream_id, headers, bytes(body)
+                            )
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    elif isinstance(event, h2.events.StreamReset):
+                        streams.pop(event.stream_id, None)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+                writer.write(conn.data_to_send())
+                await writer.drain()
+                data = await reader.read(65536)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _respond_h2(
+        self,
+        conn: Any,
+        writer: asyncio.StreamWriter,
+        connection_id: int,
+        stream_id: int,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> None:
+        """
+        HTTP/2の1ストリームに応答します。
+
+        低速送信はHTTP/2では再現せず通常の応答とし、リセットはストリームのリセットで再現します。
+
+        Args:
+            conn: HTTP/2のコネクション状態
+            writer: 送信ストリーム
+            connection_id: コネクションの通し番号
+            stream_id: ストリームID
+            headers: リクエストヘッダー
+            body: リクエストボディ
+        """
+        received_at = time.time()
+        started = time.perf_counter()
+        self.request_count += 1
+        sequence = self.request_count
+
+        # ヘルスチェックなどPOST以外は障害注入の対象外
+        if headers.get(":method") != "POST":
+            self._send_h2(conn, writer, stream_id, 200, b'{"status":"ok"}')
+            return
+
+        phase, outcome, latency_ms = self._scenario_state.next()
+        try:
+            request_body = json.loads(body or b"{}")
+        except ValueError:
+            request_body = {}
+            outcome = "400"
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+        if outcome == OUTCOME_HANG:
+            return
+        status = 200 if outcome in (OUTCOME_OK, OUTCOME_SLOW, OUTCOME_RESET) else int(outcome)
+        payload = json.dumps(
+            build_charge_response(request_body)
+            if status == 200
+            else build_error_response(status, request_body)
+        ).encode()
+
+        self._record(
+            RequestRecord(
+                sequence=sequence,
+                connection_id=connection_id,
+                received_at=received_at,
+                phase=phase.name,
+                outcome=outcome,
+                status=None if outcome == OUTCOME_RESET else status,
+                injected_latency_ms=round(latency_ms, 3),
+                total_ms=round((time.perf_counter() - started) * 1000, 3),
+                transaction_id=str(request_body.get("transactionId", "")),
+                traceparent=headers.get("traceparent", ""),
+            )
+        )
+        if outcome == OUTCOME_RESET:
+            if not writer.transport.is_closing():
+                conn.reset_stream(stream_id)
+                writer.write(conn.data_to_send())
+            return
+        self._send_h2(conn, writer, stream_id, status, payload)
+
+    @staticmethod
+    def _send_h2(
+        conn: Any, writer: asyncio.StreamWriter, stream_id: int, status: int, payload: bytes
+    ) -> None:
+        """
+        HTTP/2のストリームにレスポンスを送信します。
+
+        Args:
+            conn: HTTP/2のコネクション状態
+            writer: 送信ストリーム
+            stream_id: ストリームID
+            status: ステータスコード
+            payload: レスポンスボディ
+        """
+        if writer.transport.is_closing():
+            return
+        headers = [
+            (":status", str(status)),
+            ("content-type", "application/json"),
+            ("content-length", str(len(payload))),
+        ]
+        if status == 429:
+            headers.append(("retry-after", "1"))
+        conn.send_headers(stream_id, headers)
+        conn.send_data(stream_id, payload, end_stream=True)
+        writer.write(conn.data_to_send())
+
+    def _record(self, record: RequestRecord) -> None:
+        """
+        リクエスト記録を保存します。
+
+        Args:
+            record: リクエスト記録
+        """
+        self.records.append(record)
+        if self._log_file is not None:
+            self._log_file.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+            self._log_file.flush()
+
+
+async def _wait_closed(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    クライアントまたはサーバーがコネクションを閉じるまで待機します。
+
+    Args:
+        reader: 受信ストリーム
+        writer: 送信ストリーム
+    """
+    while not (reader.at_eof() or writer.transport.is_closing()):
+        await asyncio.sleep(0.05)
+
+
+def _abort_with_reset(writer: asyncio.StreamWriter) -> None:
+    """
+    SO_LINGERを0にしてコネクションを閉じ、RSTを送信させます。
+
+    Args:
+        writer: 送信ストリーム
+    """
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    writer.transport.abort()
+
+
+async def _drip(writer: asyncio.StreamWriter, data: bytes, interval_ms: float) -> None:
+    """
+    レスポンスを小さなチャンクに分けて低速に送信します。
+
+    Args:
+        writer: 送信ストリーム
+        data: 送信するバイト列
+        interval_ms: チャンク間の待機時間（ミリ秒）
+    """
+    for offset in range(0, len(data), _DRIP_CHUNK_BYTES):
+        writer.write(data[offset:offset + _DRIP_CHUNK_BYTES])
+        await writer.drain()
+        await asyncio.sleep(interval_ms / 1000)
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+    request_line: Optional[bytes] = None,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """
+    HTTP/1.1リクエストを1件読み込みます。
+
+    Args:
+        reader: 受信ストリーム
+        request_line: 読み込み済みのリクエスト行（省略時はreaderから読み込む）
+
+    Returns:
+        Optional[Tuple[str, str, Dict[str, str], bytes]]:
+            メソッド、パス、ヘッダー、ボディ（接続が閉じられた場合はNone）
+
+    Raises:
+        ValueError: リクエスト行またはContent-Lengthが不正な場合
+    """
+    if request_line is None:
+        request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split(" ", 2)
+    if len(parts) != 3:
+        raise ValueError(f"不正なリクエスト行です: {request_line!r}")
+    method, path, _ = parts
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", "0"))
+    if length < 0:
+        raise ValueError(f"不正なContent-Lengthです: {length}")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _encode_response(
+    status: int, payload: bytes, keep_alive: bool, extra: str = ""
+) -> bytes:
+    """
+    HTTP/1.1レスポンスをエンコードします。
+
+    Args:
+        status: ステータスコード
+        payload: レスポンスボディ
+        keep_alive: コネクションを維持するかどうか
+        extra: 追加のヘッダー行
+
+    Returns:
+        bytes: 送信するバイト列
+    """
+    if not keep_alive:
+        extra += "Connection: close\r\n"
+    head = _RESPONSE_HEAD.format(
+        status=status,
+        reason=_REASONS.get(status, "Unknown"),
+        length=len(payload),
+        extra=extra,
+    )
+    return head.encode("latin-1") + payload
+
+
+def main(argv: Optional[list] = None) -> None:
+    """
+    コマンドラインから上流シミュレーターを起動します。
+
+    Args:
+        argv: コマンドライン引数
+    """
+    parser = argparse.ArgumentParser(description="d払い上流シミュレーター")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="固定遅延（--scenario指定時は無視）")
+    parser.add_argument("--scenario", type=Path, default=None, help="シナリオファイル（JSON）")
+    parser.add_argument("--log", type=Path, default=None, help="リクエスト記録の出力先（JSON Lines）")
+    parser.add_argument("--max-concurrent-streams", type=int, default=100,
+                        help="HTTP/2の1コネクションあたりの最大同時ストリーム数")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scenario = (
+        Scenario.load(args.scenario)
+        if args.scenario
+        else Scenario.fixed_latency(args.latency_ms)
+    )
+    simulator = UpstreamSimulator(
+        args.host,
+        args.port,
+        scenario,
+        log_path=args.log,
+        max_concurrent_streams=args.max_concurrent_streams,
+    )
+    try:
+        asyncio.run(simulator.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,24 @@ pytest用の設定とフィクスチャを提供します。
 from __future__ import annotations
 
 import asyncio
+import json
+import os
+import tempfile
 import pytest
-from typing import Dict, Any, Generator
+from typing import Dict, Any, Generator, Optional
 from fastapi.testclient import TestClient
 
+# テスト中はジャーナルを有効にし、一時ディレクトリに書き込む（設定の読み込み前に指定する）
+os.environ.setdefault("JOURNAL_ENABLED", "True")
+os.environ.setdefault("JOURNAL_DIR", tempfile.mkdtemp(prefix="d_payment-journal-"))
+
 from app.main import app
+from benchmarks.upstream import UpstreamSimulator
 from app.domain.interfaces.payment_service import (
     PaymentServiceInterface,
     HttpClientInterface,
 )
-from app.domain.entities.payment import PaymentResponse
+from app.domain.entities.payment import PaymentResponse, RawUpstreamResponse
 
 
 class MockHttpClient(HttpClientInterface):
@@ -55,6 +63,29 @@ class MockHttpClient(HttpClientInterface):
         self.last_data = data
         return self.response_data
 
+    async def post_raw(
+        self, url: str, data: Dict[str, Any], timeout: int = 30
+    ) -> RawUpstreamResponse:
+        """
+        未解析のPOSTリクエストのモック。
+
+        Args:
+            url: 送信先URL
+            data: 送信データ
+            timeout: タイムアウト秒数
+
+        Returns:
+            RawUpstreamResponse: モックレスポンスデータをJSONにしたもの
+        """
+        self.last_url = url
+        self.last_data = data
+        return RawUpstreamResponse(
+            status_code=200,
+            content=json.dumps(self.response_data).encode(),
+            content_type="application/json",
+            response_code=self.response_data.get("responseCode"),
+        )
+
 
 class MockPaymentService(PaymentServiceInterface):
     """
@@ -76,18 +107,31 @@ class MockPaymentService(PaymentServiceInterface):
             data={"status": "success"},
         )
         self.last_request_data = None
-
-    async def process_payment(self, request_data: Dict[str, Any]) -> PaymentResponse:
+        self.last_transaction_id = None
+        self.last_merchant = None
+
+    async def process_payment(
+        self,
+        request_data: Dict[str, Any],
+        transaction_id: Optional[str] = None,
+        merchant: Optional[Any] = None,
+        passthrough: bool = False,
+    ) -> PaymentResponse:
         """
         決済リクエスト処理のモック。
 
         Args:
             request_data: リクエストデータ
+            transaction_id: トランザクションID
+            merchant: 加盟店
+            passthrough: 未解析のレスポンスを返すかどうか
 
         Returns:
             PaymentResponse: モックレスポンス
         """
         self.last_request_data = request_data
+        self.last_transaction_id = transaction_id
+        self.last_merchant = merchant
         return self.response
 
 
@@ -127,6 +171,21 @@ def client() -> Generator:
         yield client
 
 
+@pytest.fixture
+def upstream_simulator() -> Generator:
+    """
+    上流シミュレーターのフィクスチャ。
+
+    専用スレッドで起動したd払い上流シミュレーターを提供します。
+    テスト内でscenarioを差し替えることで障害を注入できます。
+
+    Returns:
+        Generator: 上流シミュレーターのジェネレータ
+    """
+    with UpstreamSimulator().run_in_thread() as simulator:
+        yield simulator
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """
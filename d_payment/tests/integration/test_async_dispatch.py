@@ -0,0 +1,46 @@
+"""
+非同期受付API統合テストモジュール。
+
+202で受け付けた決済リクエストが上流に転送され、
+ステータス照会エンドポイントから結果を取得できることをテストします。
+"""
+
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 3980, "orderNumber": "TEST12345", "description": "テスト決済"}}
+}
+
+
+def test_async_receive_and_status(upstream_simulator, monkeypatch):
+    """
+    非同期受付後、ステータス照会で上流のレスポンスを取得できることをテストします。
+    """
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    with TestClient(app) as client:
+        response = client.post("/api/receive/async", json=REQUEST_BODY)
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "queued"
+        assert response.headers["Location"] == body["statusUrl"]
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            status = client.get(f"/api/receive/async/{body['transactionId']}").json()
+            if status["status"] == "succeeded":
+                break
+            time.sleep(0.02)
+
+        assert status["status"] == "succeeded"
+        assert status["result"]["responseCode"] == "0000"
+        assert status["result"]["transactionId"] == body["transactionId"]
+
+        assert client.get("/api/receive/async/unknown").status_code == 404
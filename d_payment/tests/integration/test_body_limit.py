@@ -0,0 +1,79 @@
+"""
+リクエストボディの制限の統合テストモジュール。
+
+大きすぎるボディ（Content-Lengthあり・なし）と、入れ子が深すぎるボディ・キーが多すぎるボディを
+JSONの解析前に拒否し、上限以内のリクエストは通常どおり処理することをテストします。
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture
+def client(upstream_simulator, monkeypatch):
+    """上流シミュレーターに送信するアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def test_oversized_bodies_are_rejected_with_413(client):
+    """
+    Content-Lengthが上限を超える場合と、チャンク転送で上限を超えた場合に413を返すことをテストします。
+    """
+    padding = "x" * settings.REQUEST_MAX_BODY_BYTES
+    body = json.dumps({"data": {"paymentInfo": {"amount": 1, "description": padding}}})
+    response = client.post("/api/receive", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "リクエストボディが大きすぎます"}
+
+    def chunks():
+        yield b'{"data": {"description": "'
+        for _ in range(settings.REQUEST_MAX_BODY_BYTES // 1024 + 1):
+            yield b"x" * 1024
+        yield b'"}}'
+
+    response = client.post("/api/receive", content=chunks(), headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_deep_or_wide_json_is_rejected_before_parsing(client):
+    """
+    入れ子が深すぎるボディとキーが多すぎるボディに422を返すことをテストします。
+    """
+    deep = '{"data": ' + '{"a": ' * settings.REQUEST_MAX_JSON_DEPTH + "1" + "}" * (
+        settings.REQUEST_MAX_JSON_DEPTH + 1
+    )
+    response = client.post("/api/receive", content=deep, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert "深さ" in response.json()["detail"]
+
+    wide = json.dumps({"data": {f"k{i}": i for i in range(settings.REQUEST_MAX_JSON_KEYS + 1)}})
+    response = client.post("/api/receive", content=wide, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert "キー" in response.json()["detail"]
+
+
+def test_requests_within_limits_are_processed(client):
+    """
+    上限以内のリクエストは、チャンク転送の場合も通常どおり処理されることをテストします。
+    """
+    body = {"data": {"paymentInfo": {"amount": 100, "orderNumber": "LIMIT0001"}}}
+    assert client.post("/api/receive", json=body).status_code == 200
+
+    encoded = json.dumps(body).encode()
+    response = client.post(
+        "/api/receive",
+        content=iter([encoded[:10], encoded[10:]]),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,46 @@
+"""
+コールドスタートの統合テストモジュール。
+
+`python -m app`で起動してから最初の`/`に応答するまでの時間が予算内に収まること、
+アプリケーションのインポート時に上流接続のモジュールを読み込まないことをテストします。
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+from benchmarks.loadtest import PROJECT_DIR
+from benchmarks.startup import measure_cold_start
+
+# コールドスタートの予算（ミリ秒、遅いCI環境では環境変数で緩められるようにする）
+COLD_START_BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", "3000"))
+
+# 最初の決済リクエストまたはウォームアップまでインポートを遅らせるモジュール
+DEFERRED_MODULES = ["httpx", "httpcore", "h2", "app.infrastructure.http_client", "app.infrastructure.journal"]
+
+
+def test_cold_start_serves_root_within_budget():
+    """
+    起動から最初の`/`への応答までが予算内に収まり、起動処理の内訳が出力されることをテストします。
+    """
+    result = measure_cold_start()
+
+    assert result["first_request_ms"] < COLD_START_BUDGET_MS, result
+    assert {"import", "app", "merchant_registry", "journal", "total"} <= set(result["phases"])
+
+
+def test_importing_app_does_not_load_upstream_stack():
+    """
+    アプリケーションのインポート時に、HTTPクライアントとジャーナルのモジュールを読み込まないことをテストします。
+    """
+    code = (
+        "import sys, app.main\n"
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    assert completed.stdout.strip() == ""
@@ -0,0 +1,78 @@
+"""
+メモリ診断の診断用エンドポイントの統合テストモジュール。
+
+tracemallocの開始からスナップショットの差分の取得までの流れと、
+オブジェクト数とキャッシュの件数の報告をテストします。
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.errors import setup_exception_handlers
+from app.interfaces.api.debug import router as debug_router
+from app.main import app
+
+TOKEN = "debug-secret"
+HEADERS = {"X-Debug-Token": TOKEN}
+
+
+@pytest.fixture
+def debug_client(upstream_simulator, monkeypatch):
+    """診断用エンドポイントを登録したアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    debug_app = FastAPI()
+    debug_app.include_router(debug_router, prefix="/debug")
+    debug_app.mount("/", app)
+    setup_exception_handlers(debug_app)
+    with TestClient(debug_app) as client:
+        yield client
+        client.delete("/debug/memory/tracemalloc", headers=HEADERS)
+
+
+def test_memory_reports_objects_and_cache_sizes(debug_client):
+    """
+    アプリケーションの型ごとのオブジェクト数と、決済状況インデックスの件数を返すことをテストします。
+    """
+    assert debug_client.get("/debug/memory").status_code == 403
+    for i in range(3):
+        body = {"data": {"paymentInfo": {"amount": 100, "orderNumber": f"MEM{i:04d}"}}}
+        assert debug_client.post("/api/receive", json=body).status_code == 200
+
+    report = debug_client.get("/debug/memory", headers=HEADERS).json()
+    assert report["process"]["maxRssBytes"] > 0
+    assert report["tracemalloc"]["tracing"] is False
+    assert {"PaymentRequest", "PaymentResponse", "pendingFutures", "pendingTasks"} <= set(report["objects"])
+    assert report["objects"]["PaymentStatus"] >= 3
+    assert report["caches"]["paymentIndex"]["entries"] >= 3
+
+
+def test_snapshot_diff_between_requests(debug_client):
+    """
+    tracemallocを開始し、決済リクエストの前後のスナップショットの差分を取得できることをテストします。
+    """
+    assert debug_client.post("/debug/memory/snapshots", headers=HEADERS).status_code == 422
+    started = debug_client.post("/debug/memory/tracemalloc?frames=4", headers=HEADERS).json()
+    assert started["tracing"] and started["frames"] == 4
+
+    first = debug_client.post("/debug/memory/snapshots", headers=HEADERS).json()
+    for i in range(5):
+        body = {"data": {"paymentInfo": {"amount": 100, "orderNumber": f"SNAP{i:04d}"}}}
+        debug_client.post("/api/receive", json=body)
+    second = debug_client.post("/debug/memory/snapshots", headers=HEADERS).json()
+
+    diff = debug_client.get("/debug/memory/diff?limit=5&group_by=traceback", headers=HEADERS).json()
+    assert (diff["base"], diff["target"]) == (first["id"], second["id"])
+    assert len(diff["top"]) <= 5
+    assert all({"site", "sizeDiff", "countDiff"} <= set(stat) for stat in diff["top"])
+    missing = debug_client.get("/debug/memory/diff?base=999", headers=HEADERS)
+    assert missing.status_code == 404
+
+    stopped = debug_client.delete("/debug/memory/tracemalloc", headers=HEADERS).json()
+    assert stopped == {"tracing": False, "frames": 0, "tracedBytes": 0, "peakBytes": 0, "snapshots": []}
@@ -0,0 +1,75 @@
+"""
+内部状態のメトリクスの診断用エンドポイントの統合テストモジュール。
+
+内部の情報を含むメトリクスが公開のAPIからは取得できず、
+診断用エンドポイントでのみアクセスを検査した上で返すことをテストします。
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.errors import setup_exception_handlers
+from app.interfaces.api.debug import router as debug_router
+from app.main import app
+
+TOKEN = "debug-secret"
+HEADERS = {"X-Debug-Token": TOKEN}
+
+
+@pytest.fixture
+def debug_client(monkeypatch):
+    """診断用エンドポイントを登録したアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    debug_app = FastAPI()
+    debug_app.include_router(debug_router, prefix="/debug")
+    debug_app.mount("/", app)
+    setup_exception_handlers(debug_app)
+    with TestClient(debug_app) as client:
+        yield client
+
+
+def test_event_loop_stats_require_debug_access(debug_client):
+    """
+    イベントループの監視のメトリクスが診断用エンドポイントでのみ返ることをテストします。
+    """
+    assert debug_client.get("/api/event-loop").status_code == 404
+    assert debug_client.get("/debug/event-loop").status_code == 403
+    response = debug_client.get("/debug/event-loop", headers=HEADERS)
+    assert response.status_code == 200
+    assert "enabled" in response.json()
+
+
+def test_upstream_stats_require_debug_access_and_do_not_create_client(debug_client, monkeypatch):
+    """
+    上流エンドポイントのメトリクスが診断用エンドポイントでのみ返り、
+    共有HTTPクライアントを生成しないことをテストします。
+    """
+    from app.interfaces.api import dependencies
+
+    monkeypatch.setattr(dependencies, "_http_client", None)
+    assert debug_client.get("/api/upstreams").status_code == 404
+    assert debug_client.get("/debug/upstreams").status_code == 403
+    response = debug_client.get("/debug/upstreams", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json() == {"strategy": settings.PAYMENT_API_BALANCER, "endpoints": []}
+    assert dependencies._http_client is None
+
+
+def test_rejected_token_stats_require_debug_access(debug_client, monkeypatch):
+    """
+    拒否済み請求トークンのキャッシュのメトリクスが診断用エンドポイントでのみ返ることをテストします。
+    """
+    from app.interfaces.api import dependencies
+
+    monkeypatch.setattr(settings, "REJECTED_TOKEN_TTLS", {"E400": 60})
+    monkeypatch.setattr(dependencies, "_rejected_tokens", None)
+    assert debug_client.get("/api/rejected-tokens").status_code == 404
+    assert debug_client.get("/debug/rejected-tokens").status_code == 403
+    response = debug_client.get("/debug/rejected-tokens", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json()["enabled"] is True
+    assert response.json()["entries"] == 0
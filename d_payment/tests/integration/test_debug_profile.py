@@ -0,0 +1,79 @@
+"""
+CPUプロファイルの診断用エンドポイントの統合テストモジュール。
+
+アクセスの検査と、決済リクエストの処理中に採取したプロファイルが
+折り畳み形式で返されることをテストします。
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.errors import setup_exception_handlers
+from app.interfaces.api.debug import router as debug_router
+from app.main import app
+
+TOKEN = "debug-secret"
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 300, "orderNumber": "PROF0001", "description": "プロファイル"}}
+}
+
+
+@pytest.fixture
+def debug_client(upstream_simulator, monkeypatch):
+    """診断用エンドポイントを登録したアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "DEBUG_PROFILE_MAX_SECONDS", 5.0)
+    debug_app = FastAPI()
+    debug_app.include_router(debug_router, prefix="/debug")
+    debug_app.mount("/", app)
+    setup_exception_handlers(debug_app)
+    with TestClient(debug_app) as client:
+        yield client
+
+
+def test_profile_requires_debug_token(debug_client):
+    """
+    トークンがない場合と異なる場合は403を返し、上限を超える秒数は422を返すことをテストします。
+    """
+    assert debug_client.get("/debug/profile?seconds=0.1").status_code == 403
+    response = debug_client.get("/debug/profile?seconds=0.1", headers={"X-Debug-Token": "wrong"})
+    assert response.status_code == 403
+    response = debug_client.get("/debug/profile?seconds=10", headers={"X-Debug-Token": TOKEN})
+    assert response.status_code == 422
+
+
+def test_profile_samples_live_payment_traffic(debug_client):
+    """
+    決済リクエストの処理中に採取したプロファイルが折り畳み形式で返されることをテストします。
+    """
+    stop = threading.Event()
+
+    def send_payments() -> None:
+        while not stop.is_set():
+            debug_client.post("/api/receive", json=REQUEST_BODY)
+
+    sender = threading.Thread(target=send_payments)
+    sender.start()
+    try:
+        response = debug_client.get(
+            "/debug/profile?seconds=1", headers={"X-Debug-Token": TOKEN}
+        )
+    finally:
+        stop.set()
+        sender.join()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["x-profile-samples"]) > 0
+    lines = response.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.split(";", 1)[0].startswith("task:") for line in lines)
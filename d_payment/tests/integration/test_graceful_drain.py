@@ -0,0 +1,95 @@
+"""
+グレースフルドレイン統合テストモジュール。
+
+`python -m app`で起動したサーバーが終了シグナルを受けた際に、
+処理中の決済を完了させてから終了することをテストします。
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.upstream import LatencyProfile, Phase, Scenario
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 3980, "orderNumber": "TEST12345", "description": "テスト決済"}}
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("サーバーが起動しませんでした")
+
+
+def test_sigterm_drains_inflight_payment(upstream_simulator):
+    """
+    SIGTERM後もレディネスが503となり、処理中の決済は正常に完了することをテストします。
+    """
+    upstream_simulator.scenario = Scenario(
+        phases=[Phase(latency=LatencyProfile(median_ms=1000))]
+    )
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": "1",
+        "SERVER_READINESS_GRACE": "0.5",
+        "PAYMENT_API_URL": upstream_simulator.url,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app"],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(base_url + "/ready")
+
+        result = {}
+
+        def send() -> None:
+            result["response"] = httpx.post(base_url + "/api/receive", json=REQUEST_BODY, timeout=10)
+
+        sender = threading.Thread(target=send)
+        sender.start()
+        time.sleep(0.3)
+
+        process.send_signal(signal.SIGTERM)
+        time.sleep(0.1)
+        assert httpx.get(base_url + "/ready", timeout=2).status_code == 503
+
+        sender.join(timeout=10)
+        assert result["response"].status_code == 200
+        assert result["response"].json()["responseCode"] == "0000"
+        assert process.wait(timeout=10) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
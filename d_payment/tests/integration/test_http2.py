@@ -0,0 +1,64 @@
+"""
+HTTP/2による上流接続の統合テストモジュール。
+
+上流シミュレーターに対して、HTTP/2で多重化して送信できること、
+HTTP/2に対応していない送信先ではHTTP/1.1に切り替えることをテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("h2")
+
+import benchmarks.upstream
+from app.infrastructure.http_client import HttpClient
+from benchmarks.upstream import Scenario, UpstreamSimulator
+
+
+async def _post_concurrently(client: HttpClient, url: str, count: int):
+    return await asyncio.gather(
+        *(client.post(url, {"transactionId": f"h2{i:06d}"}) for i in range(count))
+    )
+
+
+@pytest.mark.asyncio
+async def test_http2_multiplexes_requests_over_configured_connections():
+    """
+    同時に送信したリクエストが、指定した本数のHTTP/2コネクションに多重化されることをテストします。
+    """
+    with UpstreamSimulator(scenario=Scenario.fixed_latency(20)).run_in_thread() as upstream:
+        client = HttpClient(http2=True, http2_connections=2, http2_prior_knowledge=True)
+        try:
+            responses = await _post_concurrently(client, upstream.url, 50)
+        finally:
+            await client.aclose()
+
+        assert client.protocol == "HTTP/2"
+        assert all(r["responseCode"] == "0000" for r in responses)
+        assert upstream.connection_count <= 2
+        assert upstream.http2_connections == upstream.connection_count
+
+
+@pytest.mark.asyncio
+async def test_http2_falls_back_to_http1_when_upstream_rejects_it(monkeypatch):
+    """
+    HTTP/1.1のみの送信先では、決済リクエストを送る前にHTTP/1.1に切り替え、
+    すべてのリクエストが1回ずつ処理されることをテストします。
+    """
+    monkeypatch.setattr(benchmarks.upstream, "h2", None)
+    with UpstreamSimulator().run_in_thread() as upstream:
+        client = HttpClient(http2=True, http2_prior_knowledge=True)
+        try:
+            responses = await _post_concurrently(client, upstream.url, 10)
+        finally:
+            await client.aclose()
+
+        assert client.protocol == "HTTP/1.1"
+        assert all(r["responseCode"] == "0000" for r in responses)
+        assert upstream.http2_connections == 0
+        assert sorted(r.transaction_id for r in upstream.records) == [
+            f"h2{i:06d}" for i in range(10)
+        ]
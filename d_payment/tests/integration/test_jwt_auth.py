@@ -0,0 +1,64 @@
+"""
+呼び出し元のJWT認証の統合テストモジュール。
+
+認証を有効にしたAPIルーターで、Bearerトークンのないリクエストや不正なトークンを
+401で拒否し、正しいトークンのリクエストのみを処理することをテストします。
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from jose import jwt
+
+import app.interfaces.api.dependencies as dependencies
+from app.core.errors import setup_exception_handlers
+from app.infrastructure.jwt_auth import JwtVerifier
+from app.interfaces.api.routes import router
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """認証を有効にしたAPIルーターのテストクライアント。"""
+    verifier = JwtVerifier(["HS256"], secret=SECRET)
+    monkeypatch.setattr(dependencies, "_jwt_verifier", verifier)
+    app = FastAPI()
+    app.include_router(router, prefix="/api", dependencies=[Depends(dependencies.authenticate_client)])
+    setup_exception_handlers(app)
+    with TestClient(app) as client:
+        client.verifier = verifier
+        yield client
+
+
+def test_requests_without_valid_token_are_rejected(client):
+    """
+    トークンがない場合と不正な場合に、WWW-Authenticateヘッダー付きの401を返すことをテストします。
+    """
+    response = client.get("/api/payments/ORDER1")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+    forged = jwt.encode({"sub": "m1", "exp": int(time.time()) + 60}, "wrong", algorithm="HS256")
+    response = client.get("/api/payments/ORDER1", headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == 'Bearer error="invalid_token"'
+    assert response.json() == {"detail": "認証に失敗しました"}
+
+
+def test_valid_token_is_verified_once_across_requests(client):
+    """
+    正しいトークンのリクエストは処理され、同じトークンの署名の検証は1回だけであることをテストします。
+    """
+    token = jwt.encode({"sub": "m1", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256")
+    for _ in range(3):
+        response = client.get("/api/payments/ORDER1", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 404
+
+    assert client.verifier.stats()["misses"] == 1
+    assert client.verifier.stats()["hits"] == 2
@@ -0,0 +1,64 @@
+"""
+複数の上流エンドポイントへの振り分けの統合テストモジュール。
+
+上流シミュレーターを複数起動し、遅いエンドポイントや停止したエンドポイントを
+避けて送信されることをテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from app.infrastructure.http_client import HttpClient
+from app.infrastructure.load_balancer import LoadBalancer
+from benchmarks.upstream import Scenario, UpstreamSimulator
+
+REQUEST = {"transactionId": "lb0001", "regiChargeReqList": []}
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_requests_avoid_slow_and_dead_endpoints():
+    """
+    遅いエンドポイントへの送信が少なくなり、停止したエンドポイントは再送と除外で
+    回避され、ヘルスチェックでも異常と判定されることをテストします。
+    """
+    dead_url = f"http://127.0.0.1:{_unused_port()}/api"
+    with UpstreamSimulator(scenario=Scenario.fixed_latency(150)).run_in_thread() as slow, \
+            UpstreamSimulator(scenario=Scenario.fixed_latency(1)).run_in_thread() as fast:
+        balancer = LoadBalancer(
+            [slow.url, fast.url, dead_url],
+            limits=httpx.Limits(max_connections=10),
+            decay=0.2,
+            eject_failures=2,
+            probe_interval=0,
+            probe_path="/health",
+        )
+        client = HttpClient(balancer=balancer)
+        try:
+            for _ in range(10):
+                results = await asyncio.gather(
+                    *(client.post("ignored", REQUEST, timeout=5) for _ in range(4))
+                )
+                assert all(r.get("responseCode") == "0000" for r in results)
+
+            assert fast.request_count > slow.request_count * 2
+            stats = {s["url"]: s for s in client.endpoint_stats()}
+            assert stats[dead_url]["healthy"] is False
+            assert stats[dead_url]["ejections"] >= 1
+            assert stats[fast.url]["ewmaMs"] < stats[slow.url]["ewmaMs"]
+            assert all(s["outstanding"] == 0 for s in stats.values())
+
+            assert await balancer.probe(balancer.endpoints[1]) is True
+            assert await balancer.probe(balancer.endpoints[2]) is False
+        finally:
+            await client.aclose()
@@ -0,0 +1,112 @@
+"""
+加盟店の選択の統合テストモジュール。
+
+ヘッダーまたはリクエストデータで指定した加盟店の認証情報で送信されることをテストします。
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infrastructure.journal import read_journal
+from app.interfaces.api import dependencies
+from app.main import app
+
+
+def _body(order_number: str, **extra) -> dict:
+    return {"data": {"paymentInfo": {"amount": 100, "orderNumber": order_number}, **extra}}
+
+
+def test_request_is_sent_as_selected_merchant(upstream_simulator, monkeypatch, tmp_path):
+    """
+    ヘッダー、merchantId、既定の順に加盟店が選択され、流量制限と未登録の加盟店が拒否されることをテストします。
+    """
+    path = tmp_path / "merchants.json"
+    path.write_text(
+        json.dumps(
+            {
+                "default": "store-a",
+                "merchants": [
+                    {
+                        "merchantId": "store-a",
+                        "companyCode": "DCM00000001",
+                        "storeCode": "TNPROUTE0001",
+                        "authenticationPass": "PASS-A",
+                    },
+                    {
+                        "merchantId": "store-b",
+                        "companyCode": "DCM00000002",
+                        "storeCode": "TNPROUTE0002",
+                        "authenticationPass": "PASS-B",
+                        "maxConnections": 2,
+                        "rateLimitRps": 0.001,
+                        "rateLimitBurst": 2,
+                    },
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    monkeypatch.setattr(settings, "MERCHANT_REGISTRY_PATH", str(path))
+    monkeypatch.setattr(dependencies, "_merchant_registry", None)
+
+    with TestClient(app) as client:
+        assert client.post("/api/receive", json=_body("ROUTE0001")).status_code == 200
+        assert (
+            client.post(
+                "/api/receive", json=_body("ROUTE0002"), headers={"X-Merchant-Id": "store-b"}
+            ).status_code
+            == 200
+        )
+        assert (
+            client.post("/api/receive", json=_body("ROUTE0003", merchantId="store-b")).status_code
+            == 200
+        )
+        limited = client.post("/api/receive", json=_body("ROUTE0004", merchantId="store-b"))
+        assert limited.status_code == 429
+        assert "Retry-After" in limited.headers
+        unknown = client.post(
+            "/api/receive", json=_body("ROUTE0005"), headers={"X-Merchant-Id": "store-x"}
+        )
+        assert unknown.status_code == 422
+
+    store_codes = {
+        record["orderNumber"]: record["storeCode"]
+        for record in read_journal(settings.JOURNAL_DIR)
+        if record.get("type") == "request" and str(record.get("orderNumber")).startswith("ROUTE")
+    }
+    assert store_codes == {
+        "ROUTE0001": "TNPROUTE0001",
+        "ROUTE0002": "TNPROUTE0002",
+        "ROUTE0003": "TNPROUTE0002",
+    }
+
+
+@pytest.mark.parametrize("merchant_id", [["store-a"], {"id": "store-a"}])
+def test_non_string_merchant_id_is_rejected(merchant_id, monkeypatch):
+    """
+    文字列でない加盟店IDが、未登録の加盟店と同じく拒否されることをテストします。
+    """
+    monkeypatch.setattr(dependencies, "_merchant_registry", None)
+
+    with TestClient(app) as client:
+        for path in ("/api/receive", "/api/receive/async"):
+            response = client.post(path, json=_body("ROUTE0006", merchantId=merchant_id))
+            assert response.status_code == 422
+            assert "加盟店が見つかりません" in response.text
+
+        line = json.dumps({"paymentInfo": {"amount": 100}, "merchantId": merchant_id})
+        response = client.post(
+            "/api/receive/stream",
+            content=line.encode() + b"\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        result = json.loads(response.text.splitlines()[0])
+        assert result["error"] == "加盟店が見つかりません"
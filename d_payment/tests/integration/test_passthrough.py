@@ -0,0 +1,37 @@
+"""
+パススルーモードの統合テストモジュール。
+
+上流シミュレーターのレスポンスが再エンコードされずに返されることをテストします。
+"""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 1200, "orderNumber": "PASS0001", "description": "パススルー"}}
+}
+
+
+def test_passthrough_returns_upstream_body(upstream_simulator, monkeypatch):
+    """
+    パススルー時も応答コードが判定され、決済状況に反映されることをテストします。
+    """
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    monkeypatch.setattr(settings, "PAYMENT_PASSTHROUGH", True)
+    with TestClient(app) as client:
+        response = client.post("/api/receive", json=REQUEST_BODY)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        body = response.json()
+        assert body["responseCode"] == "0000"
+        assert body["regiChargeResList"][0]["storeOrderNumber"] == "PASS0001"
+
+        status = client.get("/api/payments/PASS0001").json()
+        assert status["status"] == "succeeded"
+        assert status["responseCode"] == "0000"
@@ -0,0 +1,45 @@
+"""
+決済状況照会API統合テストモジュール。
+
+送信した決済の状況を注文番号で照会でき、再起動後もジャーナルから
+復元されることをテストします。
+"""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.interfaces.api import dependencies
+from app.main import app
+
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 3980, "orderNumber": "STATUS12345", "description": "テスト決済"}}
+}
+
+
+def test_payment_status_survives_restart(upstream_simulator, monkeypatch):
+    """
+    決済後に状況を照会でき、インデックスを破棄しても再起動時に復元されることをテストします。
+    """
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    # 起動時の事前接続のリクエストを数えないよう無効にする
+    monkeypatch.setattr(
+        "app.interfaces.api.dependencies.settings.PAYMENT_API_WARMUP_CONNECTIONS", 0
+    )
+    with TestClient(app) as client:
+        assert client.post("/api/receive", json=REQUEST_BODY).status_code == 200
+        status = client.get("/api/payments/STATUS12345").json()
+        assert status["status"] == "succeeded"
+        assert status["responseCode"] == "0000"
+        assert client.get("/api/payments/UNKNOWN").status_code == 404
+
+    requests_before = upstream_simulator.request_count
+    monkeypatch.setattr(dependencies, "_payment_index", None)
+    with TestClient(app) as client:
+        restored = client.get("/api/payments/STATUS12345").json()
+
+    assert restored["transactionId"] == status["transactionId"]
+    assert restored["status"] == "succeeded"
+    assert upstream_simulator.request_count == requests_before
@@ -0,0 +1,89 @@
+"""
+ストリーミング取り込みの統合テストモジュール。
+
+NDJSONのボディをチャンク転送で送信し、行ごとの結果と集計がNDJSONで返ることと、
+ボディ全体の大きさの制限を受けないことをテストします。
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture
+def client(upstream_simulator, monkeypatch):
+    """上流シミュレーターに送信するアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def _payment_line(i: int) -> bytes:
+    data = {"paymentInfo": {"amount": 100 + i, "orderNumber": f"STREAM{i:06d}"}}
+    return json.dumps(data).encode() + b"\n"
+
+
+def test_lines_are_processed_and_streamed_back(client):
+    """
+    正常な行と不正な行の結果が行ごとに返り、最後に集計が返ることをテストします。
+    """
+    count = 50
+
+    def body():
+        for i in range(count):
+            yield _payment_line(i)
+        yield b"not json\n"
+        yield b"[1, 2]\n"
+        yield b'{"merchantId": "unknown-merchant"}\n'
+        yield b"x" * (settings.STREAM_INGEST_MAX_LINE_BYTES + 1) + b"\n"
+
+    response = client.post(
+        "/api/receive/stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    summary = results.pop()
+    assert summary == {
+        "done": True,
+        "lines": count + 4,
+        "succeeded": count,
+        "failed": 4,
+        "stopped": False,
+    }
+    assert sorted(result["line"] for result in results) == list(range(1, count + 5))
+
+    by_line = {result["line"]: result for result in results}
+    assert all(by_line[i]["success"] for i in range(1, count + 1))
+    assert by_line[1]["data"]["responseCode"]
+    assert by_line[count + 1]["error"] == "JSONオブジェクトではありません"
+    assert by_line[count + 2]["error"] == "JSONオブジェクトではありません"
+    assert by_line[count + 3]["error"] == "加盟店が見つかりません"
+    assert by_line[count + 4]["error"] == "行が大きすぎます"
+
+
+def test_stream_is_not_limited_by_total_body_size(client):
+    """
+    ボディ全体がREQUEST_MAX_BODY_BYTESを超えても、行ごとに処理されることをテストします。
+    """
+    line = _payment_line(0)
+    count = settings.REQUEST_MAX_BODY_BYTES // len(line) + 10
+
+    response = client.post(
+        "/api/receive/stream",
+        content=(line for _ in range(count)),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary["lines"] == count
+    assert summary["succeeded"] == count
@@ -0,0 +1,91 @@
+"""
+トレーシングの統合テストモジュール。
+
+受信したtraceparentヘッダーが上流シミュレーターへの送信まで引き継がれ、
+受信・決済処理・上流への送信のスパンが親子関係を持って記録されることをテストします。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.tracing import Span, tracer
+from app.interfaces.middleware.tracing import TracingMiddleware
+from app.main import app
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+REQUEST_BODY = {
+    "data": {"paymentInfo": {"amount": 500, "orderNumber": "TRACE0001", "description": "トレース"}}
+}
+
+
+class ListExporter:
+    """エクスポートされたスパンを保持するエクスポーター。"""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+@pytest.fixture
+def traced_client(upstream_simulator, monkeypatch):
+    """トレーシングを有効にしたアプリケーションのテストクライアント。"""
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    exporter = ListExporter()
+    tracer.configure(True, 1.0, exporter)
+    try:
+        with TestClient(TracingMiddleware(app, tracer)) as client:
+            client.exporter = exporter
+            client.simulator = upstream_simulator
+            yield client
+    finally:
+        tracer.configure(False)
+
+
+def test_traceparent_is_propagated_and_spans_form_a_tree(traced_client):
+    """
+    上流へのリクエストに同じトレースIDのtraceparentが付き、スパンが親子関係を持つことをテストします。
+    """
+    response = traced_client.post(
+        "/api/receive", json=REQUEST_BODY, headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    )
+    assert response.status_code == 200
+
+    spans: Dict[str, Span] = {span.name: span for span in traced_client.exporter.spans}
+    ingress = spans["POST /api/receive"]
+    assert ingress.parent_id == PARENT_ID
+    assert ingress.attributes["http.status_code"] == 200
+    assert spans["receive_payment"].parent_id == ingress.span_id
+    assert spans["process_payment"].parent_id == spans["receive_payment"].span_id
+    assert spans["transform_request"].parent_id == spans["process_payment"].span_id
+    assert spans["upstream_call"].parent_id == spans["process_payment"].span_id
+    http_post = spans["http_post"]
+    assert http_post.parent_id == spans["upstream_call"].span_id
+    assert "upstream.pool_wait_ms" in http_post.attributes
+    assert "upstream.ttfb_ms" in http_post.attributes
+    assert all(span.trace_id == TRACE_ID for span in spans.values())
+
+    record = traced_client.simulator.records[-1]
+    assert record.traceparent == f"00-{TRACE_ID}-{http_post.span_id}-01"
+
+
+def test_unsampled_requests_propagate_ids_without_recording(traced_client):
+    """
+    送信元がサンプリングしていないリクエストは、スパンを記録せずにIDのみ引き継ぐことをテストします。
+    """
+    response = traced_client.post(
+        "/api/receive", json=REQUEST_BODY, headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"}
+    )
+    assert response.status_code == 200
+    assert traced_client.exporter.spans == []
+    record = traced_client.simulator.records[-1]
+    assert record.traceparent.startswith(f"00-{TRACE_ID}-")
+    assert record.traceparent.endswith("-00")
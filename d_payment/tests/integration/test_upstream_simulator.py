@@ -0,0 +1,153 @@
+"""
+上流シミュレーター統合テストモジュール。
+
+上流シミュレーターに対するHttpClientの動作をテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.application.payment_service import PaymentService
+from app.infrastructure.http_client import HttpClient
+from benchmarks.upstream import LatencyProfile, Phase, Scenario
+
+REQUEST_DATA = {
+    "paymentInfo": {
+        "amount": 3980,
+        "orderNumber": "TEST12345",
+        "description": "テスト決済",
+    }
+}
+
+
+@pytest.mark.asyncio
+async def test_payment_service_against_simulator(upstream_simulator, monkeypatch):
+    """
+    regiChargeReqList形式のリクエストに正常応答が返ることをテストします。
+    """
+    monkeypatch.setattr(
+        "app.application.payment_service.settings.PAYMENT_API_URL", upstream_simulator.url
+    )
+    service = PaymentService(HttpClient())
+
+    response = await service.process_payment(REQUEST_DATA)
+
+    assert response.success is True
+    assert response.data["responseCode"] == "0000"
+    assert response.data["regiChargeResList"][0]["storeOrderNumber"] == "TEST12345"
+    assert response.data["regiChargeResList"][0]["settlementAmount"] == "3980"
+
+
+@pytest.mark.asyncio
+async def test_scripted_faults(upstream_simulator):
+    """
+    シナリオで指定した順番どおりに障害が注入されることをテストします。
+    """
+    upstream_simulator.scenario = Scenario(
+        phases=[Phase(sequence=["500", "429", "reset", "ok"])]
+    )
+    client = HttpClient()
+
+    results = [
+        await client.post(upstream_simulator.url, {"transactionId": f"T{i}"}, timeout=5)
+        for i in range(4)
+    ]
+
+    assert results[0]["status_code"] == 500
+    assert results[0]["error"]["responseCode"] == "E500"
+    assert results[1]["status_code"] == 429
+    assert results[2]["success"] is False
+    assert "Request error" in results[2]["error"]
+    assert results[3]["responseCode"] == "0000"
+    assert upstream_simulator.outcomes() == ["500", "429", "reset", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_phases_and_timing_records(upstream_simulator):
+    """
+    段階の切り替えとリクエストのタイミング記録をテストします。
+    """
+    upstream_simulator.scenario = Scenario(
+        phases=[
+            Phase(name="slow", requests=2, latency=LatencyProfile(median_ms=30)),
+            Phase(name="drip", requests=1, sequence=["slow"], drip_interval_ms=1),
+            Phase(name="fast"),
+        ]
+    )
+    client = HttpClient()
+
+    for i in range(4):
+        result = await client.post(upstream_simulator.url, {"transactionId": f"T{i}"})
+        assert result["responseCode"] == "0000"
+
+    records = list(upstream_simulator.records)
+    assert [r.phase for r in records] == ["slow", "slow", "drip", "fast"]
+    assert [r.transaction_id for r in records] == ["T0", "T1", "T2", "T3"]
+    assert all(r.total_ms >= 30 for r in records[:2])
+    assert records[3].injected_latency_ms == 0
+
+
+@pytest.mark.asyncio
+async def test_records_keep_arrival_sequence_under_latency(upstream_simulator):
+    """
+    遅延の注入中に後続のリクエストが届いても、受信順の番号が記録されることをテストします。
+    """
+    upstream_simulator.scenario = Scenario(
+        phases=[
+            Phase(name="slow", requests=1, latency=LatencyProfile(median_ms=100)),
+            Phase(name="fast"),
+        ]
+    )
+    client = HttpClient()
+
+    first = asyncio.create_task(client.post(upstream_simulator.url, {"transactionId": "T0"}))
+    await asyncio.sleep(0.03)
+    await client.post(upstream_simulator.url, {"transactionId": "T1"})
+    await first
+
+    sequences = {r.transaction_id: r.sequence for r in upstream_simulator.records}
+    assert sequences == {"T0": 1, "T1": 2}
+
+
+@pytest.mark.asyncio
+async def test_malformed_request_line_gets_400(upstream_simulator):
+    """
+    不正なリクエスト行に400が返り、コネクションが閉じられることをテストします。
+    """
+    reader, writer = await asyncio.open_connection(
+        upstream_simulator.host, upstream_simulator.port
+    )
+    writer.write(b"GARBAGE\r\n\r\n")
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), timeout=5)
+    writer.close()
+
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in response
+
+
+def test_scenario_from_dict():
+    """
+    辞書からシナリオが読み込まれることをテストします。
+    """
+    scenario = Scenario.from_dict(
+        {
+            "seed": 1,
+            "phases": [
+                {
+                    "name": "degraded",
+                    "duration_s": 5,
+                    "latency": {"distribution": "lognormal", "median_ms": 50},
+                    "faults": {"503": 0.5},
+                }
+            ],
+        }
+    )
+
+    assert scenario.seed == 1
+    assert scenario.phases[0].latency.distribution == "lognormal"
+    assert scenario.phases[0].faults == {"503": 0.5}
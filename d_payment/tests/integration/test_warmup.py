@@ -0,0 +1,89 @@
+"""
+起動時の上流コネクションの事前確立の統合テストモジュール。
+
+事前に開いたコネクションが決済リクエストで再利用されること、
+事前確立が終わるまでレディネスが未準備のままになることをテストします。
+"""
+
+from __future__ import annotations
+
+import socket
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infrastructure.http_client import HttpClient
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_pooled_connections(upstream_simulator):
+    """
+    指定した数のコネクションを事前に開き、以降の決済リクエストで新たに接続しないことをテストします。
+    """
+    client = HttpClient(max_connections=10, max_keepalive_connections=3)
+    before = upstream_simulator.connection_count
+    try:
+        result = await client.warm_up(upstream_simulator.url, connections=5, timeout=5)
+        opened = upstream_simulator.connection_count - before
+
+        for i in range(3):
+            response = await client.post(upstream_simulator.url, {"transactionId": f"warm{i}"})
+            assert response["responseCode"] == "0000"
+    finally:
+        await client.aclose()
+
+    assert result["connections"] == 3
+    assert result["failed"] == 0
+    assert opened == 3
+    assert upstream_simulator.connection_count - before == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_up_sends_get_to_probe_path(monkeypatch):
+    """
+    パスを指定した場合、決済のURLではなくそのパスにGETを送ることをテストします。
+    """
+    client = HttpClient(max_connections=10, max_keepalive_connections=2)
+    seen = []
+
+    async def fake_get(url, timeout):
+        seen.append(str(url))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(client._get_client(), "get", fake_get)
+    try:
+        result = await client.warm_up(
+            "https://pay.example.jp/api/charge", connections=2, timeout=1, path="/health"
+        )
+    finally:
+        await client.aclose()
+
+    assert result["connections"] == 2
+    assert seen == ["https://pay.example.jp/health"] * 2
+
+
+def test_readiness_waits_for_warm_up_until_timeout(monkeypatch):
+    """
+    応答しない送信先への事前確立中はレディネスが503を返し、
+    打ち切った後に受付を開始することをテストします。
+    """
+    with socket.socket() as blackhole:
+        blackhole.bind(("127.0.0.1", 0))
+        blackhole.listen(16)
+        url = f"http://127.0.0.1:{blackhole.getsockname()[1]}/api"
+        monkeypatch.setattr("app.main.settings.PAYMENT_API_URL", url)
+        monkeypatch.setattr("app.main.settings.PAYMENT_API_WARMUP_CONNECTIONS", 2)
+        monkeypatch.setattr("app.main.settings.PAYMENT_API_WARMUP_TIMEOUT", 0.5)
+
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "warming"
+
+            deadline = time.monotonic() + 5
+            while client.get("/ready").status_code != 200:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
@@ -0,0 +1,52 @@
+"""
+ベンチマーク統計のテストモジュール。
+
+負荷試験の集計処理の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+from benchmarks.stats import find_saturation, percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    """
+    最近傍順位法でパーセンタイルが求められることをテストします。
+    """
+    values = [float(i) for i in range(1, 1001)]
+
+    assert percentile(values, 50) == 500.0
+    assert percentile(values, 99) == 990.0
+    assert percentile(values, 99.9) == 999.0
+    assert percentile(values, 100) == 1000.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize_reports_throughput_and_latency():
+    """
+    スループットとレイテンシ（ミリ秒）が集計されることをテストします。
+    """
+    result = summarize([0.010] * 90 + [0.100] * 10, elapsed=2.0, errors=3)
+
+    assert result["count"] == 100
+    assert result["errors"] == 3
+    assert result["throughput_rps"] == 50.0
+    assert result["latency_ms"]["p50"] == 10.0
+    assert result["latency_ms"]["p99"] == 100.0
+    assert set(result["latency_ms"]) >= {"p50", "p95", "p99", "p999", "mean", "max"}
+
+
+def test_find_saturation():
+    """
+    スループットの伸びが止まった同時実行数が飽和点となることをテストします。
+    """
+    points = [
+        {"concurrency": 1, "throughput_rps": 100.0},
+        {"concurrency": 2, "throughput_rps": 190.0},
+        {"concurrency": 4, "throughput_rps": 360.0},
+        {"concurrency": 8, "throughput_rps": 370.0},
+        {"concurrency": 16, "throughput_rps": 365.0},
+    ]
+
+    assert find_saturation(points) == 4
+    assert find_saturation(points[:3]) is None
@@ -0,0 +1,115 @@
+"""
+トラフィックキャプチャのテストモジュール。
+
+キャプチャファイルの書き込み・読み出しとミドルウェアの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure.capture import CaptureWriter, read_capture, redact_body
+from app.interfaces.middleware.capture import TrafficCaptureMiddleware
+from benchmarks.replay import load_schedule
+
+REQUEST_BODY = {
+    "data": {
+        "billingToken": "9000000248250856006510",
+        "paymentInfo": {"amount": 3980, "orderNumber": "TEST12345", "description": "テスト決済"},
+    }
+}
+
+
+def test_redact_body_hashes_billing_token():
+    """
+    billingTokenが同じ鍵では同一値ごとに同じハッシュへ、異なる鍵では異なるハッシュへ
+    置き換えられることをテストします。
+    """
+    redacted = redact_body(REQUEST_BODY, b"key-1")
+
+    assert redacted["data"]["billingToken"].startswith("tok-")
+    assert "9000000248250856006510" not in str(redacted)
+    assert redacted == redact_body(REQUEST_BODY, b"key-1")
+    assert redacted["data"]["paymentInfo"] == REQUEST_BODY["data"]["paymentInfo"]
+
+    other = redact_body(REQUEST_BODY, b"key-2")
+    assert other["data"]["billingToken"] != redacted["data"]["billingToken"]
+
+
+def test_writer_roundtrip(tmp_path):
+    """
+    記録したリクエストが到着時刻とともに読み出せることをテストします。
+    """
+    path = tmp_path / "receive.cap"
+    writer = CaptureWriter(str(path), max_body_bytes=1024)
+
+    writer.record(100.0, b'{"data": {"paymentInfo": {"amount": 1}}}')
+    writer.record(100.5, b"not json")
+    writer.record(101.0, b"x" * 2048)
+    writer.record(102.0, b'{"data": {"paymentInfo": {"amount": 2}}}')
+    writer.close()
+
+    records = list(read_capture(str(path)))
+    assert [t for t, _ in records] == [100.0, 102.0]
+    assert records[1][1]["data"]["paymentInfo"]["amount"] == 2
+    assert writer.skipped == 2
+
+    # 途切れた末尾のレコードは無視される
+    path.write_bytes(path.read_bytes()[:-3])
+    assert len(list(read_capture(str(path)))) == 1
+
+
+def test_writer_skips_non_object_bodies_and_bounds_queue(tmp_path):
+    """
+    JSONオブジェクトでないボディでは書き込みスレッドが止まらず、
+    書き込み待ちが上限に達した場合は破棄することをテストします。
+    """
+    path = tmp_path / "receive.cap"
+    writer = CaptureWriter(str(path))
+    writer.record(100.0, b"[1, 2]")
+    writer.record(101.0, b'"text"')
+    writer.record(102.0, b'{"data": {"paymentInfo": {"amount": 3}}}')
+    writer.close()
+
+    assert [t for t, _ in read_capture(str(path))] == [102.0]
+    assert writer.skipped == 2
+
+    full = CaptureWriter(str(tmp_path / "full.cap"), max_queue=1)
+    full._thread = object()  # 書き込みスレッドを起動しない
+    full.record(100.0, b"{}")
+    full.record(101.0, b"{}")
+    assert full.dropped == 1
+
+
+def test_middleware_records_receive_requests(tmp_path):
+    """
+    対象パスへのリクエストのみが記録されることをテストします。
+    """
+    path = tmp_path / "receive.cap"
+    writer = CaptureWriter(str(path))
+    app = FastAPI()
+
+    @app.post("/api/receive")
+    async def receive(body: dict):
+        return {"echo": body["data"]["paymentInfo"]["orderNumber"]}
+
+    @app.post("/other")
+    async def other(body: dict):
+        return {}
+
+    app.add_middleware(TrafficCaptureMiddleware, writer=writer, path="/api/receive")
+
+    with TestClient(app) as client:
+        response = client.post("/api/receive", json=REQUEST_BODY)
+        client.post("/other", json=REQUEST_BODY)
+    writer.close()
+
+    assert response.json() == {"echo": "TEST12345"}
+    records = list(read_capture(str(path)))
+    assert len(records) == 1
+    assert records[0][1]["data"]["billingToken"].startswith("tok-")
+
+    # リプレイ用のスケジュールは先頭からの相対時刻になる
+    schedule = load_schedule(str(path), speed=2.0)
+    assert schedule[0][0] == 0.0
@@ -0,0 +1,104 @@
+"""
+非同期転送キューのテストモジュール。
+
+受付・背圧・ドレインの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.application.dispatch_queue import (
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    DispatchQueue,
+    QueueClosedError,
+    QueueFullError,
+)
+from app.domain.entities.payment import PaymentResponse
+from tests.conftest import MockPaymentService
+
+REQUEST_DATA = {"paymentInfo": {"amount": 3980, "orderNumber": "TEST12345"}}
+
+
+class BlockingPaymentService(MockPaymentService):
+    """
+    releaseがセットされるまで応答しない決済サービスのモック。
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            PaymentResponse(success=True, message="ok", data={"responseCode": "0000"})
+        )
+        self.release = asyncio.Event()
+
+    async def process_payment(self, request_data, transaction_id=None, merchant=None):
+        await self.release.wait()
+        return await super().process_payment(request_data, transaction_id, merchant)
+
+
+@pytest.mark.asyncio
+async def test_submitted_job_is_dispatched(mock_payment_service):
+    """
+    払い出したトランザクションIDで転送され、結果が記録されることをテストします。
+    """
+    queue = DispatchQueue(mock_payment_service, maxsize=10, workers=2)
+    queue.start()
+
+    job = await queue.submit(REQUEST_DATA)
+    assert len(job.transaction_id) == 20
+    assert await queue.drain(timeout=5) is True
+
+    assert queue.get(job.transaction_id).status == JOB_SUCCEEDED
+    assert queue.get(job.transaction_id).result == {"status": "success"}
+    assert mock_payment_service.last_transaction_id == job.transaction_id
+    assert mock_payment_service.last_request_data == REQUEST_DATA
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    """
+    キューが満杯の場合にQueueFullErrorとなることをテストします。
+    """
+    service = BlockingPaymentService()
+    queue = DispatchQueue(service, maxsize=1, workers=1)
+    queue.start()
+
+    first = await queue.submit(REQUEST_DATA)
+    await asyncio.sleep(0)  # ワーカーが1件目を取り出すのを待つ
+    second = await queue.submit(REQUEST_DATA)
+    assert queue.get(second.transaction_id).status == JOB_QUEUED
+    with pytest.raises(QueueFullError):
+        await queue.submit(REQUEST_DATA)
+
+    service.release.set()
+    assert await queue.drain(timeout=5) is True
+    assert queue.get(first.transaction_id).status == JOB_SUCCEEDED
+    assert queue.get(second.transaction_id).status == JOB_SUCCEEDED
+    with pytest.raises(QueueClosedError):
+        await queue.submit(REQUEST_DATA)
+
+
+@pytest.mark.asyncio
+async def test_drain_times_out_and_retains_bounded_results(mock_payment_service):
+    """
+    ドレインが期限で打ち切られること、保持件数が上限を超えないことをテストします。
+    """
+    service = BlockingPaymentService()
+    queue = DispatchQueue(service, maxsize=10, workers=1)
+    queue.start()
+    await queue.submit(REQUEST_DATA)
+    assert await queue.drain(timeout=0.05) is False
+
+    queue = DispatchQueue(mock_payment_service, maxsize=10, workers=1, max_results=3)
+    queue.start()
+    jobs = [await queue.submit(REQUEST_DATA) for _ in range(3)]
+    await queue.drain(timeout=5)
+    queue.start()
+    latest = await queue.submit(REQUEST_DATA)
+    await queue.drain(timeout=5)
+
+    assert queue.get(jobs[0].transaction_id) is None
+    assert queue.get(latest.transaction_id).status == JOB_SUCCEEDED
@@ -0,0 +1,66 @@
+"""
+列指向エクスポートのテストモジュール。
+
+パーティション分割と増分エクスポートの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from app.infrastructure.journal import Journal
+from app.tools.export import FORMAT_COLUMNAR, JST, Exporter, read_columns
+
+
+def _response(order: str, ts: float, code: str = "0000") -> dict:
+    return {
+        "type": "response",
+        "ts": ts,
+        "transactionId": f"txn-{order}",
+        "companyCode": "DCM12345678",
+        "storeCode": "TNP00000001",
+        "orderNumber": order,
+        "amount": "3980",
+        "success": code == "0000",
+        "responseCode": code,
+        "elapsedMs": 12.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_incremental_export_by_hour(tmp_path):
+    """
+    時間単位のパーティションに書き出され、2回目以降は新しいレコードのみが書き出されることをテストします。
+    """
+    journal_dir = tmp_path / "journal"
+    output_dir = tmp_path / "analytics"
+    ten = datetime(2024, 5, 1, 10, 30, tzinfo=JST).timestamp()
+    eleven = datetime(2024, 5, 1, 11, 5, tzinfo=JST).timestamp()
+
+    journal = Journal(str(journal_dir))
+    await journal.start()
+    await journal.append({"type": "request", "orderNumber": "A1", "ts": ten})
+    await journal.append(_response("A1", ten))
+    await journal.append(_response("A2", ten + 1, code="E500"))
+    await journal.append(_response("A3", eleven))
+
+    exporter = Exporter(str(journal_dir), str(output_dir), FORMAT_COLUMNAR)
+    assert exporter.run() == {"date=2024-05-01/hour=10": 2, "date=2024-05-01/hour=11": 1}
+
+    (part,) = (output_dir / "date=2024-05-01/hour=10").iterdir()
+    columns = read_columns(str(part))
+    assert columns["orderNumber"] == ["A1", "A2"]
+    assert columns["responseCode"] == ["0000", "E500"]
+    assert columns["success"] == [True, False]
+    assert columns["amount"] == [3980, 3980]
+    assert columns["storeCode"] == ["TNP00000001", "TNP00000001"]
+
+    # 新しいレコードがなければ何も書き出さない
+    assert exporter.run() == {}
+
+    await journal.append(_response("A4", eleven + 60))
+    await journal.close()
+    assert exporter.run() == {"date=2024-05-01/hour=11": 1}
+    assert len(list((output_dir / "date=2024-05-01/hour=11").iterdir())) == 2
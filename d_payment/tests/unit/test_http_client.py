@@ -0,0 +1,87 @@
+"""
+HTTPクライアントのテストモジュール。
+
+未解析のレスポンスの受け渡し、応答コードの抜き出し、レスポンスサイズの上限の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.domain.entities.payment import RawUpstreamResponse
+from app.infrastructure.http_client import HttpClient, sniff_response_code
+
+BODY = b'{"responseCode":"0000","transactionId":"t1","regiChargeResList":[{"responseCode":"0000"}]}'
+
+
+def _client(handler, **kwargs) -> HttpClient:
+    client = HttpClient(**kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_sniff_response_code():
+    """
+    トップレベルのresponseCodeのみが抜き出されることをテストします。
+    """
+    assert sniff_response_code(BODY) == "0000"
+    assert sniff_response_code(b'{ "responseCode" : "E101" }') == "E101"
+    # 明細側が先に現れる場合は全体を解析する
+    assert sniff_response_code(b'{"list":[{"responseCode":"0000"}],"responseCode":"E201"}') == "E201"
+    assert sniff_response_code(b'{"list":[{"responseCode":"0000"}]}') is None
+    assert sniff_response_code(b"<html>error</html>") is None
+
+
+@pytest.mark.asyncio
+async def test_post_raw_returns_body_unchanged():
+    """
+    正常レスポンスのボディとContent-Typeがそのまま返され、エラー時はpostと同じ形式になることをテストします。
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/error":
+            return httpx.Response(503, json={"message": "busy"})
+        return httpx.Response(
+            200, content=BODY, headers={"Content-Type": "application/json; charset=utf-8"}
+        )
+
+    client = _client(handler)
+    try:
+        raw = await client.post_raw("http://upstream/ok", {"a": 1})
+        assert isinstance(raw, RawUpstreamResponse)
+        assert raw.content == BODY
+        assert raw.content_type == "application/json; charset=utf-8"
+        assert raw.response_code == "0000"
+
+        error = await client.post_raw("http://upstream/error", {"a": 1})
+        assert error == await client.post("http://upstream/error", {"a": 1})
+        assert error == {"success": False, "status_code": 503, "error": {"message": "busy"}}
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_response_size_limit():
+    """
+    Content-Lengthまたは受信したバイト数が上限を超えた場合にエラーになることをテストします。
+    """
+    async def chunks():
+        for _ in range(8):
+            yield b"x" * 64
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/declared":
+            return httpx.Response(200, content=b"x" * 1024)
+        return httpx.Response(200, content=chunks())
+
+    client = _client(handler, max_response_bytes=256)
+    try:
+        for path in ("/declared", "/streamed"):
+            for result in (
+                await client.post(f"http://upstream{path}", {}),
+                await client.post_raw(f"http://upstream{path}", {}),
+            ):
+                assert result["success"] is False
+                assert "Response too large" in result["error"]
+    finally:
+        await client.aclose()
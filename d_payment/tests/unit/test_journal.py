@@ -0,0 +1,169 @@
+"""
+トランザクションジャーナルのテストモジュール。
+
+グループコミット、セグメントの切り替え、起動時のリカバリの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+
+import pytest
+
+from app.application.payment_service import PaymentService
+from app.infrastructure.journal import Journal, list_segments, read_journal, recover
+from tests.conftest import MockHttpClient
+
+
+@pytest.mark.asyncio
+async def test_group_commit_batches_records(tmp_path):
+    """
+    並行して追記したレコードが少ない回数のコミットにまとめられることをテストします。
+    """
+    journal = Journal(str(tmp_path))
+    await journal.start()
+
+    seqs = await asyncio.gather(
+        *(journal.append({"type": "request", "transactionId": f"t{i}"}) for i in range(200))
+    )
+    await journal.close()
+
+    assert sorted(seqs) == list(range(1, 201))
+    assert journal.records == 200
+    assert journal.commits < 200
+    records = list(read_journal(str(tmp_path)))
+    assert [r["seq"] for r in records] == list(range(1, 201))
+
+
+@pytest.mark.asyncio
+async def test_rotation_and_redaction(tmp_path):
+    """
+    サイズ上限でセグメントが切り替わり、認証パスワードがマスクされることをテストします。
+    """
+    journal = Journal(str(tmp_path), segment_max_bytes=512)
+    await journal.start()
+    for i in range(20):
+        await journal.append(
+            {"type": "request", "request": {"authenticationPass": "secret", "transactionId": f"t{i}"}}
+        )
+    await journal.close()
+
+    assert len(list_segments(str(tmp_path))) > 1
+    records = list(read_journal(str(tmp_path)))
+    assert [r["seq"] for r in records] == list(range(1, 21))
+    assert all(r["request"]["authenticationPass"] == "****" for r in records)
+
+
+@pytest.mark.asyncio
+async def test_recovery_truncates_torn_tail(tmp_path):
+    """
+    途切れた末尾のレコードが切り詰められ、書き込み中のセグメントは対象外となることをテストします。
+    """
+    journal = Journal(str(tmp_path))
+    await journal.start()
+    for i in range(3):
+        await journal.append({"type": "request", "transactionId": f"t{i}"})
+    segment = journal.segment_path
+    await journal.close()
+    with open(segment, "ab") as file:
+        file.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{\"type\":")
+
+    active = Journal(str(tmp_path))
+    report = await active.start()
+    assert report.records == 3
+    assert report.truncated_segments == 1
+    assert len(list(read_journal(str(tmp_path)))) == 3
+
+    # 他のジャーナルが書き込み中のセグメントには触れない
+    await active.append({"type": "request", "transactionId": "t3"})
+    assert recover(str(tmp_path)).skipped_segments == 1
+    await active.close()
+
+
+class FailingSegment:
+    """
+    指定した回数だけ、途中まで書き込んでから失敗するセグメントファイル。
+    """
+
+    def __init__(self, file, failures: int, error: Exception):
+        self._file = file
+        self.failures = failures
+        self.error = error
+
+    def write(self, data) -> int:
+        if self.failures > 0:
+            self.failures -= 1
+            self._file.write(data[: len(data) // 2])
+            raise self.error
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_is_rolled_back_and_writer_continues(tmp_path):
+    """
+    途中まで書き込んで失敗したコミットは切り詰められ、以降のレコードが失われないことをテストします。
+    """
+    journal = Journal(str(tmp_path))
+    await journal.start()
+    await journal.append({"type": "request", "transactionId": "t0"})
+    journal._file = FailingSegment(journal._file, 1, OSError(errno.ENOSPC, "No space left on device"))
+
+    with pytest.raises(OSError):
+        await journal.append({"type": "request", "transactionId": "t1"})
+    for i in range(2, 4):
+        await journal.append({"type": "request", "transactionId": f"t{i}"})
+    await journal.close()
+
+    assert recover(str(tmp_path)).truncated_bytes == 0
+    records = list(read_journal(str(tmp_path)))
+    assert [r["transactionId"] for r in records] == ["t0", "t2", "t3"]
+
+
+@pytest.mark.asyncio
+async def test_unexpected_commit_error_does_not_stop_writer(tmp_path):
+    """
+    OSError以外の例外でも待機中の追記が失敗として完了し、書き込みタスクが継続することをテストします。
+    """
+    journal = Journal(str(tmp_path))
+    await journal.start()
+    journal._file = FailingSegment(journal._file, 1, RuntimeError("unexpected"))
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(journal.append({"type": "request", "transactionId": "t0"}), 5)
+    await asyncio.wait_for(journal.append({"type": "request", "transactionId": "t1"}), 5)
+    await journal.close()
+
+    assert [r["transactionId"] for r in read_journal(str(tmp_path))] == ["t1"]
+
+
+@pytest.mark.asyncio
+async def test_payment_service_journals_request_and_response(tmp_path):
+    """
+    決済サービスが送信前にリクエストを、受信後にレスポンスを記録することをテストします。
+    """
+    journal = Journal(str(tmp_path))
+    await journal.start()
+    http_client = MockHttpClient({"responseCode": "0000", "responseMessage": "Success"})
+    service = PaymentService(http_client, journal=journal)
+
+    response = await service.process_payment(
+        {"paymentInfo": {"amount": 3980, "orderNumber": "TEST12345"}},
+        transaction_id="txn00000000000000001",
+    )
+    await journal.close()
+
+    assert response.success is True
+    request, result = list(read_journal(str(tmp_path)))
+    assert request["type"] == "request"
+    assert request["orderNumber"] == "TEST12345"
+    assert request["request"]["authenticationPass"] == "****"
+    assert result["type"] == "response"
+    assert result["transactionId"] == "txn00000000000000001"
+    assert result["attemptId"] == request["attemptId"]
+    assert result["success"] is True
+    assert result["responseCode"] == "0000"
+    assert result["elapsedMs"] >= 0
@@ -0,0 +1,37 @@
+"""
+JSONの構造の制限のテストモジュール。
+
+文字列の中の括弧やコロンを数えずに、入れ子の深さとキーの数を検査することをテストします。
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from app.core.json_limits import check_json_limits, json_depth
+
+
+def test_depth_and_keys_ignore_strings():
+    """
+    文字列（エスケープした引用符を含む）の中の括弧とコロンを数えないことをテストします。
+    """
+    body = json.dumps({"a": {"b": [1, {"c": "[[{{:: \\\" ]]"}]}, "d": "x:y"}).encode()
+    assert json_depth(body) == 4
+    assert check_json_limits(body, max_depth=4, max_keys=4) is None
+    assert "深さ" in check_json_limits(body, max_depth=3, max_keys=0)
+    assert "キー" in check_json_limits(body, max_depth=0, max_keys=3)
+    assert check_json_limits(b"[" * 10000, max_depth=0, max_keys=0) is None
+    assert check_json_limits(b"123", max_depth=1, max_keys=1) is None
+
+
+def test_escaped_quotes_take_linear_time():
+    """
+    エスケープした引用符が続く上限近くの大きさのボディも、短時間で検査が終わることをテストします。
+    """
+    body = b"[" * 40 + b'"' + b'\\"' * 32700
+    assert len(body) <= 65536
+
+    started = time.perf_counter()
+    assert "深さ" in check_json_limits(body, max_depth=32, max_keys=1000)
+    assert time.perf_counter() - started < 0.5
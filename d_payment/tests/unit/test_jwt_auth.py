@@ -0,0 +1,144 @@
+"""
+JWT認証のテストモジュール。
+
+検証済みトークンのキャッシュ（有効期限とLRUの上限）と、
+JWKSの鍵の保持（鍵IDによる選択と再取得の制限）をテストします。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+import pytest
+
+rsa = pytest.importorskip("rsa")
+from jose import jwk, jwt
+
+import app.infrastructure.jwt_auth as jwt_auth
+from app.infrastructure.jwt_auth import JwksKeyStore, JwtVerifier, TokenVerificationError
+
+SECRET = "test-secret"
+
+
+class FakeClock:
+    def __init__(self, now: Optional[float] = None) -> None:
+        self.now = time.time() if now is None else now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _hs256(clock: FakeClock, subject: str, lifetime: int = 60) -> str:
+    return jwt.encode({"sub": subject, "exp": int(clock.now) + lifetime}, SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """署名の検証（jwt.decode）の呼び出し回数を数えます。"""
+    calls = []
+    original = jwt_auth.jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return original(token, *args, **kwargs)
+
+    monkeypatch.setattr(jwt_auth.jwt, "decode", counting_decode)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached_until_expiry(decode_calls, monkeypatch):
+    """
+    同じトークンの2回目以降は署名を検証せず、有効期限を過ぎたトークンは拒否することをテストします。
+    """
+    clock = FakeClock()
+    monkeypatch.setattr("jose.jwt.timegm", lambda _: int(clock.now))
+    verifier = JwtVerifier(["HS256"], secret=SECRET, clock=clock)
+    token = _hs256(clock, "merchant-1")
+
+    for _ in range(5):
+        assert (await verifier.verify(token))["sub"] == "merchant-1"
+    assert len(decode_calls) == 1
+    assert verifier.stats()["hits"] == 4
+
+    clock.now += 61
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(token)
+    assert len(decode_calls) == 2
+    assert verifier.stats()["entries"] == 0
+
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(jwt.encode({"sub": "x", "exp": int(clock.now) + 60}, "wrong", algorithm="HS256"))
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(jwt.encode({"sub": "x"}, SECRET, algorithm="HS256"))
+    assert verifier.stats()["failures"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_tokens(decode_calls):
+    """
+    上限を超えた場合に、最も長く使われていないトークンから破棄することをテストします。
+    """
+    clock = FakeClock()
+    verifier = JwtVerifier(["HS256"], secret=SECRET, max_entries=2, clock=clock)
+    first, second, third = (_hs256(clock, f"merchant-{i}") for i in range(3))
+
+    await verifier.verify(first)
+    await verifier.verify(second)
+    await verifier.verify(first)
+    await verifier.verify(third)
+    assert len(decode_calls) == 3
+
+    await verifier.verify(first)
+    assert len(decode_calls) == 3
+    await verifier.verify(second)
+    assert len(decode_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_jwks_keys_are_selected_by_key_id_and_refetched_sparingly():
+    """
+    鍵IDで鍵を選び、未知の鍵IDでは再取得を最短間隔に1回までに制限することをテストします。
+    """
+    clock = FakeClock(0.0)
+    keys = {kid: rsa.newkeys(1024) for kid in ("k1", "k2")}
+    published = ["k1"]
+    fetches = []
+
+    def public_jwk(kid):
+        key = jwk.construct(keys[kid][0].save_pkcs1().decode(), "RS256").to_dict()
+        return {**key, "kid": kid}
+
+    async def fetch(source):
+        fetches.append(source)
+        return {"keys": [public_jwk(kid) for kid in published]}
+
+    def sign(kid, subject):
+        private = keys[kid][1].save_pkcs1().decode()
+        return jwt.encode(
+            {"sub": subject, "exp": 4_000_000_000}, private, algorithm="RS256", headers={"kid": kid}
+        )
+
+    store = JwksKeyStore("jwks.json", ttl=300, refresh_interval=30, fetch=fetch, clock=clock)
+    verifier = JwtVerifier(["RS256"], keys=store)
+
+    assert (await verifier.verify(sign("k1", "a")))["sub"] == "a"
+    assert (await verifier.verify(sign("k1", "b")))["sub"] == "b"
+    assert len(fetches) == 1
+    assert store.stats()["parsed"] == 1
+
+    clock.now = 40
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(sign("k2", "c"))
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(sign("k2", "d"))
+    assert len(fetches) == 2
+
+    published.append("k2")
+    clock.now = 71
+    assert (await verifier.verify(sign("k2", "e")))["sub"] == "e"
+    assert len(fetches) == 3
+
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(jwt.encode({"sub": "f", "exp": 4_000_000_000}, SECRET, algorithm="HS256"))
@@ -0,0 +1,76 @@
+"""
+ライフサイクル管理のテストモジュール。
+
+処理中の決済数の管理とレディネスエンドポイントの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.lifecycle import Lifecycle, lifecycle
+
+
+@pytest.mark.asyncio
+async def test_wait_idle_waits_for_inflight():
+    """
+    処理中の決済が完了するまでドレインが待機することをテストします。
+    """
+    state = Lifecycle()
+    state.mark_ready()
+    release = asyncio.Event()
+
+    async def payment() -> None:
+        async with state.track():
+            await release.wait()
+
+    task = asyncio.create_task(payment())
+    await asyncio.sleep(0)
+    assert state.inflight == 1
+
+    state.begin_drain()
+    assert state.is_ready is False
+    waiter = asyncio.create_task(state.wait_idle(timeout=5))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    release.set()
+    assert await waiter is True
+    await task
+    assert state.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_idle_times_out():
+    """
+    期限を超えた場合にドレインが打ち切られることをテストします。
+    """
+    state = Lifecycle()
+    release = asyncio.Event()
+
+    async def payment() -> None:
+        async with state.track():
+            await release.wait()
+
+    task = asyncio.create_task(payment())
+    await asyncio.sleep(0)
+
+    assert await state.wait_idle(timeout=0.05) is False
+    release.set()
+    await task
+
+
+def test_ready_endpoint(client):
+    """
+    レディネスがドレイン開始とともに503に切り替わることをテストします。
+    """
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    lifecycle.begin_drain()
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
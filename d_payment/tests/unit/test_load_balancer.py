@@ -0,0 +1,154 @@
+"""
+ロードバランサーのテストモジュール。
+
+送信先の選択、除外、復帰の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.infrastructure.load_balancer import (
+    STRATEGY_LEAST_OUTSTANDING,
+    LoadBalancer,
+)
+
+URLS = ["http://a.invalid/api", "http://b.invalid/api", "http://c.invalid/api"]
+
+
+def _balancer(now, **kwargs) -> LoadBalancer:
+    return LoadBalancer(
+        URLS, probe_interval=0, rng=random.Random(1), clock=lambda: now[0], **kwargs
+    )
+
+
+def test_peak_ewma_prefers_fast_endpoint():
+    """
+    レイテンシの大きいエンドポイントが選ばれにくくなり、処理中の数も考慮されることをテストします。
+    """
+    now = [0.0]
+    balancer = _balancer(now)
+    slow, fast, _ = balancer.endpoints
+    slow.observe(0.5)
+    fast.observe(0.01)
+
+    picks = [balancer.select() for _ in range(300)]
+    assert picks.count(slow) < picks.count(fast) / 5
+
+    # 小さい計測値は時間の経過に応じて反映される（peak EWMA）
+    now[0] = 30.0
+    slow.observe(0.01)
+    assert slow.ewma < 0.05
+
+    # 処理中のリクエストが多いエンドポイントはコストが上がる
+    balancer = _balancer(now, strategy=STRATEGY_LEAST_OUTSTANDING)
+    busy = balancer.endpoints[0]
+    for _ in range(3):
+        balancer.begin(busy)
+    assert busy not in {balancer.select() for _ in range(100)}
+
+
+def test_failing_endpoint_is_ejected_and_returns():
+    """
+    連続して失敗したエンドポイントが除外され、除外時間の経過後に復帰することをテストします。
+    """
+    now = [0.0]
+    balancer = _balancer(now, eject_failures=3, eject_seconds=10)
+    bad = balancer.endpoints[0]
+
+    for _ in range(3):
+        balancer.complete(bad, balancer.begin(bad), failed=True)
+    assert bad.ejections == 1
+    assert bad not in {balancer.select() for _ in range(100)}
+    assert balancer.stats()[0]["healthy"] is False
+
+    # 除外時間の経過後は再び選択され、次の失敗で除外時間が倍になる
+    now[0] = 10.0
+    assert bad in {balancer.select() for _ in range(100)}
+    balancer.complete(bad, balancer.begin(bad), failed=True)
+    assert bad.ejected_until == 30.0
+    assert bad.outstanding == 0
+
+    # すべてが除外中の場合は除外を無視して選択する
+    for endpoint in balancer.endpoints[1:]:
+        for _ in range(3):
+            balancer.complete(endpoint, balancer.begin(endpoint), failed=True)
+    assert balancer.select() in balancer.endpoints
+
+
+@pytest.mark.asyncio
+async def test_probes_reinstate_after_consecutive_successes_and_keep_backoff(monkeypatch):
+    """
+    除外中のエンドポイントは続けて正常なヘルスチェックの後にのみ復帰し、
+    復帰後の除外で除外時間が倍になることをテストします。
+    """
+    now = [0.0]
+    balancer = _balancer(
+        now, eject_failures=1, eject_seconds=10, probe_successes=2, probe_path="/health"
+    )
+    bad = balancer.endpoints[0]
+    statuses = iter([405, 503, 405, 405])
+
+    async def fake_get(url, timeout):
+        assert url == "http://a.invalid/health"
+        return httpx.Response(next(statuses))
+
+    monkeypatch.setattr(bad.client, "get", fake_get)
+
+    balancer.complete(bad, balancer.begin(bad), failed=True)
+    assert bad.ejected_until == 10.0
+    assert await balancer.probe(bad) is True
+    assert bad.is_ejected(now[0])
+    assert await balancer.probe(bad) is False
+    assert await balancer.probe(bad) is True
+    assert bad.is_ejected(now[0])
+    assert await balancer.probe(bad) is True
+    assert not bad.is_ejected(now[0])
+
+    balancer.complete(bad, balancer.begin(bad), failed=True)
+    assert bad.ejected_until == 20.0
+    await balancer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_probe_loop_survives_unexpected_errors(monkeypatch):
+    """
+    ヘルスチェックで想定外の例外が発生しても、次のヘルスチェックが行われることをテストします。
+    """
+    balancer = LoadBalancer(URLS[:1], probe_interval=0.01, probe_path="/health")
+    calls = []
+
+    async def failing_probe(endpoint):
+        calls.append(endpoint)
+        raise httpx.InvalidURL("invalid")
+
+    monkeypatch.setattr(balancer, "probe", failing_probe)
+    balancer.select()
+    await asyncio.sleep(0.1)
+    assert len(calls) >= 2
+    assert not balancer._probe_task.done()
+    await balancer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_no_probes_without_probe_path():
+    """
+    既定の設定（ヘルスチェックのパスが空）では、ヘルスチェックを開始せず、
+    決済のURLにGETを送らないことをテストします。
+    """
+    balancer = LoadBalancer(
+        URLS,
+        probe_interval=settings.PAYMENT_API_PROBE_INTERVAL,
+        probe_path=settings.PAYMENT_API_PROBE_PATH,
+    )
+    balancer.select()
+    assert balancer._probe_task is None
+    with pytest.raises(ValueError):
+        await balancer.probe(balancer.endpoints[0])
+    assert balancer.endpoints[0].probes == 0
+    await balancer.aclose()
@@ -0,0 +1,58 @@
+"""
+イベントループの監視のテストモジュール。
+
+ラグのヒストグラムの集計と、ループをブロックした処理のスタックとルートの記録をテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.loop_monitor import EventLoopMonitor, LagHistogram
+
+
+def test_histogram_buckets_are_cumulative():
+    """
+    区間ごとの件数が累積で出力され、分位点が区間の上限で近似されることをテストします。
+    """
+    histogram = LagHistogram(buckets_ms=(1, 10, 100))
+    for lag in (0.5, 0.7, 5, 50, 500):
+        histogram.record(lag)
+    stats = histogram.stats()
+    assert stats["buckets"] == {"1": 2, "10": 3, "100": 4, "+Inf": 5}
+    assert stats["count"] == 5 and stats["maxMs"] == 500
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(0.99) == 500
+
+
+async def blocking_handler(scope):
+    """ASGIアプリケーションのようにscopeを受け取り、ループをブロックするコルーチン。"""
+    await asyncio.sleep(0.06)
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_slow_callback_is_recorded_with_stack_and_route():
+    """
+    しきい値を超えてループをブロックした処理が、スタックとルートとともに記録されることをテストします。
+    """
+    monitor = EventLoopMonitor(interval=0.02, slow_threshold=0.1, log_interval=0)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        await blocking_handler({"type": "http", "method": "POST", "path": "/api/receive"})
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["slowCallbacks"] == 1
+    event = stats["recentSlowCallbacks"][0]
+    assert event["durationMs"] >= 250
+    assert event["route"] == "POST /api/receive"
+    assert event["stack"][-1] == "tests.unit.test_loop_monitor:blocking_handler"
+    assert stats["lag"]["count"] > 5
+    assert stats["lag"]["buckets"]["+Inf"] == stats["lag"]["count"]
@@ -0,0 +1,68 @@
+"""
+メモリ診断のテストモジュール。
+
+スナップショットの間で増えた確保箇所の集計と、型ごとのオブジェクト数の計数をテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.domain.entities.payment import PaymentResponse
+from app.infrastructure.memory_diagnostics import (
+    MemoryDiagnostics,
+    SnapshotNotFoundError,
+    count_objects,
+)
+
+# テスト中に確保したオブジェクトを保持する（スナップショットの間で解放されないように）
+_retained = []
+
+
+def grow() -> None:
+    """確保箇所として検出されるよう、まとまった量のメモリを確保します。"""
+    _retained.extend(bytearray(1024) for _ in range(1000))
+
+
+@pytest.mark.asyncio
+async def test_diff_reports_top_growing_allocation_site():
+    """
+    2つのスナップショットの間で増えた確保箇所が、増加量の大きい順の先頭に現れることをテストします。
+    """
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+    with pytest.raises(RuntimeError):
+        await diagnostics.take_snapshot()
+    diagnostics.start(frames=2)
+    try:
+        first = await diagnostics.take_snapshot()
+        with pytest.raises(SnapshotNotFoundError):
+            await diagnostics.diff()
+        grow()
+        second = await diagnostics.take_snapshot()
+        result = await diagnostics.diff(limit=5)
+    finally:
+        diagnostics.stop()
+        _retained.clear()
+
+    assert (result["base"], result["target"]) == (first["id"], second["id"])
+    top = result["top"][0]
+    assert top["sizeDiff"] >= 1024 * 1000
+    assert any("test_memory_diagnostics.py" in site for site in top["site"])
+    assert diagnostics.status()["tracing"] is False
+
+
+@pytest.mark.asyncio
+async def test_count_objects_counts_app_types_and_pending_futures():
+    """
+    指定した型のオブジェクト数と、完了していないフューチャーの数を数えることをテストします。
+    """
+    responses = [PaymentResponse(success=True, message="ok") for _ in range(3)]
+    future = asyncio.get_running_loop().create_future()
+    counts = count_objects({"PaymentResponse": PaymentResponse})
+    future.cancel()
+
+    assert counts["PaymentResponse"] >= len(responses)
+    assert counts["pendingFutures"] >= 1
+    assert counts["pendingTasks"] >= 1
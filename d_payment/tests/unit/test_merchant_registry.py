@@ -0,0 +1,184 @@
+"""
+加盟店レジストリのテストモジュール。
+
+加盟店の選択、再読み込み、流量制限、リクエストテンプレートの単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.application.payment_service import PaymentService
+from app.core.rate_limit import TokenBucket
+from app.infrastructure.merchant_registry import (
+    MerchantRegistry,
+    UnknownMerchantError,
+    parse_registry,
+)
+
+REGISTRY = {
+    "default": "store-a",
+    "merchants": [
+        {
+            "merchantId": "store-a",
+            "companyCode": "DCM00000001",
+            "storeCode": "TNP00000001",
+            "authenticationPass": "PASS-A",
+        },
+        {
+            "merchantId": "store-b",
+            "companyCode": "DCM00000002",
+            "storeCode": "TNP00000002",
+            "authenticationPass": "PASS-B",
+            "maxConnections": 4,
+            "rateLimitRps": 10,
+            "rateLimitBurst": 2,
+        },
+    ],
+}
+
+
+def _write(path, data, mtime_ns=None) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_resolve_and_reload(tmp_path):
+    """
+    加盟店IDで選択でき、ファイルの更新で切り替わり、不正な内容では切り替わらないことをテストします。
+    """
+    path = tmp_path / "merchants.json"
+    _write(path, REGISTRY, mtime_ns=1_000_000_000)
+    registry = MerchantRegistry(str(path))
+    assert registry.reload(force=True)
+
+    assert registry.resolve(None).merchant_id == "store-a"
+    assert registry.resolve("store-b").store_code == "TNP00000002"
+    with pytest.raises(UnknownMerchantError):
+        registry.resolve("store-c")
+    assert registry.client_for(registry.resolve("store-a")) is None
+    assert registry.client_for(registry.resolve("store-b")) is not None
+
+    # 更新されていなければ読み込まない
+    assert not registry.reload()
+
+    updated = json.loads(json.dumps(REGISTRY))
+    updated["merchants"][1]["storeCode"] = "TNP00000099"
+    updated["merchants"].append(dict(updated["merchants"][0], merchantId="store-c"))
+    _write(path, updated, mtime_ns=2_000_000_000)
+    assert registry.reload()
+    assert registry.resolve("store-b").store_code == "TNP00000099"
+    assert registry.resolve("store-c").company_code == "DCM00000001"
+
+    broken = dict(updated, default="missing")
+    _write(path, broken, mtime_ns=3_000_000_000)
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert len(registry) == 3
+    assert registry.resolve(None).merchant_id == "store-a"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        {"merchants": {"merchantId": "store-a"}},
+        {"merchants": ["store-a"]},
+        {"merchants": [dict(REGISTRY["merchants"][0], merchantId=["store-a"])]},
+        {"merchants": [dict(REGISTRY["merchants"][0], companyCode=1)]},
+        {"merchants": [dict(REGISTRY["merchants"][0], maxConnections=[4])]},
+    ],
+)
+def test_parse_registry_rejects_wrong_types(data):
+    """
+    レジストリファイルの構造や項目の型が不正な場合にValueErrorとなることをテストします。
+    """
+    with pytest.raises(ValueError):
+        parse_registry(data)
+
+
+@pytest.mark.asyncio
+async def test_watch_survives_unexpected_errors(tmp_path, monkeypatch):
+    """
+    再読み込みで想定外の例外が発生しても、更新の確認を続けることをテストします。
+    """
+    path = tmp_path / "merchants.json"
+    _write(path, REGISTRY)
+    registry = MerchantRegistry(str(path), reload_interval=0.01)
+    await registry.start()
+    calls = []
+
+    def failing_reload(force=False):
+        calls.append(force)
+        raise TypeError("unexpected")
+
+    monkeypatch.setattr(registry, "reload", failing_reload)
+    await asyncio.sleep(0.1)
+    assert len(calls) >= 2
+    assert not registry._task.done()
+    assert len(registry) == 2
+    await registry.close()
+
+
+def test_merchant_repr_hides_authentication_pass():
+    """
+    加盟店の文字列表現に認証パスが含まれないことをテストします。
+    """
+    merchants, _ = parse_registry(REGISTRY)
+    assert "PASS-A" not in repr(merchants["store-a"])
+
+
+def test_rate_limit_per_merchant(tmp_path):
+    """
+    流量制限を設定した加盟店のみ、バーストを超えた分が制限されることをテストします。
+    """
+    path = tmp_path / "merchants.json"
+    _write(path, REGISTRY)
+    registry = MerchantRegistry(str(path))
+    registry.reload(force=True)
+    store_a = registry.resolve("store-a")
+    store_b = registry.resolve("store-b")
+
+    assert all(registry.try_acquire(store_a) == 0 for _ in range(100))
+    assert registry.try_acquire(store_b) == 0
+    assert registry.try_acquire(store_b) == 0
+    assert registry.try_acquire(store_b) > 0
+
+    now = [0.0]
+    bucket = TokenBucket(rate=10, burst=1, clock=lambda: now[0])
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.1)
+    now[0] = 0.1
+    assert bucket.try_acquire() == 0
+
+
+def test_request_uses_merchant_template(tmp_path, mock_http_client):
+    """
+    加盟店を指定した場合、加盟店の認証情報で外部API用のリクエストが組み立てられることをテストします。
+    """
+    path = tmp_path / "merchants.json"
+    _write(path, REGISTRY)
+    registry = MerchantRegistry(str(path))
+    registry.reload(force=True)
+    service = PaymentService(mock_http_client)
+    merchant = registry.resolve("store-b")
+
+    payment_request = service._transform_request(
+        {"paymentInfo": {"amount": 100, "orderNumber": "ORDER1"}}, "txn1", merchant
+    )
+    request_dict = service._payment_request_to_dict(payment_request, merchant)
+
+    assert request_dict["companyCode"] == "DCM00000002"
+    assert request_dict["storeCode"] == "TNP00000002"
+    assert request_dict["authenticationPass"] == "PASS-B"
+    assert request_dict["transactionId"] == "txn1"
+    assert request_dict["regiChargeReqList"][0]["storeOrderNumber"] == "ORDER1"
+    assert request_dict == service._payment_request_to_dict(payment_request)
+    # テンプレートは送信ごとに複製される
+    assert merchant.request_template["storeCode"] == "TNP00000002"
+    assert "transactionId" not in merchant.request_template
@@ -0,0 +1,88 @@
+"""
+マイクロベンチマークのテストモジュール。
+
+ベースライン比較処理の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+from benchmarks.micro import Case, build_cases, find_regressions, measure, run_suite
+
+BASELINE = {
+    "calibration_ns": 10000.0,
+    "cases": {
+        "transform_request": {"ns": 5000.0, "ratio": 0.5},
+        "process_payment": {"ns": 10000.0, "ratio": 1.0, "tolerance": 0.5},
+    },
+}
+
+
+def test_find_regressions_detects_slowdown():
+    """
+    許容率を超えて遅くなったケースが検出されることをテストします。
+    """
+    current = {
+        "cases": {
+            "transform_request": {"ns": 7000.0, "ratio": 0.7},
+            "process_payment": {"ns": 14000.0, "ratio": 1.4},
+            "new_case": {"ns": 1.0, "ratio": 1.0},
+        }
+    }
+
+    regressions = find_regressions(BASELINE, current, tolerance=0.25)
+
+    # process_paymentはケースごとの許容率（50%）の範囲内
+    assert len(regressions) == 1
+    assert regressions[0].startswith("transform_request")
+
+
+def test_find_regressions_allows_speedup():
+    """
+    速くなったケースは劣化として扱われないことをテストします。
+    """
+    current = {"cases": {"transform_request": {"ns": 1000.0, "ratio": 0.1}}}
+
+    assert find_regressions(BASELINE, current) == []
+
+
+def test_find_regressions_widens_allowance_for_noise():
+    """
+    計測のばらつきが大きい場合は、許容率を超えても劣化として扱われないことをテストします。
+    """
+    current = {"cases": {"transform_request": {"ns": 7000.0, "ratio": 0.7, "noise": 0.3}}}
+
+    assert find_regressions(BASELINE, current, tolerance=0.25) == []
+    current["cases"]["transform_request"]["ratio"] = 0.8
+    assert len(find_regressions(BASELINE, current, tolerance=0.25)) == 1
+
+
+def test_run_suite_reports_ratio_and_noise():
+    """
+    計測結果にケースごとの比率とばらつきが含まれることをテストします。
+    """
+    result = run_suite("transform_request", min_time=0.001, rounds=2, repeat=1)
+
+    assert result["calibration_ns"] > 0
+    case = result["cases"]["transform_request"]
+    assert case["ns"] > 0
+    assert case["ratio"] > 0
+    assert case["noise"] >= 0
+
+
+def test_all_cases_run():
+    """
+    すべての計測ケースが実行できることをテストします。
+    """
+    for case in build_cases():
+        assert measure(case, min_time=0.001, repeat=1) > 0
+
+
+def test_measure_async_case():
+    """
+    非同期ケースが計測できることをテストします。
+    """
+
+    async def noop() -> None:
+        return None
+
+    assert measure(Case("noop", noop, is_async=True), min_time=0.001, repeat=1) > 0
@@ -0,0 +1,161 @@
+"""
+決済状況インデックスのテストモジュール。
+
+状態の反映、破棄、再構築の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.application.payment_index import (
+    PAYMENT_FAILED,
+    PAYMENT_PENDING,
+    PAYMENT_SUCCEEDED,
+    PaymentIndex,
+)
+from app.application.payment_service import PaymentService
+from tests.conftest import MockHttpClient
+
+
+def _request(order: str, txn: str, ts: float) -> dict:
+    return {"type": "request", "orderNumber": order, "transactionId": txn, "ts": ts}
+
+
+def _response(order: str, txn: str, ts: float, code: str = "0000") -> dict:
+    return {
+        "type": "response",
+        "orderNumber": order,
+        "transactionId": txn,
+        "ts": ts,
+        "success": code == "0000",
+        "responseCode": code,
+        "elapsedMs": 12.5,
+    }
+
+
+def test_apply_tracks_latest_attempt():
+    """
+    最後の送信の状況を保持し、古い送信の結果で上書きしないことをテストします。
+    """
+    index = PaymentIndex()
+    now = time.time()
+
+    index.apply(_request("ORDER1", "t1", now))
+    assert index.get("ORDER1").status == PAYMENT_PENDING
+
+    index.apply(_response("ORDER1", "t1", now + 1, code="E500"))
+    assert index.get("ORDER1").status == PAYMENT_FAILED
+
+    index.apply(_request("ORDER1", "t2", now + 2))
+    index.apply(_response("ORDER1", "t1", now + 3))
+    entry = index.get("ORDER1")
+    assert entry.status == PAYMENT_PENDING
+    assert entry.attempts == 2
+
+    index.apply(_response("ORDER1", "t2", now + 4))
+    assert index.get("ORDER1").to_dict() == {
+        "orderNumber": "ORDER1",
+        "transactionId": "t2",
+        "status": PAYMENT_SUCCEEDED,
+        "responseCode": "0000",
+        "requestedAt": now + 2,
+        "completedAt": now + 4,
+        "elapsedMs": 12.5,
+        "attempts": 2,
+    }
+
+
+def test_eviction_by_size_and_ttl():
+    """
+    上限を超えたもの、期限切れのものが古い順に破棄されることをテストします。
+    """
+    index = PaymentIndex(max_entries=2, ttl=60)
+    now = time.time()
+    for i in range(3):
+        index.apply(_request(f"ORDER{i}", f"t{i}", now))
+
+    assert len(index) == 2
+    assert index.get("ORDER0") is None
+    assert index.get("ORDER2") is not None
+    assert index.get("ORDER2", now=now + 61) is None
+
+
+def test_rebuild_skips_expired_records():
+    """
+    再構築で保持期間内のレコードのみが反映されることをテストします。
+    """
+    index = PaymentIndex(ttl=60)
+    now = time.time()
+    index.apply(_request("STALE", "t0", now))
+    records = [
+        _request("OLD", "t1", now - 120),
+        _response("OLD", "t1", now - 119),
+        _request("NEW", "t2", now - 5),
+        _response("NEW", "t2", now - 4),
+    ]
+
+    assert index.rebuild(records) == 2
+    assert index.get("OLD") is None
+    assert index.get("STALE") is None
+    assert index.get("NEW").status == PAYMENT_SUCCEEDED
+
+
+def test_apply_distinguishes_attempts_with_same_transaction_id():
+    """
+    トランザクションIDが同じでも、古い送信の結果で新しい送信の状況を上書きしないことをテストします。
+    """
+    index = PaymentIndex()
+    now = time.time()
+
+    index.apply({**_request("ORDER1", "t0", now), "attemptId": "a1"})
+    index.apply({**_request("ORDER1", "t0", now + 1), "attemptId": "a2"})
+    index.apply({**_response("ORDER1", "t0", now + 2, code="E500"), "attemptId": "a1"})
+    assert index.get("ORDER1").status == PAYMENT_PENDING
+
+    index.apply({**_response("ORDER1", "t0", now + 3), "attemptId": "a2"})
+    assert index.get("ORDER1").status == PAYMENT_SUCCEEDED
+
+
+class GatedHttpClient(MockHttpClient):
+    """送信ごとに、テスト側で解放するまでレスポンスを返さないHTTPクライアント。"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.gates = []
+
+    async def post(self, url, data, timeout=30):
+        gate = asyncio.Event()
+        self.gates.append(gate)
+        response = self.responses[len(self.gates) - 1]
+        await gate.wait()
+        return response
+
+
+@pytest.mark.asyncio
+async def test_payment_service_ignores_late_response_of_older_attempt():
+    """
+    トランザクションIDを省略した再送の後に、前の送信の結果が届いても上書きしないことをテストします。
+    """
+    index = PaymentIndex()
+    http_client = GatedHttpClient([{"responseCode": "E500"}, {"responseCode": "0000"}])
+    service = PaymentService(http_client, index=index)
+    request = {"paymentInfo": {"amount": 3980, "orderNumber": "TEST12345"}}
+
+    first = asyncio.create_task(service.process_payment(request))
+    second = asyncio.create_task(service.process_payment(request))
+    while len(http_client.gates) < 2:
+        await asyncio.sleep(0)
+
+    http_client.gates[1].set()
+    await second
+    http_client.gates[0].set()
+    await first
+
+    entry = index.get("TEST12345")
+    assert entry.status == PAYMENT_SUCCEEDED
+    assert entry.attempts == 2
@@ -0,0 +1,57 @@
+"""
+サンプリングプロファイラーのテストモジュール。
+
+イベントループで実行中のコルーチンのスタックが、タスク名を根にした
+折り畳み形式で集計されることをテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.profiler import ProfilerBusyError, SamplingProfiler
+
+
+def busy_work(seconds: float) -> None:
+    """CPUを使い続ける処理。"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+async def busy_handler() -> None:
+    """イベントループをブロックしながら処理するコルーチン。"""
+    for _ in range(20):
+        busy_work(0.02)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_profile_collapses_running_coroutine_stacks():
+    """
+    実行中のコルーチンのスタックがタスク名を根にして集計され、
+    採取中の重複した採取は拒否されることをテストします。
+    """
+    profiler = SamplingProfiler(interval=0.005)
+    worker = asyncio.create_task(busy_handler())
+    profiling = asyncio.create_task(profiler.profile(0.3))
+    await asyncio.sleep(0)
+    assert profiler.running
+    with pytest.raises(ProfilerBusyError):
+        await profiler.profile(0.1)
+    await worker
+    result = await profiling
+
+    assert not profiler.running
+    assert result.samples > 0
+    lines = result.collapsed().splitlines()
+    busy = [line for line in lines if "test_profiler:busy_work" in line]
+    assert busy, lines
+    stack, count = busy[0].rsplit(" ", 1)
+    frames = stack.split(";")
+    assert frames[0] == "task:busy_handler"
+    assert frames.index("tests.unit.test_profiler:busy_handler") < frames.index("tests.unit.test_profiler:busy_work")
+    assert int(count) > 0
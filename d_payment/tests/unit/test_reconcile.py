@@ -0,0 +1,103 @@
+"""
+決済照合コマンドのテストモジュール。
+
+外部ソートマージによる照合結果の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import csv
+import random
+
+import pytest
+
+from app.tools import reconcile
+from app.tools.reconcile import (
+    AMOUNT_MISMATCH,
+    DUPLICATE,
+    INVALID_AMOUNT,
+    MISSING_IN_GATEWAY,
+    MISSING_IN_PROVIDER,
+    ReconcileRun,
+    external_sort,
+)
+
+
+def _rows():
+    gateway = [(f"ORDER{i:06d}", str(1000 + i)) for i in range(5000)]
+    provider = [(f"ORDER{i:06d}", str(1000 + i)) for i in range(5000)]
+    # 欠落・重複・金額不一致・金額不正を作る
+    provider[30] = ("ORDER000030", "9999")
+    provider[40] = ("ORDER000040", "abc")
+    del provider[10]
+    provider.append(("ORDER999999", "500"))
+    gateway.append(("ORDER000020", "1020"))
+    random.Random(1).shuffle(gateway)
+    random.Random(2).shuffle(provider)
+    return gateway, provider
+
+
+def test_external_sort_uses_multiple_merge_passes(tmp_path):
+    """
+    ランの数が同時マージ数を超える場合も正しく整列されることをテストします。
+    """
+    rows = [(f"K{random.Random(i).randint(0, 10**6):07d}", str(i)) for i in range(2500)]
+
+    merged, count = external_sort(iter(rows), str(tmp_path), run_rows=100, fan_in=4)
+
+    assert count == 2500
+    assert [r[0] for r in merged] == sorted(r[0] for r in rows)
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_reconcile_reports_discrepancies(tmp_path, monkeypatch, vectorized):
+    """
+    欠落・重複・金額不一致・金額不正が報告されることをテストします。
+    """
+    if vectorized:
+        pytest.importorskip("numpy")
+    gateway, provider = _rows()
+    run = ReconcileRun(vectorized=vectorized, workdir=str(tmp_path))
+    # 小さなランで外部ソートの経路を通す
+    run.run_rows = 700
+    run.fan_in = 3
+
+    found = {(d.kind, d.order_number) for d in run.execute(iter(gateway), iter(provider))}
+
+    assert found == {
+        (MISSING_IN_PROVIDER, "ORDER000010"),
+        (MISSING_IN_GATEWAY, "ORDER999999"),
+        (DUPLICATE, "ORDER000020"),
+        (AMOUNT_MISMATCH, "ORDER000030"),
+        (INVALID_AMOUNT, "ORDER000040"),
+    }
+    assert run.report.gateway_rows == 5001
+    assert run.report.provider_rows == 5000
+    assert run.report.matched == 4996
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_main_reads_csv_files(tmp_path, capsys):
+    """
+    コマンドがCSVを読み込み、差異を出力して終了コードで知らせることをテストします。
+    """
+    gateway_path = tmp_path / "gateway.csv"
+    provider_path = tmp_path / "settlement.csv"
+    with open(gateway_path, "w", newline="") as file:
+        csv.writer(file).writerows([["storeOrderNumber", "settlementAmount"], ["A1", "1000"], ["A2", "200"]])
+    with open(provider_path, "w", newline="", encoding="cp932") as file:
+        csv.writer(file).writerows([["注文番号", "金額"], ["A1", "1,000"], ["A2", "200"]])
+
+    output = tmp_path / "report.csv"
+    code = reconcile.main([
+        "--gateway", str(gateway_path),
+        "--provider", str(provider_path),
+        "--order-column", "注文番号",
+        "--amount-column", "金額",
+        "--encoding", "cp932",
+        "--output", str(output),
+    ])
+
+    assert code == 0
+    assert len(output.read_text().splitlines()) == 1
+    assert '"matched": 2' in capsys.readouterr().err
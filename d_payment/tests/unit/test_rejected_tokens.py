@@ -0,0 +1,144 @@
+"""
+拒否済み請求トークンのキャッシュのテストモジュール。
+
+応答コードごとの保持期間、保持件数の上限、ブルームフィルター、
+決済サービスでの外部APIへの送信の省略をテストします。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from app.application.payment_service import PaymentService
+from app.application.rejected_tokens import BloomFilter, RejectedTokenCache, rejection_code
+from app.domain.entities.payment import RawUpstreamResponse
+from app.domain.interfaces.payment_service import HttpClientInterface
+
+EXPIRED = {"success": False, "status_code": 400, "error": {"responseCode": "E400", "responseMessage": "Expired"}}
+REVOKED = {"responseCode": "E410", "responseMessage": "Revoked", "transactionId": "t1"}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RejectingHttpClient(HttpClientInterface):
+    """請求トークンごとに決めたレスポンスを返すHTTPクライアント。"""
+
+    def __init__(self, responses: Dict[str, Dict[str, Any]]):
+        self.responses = responses
+        self.sent: List[str] = []
+
+    async def post(self, url: str, data: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
+        self.sent.append(data["billingToken"])
+        return self.responses.get(data["billingToken"], {"responseCode": "0000"})
+
+    async def post_raw(self, url: str, data: Dict[str, Any], timeout: int = 30):
+        return await self.post(url, data, timeout)
+
+
+def test_rejection_code_reads_body_and_error_responses():
+    """
+    正常応答のresponseCode、エラー応答のボディのresponseCode、HTTPステータスを取り出せることをテストします。
+    """
+    assert rejection_code(REVOKED) == "E410"
+    assert rejection_code(EXPIRED) == "E400"
+    assert rejection_code({"success": False, "status_code": 403, "error": "Forbidden"}) == "403"
+    assert rejection_code(RawUpstreamResponse(200, b"{}", "application/json", "E410")) == "E410"
+    assert rejection_code({"success": False, "error": "Request error: refused"}) is None
+
+
+def test_entries_expire_per_code_and_are_bounded():
+    """
+    応答コードごとの期間で期限切れになり、保持対象外の応答コードは保持せず、
+    上限を超えた場合は古いものから破棄することをテストします。
+    """
+    clock = FakeClock()
+    cache = RejectedTokenCache({"E400": 10, "E410": 100}, max_entries=2, clock=clock)
+
+    assert cache.record("expired", EXPIRED)
+    assert cache.record("revoked", REVOKED)
+    assert not cache.record("ok", {"responseCode": "0000"})
+    assert not cache.record("busy", {"success": False, "status_code": 503, "error": "busy"})
+
+    clock.now = 11
+    assert cache.get("expired") is None
+    assert cache.get("revoked") == REVOKED
+    assert cache.get("ok") is None
+
+    cache.record("a", REVOKED)
+    cache.record("b", REVOKED)
+    assert len(cache) == 2
+    assert cache.get("revoked") is None
+    assert cache.stats()["hitRate"] == pytest.approx(1 / 4)
+    assert cache.stats()["hitsByCode"] == {"E410": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_bloom_filter_skips_lookups_for_unknown_tokens():
+    """
+    ブルームフィルターに偽陰性がなく、未登録のトークンの大半で辞書の検索を省略することをテストします。
+    """
+    bloom = BloomFilter(1000, 0.01)
+    digests = [RejectedTokenCache._digest(f"token{i}") for i in range(1000)]
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+    false_positives = sum(RejectedTokenCache._digest(f"other{i}") in bloom for i in range(10000))
+    assert false_positives < 300
+
+    cache = RejectedTokenCache({"E410": 60}, max_entries=100, use_bloom=True)
+    for i in range(300):
+        cache.record(f"revoked{i}", REVOKED)
+    assert len(cache) == 100
+    assert all(cache.get(f"revoked{i}") == REVOKED for i in range(200, 300))
+    for i in range(1000):
+        assert cache.get(f"unknown{i}") is None
+    assert cache.stats()["bloomSkips"] > 900
+
+
+@pytest.mark.asyncio
+async def test_payment_service_rejects_cached_tokens_without_upstream_call():
+    """
+    拒否された請求トークンの再送は外部APIに送らず、同じ形式のレスポンスを返すことをテストします。
+    """
+    client = RejectingHttpClient({"revoked": REVOKED, "expired": EXPIRED})
+    service = PaymentService(client, rejected_tokens=RejectedTokenCache({"E400": 60, "E410": 60}))
+    request = {"paymentInfo": {"amount": 100, "orderNumber": "O1"}}
+
+    first = await service.process_payment({**request, "billingToken": "revoked"}, transaction_id="t1")
+    retry = await service.process_payment({**request, "billingToken": "revoked"}, transaction_id="t2")
+    expired = [
+        await service.process_payment({**request, "billingToken": "expired"}) for _ in range(3)
+    ]
+    await service.process_payment({**request, "billingToken": "valid"})
+    await service.process_payment({**request, "billingToken": "valid"})
+
+    assert client.sent == ["revoked", "expired", "valid", "valid"]
+    assert first.data == REVOKED
+    assert retry.success and retry.data == {**REVOKED, "transactionId": "t2"}
+    assert all(result.data == EXPIRED for result in expired)
+
+
+@pytest.mark.asyncio
+async def test_payment_service_ignores_non_string_tokens():
+    """
+    文字列以外の請求トークンはキャッシュを参照・記録せず、通常どおり送信することをテストします。
+    """
+    client = RejectingHttpClient({12345: REVOKED})
+    cache = RejectedTokenCache({"E410": 60})
+    service = PaymentService(client, rejected_tokens=cache)
+    request = {"paymentInfo": {"amount": 100, "orderNumber": "O1"}, "billingToken": 12345}
+
+    results = [await service.process_payment(request) for _ in range(2)]
+
+    assert all(result.success and result.data == REVOKED for result in results)
+    assert client.sent == [12345, 12345]
+    assert len(cache) == 0
+    assert cache.lookups == 0
@@ -0,0 +1,61 @@
+"""
+サーバー起動設定のテストモジュール。
+
+ランタイムプロファイルの解決と起動パラメータの組み立てをテストします。
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.core import server
+from app.core.config import Settings
+
+
+def test_production_profile_prefers_fast_runtime(monkeypatch):
+    """
+    uvloopとhttptoolsが利用可能な場合に選択されることをテストします。
+    """
+    monkeypatch.setattr(server, "_is_available", lambda module: True)
+
+    assert server.resolve_runtime("production") == {"loop": "uvloop", "http": "httptools"}
+
+
+def test_production_profile_falls_back(monkeypatch):
+    """
+    uvloopとhttptoolsが利用できない場合にasyncioとh11へフォールバックすることをテストします。
+    """
+    monkeypatch.setattr(server, "_is_available", lambda module: False)
+
+    assert server.resolve_runtime("production") == {"loop": "asyncio", "http": "h11"}
+
+
+def test_default_profile_and_unknown_profile():
+    """
+    defaultプロファイルと不明なプロファイルの扱いをテストします。
+    """
+    assert server.resolve_runtime("default") == {"loop": "asyncio", "http": "h11"}
+    with pytest.raises(ValueError):
+        server.resolve_runtime("turbo")
+
+
+def test_build_server_config_uses_settings():
+    """
+    ワーカー数、バックログ、キープアライブが設定から読み込まれることをテストします。
+    """
+    config = Settings(
+        SERVER_PORT=9001,
+        SERVER_WORKERS=4,
+        SERVER_BACKLOG=4096,
+        SERVER_KEEPALIVE_TIMEOUT=15,
+        SERVER_RUNTIME_PROFILE="default",
+    )
+
+    result = server.build_server_config(config)
+
+    assert result["port"] == 9001
+    assert result["workers"] == 4
+    assert result["backlog"] == 4096
+    assert result["timeout_keep_alive"] == 15
+    assert result["loop"] == "asyncio"
+    assert result["http"] == "h11"
@@ -0,0 +1,107 @@
+"""
+ストリーミング取り込みのテストモジュール。
+
+チャンクからの行の取り出しと、同時実行数を制限した処理の単体テストを提供します。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.application.stream_ingest import StreamIngest, read_lines
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_lines_are_split_across_chunks():
+    """
+    チャンクをまたぐ行、空行、改行で終わらない最後の行を取り出せることをテストします。
+    """
+    lines = await _collect(
+        read_lines(_chunks(b'{"a"', b":1}\n\n", b'{"b":2}\r\n{"c"', b":3}"), max_line_bytes=100)
+    )
+    assert lines == [(1, b'{"a":1}'), (3, b'{"b":2}\r'), (4, b'{"c":3}')]
+
+
+@pytest.mark.asyncio
+async def test_oversized_line_is_skipped_to_next_newline():
+    """
+    上限を超える行は改行まで読み捨ててNoneを返し、次の行から再開することをテストします。
+    """
+    lines = await _collect(
+        read_lines(_chunks(b"x" * 8, b"x" * 8, b"x\nok\n", b"y" * 20), max_line_bytes=10)
+    )
+    assert lines == [(1, None), (2, b"ok"), (3, None)]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_results_follow_completion_order():
+    """
+    同時に処理する行が上限以内で、結果が完了した順に返ることをテストします。
+    """
+    in_flight = 0
+    peak = 0
+
+    async def handle(line_no, line):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # 先の行ほど遅く完了させる
+        await asyncio.sleep(0.001 * (20 - line_no))
+        in_flight -= 1
+        return {"line": line_no, "success": line_no % 5 != 0}
+
+    async def lines():
+        for line_no in range(1, 21):
+            yield line_no, b"{}"
+        yield 21, None
+
+    ingest = StreamIngest(handle, concurrency=4)
+    results = await _collect(ingest.run(lines()))
+
+    assert peak == 4
+    assert sorted(result["line"] for result in results) == list(range(1, 22))
+    assert [result["line"] for result in results[:4]] != [1, 2, 3, 4]
+    assert {"line": 21, "success": False, "error": "行が大きすぎます"} in results
+    assert ingest.summary() == {
+        "done": True,
+        "lines": 21,
+        "succeeded": 16,
+        "failed": 5,
+        "stopped": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_stop_ends_reading_but_finishes_in_flight_lines():
+    """
+    読み込みを打ち切った後も、処理中の行は完了して結果が返ることをテストします。
+    """
+    stop = False
+
+    async def handle(line_no, line):
+        nonlocal stop
+        if line_no == 1:
+            stop = True
+        await asyncio.sleep(0.01)
+        return {"line": line_no, "success": True}
+
+    async def lines():
+        for line_no in range(1, 100):
+            yield line_no, b"{}"
+
+    ingest = StreamIngest(handle, concurrency=2, should_stop=lambda: stop)
+    results = await _collect(ingest.run(lines()))
+
+    assert sorted(result["line"] for result in results) == [1, 2]
+    assert ingest.summary()["stopped"] is True
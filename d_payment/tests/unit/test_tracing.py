@@ -0,0 +1,153 @@
+"""
+トレーシングのテストモジュール。
+
+traceparentヘッダーの解析、サンプリングの決定と親子関係の引き継ぎ、
+スパンのファイルへのまとめての書き出しをテストします。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import List
+
+import pytest
+
+from app.core.tracing import NOOP_SPAN, Span, Tracer, current_span, parse_traceparent
+from app.infrastructure.trace_exporter import FileSpanExporter
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class ListExporter:
+    """エクスポートされたスパンを保持するエクスポーター。"""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+def test_parse_traceparent_accepts_only_valid_headers():
+    """
+    正しい形式のヘッダーのみを受け付け、サンプリングフラグを読み取ることをテストします。
+    """
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID.upper()}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_ID}-01") is None
+
+
+def test_children_follow_parent_and_remote_sampling_decision():
+    """
+    子のスパンが親のトレースIDとサンプリングの決定を引き継ぎ、
+    受信したtraceparentのサンプリングフラグに従うことをテストします。
+    """
+    exporter = ListExporter()
+    tracer = Tracer(enabled=True, sample_rate=0.0, exporter=exporter)
+
+    with tracer.start_span("ingress", traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+        with tracer.start_span("child") as child:
+            assert current_span() is child
+            child.set_attribute("key", "value")
+        assert current_span() is root
+    assert current_span() is None
+
+    assert [span.name for span in exporter.spans] == ["child", "ingress"]
+    assert root.parent_id == PARENT_ID and child.parent_id == root.span_id
+    assert child.trace_id == TRACE_ID
+    assert child.traceparent == f"00-{TRACE_ID}-{child.span_id}-01"
+    assert exporter.spans[0].to_dict()["attributes"] == {"key": "value"}
+
+    # サンプリングされない場合はIDのみ引き継ぎ、何も記録しない
+    exporter.spans.clear()
+    with tracer.start_span("unsampled") as root:
+        with tracer.start_span("child") as child:
+            child.set_attribute("key", "value")
+    assert not root.recording and child.trace_id == root.trace_id
+    assert child.traceparent.endswith("-00")
+    assert child.attributes == {}
+    assert exporter.spans == []
+
+    tracer.configure(False)
+    assert tracer.start_span("disabled") is NOOP_SPAN
+
+
+def test_sample_rate_applies_to_root_spans():
+    """
+    親のないスパンのみ、割合に応じてサンプリングされることをテストします。
+    """
+    values = iter([0.1, 0.9])
+    tracer = Tracer(enabled=True, sample_rate=0.5, random_value=lambda: next(values))
+    assert tracer.start_span("first").recording
+    assert not tracer.start_span("second").recording
+
+
+def test_file_exporter_writes_batches_and_drops_when_full(tmp_path):
+    """
+    スパンをJSON Lines形式でまとめて書き出し、キューが満杯の場合は待たずに破棄することをテストします。
+    """
+    path = tmp_path / "spans" / "spans.jsonl"
+    exporter = FileSpanExporter(str(path), batch_size=2, interval=0.05)
+    tracer = Tracer(enabled=True, exporter=exporter)
+    for i in range(5):
+        with tracer.start_span(f"span{i}"):
+            pass
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["name"] for line in lines] == [f"span{i}" for i in range(5)]
+    assert all(line["durationMs"] >= 0 and line["parentSpanId"] is None for line in lines)
+    assert exporter.exported == 5
+
+    full = FileSpanExporter(str(path), max_queue=1)
+    full._thread = object()  # 書き込みスレッドを起動しない
+    full.export(lines[0])
+    full.export(lines[1])
+    assert full.dropped == 1
+
+
+def test_file_exporter_fails_fast_and_closes_without_blocking(tmp_path):
+    """
+    使用できないパスは生成時にエラーとなり、書き込みスレッドが終了していても
+    キューが満杯のまま停止処理がブロックしないことをテストします。
+    """
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("", encoding="utf-8")
+    with pytest.raises(OSError):
+        FileSpanExporter(str(blocker / "spans.jsonl"))
+
+    exporter = FileSpanExporter(str(tmp_path / "spans.jsonl"), max_queue=1)
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    exporter._thread = dead
+    exporter.export(object())
+    exporter.export(object())
+
+    started = time.monotonic()
+    exporter.close()
+    assert time.monotonic() - started < 1
+    assert exporter.dropped == 1
+
+
+def test_file_exporter_survives_unserializable_spans(tmp_path):
+    """
+    書き出しに失敗したバッチのみを破棄し、以降のスパンは書き出されることをテストします。
+    """
+    path = tmp_path / "spans.jsonl"
+    exporter = FileSpanExporter(str(path), batch_size=1, interval=0.01)
+    exporter.export(object())  # to_dict()を持たない
+    tracer = Tracer(enabled=True, exporter=exporter)
+    with tracer.start_span("after-error"):
+        pass
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["name"] for line in lines] == ["after-error"]
+    assert exporter.dropped == 1
@@ -0,0 +1,150 @@
+"""
+上流接続のトランスポートのテストモジュール。
+
+DNSキャッシュの保持期間と障害時の動作、解決したアドレスへの接続、
+TLSセッションの再利用をテストします。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import ssl
+import subprocess
+
+import httpcore
+import httpx
+import pytest
+
+from app.infrastructure.transport import (
+    CachingNetworkBackend,
+    DnsCache,
+    create_client,
+    create_ssl_context,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_honours_ttl_and_serves_stale_on_failure():
+    """
+    保持期間内は再解決せず、同時の解決は1回にまとめ、期限切れ後の再解決に
+    失敗した場合は前回の結果を使うことをテストします。
+    """
+    clock = FakeClock()
+    lookups = []
+    answers = [["10.0.0.1", "10.0.0.2"], OSError("resolver down"), OSError("no such host")]
+
+    async def lookup(host, port):
+        lookups.append((host, port))
+        await asyncio.sleep(0)
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    cache = DnsCache(ttl=60, lookup=lookup, clock=clock)
+    first = await asyncio.gather(*(cache.resolve("payment.example.jp", 443) for _ in range(5)))
+    assert first == [["10.0.0.1", "10.0.0.2"]] * 5
+    assert len(lookups) == 1
+
+    clock.now = 59
+    assert await cache.resolve("payment.example.jp", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert len(lookups) == 1
+
+    clock.now = 61
+    assert await cache.resolve("payment.example.jp", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert len(lookups) == 2
+    assert cache.stats()["stale"] == 1
+
+    with pytest.raises(OSError):
+        await DnsCache(lookup=lookup).resolve("unknown.example.jp", 443)
+
+
+@pytest.mark.asyncio
+async def test_create_client_installs_caching_backend():
+    """
+    インストールされているhttpxで、DNSキャッシュのネットワークバックエンドが設定されることをテストします
+    （httpxの内部構造が変わった場合に検出するため）。
+    """
+    client = create_client(httpx.Limits(), dns_cache=DnsCache())
+    try:
+        assert isinstance(client._transport._pool._network_backend, CachingNetworkBackend)
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_caching_backend_tries_next_address_when_connect_fails():
+    """
+    解決したアドレスのうち接続できないものを飛ばして接続することをテストします。
+    """
+    attempts = []
+
+    class Backend(httpcore.AsyncMockBackend):
+        async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            attempts.append(host)
+            if host == "10.0.0.1":
+                raise httpcore.ConnectError("refused")
+            return await super().connect_tcp(host, port)
+
+    async def lookup(host, port):
+        return ["10.0.0.1", "10.0.0.2"]
+
+    backend = CachingNetworkBackend(DnsCache(lookup=lookup), Backend([]))
+    await backend.connect_tcp("payment.example.jp", 443)
+    await backend.connect_tcp("127.0.0.1", 443)
+
+    assert attempts == ["10.0.0.1", "10.0.0.2", "127.0.0.1"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is not installed")
+async def test_tls_sessions_are_resumed_on_new_connections(tmp_path):
+    """
+    同じホストへの2本目以降のコネクションでTLSセッションが再開されることをテストします。
+    """
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert, key)
+    resumed = []
+
+    async def handle(reader, writer):
+        resumed.append(writer.get_extra_info("ssl_object").session_reused)
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=server_context)
+    port = server.sockets[0].getsockname()[1]
+    context = create_ssl_context(cafile=str(cert))
+    try:
+        for _ in range(3):
+            client = create_client(httpx.Limits(), dns_cache=DnsCache(), ssl_context=context)
+            async with client:
+                response = await client.get(f"https://localhost:{port}/")
+                assert response.status_code == 200
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert resumed == [False, True, True]
+    assert context.stats()["offered"] == 2